@@ -0,0 +1,190 @@
+"""
+Benchmark: reportes agregados en SQLite frente a la réplica DuckDB.
+
+Carga productos y puntos de historial de precios sintéticos en un
+SQLite temporal y mide:
+    1. Sincronización inicial e incremental (1% de productos cambiados)
+    de la réplica analítica.
+    2. Percentiles de precio por tienda y semana: SQL con funciones de
+    ventana en SQLite frente a quantile_cont en DuckDB.
+    3. Latencia de commits pequeños de un escritor mientras el reporte
+    corre en paralelo sobre SQLite o sobre DuckDB.
+
+Uso:
+    python -m benchmarks.bench_analytics [--productos 300000] [--puntos 8]
+"""
+
+import argparse
+import itertools
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+# La base de datos temporal debe configurarse antes de importar src.db
+_TMP_DIR = tempfile.mkdtemp(prefix="bench_analytics_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP_DIR, 'bench.db')}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text  # noqa: E402
+
+from src.db.analytics import AnalyticsMirror  # noqa: E402
+from src.db.database import engine, init_db  # noqa: E402
+
+TIENDAS = ["https://www.alkosto.com/p/", "https://articulo.mercadolibre.com.co/MCO-"]
+LOTE = 20_000
+INICIO = datetime(2024, 1, 1)
+# IDs de las filas del escritor simulado (no chocan con la carga)
+_IDS_ESCRITOR = itertools.count(10_000_000)
+
+# Percentiles por tienda y semana sin quantile: posición dentro de la ventana
+SQLITE_PERCENTILES = """
+    WITH obs AS (
+        SELECT CASE WHEN d.url LIKE '%mercadolibre%' THEN 'mercadolibre'
+                    WHEN d.url LIKE '%alkosto%' THEN 'alkosto'
+                    ELSE 'desconocida' END AS tienda,
+               strftime('%Y-%W', h.fecha) AS semana,
+               h.precio
+        FROM precios_historicos h
+        JOIN scraped_data d ON d.id = h.producto_id
+        WHERE h.precio IS NOT NULL
+    ), ordenadas AS (
+        SELECT tienda, semana, precio,
+               row_number() OVER (PARTITION BY tienda, semana ORDER BY precio) AS rn,
+               count(*) OVER (PARTITION BY tienda, semana) AS n
+        FROM obs
+    )
+    SELECT tienda, semana, count(*) AS observaciones,
+           max(CASE WHEN rn = CAST(0.25 * n AS INT) + 1 THEN precio END) AS p25,
+           max(CASE WHEN rn = CAST(0.5 * n AS INT) + 1 THEN precio END) AS p50,
+           max(CASE WHEN rn = CAST(0.75 * n AS INT) + 1 THEN precio END) AS p75,
+           max(CASE WHEN rn = CAST(0.9 * n AS INT) + 1 THEN precio END) AS p90,
+           avg(precio) AS promedio
+    FROM ordenadas
+    GROUP BY tienda, semana
+    ORDER BY semana, tienda
+"""
+
+
+def cargar(productos: int, puntos: int) -> float:
+    rnd = random.Random(0)
+    inicio = time.perf_counter()
+    with engine.begin() as conn:
+        for base in range(0, productos, LOTE):
+            ids = range(base + 1, min(base + LOTE, productos) + 1)
+            conn.execute(text(
+                "INSERT INTO scraped_data (id, url, tipo, fecha_extraccion) "
+                "VALUES (:id, :url, 'e-commerce', :fecha)"
+            ), [{"id": i, "url": f"{TIENDAS[i % 2]}{i}", "fecha": INICIO} for i in ids])
+            conn.execute(text(
+                "INSERT INTO productos_ecommerce (id, nombre, precio, precio_original, descuento) "
+                "VALUES (:id, :nombre, :precio, :original, :descuento)"
+            ), [{
+                "id": i, "nombre": f"Producto {i}",
+                "precio": float(rnd.randint(50, 8000) * 1000),
+                "original": float(rnd.randint(8000, 9000) * 1000),
+                "descuento": f"{rnd.randint(0, 60)}%",
+            } for i in ids])
+            conn.execute(text(
+                "INSERT INTO precios_historicos (producto_id, fecha, secuencia, precio, "
+                "precio_original, descuento, es_delta) "
+                "VALUES (:pid, :fecha, :seq, :precio, :original, :descuento, 0)"
+            ), [{
+                "pid": i, "seq": s,
+                "fecha": INICIO + timedelta(days=7 * s + rnd.random() * 6),
+                "precio": float(rnd.randint(50, 8000) * 1000),
+                "original": float(rnd.randint(8000, 9000) * 1000),
+                "descuento": f"{rnd.randint(0, 60)}%",
+            } for i in ids for s in range(puntos)])
+    return time.perf_counter() - inicio
+
+
+def actualizar(fraccion: float) -> int:
+    """Simula un scrape que cambia el precio de una fracción de productos"""
+    with engine.begin() as conn:
+        total = conn.execute(text("SELECT max(id) FROM productos_ecommerce")).scalar()
+        ids = random.Random(1).sample(range(1, total + 1), int(total * fraccion))
+        ahora = datetime.now()
+        conn.execute(text("UPDATE productos_ecommerce SET precio = precio + 1000 WHERE id = :id"),
+                     [{"id": i} for i in ids])
+        conn.execute(text("UPDATE scraped_data SET fecha_actualizacion = :f WHERE id = :id"),
+                     [{"id": i, "f": ahora} for i in ids])
+    return len(ids)
+
+
+def latencia_escritor(consulta):
+    """
+    Commits de 100 filas mientras `consulta` corre en otro hilo.
+    Returns: (segundos de la consulta, p50 ms, p95 ms, commits)
+    """
+    tiempos, fin = [], threading.Event()
+    resultado = {}
+
+    def lector():
+        t0 = time.perf_counter()
+        consulta()
+        resultado["t"] = time.perf_counter() - t0
+        fin.set()
+
+    hilo = threading.Thread(target=lector)
+    hilo.start()
+    while not fin.is_set():
+        ids = [next(_IDS_ESCRITOR) for _ in range(100)]
+        t0 = time.perf_counter()
+        with engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO scraped_data (id, url, tipo, fecha_extraccion) "
+                "VALUES (:id, :url, 'bench', CURRENT_TIMESTAMP)"
+            ), [{"id": i, "url": f"https://bench.local/{i}"} for i in ids])
+        tiempos.append((time.perf_counter() - t0) * 1000)
+    hilo.join()
+    tiempos.sort()
+    return (resultado["t"], statistics.median(tiempos),
+            tiempos[max(0, int(len(tiempos) * 0.95) - 1)], len(tiempos))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--productos", type=int, default=300_000)
+    parser.add_argument("--puntos", type=int, default=8, help="Puntos de historial por producto")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    init_db()
+    t_carga = cargar(args.productos, args.puntos)
+    print(f"SQLite: {os.environ['DATABASE_URL']}")
+    print(f"Carga: {args.productos:,} productos, {args.productos * args.puntos:,} puntos "
+          f"en {t_carga:.1f}s")
+
+    mirror = AnalyticsMirror(os.path.join(_TMP_DIR, "analytics.duckdb"))
+    t0 = time.perf_counter()
+    copiados = mirror.sync()
+    print(f"Sincronización inicial: {time.perf_counter() - t0:.1f}s {copiados}")
+    cambiados = actualizar(0.01)
+    t0 = time.perf_counter()
+    copiados = mirror.sync()
+    print(f"Sincronización incremental ({cambiados:,} cambiados): "
+          f"{time.perf_counter() - t0:.2f}s {copiados}")
+
+    def en_sqlite():
+        with engine.connect() as conn:
+            conn.execute(text(SQLITE_PERCENTILES)).all()
+
+    def en_duckdb():
+        mirror.run_report("percentiles_tienda_semana")
+
+    print(f"{'percentiles tienda/semana':<28}{'consulta (s)':>13}"
+          f"{'commit p50 (ms)':>17}{'commit p95 (ms)':>17}{'commits':>9}")
+    for nombre, fn in [("SQLite (ventanas)", en_sqlite), ("DuckDB (réplica)", en_duckdb)]:
+        t, p50, p95, n = latencia_escritor(fn)
+        print(f"{nombre:<28}{t:>13.2f}{p50:>17.2f}{p95:>17.2f}{n:>9}")
+    mirror.close()
+
+
+if __name__ == "__main__":
+    main()
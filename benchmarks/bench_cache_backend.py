@@ -0,0 +1,131 @@
+"""
+Benchmark: caché de resultados LRUCache (pickle) frente a SQLiteCache.
+
+Cada entrada es un resultado de tarea con un listado simulado de
+productos. Mide:
+    1. Costo de set() a medida que crece el caché (el pickle reescribe
+    todo el archivo en cada escritura; SQLite hace un upsert).
+    2. Arranque: construir el caché lleno y leer una entrada.
+    3. Varios procesos escribiendo a la vez sobre el mismo directorio
+    (como la app Java, que lanza un proceso por scrape): entradas que
+    sobreviven al final.
+
+Uso:
+    python -m benchmarks.bench_cache_backend [--entradas 1000] [--productos 50] [--procesos 4]
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+# Directorio temporal compartido con los procesos hijos (spawn reimporta el módulo)
+_TMP_DIR = os.environ.get("BENCH_CACHE_DIR") or tempfile.mkdtemp(prefix="bench_cache_")
+os.environ["BENCH_CACHE_DIR"] = _TMP_DIR
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP_DIR, 'bench.db')}")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.coordinator.cache_store import SQLiteCache  # noqa: E402
+from src.coordinator.scraping_coordinator import LRUCache  # noqa: E402
+
+logging.disable(logging.WARNING)
+
+BACKENDS = {"pickle": LRUCache, "sqlite": SQLiteCache}
+
+
+def directorio(backend: str) -> str:
+    return os.path.join(_TMP_DIR, backend)
+
+
+def resultado(i: int, productos: int) -> dict:
+    url = f"https://www.alkosto.com/search?text=tv{i}"
+    return {
+        "url": url, "type": "dynamic", "subtype": "e-commerce", "from_cache": False,
+        "data": [{
+            "title": f"Televisor {k} pulgadas Smart TV 4K UHD",
+            "price_sell": 1_000_000 + k, "url": f"{url}&p={k}",
+            "image": f"https://www.alkosto.com/img/{k}.jpg",
+        } for k in range(productos)],
+        "metrics": {"duration": 1.0, "attempts": 1},
+    }
+
+
+def escritor(backend: str, inicio: int, n: int, productos: int, max_size: int) -> None:
+    """Proceso hijo: escribe n entradas propias en el caché compartido"""
+    cache = BACKENDS[backend](max_size=max_size, cache_dir=directorio(backend))
+    for i in range(inicio, inicio + n):
+        cache.set(f"clave{i}", resultado(i, productos))
+
+
+def medir_escrituras(backend: str, entradas: int, productos: int):
+    """Returns: lista de (entradas en caché, ms por set) por tramo"""
+    shutil.rmtree(directorio(backend), ignore_errors=True)
+    cache = BACKENDS[backend](max_size=entradas, cache_dir=directorio(backend))
+    tramo = max(1, entradas // 4)
+    medidas = []
+    for desde in range(0, entradas, tramo):
+        valores = [resultado(i, productos) for i in range(desde, desde + tramo)]
+        t0 = time.perf_counter()
+        for i, valor in enumerate(valores, desde):
+            cache.set(f"clave{i}", valor)
+        medidas.append((desde + tramo, (time.perf_counter() - t0) * 1000 / tramo))
+    return medidas
+
+
+def medir_arranque(backend: str, entradas: int) -> float:
+    """ms para construir el caché ya lleno y leer una entrada"""
+    t0 = time.perf_counter()
+    cache = BACKENDS[backend](max_size=entradas, cache_dir=directorio(backend))
+    assert cache.get(f"clave{entradas - 1}") is not None
+    return (time.perf_counter() - t0) * 1000
+
+
+def medir_concurrencia(backend: str, procesos: int, por_proceso: int, productos: int) -> int:
+    """Entradas que quedan tras `procesos` escritores simultáneos"""
+    shutil.rmtree(directorio(backend), ignore_errors=True)
+    total = procesos * por_proceso
+    ctx = multiprocessing.get_context("spawn")
+    hijos = [
+        ctx.Process(target=escritor, args=(backend, p * por_proceso, por_proceso,
+                                           productos, total))
+        for p in range(procesos)
+    ]
+    for hijo in hijos:
+        hijo.start()
+    for hijo in hijos:
+        hijo.join()
+    return BACKENDS[backend](max_size=total, cache_dir=directorio(backend)).size()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--entradas", type=int, default=1000)
+    parser.add_argument("--productos", type=int, default=50, help="Productos por entrada")
+    parser.add_argument("--procesos", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"Entradas de {args.productos} productos, caché de {args.entradas}")
+    escrituras = {backend: medir_escrituras(backend, args.entradas, args.productos)
+                  for backend in BACKENDS}
+    print(f"{'entradas':>9}" + "".join(f"{backend + ' ms/set':>16}" for backend in BACKENDS))
+    for fila in zip(*escrituras.values()):
+        print(f"{fila[0][0]:>9}" + "".join(f"{ms:>16.2f}" for _, ms in fila))
+
+    print("Arranque con el caché lleno (ms): " + ", ".join(
+        f"{backend} {medir_arranque(backend, args.entradas):.1f}" for backend in BACKENDS
+    ))
+
+    por_proceso = 100
+    total = args.procesos * por_proceso
+    print(f"{args.procesos} procesos escribiendo {por_proceso} entradas cada uno: " + ", ".join(
+        f"{backend} {medir_concurrencia(backend, args.procesos, por_proceso, args.productos)}/{total}"
+        for backend in BACKENDS
+    ))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Benchmark: expulsión del caché por número de entradas frente a bytes (LRU y GreedyDual-Size).
+
+Traza sintética de consultas con popularidad Zipf. Cada URL devuelve
+entre 1 y 500 productos (la mayoría pocos) y tarda entre 1 y 10 s en
+obtenerse. Se reproduce la traza sobre SQLiteCache con:
+    1. LRU limitado a `--entradas` entradas (comportamiento anterior).
+    2. LRU limitado a `--mb` MB serializados.
+    3. GreedyDual-Size limitado a `--mb` MB (costo = segundos de scraping).
+Mide tasa de aciertos, fracción del tiempo de scraping ahorrado y bytes
+máximos ocupados.
+
+Uso:
+    python -m benchmarks.bench_cache_eviction [--consultas 20000] [--urls 3000] [--mb 4] [--entradas 1000]
+"""
+
+import argparse
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+_TMP_DIR = tempfile.mkdtemp(prefix="bench_eviction_")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.coordinator.cache_store import SQLiteCache  # noqa: E402
+
+logging.disable(logging.WARNING)
+
+MB = 1024 * 1024
+
+
+def generar_traza(consultas: int, urls: int, semilla: int = 7):
+    """Returns: (lista de índices de URL, productos por URL, segundos por URL)"""
+    rnd = random.Random(semilla)
+    pesos = [1 / (i + 1) ** 0.9 for i in range(urls)]
+    traza = rnd.choices(range(urls), weights=pesos, k=consultas)
+    # La mayoría de los listados son cortos; pocos llegan a 500 productos
+    productos = [min(500, max(1, int((rnd.paretovariate(1.1) - 1) * 20))) for _ in range(urls)]
+    segundos = [rnd.uniform(1, 10) for _ in range(urls)]
+    # La popularidad no depende del tamaño del listado
+    rnd.shuffle(productos)
+    return traza, productos, segundos
+
+
+def resultado(i: int, productos: int) -> dict:
+    url = f"https://www.alkosto.com/search?text=q{i}"
+    return {
+        "url": url, "type": "dynamic", "subtype": "e-commerce",
+        "data": [{
+            "title": f"Producto {i}-{k} con descripción de ejemplo",
+            "price_sell": 100_000 + k, "url": f"{url}&p={k}",
+        } for k in range(productos)],
+    }
+
+
+def reproducir(nombre: str, cache: SQLiteCache, traza, productos, segundos):
+    aciertos, ahorrado, total, pico = 0, 0.0, 0.0, 0
+    t0 = time.perf_counter()
+    for n, i in enumerate(traza):
+        total += segundos[i]
+        if cache.get(f"q{i}") is not None:
+            aciertos += 1
+            ahorrado += segundos[i]
+        else:
+            cache.set(f"q{i}", resultado(i, productos[i]), cost=segundos[i])
+        if n % 200 == 0:
+            pico = max(pico, cache.get_cache_info()["bytes"])
+    info = cache.get_cache_info()
+    pico = max(pico, info["bytes"])
+    print(f"{nombre:>22}{aciertos / len(traza):>10.1%}{ahorrado / total:>11.1%}"
+          f"{pico / MB:>12.1f}{info['entries']:>10}{time.perf_counter() - t0:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--consultas", type=int, default=20000)
+    parser.add_argument("--urls", type=int, default=3000)
+    parser.add_argument("--mb", type=float, default=4, help="Presupuesto en MB")
+    parser.add_argument("--entradas", type=int, default=1000,
+                        help="Límite de entradas del LRU anterior")
+    args = parser.parse_args()
+
+    traza, productos, segundos = generar_traza(args.consultas, args.urls)
+    presupuesto = int(args.mb * MB)
+    configuraciones = {
+        f"lru {args.entradas} entradas": dict(max_size=args.entradas, max_bytes=2**62,
+                                              eviction="lru"),
+        f"lru {args.mb:g} MB": dict(max_bytes=presupuesto, eviction="lru"),
+        f"gds {args.mb:g} MB": dict(max_bytes=presupuesto, eviction="gds"),
+    }
+    print(f"{args.consultas} consultas sobre {args.urls} URLs "
+          f"({min(productos)}-{max(productos)} productos por listado)")
+    print(f"{'política':>22}{'aciertos':>10}{'ahorrado':>11}{'pico (MB)':>12}"
+          f"{'entradas':>10}{'segundos':>10}")
+    for n, (nombre, opciones) in enumerate(configuraciones.items()):
+        directorio = os.path.join(_TMP_DIR, str(n))
+        reproducir(nombre, SQLiteCache(cache_dir=directorio, **opciones),
+                   traza, productos, segundos)
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark: columnas JSON comprimidas (CompressedJSON) vs JSON plano.
+
+Genera productos tipo Alkosto (listas de características largas) en
+un SQLite temporal y mide:
+    1. Tamaño del archivo con JSON sin comprimir.
+    2. Tamaño tras migrar con diccionario entrenado (+ VACUUM).
+    3. Latencia de lectura de la API (/api/ecommerce y /api/data/<id>)
+    antes y después.
+
+Uso:
+    python -m benchmarks.bench_json_compression [--productos 20000] [--codec zstd]
+"""
+
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# La base de datos temporal debe configurarse antes de importar src.db
+_TMP_DIR = tempfile.mkdtemp(prefix="bench_json_compression_")
+_DB_PATH = os.path.join(_TMP_DIR, "bench.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{_DB_PATH}"
+os.environ["JSON_COMPRESSION"] = "none"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.components.data_handler import DataHandler  # noqa: E402
+from src.db import compression  # noqa: E402
+from src.db.database import engine, init_db  # noqa: E402
+from src.web.app import create_app  # noqa: E402
+
+MARCAS = ["Samsung", "LG", "Lenovo", "HP", "Xiaomi", "Apple", "Asus", "Kalley", "Challenger"]
+CARACTERISTICAS = [
+    "Marca", "Modelo", "Tamaño de pantalla", "Resolución", "Procesador", "Memoria RAM",
+    "Almacenamiento", "Sistema operativo", "Garantía", "Color", "Peso", "Conectividad",
+    "Tipo de panel", "Frecuencia de actualización", "Puertos HDMI", "Puertos USB",
+    "Bluetooth", "Wi-Fi", "Batería", "Dimensiones", "Voltaje", "Consumo de energía",
+]
+
+
+def generar_productos(n: int, seed: int = 0):
+    """Productos sintéticos con descripciones del estilo de Alkosto"""
+    rnd = random.Random(seed)
+    productos = []
+    for i in range(n):
+        marca = rnd.choice(MARCAS)
+        descripcion = [
+            {"-": clave, "": f"{marca} {rnd.randint(1, 64)}" if clave != "Marca" else marca}
+            for clave in rnd.sample(CARACTERISTICAS, rnd.randint(12, len(CARACTERISTICAS)))
+        ]
+        productos.append({
+            "title": f"Producto {marca} {i}",
+            "url": f"https://www.alkosto.com/producto-{i}/p/{7705946000000 + i}",
+            "image": f"https://www.alkosto.com/medias/{i}.webp",
+            "price_original": f"${rnd.randint(100, 5000) * 1000:,}".replace(",", "."),
+            "price_sell": f"${rnd.randint(100, 5000) * 900:,}".replace(",", "."),
+            "discount": f"{rnd.randint(0, 40)}%",
+            "rating": {"rating": f"{rnd.randint(10, 50) / 10} de 5",
+                       "rating_count": f"{rnd.randint(0, 900)} comentarios"},
+            "description": descripcion,
+        })
+    return productos
+
+
+def tamano_db() -> int:
+    with engine.connect() as conn:
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+        conn.exec_driver_sql("VACUUM")
+    return os.path.getsize(_DB_PATH)
+
+
+def medir_api(client, ids, paginas: int = 50):
+    """Latencias (ms) de listados paginados y lecturas por ID"""
+    listados, detalles = [], []
+    for page in range(1, paginas + 1):
+        inicio = time.perf_counter()
+        assert client.get(f"/api/ecommerce?page={page}&per_page=100").status_code == 200
+        listados.append((time.perf_counter() - inicio) * 1000)
+    for data_id in ids:
+        inicio = time.perf_counter()
+        assert client.get(f"/api/data/{data_id}").status_code == 200
+        detalles.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(listados), statistics.median(detalles)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--productos", type=int, default=20_000)
+    parser.add_argument("--codec", default="zstd" if compression.ZSTD_AVAILABLE else "zlib",
+                        choices=["zstd", "zlib"])
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    init_db()
+    productos = generar_productos(args.productos)
+    for inicio in range(0, len(productos), 5000):
+        DataHandler(productos[inicio:inicio + 5000], storage_format="sql",
+                    price_history=False).store_sql("e-commerce")
+
+    client = create_app().test_client()
+    ids = random.Random(1).sample(range(1, args.productos + 1), 200)
+
+    plano = tamano_db()
+    lat_plano = medir_api(client, ids)
+
+    compression.set_json_codec(args.codec)
+    inicio = time.perf_counter()
+    stats = compression.migrate_json_columns(engine, train=True)
+    t_migracion = time.perf_counter() - inicio
+    comprimido = tamano_db()
+    lat_comp = medir_api(client, ids)
+
+    print(f"SQLite: {_DB_PATH}  productos: {args.productos}  códec: {args.codec}")
+    print(f"Diccionario: {stats.get('diccionario_bytes', 0)} bytes  "
+          f"migración: {stats['filas_reescritas']} filas en {t_migracion:.2f}s")
+    print(f"{'':<18}{'DB (MiB)':>10}{'listado p50 (ms)':>19}{'detalle p50 (ms)':>19}")
+    print(f"{'JSON plano':<18}{plano / 2**20:>10.2f}{lat_plano[0]:>19.2f}{lat_plano[1]:>19.2f}")
+    print(f"{'comprimido':<18}{comprimido / 2**20:>10.2f}{lat_comp[0]:>19.2f}{lat_comp[1]:>19.2f}")
+    print(f"Columnas JSON: {stats['bytes_antes'] / 2**20:.2f} MiB -> "
+          f"{stats['bytes_despues'] / 2**20:.2f} MiB")
+
+
+if __name__ == "__main__":
+    main()
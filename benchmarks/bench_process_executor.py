@@ -0,0 +1,156 @@
+"""
+Benchmark: ScrapingCoordinator con executor='thread' frente a 'process'.
+
+Cada tarea parsea con EcommerceExtractor un listado sintético de Alkosto
+(sin navegador) y entrega los productos al sink de la ejecución, de modo
+que el trabajo es CPU (BeautifulSoup) más la contabilidad del padre.
+Mide:
+    1. Tareas/s con 1, 2, 4 y 8 workers en modo hilos (un solo GIL) y
+    en modo procesos (solo con tantos workers como núcleos haya).
+    2. CPU por tarea en el worker (t_w) y en el padre (t_p).
+    3. Curva esperada en una máquina de 8 núcleos (Amdahl): el padre es
+    la parte serial, S(n) = (t_w + t_p) / max(t_w / n, t_p).
+
+Uso:
+    python -m benchmarks.bench_process_executor [--tareas 64] [--productos 200]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from functools import lru_cache
+
+# La base de datos temporal debe configurarse antes de importar src.db
+_TMP_DIR = tempfile.mkdtemp(prefix="bench_process_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP_DIR, 'bench.db')}")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.components.dynamic.ecommerce_extractor import EcommerceExtractor  # noqa: E402
+from src.coordinator.scraping_coordinator import ScrapingCoordinator  # noqa: E402
+from src.db.database import init_db  # noqa: E402
+
+# También en los workers (el módulo se reimporta al hacer spawn)
+logging.disable(logging.INFO)
+
+NUCLEOS_OBJETIVO = 8
+WORKERS = (1, 2, 4, 8)
+
+PRODUCTO_HTML = """
+<li class="ais-InfiniteHits-item">
+  <a class="product__item__top__link" href="/p/__TAREA__-{i}">
+    <h3 class="product__item__top__title">Televisor {i} pulgadas Smart TV</h3>
+  </a>
+  <div class="product__item__information__image"><img src="/img/{i}.jpg"></div>
+  <p class="product__price--discounts__old"><span>$</span>{original}</p>
+  <span class="price"><span>$</span>{precio}</span>
+  <div class="discount-label--newDesign"><span class="label-offer">-{descuento}%</span></div>
+  <div class="product__item__top__rating"><span class="averageNumber">4.{d}</span></div>
+  <span class="review">({i})</span>
+  <ul class="product__item__information__key-features--list">
+    <li>Resolución 4K</li><li>HDR</li><li>Wi-Fi</li>
+  </ul>
+</li>"""
+
+
+@lru_cache(maxsize=None)
+def listado_html(productos: int) -> str:
+    items = "".join(
+        PRODUCTO_HTML.format(
+            i=i, precio=f"{1_000 + i:,}.000", original=f"{1_500 + i:,}.000",
+            descuento=10 + i % 40, d=i % 10,
+        )
+        for i in range(productos)
+    )
+    return (
+        "<html><body><ol class='breadcrumb'><li>Inicio</li><li>Televisores</li></ol>"
+        f"<ul>{items}</ul></body></html>"
+    )
+
+
+def parsear_tarea(task, params, timeout, grace_period, cancel_slot=None):
+    """Sustituto de process_worker.scrape_task: parsea el listado sintético"""
+    inicio, cpu = time.perf_counter(), time.process_time()
+    productos = task["num_productos"]
+    extractor = EcommerceExtractor(task["url"], tienda="alkosto", num_productos=productos,
+                                   autostore=False)
+    html = listado_html(productos).replace("__TAREA__", task["url"].rsplit("=", 1)[-1])
+    data = extractor.parse(html_content=html)
+    return {
+        "data": data, "timed_out": False, "pid": os.getpid(),
+        "cpu_time": time.process_time() - cpu,
+        "duration": time.perf_counter() - inicio,
+    }
+
+
+def tareas(n: int, productos: int):
+    return [{
+        "url": f"https://www.alkosto.com/search?text=tv{i}",
+        "type": "dynamic", "subtype": "e-commerce",
+        "num_productos": productos, "timeout": 600,
+    } for i in range(n)]
+
+
+def ejecutar(executor: str, workers: int, n: int, productos: int):
+    """Returns: (tareas/s, CPU del padre por tarea, CPU de worker por tarea)"""
+    coordinator = ScrapingCoordinator(
+        tareas(n, productos), max_workers=workers, executor=executor,
+        delay_between_requests=0, rate_limits={},
+        domain_concurrency={"alkosto": workers}, respect_robots_txt=False,
+        enable_cache=False, show_progress=False, log_level="ERROR",
+    )
+    if executor == "process":
+        coordinator.process_target = parsear_tarea
+    else:
+        coordinator._scrape_with_extractor = (
+            lambda task, cancel_token=None: parsear_tarea(task, None, 0, 0)["data"]
+        )
+    cpu, t0 = time.process_time(), time.perf_counter()
+    resultado = coordinator.run()
+    elapsed = time.perf_counter() - t0
+    cpu_padre = time.process_time() - cpu
+    ok = len(coordinator.get_successful_tasks())
+    assert ok == n, f"{ok}/{n} tareas exitosas"
+    pool = resultado["statistics"].get("process_pool")
+    cpu_worker = pool["cpu_time"] / n if pool else None
+    return n / elapsed, cpu_padre / n, cpu_worker
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tareas", type=int, default=64)
+    parser.add_argument("--productos", type=int, default=200, help="Productos por listado")
+    args = parser.parse_args()
+
+    init_db()
+    nucleos = os.cpu_count() or 1
+    print(f"Núcleos disponibles: {nucleos}; {args.tareas} tareas de "
+          f"{args.productos} productos")
+
+    medidas = {}
+    for workers in WORKERS:
+        medidas[("thread", workers)] = ejecutar("thread", workers, args.tareas, args.productos)
+        if workers <= nucleos:
+            medidas[("process", workers)] = ejecutar(
+                "process", workers, args.tareas, args.productos)
+
+    # Costos por tarea medidos con un worker en modo procesos
+    _, t_p, t_w = medidas[("process", 1)]
+    mejor_hilos = max(medidas[("thread", w)][0] for w in WORKERS)
+    print(f"CPU por tarea: worker {t_w * 1000:.1f} ms, padre {t_p * 1000:.1f} ms")
+    print(f"{'workers':>8}{'hilos (t/s)':>14}{'procesos (t/s)':>16}"
+          f"{'esperado ' + str(NUCLEOS_OBJETIVO) + ' núcleos':>22}{'vs hilos':>10}")
+    for workers in WORKERS:
+        hilos = medidas[("thread", workers)][0]
+        procesos = medidas.get(("process", workers))
+        n = min(workers, NUCLEOS_OBJETIVO)
+        esperado = 1 / max(t_w / n, t_p)
+        print(f"{workers:>8}{hilos:>14.1f}"
+              f"{(f'{procesos[0]:.1f}' if procesos else '-'):>16}"
+              f"{esperado:>22.1f}{esperado / mejor_hilos:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark: memoria retenida por ScrapingCoordinator según result_retention.
+
+Cada tarea retorna un listado simulado de productos (sin navegador) que
+pasa por el sink NDJSON de la ejecución. Se consumen los resultados con
+iter_results() y se mide con tracemalloc:
+    1. Pico de memoria durante la ejecución.
+    2. Memoria que queda retenida en self.results al terminar.
+    3. Que las estadísticas (incrementales) no cambian entre políticas.
+
+Uso:
+    python -m benchmarks.bench_result_retention [--tareas 300] [--productos 200]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# La base de datos temporal debe configurarse antes de importar src.db
+_TMP_DIR = tempfile.mkdtemp(prefix="bench_retention_")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP_DIR, 'bench.db')}")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.coordinator.scraping_coordinator import (  # noqa: E402
+    ScrapingCoordinator, RETENTION_POLICIES
+)
+from src.db.database import init_db  # noqa: E402
+
+logging.disable(logging.INFO)
+
+
+def productos(url: str, n: int):
+    return [{
+        "title": f"Televisor {i} pulgadas Smart TV 4K UHD",
+        "price_sell": 1_000_000 + i,
+        "price_original": 1_500_000 + i,
+        "discount_percent": 10 + i % 40,
+        "url": f"{url}&p={i}",
+        "image": f"https://www.alkosto.com/img/{i}.jpg",
+        "caracteristicas": ["Resolución 4K", "HDR", "Wi-Fi"],
+    } for i in range(n)]
+
+
+def ejecutar(retencion: str, n: int, por_tarea: int):
+    """Returns: (pico MB, retenido MB, segundos, estadísticas)"""
+    tareas = [{
+        "url": f"https://www.alkosto.com/search?text=tv{i}",
+        "type": "dynamic", "subtype": "e-commerce",
+    } for i in range(n)]
+    coordinator = ScrapingCoordinator(
+        tareas, max_workers=4, result_retention=retencion, json_output="ndjson",
+        delay_between_requests=0, rate_limits={}, domain_concurrency={"alkosto": 4},
+        respect_robots_txt=False, enable_cache=False, deduplicate=False,
+        show_progress=False, log_level="ERROR",
+    )
+    coordinator._scrape_with_extractor = (
+        lambda task, cancel_token=None: productos(task["url"], por_tarea)
+    )
+
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    exitosas = sum(1 for r in coordinator.iter_results() if "error" not in r)
+    elapsed = time.perf_counter() - t0
+    retenido, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert exitosas == n, f"{exitosas}/{n} tareas exitosas"
+    return pico / 2**20, retenido / 2**20, elapsed, coordinator.last_run["statistics"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tareas", type=int, default=300)
+    parser.add_argument("--productos", type=int, default=200, help="Productos por tarea")
+    args = parser.parse_args()
+
+    init_db()
+    print(f"{args.tareas} tareas de {args.productos} productos")
+    print(f"{'retención':>10}{'pico (MB)':>12}{'retenido (MB)':>15}{'segundos':>10}{'exitosas':>10}")
+    referencia = None
+    for retencion in RETENTION_POLICIES:
+        pico, retenido, elapsed, stats = ejecutar(retencion, args.tareas, args.productos)
+        resumen = (stats["total_tasks"], stats["success"], stats["errors"])
+        referencia = referencia or resumen
+        assert resumen == referencia, f"Estadísticas distintas con '{retencion}'"
+        print(f"{retencion:>10}{pico:>12.1f}{retenido:>15.1f}{elapsed:>10.2f}{stats['success']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Benchmark: búsqueda FTS5 (/api/search) sobre un catálogo grande.
+
+Carga productos sintéticos en un SQLite temporal (los triggers FTS5
+indexan cada inserción) y mide:
+    1. Tiempo de carga con índice FTS5 sincronizado por triggers.
+    2. Latencia de search_products (primera página y páginas profundas
+    por keyset) frente a LIKE '%texto%' sobre nombre.
+    3. Latencia de extremo a extremo de GET /api/search.
+
+Uso:
+    python -m benchmarks.bench_search [--productos 1000000]
+"""
+
+import argparse
+import logging
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# La base de datos temporal debe configurarse antes de importar src.db
+_TMP_DIR = tempfile.mkdtemp(prefix="bench_search_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP_DIR, 'bench.db')}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text  # noqa: E402
+
+from src.db.database import SessionLocal, engine, init_db  # noqa: E402
+from src.db.search import search_products  # noqa: E402
+from src.web.app import create_app  # noqa: E402
+
+CATEGORIAS = ["Celular", "Televisor", "Portátil", "Nevera", "Lavadora", "Audífonos",
+              "Cafetera Eléctrica", "Tablet", "Monitor", "Parlante", "Freidora de Aire"]
+MARCAS = ["Samsung", "LG", "Lenovo", "HP", "Xiaomi", "Apple", "Asus", "Kalley",
+          "Motorola", "Honor", "Oster", "Sony", "Haceb", "Mabe", "Whirlpool"]
+ATRIBUTOS = ["128GB", "256GB", "512GB", "4K", "55 Pulgadas", "65 Pulgadas", "8GB RAM",
+             "16GB RAM", "Negro", "Gris", "Azul", "Inoxidable", "5G", "Bluetooth", "Smart"]
+CONSULTAS = ["samsung", "televisor 55", "cafetera electrica", "celular 5g negro",
+             "portatil lenovo 16gb", "xiao", "freidora", "audifonos bluetooth sony"]
+
+LOTE = 20_000
+
+
+def cargar(n: int) -> float:
+    rnd = random.Random(0)
+    inicio = time.perf_counter()
+    with engine.begin() as conn:
+        for base in range(0, n, LOTE):
+            ids = range(base + 1, min(base + LOTE, n) + 1)
+            conn.execute(text(
+                "INSERT INTO scraped_data (id, url, tipo, fecha_extraccion) "
+                "VALUES (:id, :url, 'e-commerce', CURRENT_TIMESTAMP)"
+            ), [{"id": i, "url": f"https://bench.local/p/{i}"} for i in ids])
+            conn.execute(text(
+                "INSERT INTO productos_ecommerce (id, nombre, precio) VALUES (:id, :nombre, :precio)"
+            ), [{
+                "id": i,
+                "nombre": " ".join([rnd.choice(CATEGORIAS), rnd.choice(MARCAS)]
+                                   + rnd.sample(ATRIBUTOS, 3)),
+                "precio": float(rnd.randint(50, 8000) * 1000),
+            } for i in ids])
+    return time.perf_counter() - inicio
+
+
+def p50_p95(valores):
+    valores = sorted(valores)
+    return statistics.median(valores), valores[int(len(valores) * 0.95) - 1]
+
+
+def medir(fn, repeticiones: int = 5):
+    tiempos = []
+    for _ in range(repeticiones):
+        for consulta in CONSULTAS:
+            inicio = time.perf_counter()
+            fn(consulta)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+    return p50_p95(tiempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--productos", type=int, default=1_000_000)
+    parser.add_argument("--paginas", type=int, default=20, help="Profundidad para el keyset")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    init_db()
+    t_carga = cargar(args.productos)
+    session = SessionLocal()
+
+    def primera_pagina(q):
+        search_products(session, q, limit=20)
+
+    def pagina_profunda(q):
+        cursor = None
+        for _ in range(args.paginas):
+            _, cursor = search_products(session, q, limit=20, cursor=cursor)
+            if cursor is None:
+                break
+
+    def con_filtro(q):
+        search_products(session, q, min_precio=500_000, max_precio=2_000_000, limit=20)
+
+    def like(q):
+        palabra = q.split()[0]
+        session.execute(text(
+            "SELECT id FROM productos_ecommerce WHERE nombre LIKE :p LIMIT 20"
+        ), {"p": f"%{palabra}%"}).all()
+
+    client = create_app().test_client()
+
+    def api(q):
+        assert client.get(f"/api/search?q={q}&limit=20").status_code == 200
+
+    print(f"SQLite: {os.environ['DATABASE_URL']}  productos: {args.productos}")
+    print(f"Carga con triggers FTS5: {t_carga:.1f}s ({args.productos / t_carga:,.0f} prod/s)")
+    print(f"{'consulta':<34}{'p50 (ms)':>10}{'p95 (ms)':>10}")
+    for nombre, fn in [
+        ("FTS5 primera página", primera_pagina),
+        (f"FTS5 {args.paginas} páginas (keyset)", pagina_profunda),
+        ("FTS5 + filtro de precio", con_filtro),
+        ("LIKE '%palabra%' (20 filas)", like),
+        ("GET /api/search", api),
+    ]:
+        p50, p95 = medir(fn)
+        print(f"{nombre:<34}{p50:>10.2f}{p95:>10.2f}")
+    session.close()
+
+
+if __name__ == "__main__":
+    main()
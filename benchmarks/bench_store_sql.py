@@ -0,0 +1,90 @@
+"""
+Benchmark: DataHandler.store_sql por lotes vs registro a registro.
+
+Simula sesiones de 10k productos e-commerce contra un SQLite temporal:
+    1. Sesión con productos nuevos (solo inserts).
+    2. Re-scrape de los mismos productos (solo updates).
+    3. Re-scrape sin cambios (se omiten por payload_hash).
+
+Uso:
+    python -m benchmarks.bench_store_sql [--productos 10000]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+# La base de datos temporal debe configurarse antes de importar src.db
+_TMP_DIR = tempfile.mkdtemp(prefix="bench_store_sql_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP_DIR, 'bench.db')}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import delete  # noqa: E402
+
+from src.components.data_handler import DataHandler  # noqa: E402
+from src.db.database import SessionLocal, init_db  # noqa: E402
+from src.db.models import Base  # noqa: E402
+
+
+def generar_productos(n: int, seed: int = 0):
+    """Productos sintéticos con la misma forma que EcommerceExtractor"""
+    return [
+        {
+            "title": f"Producto de prueba {i}",
+            "url": f"https://articulo.mercadolibre.com.co/MCO-{1000000 + i}-producto-_JM",
+            "image": f"https://http2.mlstatic.com/D_{i}.webp",
+            "price_original": f"${(i + seed) * 1000 + 50000:,}".replace(",", "."),
+            "price_sell": f"${(i + seed) * 900 + 45000:,}".replace(",", "."),
+            "discount": f"{i % 40}%",
+            "rating": {"rating": f"{(i % 50) / 10} de 5", "rating_count": f"{i % 300} reseñas"},
+            "description": [{"-": "Marca", "": "Genérica"}, {"-": "Modelo", "": str(i)}],
+        }
+        for i in range(n)
+    ]
+
+
+def limpiar_tablas():
+    session = SessionLocal()
+    try:
+        for table in reversed(Base.metadata.sorted_tables):
+            session.execute(delete(table))
+        session.commit()
+    finally:
+        session.close()
+
+
+def medir(productos, bulk: bool) -> float:
+    handler = DataHandler(productos, storage_format="sql", bulk_sql=bulk)
+    inicio = time.perf_counter()
+    assert handler.store_sql("e-commerce")
+    return time.perf_counter() - inicio
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--productos", type=int, default=10_000)
+    args = parser.parse_args()
+
+    # Silenciar el log por producto del modo registro a registro
+    logging.disable(logging.INFO)
+    init_db()
+
+    nuevos = generar_productos(args.productos)
+    cambiados = generar_productos(args.productos, seed=7)
+
+    print(f"SQLite: {os.environ['DATABASE_URL']}  productos/sesión: {args.productos}")
+    print(f"{'modo':<14}{'inserts (s)':>14}{'updates (s)':>14}{'sin cambios (s)':>17}{'prod/s ins':>14}")
+    for bulk in (False, True):
+        limpiar_tablas()
+        t_ins = medir(nuevos, bulk)
+        t_upd = medir(cambiados, bulk)
+        t_same = medir(cambiados, bulk)
+        nombre = "lotes" if bulk else "por registro"
+        print(f"{nombre:<14}{t_ins:>14.2f}{t_upd:>14.2f}{t_same:>17.2f}{args.productos / t_ins:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
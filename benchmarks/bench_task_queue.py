@@ -0,0 +1,143 @@
+"""
+Benchmark: varios coordinadores consumiendo la misma SQLiteTaskQueue.
+
+Cada nodo es un proceso con su propio ScrapingCoordinator(task_queue=...)
+y un extractor simulado (espera fija, como la E/S del navegador). Mide:
+    1. Tareas/s con 1, 2 y 4 nodos sobre la misma cola (escalado lineal
+    esperado mientras la cola no sea el cuello de botella).
+    2. Caída de un nodo: se mata con SIGKILL mientras tiene tareas en
+    préstamo y sus leases vencidos los termina otro nodo (ninguna tarea
+    se pierde y las re-entregadas son al menos las que tenía el nodo).
+
+Uso:
+    python -m benchmarks.bench_task_queue [--tareas 400] [--espera 0.05] [--workers 4]
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+
+# La base de datos temporal debe configurarse antes de importar src.db. 
+# Los nodos heredan el directorio por entorno (spawn reimporta el módulo)
+_TMP_DIR = os.environ.get("BENCH_QUEUE_DIR") or tempfile.mkdtemp(prefix="bench_queue_")
+os.environ["BENCH_QUEUE_DIR"] = _TMP_DIR
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(_TMP_DIR, 'bench.db')}")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.coordinator.durable_queue import SQLiteTaskQueue  # noqa: E402
+from src.coordinator.scraping_coordinator import ScrapingCoordinator  # noqa: E402
+from src.db.database import init_db  # noqa: E402
+
+# También en los nodos (el módulo se reimporta al hacer spawn)
+logging.disable(logging.WARNING)
+
+COLA = os.path.join(_TMP_DIR, "tareas.db")
+
+
+def nodo(workers: int, espera: float, lease_timeout: float) -> None:
+    """Proceso nodo: consume la cola compartida hasta vaciarla"""
+    coordinator = ScrapingCoordinator(
+        [], max_workers=workers, task_queue=SQLiteTaskQueue(COLA),
+        lease_timeout=lease_timeout, queue_poll_interval=0.2,
+        delay_between_requests=0, rate_limits={},
+        domain_concurrency={"alkosto": workers}, respect_robots_txt=False,
+        enable_cache=False, deduplicate=False, show_progress=False, log_level="ERROR",
+    )
+    coordinator._scrape_with_extractor = (
+        lambda task, cancel_token=None: time.sleep(espera) or []
+    )
+    coordinator.run()
+
+
+def encolar(n: int) -> SQLiteTaskQueue:
+    cola = SQLiteTaskQueue(COLA)
+    cola.clear()
+    cola.push_many([{
+        "url": f"https://www.alkosto.com/search?text=tv{i}",
+        "type": "dynamic", "subtype": "e-commerce", "priority": i % 3,
+    } for i in range(n)])
+    return cola
+
+
+def lanzar(nodos: int, workers: int, espera: float, lease_timeout: float):
+    ctx = multiprocessing.get_context("spawn")
+    procesos = [ctx.Process(target=nodo, args=(workers, espera, lease_timeout))
+                for _ in range(nodos)]
+    for p in procesos:
+        p.start()
+    return procesos
+
+
+def ritmo(cola: SQLiteTaskQueue) -> float:
+    """Tareas/s entre el primer y el último ack (sin el arranque de los nodos)"""
+    n, primero, ultimo = cola._conn().execute(
+        "SELECT count(*), min(updated_at), max(updated_at) FROM task_queue "
+        "WHERE queue = ? AND status = 'done'", (cola.name,)
+    ).fetchone()
+    return (n - 1) / (ultimo - primero) if n > 1 and ultimo > primero else 0.0
+
+
+def en_prestamo(cola: SQLiteTaskQueue, pid: int) -> int:
+    """Leases vigentes del nodo con ese pid (node_id = host:pid:sufijo)"""
+    return cola._conn().execute(
+        "SELECT count(*) FROM task_queue WHERE queue = ? AND status = 'leased' "
+        "AND lease_owner LIKE ?", (cola.name, f"%:{pid}:%")
+    ).fetchone()[0]
+
+
+def reintentadas(cola: SQLiteTaskQueue) -> int:
+    return cola._conn().execute(
+        "SELECT count(*) FROM task_queue WHERE queue = ? AND attempts > 1", (cola.name,)
+    ).fetchone()[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tareas", type=int, default=400)
+    parser.add_argument("--espera", type=float, default=0.05, help="Segundos por tarea")
+    parser.add_argument("--workers", type=int, default=4, help="Workers por nodo")
+    args = parser.parse_args()
+
+    init_db()
+    print(f"{args.tareas} tareas de {args.espera * 1000:.0f} ms, "
+          f"{args.workers} workers por nodo, cola {COLA}")
+    print(f"{'nodos':>6}{'segundos':>10}{'tareas/s':>10}{'escalado':>10}{'hechas':>8}")
+    print("  (tareas/s entre el primer y el último ack, sin el arranque de los procesos)")
+    base = None
+    for nodos in (1, 2, 4):
+        cola = encolar(args.tareas)
+        t0 = time.perf_counter()
+        for p in lanzar(nodos, args.workers, args.espera, lease_timeout=30):
+            p.join()
+        elapsed = time.perf_counter() - t0
+        throughput = ritmo(cola)
+        base = base or throughput
+        print(f"{nodos:>6}{elapsed:>10.2f}{throughput:>10.1f}"
+              f"{throughput / base:>9.2f}x{cola.counts()['done']:>8}")
+
+    # Caída de un nodo a mitad de la ejecución
+    cola = encolar(args.tareas)
+    lease_timeout = 2.0
+    t0 = time.perf_counter()
+    procesos = lanzar(2, args.workers, args.espera, lease_timeout)
+    # Se espera a que el nodo tenga tareas en préstamo: matarlo antes de 
+    # arrancar (o después de vaciar la cola) no ejercita el vencimiento
+    while not en_prestamo(cola, procesos[0].pid) and procesos[0].is_alive():
+        time.sleep(0.01)
+    perdidas = en_prestamo(cola, procesos[0].pid)
+    procesos[0].kill()
+    for p in procesos:
+        p.join()
+    counts = cola.counts()
+    print(f"Nodo caído (SIGKILL con {perdidas} leases, lease {lease_timeout:.0f}s): "
+          f"{counts['done']}/{args.tareas} hechas, {reintentadas(cola)} re-entregadas, "
+          f"{counts['pending'] + counts['leased']} sin terminar, "
+          f"{time.perf_counter() - t0:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
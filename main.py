@@ -7,9 +7,10 @@ Descripción:
     - Configuración del sistema de logging.
     - Gestión de múltiples tareas de scraping con cola de prioridad.
     - Procesamiento paralelo con workers.
-    - Caché LRU, reintentos automáticos, circuit breaker.
+    - Caché LRU persistente en SQLite, reintentos automáticos, circuit breaker.
     - Exportación de resultados (JSON, CSV, Excel).
     - Métricas y estadísticas detalladas.
+    - Checkpoints de las ejecuciones por lotes y reanudación con --resume.
 """
 
 import sys
@@ -27,6 +28,7 @@ init(autoreset=True)
 from src.utils.logger import setup_logger
 from src.utils.helpers import validate_url, create_directory_structure
 from src.coordinator.scraping_coordinator import ScrapingCoordinator
+from src.coordinator.cache_store import SQLiteCache
 
 
 def _emit_products_for_java(coordinator: ScrapingCoordinator):
@@ -88,6 +90,27 @@ def _run_java_bridge(args: argparse.Namespace):
     return result
 
 
+def _run_resume(args: argparse.Namespace):
+    """Reanuda una ejecución interrumpida desde su checkpoint (sin prompts)"""
+    setup_logger(LOGGER_CONFIG)
+    create_directory_structure()
+
+    # Misma clase y configuración que la ejecución original
+    coordinator = ScrapingCoordinator.from_checkpoint(args.resume)
+
+    result = coordinator.run()
+    TerminalInterface.show_statistics(result['statistics'])
+
+    if args.export:
+        filepath = coordinator.export_results(format='json')
+        print(f"{Fore.GREEN}[ÉXITO]{Style.RESET_ALL} Archivo exportado: {Fore.CYAN}{filepath}{Style.RESET_ALL}")
+
+    return result
+
+
+# Segundos entre checkpoints de las ejecuciones por lotes
+CHECKPOINT_INTERVAL = 30.0
+
 LOGGER_CONFIG = {
     'name': 'ScrapingSystem',
     'level': 'DEBUG',
@@ -233,8 +256,18 @@ class TerminalInterface:
             if cache_info:
                 print(f"  Archivo: {cache_info.get('cache_file', 'N/A')}")
                 print(f"  Tamaño en disco: {cache_info.get('disk_size_mb', 0)} MB")
-                print(f"  Capacidad máxima: {cache_info.get('max_size', 0)} entradas")
+                print(f"  Contenido: {cache_info.get('payload_size_mb', 0)} MB "
+                      f"de {cache_info.get('max_bytes', 0) / (1024 * 1024):.0f} MB "
+                      f"({cache_info.get('eviction', 'gds')}, "
+                      f"{cache_info.get('evictions', 0)} expulsadas)")
         
+        dedup = stats.get('deduplication')
+        if dedup:
+            print(f"\n{Fore.YELLOW}Deduplicación:{Style.RESET_ALL}")
+            print(f"  Productos vistos: {dedup.get('seen', 0)}")
+            print(f"  Duplicados descartados: {dedup.get('duplicates', 0)} ({dedup.get('dedup_ratio', '0%')})")
+            print(f"  Backend: {dedup.get('backend', 'set')}")
+
         agg_metrics = stats.get('aggregated_metrics', {})
         if agg_metrics:
             print(f"\n{Fore.YELLOW}Métricas agregadas:{Style.RESET_ALL}")
@@ -302,12 +335,17 @@ def main():
             # Opción 6: Limpiar caché
             elif choice == 6:
                 from pathlib import Path
-                cache_file = Path('cache') / 'scraping_cache.pkl'
+                cache_file = Path('cache') / 'scraping_cache.db'
+                legacy_file = Path('cache') / 'scraping_cache.pkl'
                 
-                if cache_file.exists():
+                if cache_file.exists() or legacy_file.exists():
                     confirm = input(f"\n{Fore.YELLOW}¿Está seguro de limpiar el caché? (S/n): {Style.RESET_ALL}").lower()
                     if confirm != 'n':
-                        cache_file.unlink()
+                        # Vaciar por SQL: otros procesos pueden tener el archivo abierto
+                        if cache_file.exists():
+                            SQLiteCache().clear()
+                        if legacy_file.exists():
+                            legacy_file.unlink()
                         print(f"{Fore.GREEN}✓ Caché limpiado exitosamente{Style.RESET_ALL}")
                     else:
                         print(f"{Fore.YELLOW}Operación cancelada{Style.RESET_ALL}")
@@ -344,7 +382,7 @@ def main():
                     
                     # Opción de exportar
                     if input(f"\n{Fore.YELLOW}¿Exportar resultados? (S/n): {Style.RESET_ALL}").lower() != 'n':
-                        export_format = input("Formato (json/csv/excel) [json]: ").strip().lower() or 'json'
+                        export_format = input("Formato (json/csv/excel/parquet) [json]: ").strip().lower() or 'json'
                         filepath = coordinator.export_results(format=export_format)
                         print(f"{Fore.GREEN}[ÉXITO]{Style.RESET_ALL} Archivo exportado: {Fore.CYAN}{filepath}{Style.RESET_ALL}")
                 
@@ -366,7 +404,8 @@ def main():
                         max_retries=config['max_retries'],
                         enable_cache=config['enable_cache'],
                         show_progress=config['show_progress'],
-                        respect_robots_txt=config['respect_robots_txt']
+                        respect_robots_txt=config['respect_robots_txt'],
+                        checkpoint_interval=CHECKPOINT_INTERVAL
                     )
                     
                     result = coordinator.run()
@@ -385,7 +424,7 @@ def main():
                             print(f"  {i}. {f.get('url', 'N/A')} - {f.get('error', 'Error desconocido')}")
                     
                     if input(f"\n{Fore.YELLOW}¿Exportar resultados? (S/n): {Style.RESET_ALL}").lower() != 'n':
-                        export_format = input("Formato (json/csv/excel) [json]: ").strip().lower() or 'json'
+                        export_format = input("Formato (json/csv/excel/parquet) [json]: ").strip().lower() or 'json'
                         filepath = coordinator.export_results(format=export_format)
                         print(f"{Fore.GREEN}[ÉXITO]{Style.RESET_ALL} Archivo exportado: {Fore.CYAN}{filepath}{Style.RESET_ALL}")
                 
@@ -405,7 +444,8 @@ def main():
                         max_retries=config['max_retries'],
                         enable_cache=config['enable_cache'],
                         show_progress=config['show_progress'],
-                        respect_robots_txt=config['respect_robots_txt']
+                        respect_robots_txt=config['respect_robots_txt'],
+                        checkpoint_interval=CHECKPOINT_INTERVAL
                     )
                     
                     result = coordinator.run()
@@ -417,7 +457,7 @@ def main():
                     TerminalInterface.show_statistics(result['statistics'])
                     
                     if input(f"\n{Fore.YELLOW}¿Exportar resultados? (S/n): {Style.RESET_ALL}").lower() != 'n':
-                        export_format = input("Formato (json/csv/excel) [json]: ").strip().lower() or 'json'
+                        export_format = input("Formato (json/csv/excel/parquet) [json]: ").strip().lower() or 'json'
                         filepath = coordinator.export_results(format=export_format)
                         print(f"{Fore.GREEN}[ÉXITO]{Style.RESET_ALL} Archivo exportado: {Fore.CYAN}{filepath}{Style.RESET_ALL}")
                 
@@ -487,6 +527,8 @@ if __name__ == "__main__":
     parser.add_argument("--items", type=int, default=10, help="Número de productos a extraer")
     parser.add_argument("--paginas", type=int, default=1, help="Número máximo de páginas")
     parser.add_argument("--export", action="store_true", help="Exportar JSON en outputs/exports")
+    parser.add_argument("--resume", type=str, metavar="RUN_ID",
+                        help="Reanuda una ejecución por lotes desde su checkpoint")
 
     args, unknown = parser.parse_known_args()
 
@@ -494,4 +536,8 @@ if __name__ == "__main__":
         _run_java_bridge(args)
         sys.exit(0)
 
+    if args.resume:
+        _run_resume(args)
+        sys.exit(0)
+
     main()
\ No newline at end of file
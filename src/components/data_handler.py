@@ -4,6 +4,7 @@ Descripción:
     procesamiento de datos extraídos durante el proceso de scraping.
 
     Además, se incluyen métodos para:
+    - Guardar en JSON por producto o en un NDJSON por sesión.
     - Generar reportes en formato de documento (TXT o HTML).
     - Categorizar los resultados.
     - Aplicar un modelo básico de proyección de precios de inmuebles.
@@ -16,33 +17,87 @@ import os
 import re
 import uuid
 from datetime import datetime
-from typing import Union, List, Dict
+from typing import Union, List, Dict, Optional, Tuple, Iterator
+
+from sqlalchemy import update
 
 # Importar la clase ScrapedData y la sesión de la base de datos
 from src.db.database import SessionLocal, init_db
 from src.db.models import ScrapedData, ProductoEcommerce, ScrapingSession
+from src.db.price_history import record_price_observations
+from src.db.categories import UNCATEGORIZED, category_summary
+from src.components.ndjson_writer import NDJSONSessionWriter
+from src.utils.helpers import normalize_category
+
+# Mapeo de tipos a carpetas de salida JSON
+FOLDER_MAP = {
+    "static": "static_pages_extractors",
+    "e-commerce": "dynamic_extractors/e-commerce",
+    "real_state": "dynamic_extractors/real_state",
+    "dynamic": "dynamic_extractors/generic"
+}
+
+# Tamaño de bloque para consultas IN y lotes de escritura (SQLite
+# antiguo limita a 999 parámetros por sentencia)
+SQL_CHUNK_SIZE = 500
+
+def _chunks(items: List, size: int) -> Iterator[List]:
+    """Divide una lista en bloques de tamaño `size`"""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+def session_output_dir(tipo: str) -> str:
+    """Carpeta de salida JSON para un tipo de datos"""
+    return os.path.join("outputs", FOLDER_MAP.get(tipo, "generic_data"))
 
 class DataHandler:
     """
     Clase que se unifica para manejo el de datos del programa
     (JSON, SQL, reportes, etc.).
     """
-    def _init_(
+    def __init__(
         self, 
         data: Union[Dict, List[Dict]], 
         storage_format: str = 'both',
         logger: logging.Logger = None,
-        session_id: str = None
+        session_id: str = None,
+        json_mode: str = 'files',
+        json_compression: Optional[str] = None,
+        ndjson_writer: Optional[NDJSONSessionWriter] = None,
+        bulk_sql: bool = True,
+        db_session_id: Optional[int] = None,
+        price_history: bool = True
     ):
+        """
+        Args:
+            json_mode: 'files' (un JSON por producto) o 'ndjson' (una 
+                línea por producto en un archivo por sesión)
+            json_compression: None, 'gzip' o 'zstd' (solo modo ndjson)
+            ndjson_writer: writer compartido de la sesión; si no se 
+                pasa, se abre uno propio y se cierra tras escribir
+            bulk_sql: upsert SQL por lotes (True) o registro a registro
+            db_session_id: ID de una ScrapingSession existente a la que 
+                sumar este lote; si es None se crea una nueva
+            price_history: registrar en precios_historicos los 
+                productos e-commerce cuyo precio o descuento cambió
+        """
+        if json_mode not in ('files', 'ndjson'):
+            raise ValueError(f"Modo JSON no válido: {json_mode}")
         self.__data = data
         self.__storage_format = storage_format.lower()
         self.__logger = logger or logging.getLogger(
-            self._class.name_
+            self.__class__.__name__
             )
         self.__logger.setLevel(logging.DEBUG)
         # Generar o usar session_id existente
         self.__session_id = session_id or str(uuid.uuid4())[:8]
-        self._logger.info(f"DataHandler inicializado con session_id: {self._session_id}")
+        self.__json_mode = json_mode
+        self.__json_compression = json_compression
+        self.__ndjson_writer = ndjson_writer
+        self.__bulk_sql = bulk_sql
+        self.__db_session_id = db_session_id
+        self.__price_history = price_history
+        self.__logger.info(f"DataHandler inicializado con session_id: {self.__session_id}")
 
     @property
     def data(self) -> Union[Dict, List[Dict]]:
@@ -112,30 +167,25 @@ class DataHandler:
         """
         Lógica unificada de almacenamiento JSON con 
         estructura de carpetas."""
+        if self.__json_mode == 'ndjson':
+            return self.store_ndjson(tipo)
         try:
-            # Mapeo de tipos a carpetas
-            folder_map = {
-                "static": "static_pages_extractors",
-                "e-commerce": "dynamic_extractors/e-commerce",
-                "real_state": "dynamic_extractors/real_state",
-                "dynamic": "dynamic_extractors/generic"
-            }
-            
             # Obtener carpeta destino
-            base_folder = folder_map.get(tipo, "generic_data")
-            output_dir = os.path.join("outputs", base_folder)
+            output_dir = session_output_dir(tipo)
             os.makedirs(output_dir, exist_ok=True)
 
             data_list = self.data if isinstance(self.data, list) else [self.data]
 
+            # El hash depende solo de la URL de origen: se calcula una vez
+            url_hash = hashlib.md5((url or "").encode()).hexdigest()[:8]
+
             for item in data_list:
                 # Limpiar nombre del producto (¡FIX AQUÍ!)
                 nombre_producto = item.get("title", "sin_titulo")
                 nombre_seguro = re.sub(r'[\\/*?:"<>|]', '_', nombre_producto)  # Eliminar caracteres prohibidos
                 nombre_seguro = nombre_seguro.strip().lower().replace(' ', '_')[:50]  # Normalizar
                 
-                # Generar hash único y agregar session_id
-                url_hash = hashlib.md5(url.encode()).hexdigest()[:8]
+                # Agregar hash de la URL y session_id
                 filename = f"{nombre_seguro}{url_hash}_session{self.session_id}.json"
                 filepath = os.path.join(output_dir, filename)
 
@@ -155,6 +205,38 @@ class DataHandler:
             self.logger.error(f"Error JSON: {str(e)}")
             return False
 
+    def store_ndjson(self, tipo: str) -> bool:
+        """
+        Agrega una línea JSON por producto al archivo NDJSON de la 
+        sesión (outputs/<carpeta>/session_<id>.ndjson[.gz|.zst]).
+        """
+        writer = self.__ndjson_writer
+        owns_writer = writer is None
+        try:
+            if owns_writer:
+                writer = NDJSONSessionWriter(
+                    os.path.join(session_output_dir(tipo), f"session_{self.session_id}"),
+                    compression=self.__json_compression
+                )
+
+            data_list = self.data if isinstance(self.data, list) else [self.data]
+            scraped_at = datetime.now().isoformat()
+            for item in data_list:
+                item_with_session = item.copy()
+                item_with_session["scraping_session_id"] = self.session_id
+                item_with_session["scraped_at"] = scraped_at
+                writer.write(item_with_session, key=item.get("url"))
+
+            self.logger.debug(
+                f"NDJSON: {len(data_list)} registros agregados a {writer.path}")
+            return True
+        except Exception as e:
+            self.logger.error(f"Error NDJSON: {str(e)}")
+            return False
+        finally:
+            if owns_writer and writer is not None:
+                writer.close()
+
     def store_sql(self, tipo: str) -> bool:
         """Lógica unificada de almacenamiento SQL con sesiones."""
         # Garantizar que las tablas existen antes de abrir sesión
@@ -171,97 +253,55 @@ class DataHandler:
                 else [self.data])
 
             # Crear o recuperar la sesión de scraping
-            scraping_session = ScrapingSession(
-                start_time=datetime.now(),
-                total_items=len(data_list)
-            )
-            session.add(scraping_session)
-            session.flush()  # Obtener el ID antes del commit
-            self.__logger.info(f"Nueva sesión de scraping creada: {scraping_session.id}")
-            
-            successful_count = 0
-            failed_count = 0
+            scraping_session = None
+            if self.__db_session_id is not None:
+                scraping_session = session.get(ScrapingSession, self.__db_session_id)
+            if scraping_session is None:
+                scraping_session = ScrapingSession(
+                    start_time=datetime.now(),
+                    total_items=0,
+                    successful_items=0,
+                    failed_items=0,
+                    skipped_items=0
+                )
+                session.add(scraping_session)
+                session.flush()  # Obtener el ID antes del commit
+                self.__logger.info(f"Nueva sesión de scraping creada: {scraping_session.id}")
 
-            for item in data_list:
-                # Usar URL del producto, no la URL general
-                producto_url = item.get("url")
-                if not producto_url:
-                    failed_count += 1
-                    continue
+            # Abrir ya la transacción de escritura: pysqlite no la inicia 
+            # con un SELECT y, sin ella, cada RELEASE SAVEPOINT de los 
+            # upserts confirmaría su lote por separado
+            scraping_session.end_time = datetime.now()
+            session.flush()
 
-                try:
-                    # Solo guardamos en tabla tipada cuando es e-commerce
-                    if tipo == "e-commerce":
-                        existing = (
-                            session.query(ProductoEcommerce)
-                            .filter_by(url=producto_url)
-                            .first()
-                        )
-
-                        payload = {
-                            "url": producto_url,
-                            "tipo": tipo,
-                            "session_id": scraping_session.id,
-                            "nombre": item.get("title", ""),
-                            "imagen_url": item.get("image"),
-                            "precio_original": self._to_float(item.get("price_original")),
-                            "precio": self._to_float(item.get("price_sell")),
-                            "descuento": item.get("discount"),
-                            "rating_metadata": item.get("rating"),
-                            "descripcion": self._normalize_description(item.get("description")),
-                        }
-
-                        if existing:
-                            for k, v in payload.items():
-                                setattr(existing, k, v)
-                            existing.fecha_actualizacion = datetime.now()
-                            self.logger.info(
-                                f"Actualizado SQL e-commerce: {producto_url}")
-                        else:
-                            session.add(ProductoEcommerce(**payload))
-                            self.logger.info(
-                                f"Nuevo registro e-commerce en SQL: {producto_url}")
-                    else:
-                        # Para tipos genéricos, usar ScrapedData con contenido JSON
-                        existing = (
-                            session.query(ScrapedData)
-                            .filter_by(url=producto_url, tipo=tipo)
-                            .first()
-                        )
-
-                        if existing:
-                            existing.contenido = item  # Guardar como JSON nativo
-                            existing.fecha_actualizacion = datetime.now()
-                            existing.session_id = scraping_session.id
-                            self.logger.info(
-                                f"Actualizado SQL: {producto_url}")
-                        else:
-                            new_record = ScrapedData(
-                                url=producto_url,
-                                tipo=tipo,
-                                contenido=item,  # Guardar como JSON nativo
-                                session_id=scraping_session.id
-                            )
-                            session.add(new_record)
-                            self.logger.info(
-                                f"Nuevo registro en el SQL: {producto_url}")
-                    
-                    successful_count += 1
-                    
-                except Exception as item_error:
-                    failed_count += 1
-                    self.logger.error(f"Error procesando item {producto_url}: {str(item_error)}")
-                    continue
+            # {producto_id: (precio, precio_original, descuento)} del lote
+            observations = {} if self.__price_history and tipo == "e-commerce" else None
+            if self.__bulk_sql:
+                successful_count, failed_count, skipped_count = self._upsert_bulk(
+                    session, data_list, tipo, scraping_session.id, observations)
+            else:
+                successful_count, failed_count, skipped_count = self._upsert_por_registro(
+                    session, data_list, tipo, scraping_session.id, observations)
+
+            if observations:
+                puntos = record_price_observations(
+                    session, observations, session_id=scraping_session.id)
+                self.logger.info(f"Historial de precios: {puntos} cambios registrados")
             
-            # Actualizar estadísticas de la sesión
+            # Actualizar estadísticas de la sesión (incrementales: una 
+            # sesión puede recibir varios lotes)
             scraping_session.end_time = datetime.now()
-            scraping_session.successful_items = successful_count
-            scraping_session.failed_items = failed_count
+            scraping_session.total_items = (scraping_session.total_items or 0) + len(data_list)
+            scraping_session.successful_items = (scraping_session.successful_items or 0) + successful_count
+            scraping_session.failed_items = (scraping_session.failed_items or 0) + failed_count
+            # Los omitidos por no tener cambios también cuentan como exitosos
+            scraping_session.skipped_items = (scraping_session.skipped_items or 0) + skipped_count
 
             session.commit()
             self.logger.info(
-                f"Sesión {scraping_session.id}: {successful_count} exitosos, "
-                f"{failed_count} fallidos de {len(data_list)} totales"
+                f"Sesión {scraping_session.id}: {successful_count} exitosos "
+                f"({skipped_count} sin cambios), {failed_count} fallidos "
+                f"de {len(data_list)} totales"
             )
             return True
         except Exception as e:
@@ -272,6 +312,264 @@ class DataHandler:
         finally:
             session.close()
 
+    @staticmethod
+    def open_scraping_session() -> int:
+        """Crea una ScrapingSession vacía y retorna su ID."""
+        init_db()
+        session = SessionLocal()
+        try:
+            scraping_session = ScrapingSession(
+                start_time=datetime.now(),
+                total_items=0,
+                successful_items=0,
+                failed_items=0,
+                skipped_items=0
+            )
+            session.add(scraping_session)
+            session.commit()
+            return scraping_session.id
+        finally:
+            session.close()
+
+    def _build_payload(self, item: Dict, tipo: str, session_db_id: int) -> Dict:
+        """Mapea un producto scrapeado a las columnas del modelo SQL."""
+        producto_url = item.get("url")
+        if tipo == "e-commerce":
+            payload = {
+                "url": producto_url,
+                "tipo": tipo,
+                "session_id": session_db_id,
+                "nombre": item.get("title", ""),
+                "imagen_url": item.get("image"),
+                "precio_original": self._to_float(item.get("price_original")),
+                "precio": self._to_float(item.get("price_sell")),
+                "descuento": item.get("discount"),
+                "rating_metadata": item.get("rating"),
+                "descripcion": self._normalize_description(item.get("description")),
+                "categoria": normalize_category(item.get("category")),
+            }
+        else:
+            # Para tipos genéricos, usar ScrapedData con contenido JSON
+            payload = {
+                "url": producto_url,
+                "tipo": tipo,
+                "session_id": session_db_id,
+                "contenido": item,  # Guardar como JSON nativo
+            }
+        payload["payload_hash"] = self._payload_hash(payload)
+        return payload
+
+    @staticmethod
+    def _payload_hash(payload: Dict) -> str:
+        """
+        Hash de 64 bits de las columnas scrapeadas. La sesión no entra 
+        en el hash: re-scrapear un producto igual no es un cambio.
+        """
+        content = {k: v for k, v in payload.items() if k != "session_id"}
+        serialized = json.dumps(content, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.blake2b(serialized.encode("utf-8"), digest_size=8).hexdigest()
+
+    def _upsert_bulk(self, session, data_list: List[Dict], tipo: str,
+                     session_db_id: int,
+                     observations: Optional[Dict] = None) -> Tuple[int, int, int]:
+        """
+        Inserta/actualiza por bloques de SQL_CHUNK_SIZE dentro de la 
+        transacción abierta. Por bloque:
+        1. Una consulta IN para obtener los IDs y hashes existentes.
+        2. bulk_insert_mappings para los nuevos (ambas tablas de la 
+        herencia joined-table en lote).
+        3. bulk_update_mappings solo para los existentes cuyo hash cambió; 
+        los demás no se tocan.
+
+        Cada bloque va en un SAVEPOINT: si falla (p.ej. un valor que la 
+        base rechaza), se deshace solo ese bloque y se reintenta registro 
+        por registro, así se conservan las filas válidas y se cuentan las 
+        que fallan.
+
+        Returns:
+            (exitosos, fallidos, omitidos sin cambios)
+        """
+        model = ProductoEcommerce if tipo == "e-commerce" else ScrapedData
+        failed_count = 0
+
+        # Si la URL se repite en el lote, gana la última aparición
+        items: Dict[str, Dict] = {}
+        for item in data_list:
+            producto_url = item.get("url")
+            if not producto_url:
+                failed_count += 1
+                continue
+            items[producto_url] = item
+
+        inserted = updated = skipped_count = 0
+        for chunk in _chunks(list(items.values()), SQL_CHUNK_SIZE):
+            try:
+                with session.begin_nested():
+                    inserts, updates, skipped = self._upsert_chunk(
+                        session, model, chunk, tipo, session_db_id)
+            except Exception as chunk_error:
+                self.logger.warning(
+                    f"Falló el lote SQL {tipo} de {len(chunk)} registros "
+                    f"({chunk_error}); se reintenta registro por registro"
+                )
+                _, failed, skipped = self._upsert_por_registro(
+                    session, chunk, tipo, session_db_id, observations)
+                failed_count += failed
+                skipped_count += skipped
+                continue
+
+            inserted += len(inserts)
+            updated += len(updates)
+            skipped_count += skipped
+            if observations is not None:
+                # Sin cambios en el payload no hay cambios de precio
+                for payload in inserts + updates:
+                    observations[payload["id"]] = self._price_state(payload)
+
+        self.logger.info(
+            f"SQL {tipo} en lote: {inserted} nuevos, {updated} actualizados, "
+            f"{skipped_count} sin cambios, {failed_count} fallidos"
+        )
+        # Los duplicados dentro del lote cuentan como procesados
+        return len(data_list) - failed_count, failed_count, skipped_count
+
+    def _upsert_chunk(self, session, model, chunk: List[Dict], tipo: str,
+                      session_db_id: int) -> Tuple[List[Dict], List[Dict], int]:
+        """
+        Escribe un bloque de productos con URLs distintas.
+
+        Returns:
+            (payloads insertados, payloads actualizados, omitidos sin cambios)
+        """
+        payloads = {
+            item["url"]: self._build_payload(item, tipo, session_db_id) for item in chunk
+        }
+        existing = self._fetch_existing(session, list(payloads), tipo)
+
+        now = datetime.now()
+        inserts, updates, unchanged = [], [], []
+        for producto_url, payload in payloads.items():
+            if producto_url in existing:
+                record_id, stored_hash = existing[producto_url]
+                if stored_hash == payload["payload_hash"]:
+                    unchanged.append(record_id)
+                    continue
+                payload["id"] = record_id
+                payload["fecha_actualizacion"] = now
+                updates.append(payload)
+            else:
+                inserts.append(payload)
+
+        if inserts:
+            # return_defaults: la tabla hija necesita el ID generado en la base
+            session.bulk_insert_mappings(
+                model, inserts, return_defaults=model is ProductoEcommerce)
+        if updates:
+            session.bulk_update_mappings(model, updates)
+        self._assign_session(session, unchanged, session_db_id)
+        return inserts, updates, len(unchanged)
+
+    @staticmethod
+    def _assign_session(session, record_ids: List[int], session_db_id: int) -> None:
+        """
+        Asigna a la sesión los registros omitidos por no tener cambios, 
+        con un UPDATE de una sola columna: las lecturas por sesión (API, 
+        reportes, resumen por categoría) los incluyen sin reescribir las 
+        columnas pesadas. fecha_actualizacion se conserva porque marca 
+        cambios de contenido.
+        """
+        for chunk in _chunks(record_ids, SQL_CHUNK_SIZE):
+            session.execute(
+                update(ScrapedData)
+                .where(ScrapedData.id.in_(chunk))
+                .values(session_id=session_db_id,
+                        fecha_actualizacion=ScrapedData.fecha_actualizacion)
+                .execution_options(synchronize_session=False)
+            )
+
+    @staticmethod
+    def _fetch_existing(session, urls: List[str], tipo: str) -> Dict[str, Tuple[int, Optional[str]]]:
+        """
+        Obtiene {url: (id, payload_hash)} de los registros existentes con 
+        consultas IN por bloques.
+        """
+        existing = {}
+        for chunk in _chunks(urls, SQL_CHUNK_SIZE):
+            rows = (
+                session.query(ScrapedData.url, ScrapedData.id, ScrapedData.payload_hash)
+                .filter(ScrapedData.tipo == tipo, ScrapedData.url.in_(chunk))
+                .all()
+            )
+            existing.update({url: (record_id, h) for url, record_id, h in rows})
+        return existing
+
+    def _upsert_por_registro(self, session, data_list: List[Dict], tipo: str,
+                             session_db_id: int,
+                             observations: Optional[Dict] = None) -> Tuple[int, int, int]:
+        """Inserta/actualiza producto por producto (una consulta por registro)."""
+        successful_count = 0
+        failed_count = 0
+        records = []
+        unchanged = []
+
+        for item in data_list:
+            # Usar URL del producto, no la URL general
+            producto_url = item.get("url")
+            if not producto_url:
+                failed_count += 1
+                continue
+
+            try:
+                payload = self._build_payload(item, tipo, session_db_id)
+                # Solo guardamos en tabla tipada cuando es e-commerce
+                model = ProductoEcommerce if tipo == "e-commerce" else ScrapedData
+                existing = (
+                    session.query(model)
+                    .filter_by(url=producto_url, tipo=tipo)
+                    .first()
+                )
+
+                if existing and existing.payload_hash == payload["payload_hash"]:
+                    unchanged.append(existing.id)
+                    successful_count += 1
+                    continue
+                # Un SAVEPOINT por registro: si la base lo rechaza al 
+                # escribirlo, se deshace solo ese registro
+                with session.begin_nested():
+                    if existing:
+                        for k, v in payload.items():
+                            setattr(existing, k, v)
+                        existing.fecha_actualizacion = datetime.now()
+                        self.logger.info(
+                            f"Actualizado SQL {tipo}: {producto_url}")
+                    else:
+                        existing = model(**payload)
+                        session.add(existing)
+                        self.logger.info(
+                            f"Nuevo registro {tipo} en SQL: {producto_url}")
+                
+                records.append((existing, payload))
+                successful_count += 1
+                
+            except Exception as item_error:
+                failed_count += 1
+                self.logger.error(f"Error procesando item {producto_url}: {str(item_error)}")
+                continue
+
+        self._assign_session(session, unchanged, session_db_id)
+
+        if observations is not None:
+            # Los SAVEPOINT ya escribieron los registros (IDs asignados)
+            for record, payload in records:
+                observations[record.id] = self._price_state(payload)
+
+        return successful_count, failed_count, len(unchanged)
+
+    @staticmethod
+    def _price_state(payload: Dict) -> Tuple:
+        """Estado de precio de un payload e-commerce para el historial."""
+        return (payload.get("precio"), payload.get("precio_original"), payload.get("descuento"))
+
     @staticmethod
     def _to_float(value):
         """Convierte precios tipo "$129.900" a float; None si no aplica."""
@@ -304,44 +602,48 @@ class DataHandler:
         # Para otros tipos, convertir a string
         return str(desc)
 
-    def generate_report(self, report_type='txt'):
+    def generate_report(self, report_type='txt', db_session_id: Optional[int] = None,
+                        include_items: bool = True, top_n: int = 20):
         """
-        Genera un reporte basado en los datos extraídos.
+        Genera un reporte (txt o html) con resumen de precios por tienda,
+        top de descuentos y distribución de ratings.
+
+        Args:
+            report_type: 'txt' o 'html'
+            db_session_id: Si se indica, los productos se leen por bloques
+                desde la base (sesión de scraping); si no, desde self.data
+            include_items: Incluir el listado de productos (solo html)
+            top_n: Tamaño del top de descuentos
         """
+        from src.components.report_generator import (
+            ReportGenerator, iter_products, iter_products_from_db
+        )
+
+        if report_type not in ('txt', 'html'):
+            self.logger.error(
+                f"Tipo de reporte {report_type} no soportado.")
+            return None
+
+        db_session = None
         try:
             report_dir = os.path.join("outputs", "reports")
-            os.makedirs(report_dir, exist_ok=True)
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             filename = os.path.join(
                 report_dir, f"report_{timestamp}.{report_type}"
                 )
 
-            # Generación de reporte en formato TXT
-            if report_type == 'txt':
-                with open(filename, "w", encoding="utf-8") as f:
-                    f.write("Reporte de Datos Extraídos\n")
-                    f.write("=" * 50 + "\n")
-                    f.write(f"Fecha y Hora: {datetime.now()}\n\n")
-                    f.write("Datos:\n")
-                    for item in self.data:
-                        f.write(f"{item}\n")
-            # Generación de reporte en formato HTML
-            elif report_type == 'html':
-                with open(filename, "w", encoding="utf-8") as f:
-                    f.write("<html><head><title>Reporte de Datos "
-                            "Extraídos</title></head><body>")
-                    f.write("<h1>Reporte de Datos Extraídos</h1>")
-                    f.write(f"<p>Fecha y Hora: {datetime.now()}</p>")
-                    f.write("<hr>")
-                    f.write("<ul>")
-                    for item in self.data:
-                        f.write(f"<li>{item}</li>")
-                    f.write("</ul>")
-                    f.write("</body></html>")
+            if db_session_id is not None:
+                db_session = SessionLocal()
+                products = iter_products_from_db(db_session, db_session_id)
+            else:
+                data_list = self.data if isinstance(self.data, list) else [self.data]
+                products = iter_products(data_list)
+
+            generator = ReportGenerator(products, top_n=top_n, include_items=include_items)
+            if report_type == 'html':
+                generator.render_html(filename)
             else:
-                self.logger.error(
-                    f"Tipo de reporte {report_type} no soportado.")
-                return None
+                generator.render_txt(filename)
 
             self.logger.info(
                 f"Reporte generado exitosamente: {filename}"
@@ -350,19 +652,24 @@ class DataHandler:
         except Exception as e:
             self.logger.error(f"Error al generar el reporte: {str(e)}")
             return None
-        
+        finally:
+            if db_session is not None:
+                db_session.close()
+
 
     def categorize_data(self):
         """
-        Categoriza los datos extraídos.
+        Agrupa por categoría los productos en memoria (self.data).
+        Para resúmenes sobre todo el histórico usar summarize_categories.
         """
         try:
             categories = {}
-            for item in self.data:
-                category = item.get('category', 'Sin Categoría')
-                if category not in categories:
-                    categories[category] = []
-                categories[category].append(item)
+            data_list = self.data if isinstance(self.data, list) else [self.data]
+            for item in data_list:
+                if not isinstance(item, dict):
+                    continue
+                category = normalize_category(item.get('category')) or UNCATEGORIZED
+                categories.setdefault(category, []).append(item)
             self.logger.info(
                 f"Datos categorizados en {len(categories)} categorías.")
             return categories
@@ -371,6 +678,20 @@ class DataHandler:
                 f"Error al categorizar los datos: {str(e)}")
             return {}
 
+    @staticmethod
+    def summarize_categories(db_session_id: Optional[int] = None,
+                             since: Optional[datetime] = None) -> List[Dict]:
+        """
+        Resumen por categoría (conteo y precio mínimo / promedio / máximo)
+        calculado con GROUP BY en la base de datos.
+        """
+        init_db()
+        session = SessionLocal()
+        try:
+            return category_summary(session, session_id=db_session_id, since=since)
+        finally:
+            session.close()
+
 # Para después...
 """    def project_prices(self):
         
@@ -14,6 +14,9 @@ Características:
     datos (por ejemplo, enlaces).
     - Almacena los datos extraídos en un archivo JSON dentro de la 
     carpeta outputs.
+    - Cancelación cooperativa: con un CancelToken se detiene entre 
+    intentos y scrolls, y al cancelar se cierra el WebDriver y se 
+    termina el árbol de procesos de Chrome.
 """
 
 from abc import ABC, abstractmethod
@@ -33,6 +36,7 @@ from typing import List, Dict, Optional
 from src.base.web_data_extractor import WebDataExtractor
 
 from src.components.data_handler import DataHandler
+from src.utils.cancellation import CancelToken, TaskCancelledError, kill_process_tree
 
 from src.config import USER_AGENT_DINAMICOS
 
@@ -57,6 +61,7 @@ class DynamicPageExtractor(WebDataExtractor):
         scroll_max: int = 5,
         scroll_wait_alkosto: float = 5.0,
         scroll_wait_default: float = 2.0,
+        cancel_token: Optional[CancelToken] = None,
     ):
         """
         Inicializa el extractor de páginas dinámicas.
@@ -69,6 +74,7 @@ class DynamicPageExtractor(WebDataExtractor):
             scroll_max: Máximo de scrolls por página
             scroll_wait_alkosto: Tiempo de espera entre scrolls para Alkosto
             scroll_wait_default: Tiempo de espera entre scrolls por defecto
+            cancel_token: Token de cancelación del coordinador (opcional)
         """
         super().__init__(url)
         self.__tienda = tienda or self.detectar_tienda()
@@ -77,6 +83,7 @@ class DynamicPageExtractor(WebDataExtractor):
         self._scroll_max = scroll_max
         self._scroll_wait_alkosto = scroll_wait_alkosto
         self._scroll_wait_default = scroll_wait_default
+        self.cancel_token = cancel_token
 
         self.logger.info(
             f"DynamicPageExtractor inicializado para la URL: {self.url}" 
@@ -145,6 +152,34 @@ class DynamicPageExtractor(WebDataExtractor):
         
         raise ValueError(f"No se reconoce la tienda para el dominio: {dominio}.")
 
+    def _check_cancelled(self) -> None:
+        """Punto de control: lanza TaskCancelledError si se canceló la tarea."""
+        if self.cancel_token is not None:
+            self.cancel_token.check()
+
+    def _esperar(self, segundos: float) -> None:
+        """Espera interrumpible por el token de cancelación."""
+        if self.cancel_token is not None:
+            self.cancel_token.wait(segundos)
+        else:
+            time.sleep(segundos)
+
+    def _forzar_cierre(self, driver) -> None:
+        """
+        Termina chromedriver y sus procesos de Chrome y cierra la sesión. 
+        Se invoca desde el hilo que cancela, mientras el hilo del 
+        extractor puede seguir bloqueado en una llamada de Selenium.
+        """
+        process = getattr(getattr(driver, "service", None), "process", None)
+        terminados = kill_process_tree(getattr(process, "pid", None))
+        self.logger.warning(
+            f"Descarga cancelada: WebDriver cerrado ({terminados} procesos terminados)."
+        )
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
     def download(self, override_url: str = None) -> str:
         """
         Descarga el contenido HTML actualizado de la página dinámica 
@@ -160,6 +195,8 @@ class DynamicPageExtractor(WebDataExtractor):
         target_url = override_url or self.url
 
         for intento in range(1, max_intentos + 1):
+            self._check_cancelled()
+            retirar_cierre = None
             try:
                 self.logger.debug(
                     f"Intento {intento}/{max_intentos}: Se está "
@@ -169,6 +206,12 @@ class DynamicPageExtractor(WebDataExtractor):
                 # Configuración MEJORADA para evadir detección
                 opciones = self._configurar_chrome_options()
                 driver = webdriver.Chrome(options=opciones)
+                if self.cancel_token is not None:
+                    # Si se cancela, el navegador se cierra aunque este 
+                    # hilo siga bloqueado en driver.get / WebDriverWait
+                    retirar_cierre = self.cancel_token.register(
+                        lambda d=driver: self._forzar_cierre(d)
+                    )
                 self.logger.debug(
                     "El WebDriver se ha inicializado correctamente."
                     )
@@ -240,13 +283,17 @@ class DynamicPageExtractor(WebDataExtractor):
                     )
                 return html
             
+            except TaskCancelledError:
+                raise
             except TimeoutException:
+                self._check_cancelled()
                 self.logger.warning(
                     f"Este es el intento: {intento}. No se ha "
                     f"podido cargar la página {self.url} en "
                     "el tiempo esperado."
                     )
             except WebDriverException as e:
+                self._check_cancelled()
                 self.logger.error(
                     f"Este es el intento: {intento}. Error de "
                     "WebDriver al cargar la página "
@@ -254,13 +301,21 @@ class DynamicPageExtractor(WebDataExtractor):
                     )
                 break
             except Exception as e:
+                self._check_cancelled()
                 self.logger.error(
                     f"Este es el intento: {intento}. Hay un error "
                     f"general en Selenium: {str(e)}"
                 )
             finally:
+                if retirar_cierre is not None:
+                    retirar_cierre()
                 if driver is not None:
-                    driver.quit()
+                    try:
+                        driver.quit()
+                    except Exception:
+                        # Ya cerrado a la fuerza por la cancelación
+                        pass
+                    driver = None
         self.logger.error(
             "Error. :( No se pudo descargar la página dinámica, " 
             f"después de {max_intentos} intentos."
@@ -308,7 +363,7 @@ class DynamicPageExtractor(WebDataExtractor):
             
             while scroll_attempts < max_scroll:
                 driver.execute_script("window.scrollTo(0, document.body.scrollHeight)")
-                time.sleep(wait_alkosto)
+                self._esperar(wait_alkosto)
                 
                 # Contar productos actuales
                 html = driver.page_source
@@ -329,7 +384,7 @@ class DynamicPageExtractor(WebDataExtractor):
             # Para otras tiendas (MercadoLibre), usar altura
             while scroll_attempts < max_scroll:
                 driver.execute_script("window.scrollTo(0, document.body.scrollHeight)")
-                time.sleep(wait_default)
+                self._esperar(wait_default)
                 
                 new_height = driver.execute_script("return document.body.scrollHeight")
                 if new_height == last_height:
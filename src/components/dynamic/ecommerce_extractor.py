@@ -14,7 +14,7 @@ import logging
 import re
 
 from bs4 import BeautifulSoup, Tag
-from typing import Union, Dict, List
+from typing import Union, Dict, List, Callable, Optional
 from urllib.parse import urljoin, urlparse, parse_qs, urlencode
 
 from .dynamic_page_extractor import DynamicPageExtractor
@@ -24,7 +24,11 @@ from src.config import SELECTORES_LISTA_DINAMICOS
 
 # Añadir al inicio del archivo
 from src.utils.logger import setup_logger, get_logger
-from src.utils.helpers import create_directory_structure
+from src.utils.helpers import (
+    create_directory_structure, canonical_product_key,
+    extract_search_query, normalize_category
+)
+from src.utils.cancellation import CancelToken
 from src.config import PAGINACION_ML
 
 class ProductData:
@@ -56,6 +60,8 @@ class ProductData:
         self.url: str = "" 
         # Descripción del producto
         self.description: Union[str, None] = None 
+        # Categoría del listado (breadcrumb o término de búsqueda)
+        self.category: Union[str, None] = None 
 
 
     def to_dict(self) -> Dict:
@@ -69,7 +75,11 @@ class EcommerceExtractor(DynamicPageExtractor):
     al trabajar con objetos de la clase `ProductData`.
     """
     def __init__(
-            self, url: str, tienda: str, num_productos: int = 1, max_paginas: int = 1):
+            self, url: str, tienda: str, num_productos: int = 1, max_paginas: int = 1,
+            product_filter: Optional[Callable[[List[Dict]], List[Dict]]] = None,
+            storage_options: Optional[Dict] = None,
+            autostore: bool = True,
+            cancel_token: Optional[CancelToken] = None):
         """
         Inicializa el extractor con la URL, la tienda, el número 
         de productos y el máximo de páginas. Utiliza encapsulamiento 
@@ -80,8 +90,21 @@ class EcommerceExtractor(DynamicPageExtractor):
             tienda: Nombre de la tienda (mercadolibre, alkosto)
             num_productos: Número de productos a extraer
             max_paginas: Máximo de páginas a cargar (cada página ~48 productos)
+            product_filter: Filtro opcional aplicado antes de almacenar 
+                (p.ej. deduplicación a nivel de ejecución del coordinador)
+            storage_options: Argumentos extra para DataHandler 
+                (session_id, json_mode, ndjson_writer, ...)
+            autostore: Si es False, scrape() solo retorna los productos y 
+                el almacenamiento queda a cargo de quien lo invoca (p.ej. 
+                el sink de la ejecución en ScrapingCoordinator)
+            cancel_token: Token de cancelación; se consulta entre páginas 
+                y scrolls y cierra el navegador al cancelar
         """
-        super().__init__(url, tienda, num_productos, max_paginas) 
+        super().__init__(url, tienda, num_productos, max_paginas,
+                         cancel_token=cancel_token)
+        self.product_filter = product_filter
+        self.storage_options = storage_options or {}
+        self.autostore = autostore
         # Usa el logger configurado globalmente para esta clase
         self.logger = get_logger(self.__class__.__name__)
         create_directory_structure()  # Crear estructura de directorios
@@ -142,10 +165,12 @@ class EcommerceExtractor(DynamicPageExtractor):
     def _scrape_mercadolibre_paginated(self):
         """Descarga múltiples páginas usando el patrón _Desde_ y acumula productos."""
         all_products = []
+        vistos = set()
 
         base_url = self._normalizar_url_ml(self.url)
 
         for page in range(1, self.max_paginas + 1):
+            self._check_cancelled()
             page_url = self._build_ml_page_url(base_url, page)
             self.logger.info(
                 f"Descargando página {page}/{self.max_paginas} de MercadoLibre: {page_url}"
@@ -167,7 +192,7 @@ class EcommerceExtractor(DynamicPageExtractor):
                 )
                 break
 
-            all_products.extend(parsed)
+            self._acumular_productos(all_products, parsed, vistos)
 
             if len(all_products) >= self.num_productos:
                 self.logger.info(
@@ -175,14 +200,15 @@ class EcommerceExtractor(DynamicPageExtractor):
                 )
                 break
 
-        # Limitar al número solicitado
-        self.data = all_products[: self.num_productos]
+        # _acumular_productos ya respeta el límite solicitado
+        self.data = all_products
 
         # Guardar resultados
-        try:
-            self.store()
-        except Exception as e:
-            self.logger.error(f"Error guardando resultados ML: {e}")
+        if self.autostore:
+            try:
+                self.store()
+            except Exception as e:
+                self.logger.error(f"Error guardando resultados ML: {e}")
         return self.data
 
     def _normalizar_url_ml(self, url: str) -> str:
@@ -205,10 +231,12 @@ class EcommerceExtractor(DynamicPageExtractor):
     def _scrape_alkosto_paginated(self):
         """Pagina usando el parámetro page= y acumula productos."""
         all_products = []
+        vistos = set()
 
         base_url = self._normalizar_url_alkosto(self.url)
 
         for page in range(1, self.max_paginas + 1):
+            self._check_cancelled()
             page_url = self._build_alkosto_page_url(base_url, page)
             self.logger.info(
                 f"Descargando página {page}/{self.max_paginas} de Alkosto: {page_url}"
@@ -230,7 +258,7 @@ class EcommerceExtractor(DynamicPageExtractor):
                 )
                 break
 
-            all_products.extend(parsed)
+            self._acumular_productos(all_products, parsed, vistos)
 
             if len(all_products) >= self.num_productos:
                 self.logger.info(
@@ -238,13 +266,45 @@ class EcommerceExtractor(DynamicPageExtractor):
                 )
                 break
 
-        self.data = all_products[: self.num_productos]
-        try:
-            self.store()
-        except Exception as e:
-            self.logger.error(f"Error guardando resultados Alkosto: {e}")
+        self.data = all_products
+        if self.autostore:
+            try:
+                self.store()
+            except Exception as e:
+                self.logger.error(f"Error guardando resultados Alkosto: {e}")
         return self.data
 
+    def _acumular_productos(self, all_products: List[Dict], parsed, vistos: set) -> None:
+        """
+        Agrega los productos de una página hasta completar num_productos, 
+        descartando los que ya aparecieron en páginas anteriores (p.ej. 
+        patrocinados que se repiten entre offsets _Desde_) y los que 
+        rechaza el filtro externo (deduplicación de la ejecución). El 
+        filtro se aplica antes del tope: los duplicados no restan 
+        productos a la tarea, se sigue con la página siguiente.
+        """
+        if isinstance(parsed, dict):
+            parsed = [parsed]
+        descartados = 0
+        for producto in parsed:
+            if len(all_products) >= self.num_productos:
+                break
+            url = producto.get("url")
+            clave = canonical_product_key(url) if url and url != self.url else None
+            if clave:
+                if clave in vistos:
+                    continue
+                vistos.add(clave)
+            # De a uno: el filtro registra como vistos los que deja pasar
+            if self.product_filter and not self.product_filter([producto]):
+                descartados += 1
+                continue
+            all_products.append(producto)
+        if descartados:
+            self.logger.info(
+                f"Se descartaron {descartados} productos duplicados antes de almacenar."
+            )
+
     def _normalizar_url_alkosto(self, url: str) -> str:
         """Elimina cualquier page= existente para usar como base."""
         parsed = urlparse(url)
@@ -281,8 +341,13 @@ class EcommerceExtractor(DynamicPageExtractor):
             selectores = self.obtener_selectores()
             productos = self.procesar_productos(soup, selectores)
             self.validar_resultados(productos)
-            # Retornar un solo producto si num_productos=1, sino la lista completa
-            self.data = productos if self.num_productos > 1 else (productos[0] if productos else None)
+            # Retornar un solo producto si num_productos=1, sino la lista completa. 
+            # Con filtro se entrega la página completa: los descartados se 
+            # reemplazan con los siguientes
+            self.data = (
+                productos if self.num_productos > 1 or self.product_filter
+                else (productos[0] if productos else None)
+            )
             return self.data
         
         except Exception as e:
@@ -322,11 +387,13 @@ class EcommerceExtractor(DynamicPageExtractor):
         contenedor_productos = self.obtener_contenedor_productos(
                                                     soup, 
                                                     selectores)
+        # La categoría es de la página: se extrae una sola vez
+        categoria = self.extraer_categoria(soup, selectores.get("category"))
         
         # Extraer y estructurar los datos de cada producto en el 
         # contenedor
         return [
-            self.extraer_datos_producto(producto, selectores) 
+            self.extraer_datos_producto(producto, selectores, categoria) 
             for producto in contenedor_productos
         ]
 
@@ -362,17 +429,23 @@ class EcommerceExtractor(DynamicPageExtractor):
                 f"pero solo se encontraron {len(productos_encontrados)}"
             )
         
-        # Limitar al número solicitado (tomar los primeros num_productos)
+        # Limitar al número solicitado (tomar los primeros num_productos). 
+        # Con filtro externo se parsea la página completa y el tope se 
+        # aplica al acumular, después de descartar duplicados
+        if self.product_filter:
+            return productos_encontrados
         return productos_encontrados[:self.num_productos]
     
     def extraer_datos_producto(self, 
                         producto: Tag, 
-                        selectores: Dict) -> Dict:
+                        selectores: Dict,
+                        categoria: Optional[str] = None) -> Dict:
         """
         Extrae y estructura los datos de un producto individual.
         Utiliza composición al trabajar con un objeto de `ProductData`.
         """
         data = ProductData()  # Composición: crea una instancia de ProductData
+        data.category = categoria
         
         try:
             self.logger.debug("Extrayendo título del producto")
@@ -645,6 +718,28 @@ class EcommerceExtractor(DynamicPageExtractor):
             "rating_count": f"{match.group(3)} comentarios"
         }
 
+    def extraer_categoria(self, soup: Tag, selector: Dict) -> Optional[str]:
+        """
+        Extrae la categoría de la página de listado. Si el selector no 
+        aplica (p.ej. página de búsqueda sin breadcrumb), usa el término 
+        de búsqueda de la URL.
+        """
+        texto = ""
+        if selector:
+            elemento = soup.find(selector["tag"], class_=selector.get("class"))
+            if elemento and "sub_element" in selector:
+                sub_selector = selector["sub_element"]
+                hijos = elemento.find_all(sub_selector["tag"],
+                                        class_=sub_selector.get("class"))
+                if hijos:
+                    elemento = hijos[-1] if selector.get("last") else hijos[0]
+            if elemento:
+                texto = elemento.get_text(" ", strip=True)
+        categoria = normalize_category(texto) or normalize_category(
+            extract_search_query(self.url))
+        self.logger.debug(f"Categoría de la página: {categoria}")
+        return categoria
+
     def extraer_url(self, elemento: Tag, selector: Dict) -> str:
         """Construye URL absoluta (compatible con Alkosto y ML)"""
         if not selector:
@@ -723,7 +818,8 @@ class EcommerceExtractor(DynamicPageExtractor):
             handler = DataHandler(
                 self.data, 
                 storage_format='both',
-                logger=self.logger
+                logger=self.logger,
+                **self.storage_options
             )
             return handler.store_data(url=self.url, tipo="e-commerce")
         
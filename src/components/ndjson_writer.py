@@ -0,0 +1,253 @@
+"""
+Descripción:
+    Escritura de salidas JSON por sesión en formato NDJSON (un objeto
+    JSON por línea) en lugar de un archivo por producto.
+
+    - Un único writer con buffer por sesión.
+    - Compresión opcional gzip/zstd por bloques independientes, lo que
+    permite acceso aleatorio sin descomprimir todo el archivo.
+    - Índice de offsets (<archivo>.idx) para leer un registro por
+    posición o por clave (URL del producto).
+
+    Formato del índice (TSV, una línea por registro):
+        n  offset_bloque  largo_bloque  pos_en_bloque  largo  clave
+"""
+
+import gzip
+import json
+import os
+from threading import Lock
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Se importa zstandard para compresión zstd opcional
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+# Tamaño por defecto de cada bloque antes de volcarlo a disco (1 MiB)
+DEFAULT_BLOCK_SIZE = 1 << 20
+
+EXTENSIONS = {None: ".ndjson", "gzip": ".ndjson.gz", "zstd": ".ndjson.zst"}
+
+
+def _check_compression(compression: Optional[str]) -> None:
+    """Valida el tipo de compresión solicitado"""
+    if compression not in EXTENSIONS:
+        raise ValueError(
+            f"Compresión no soportada: {compression}. Use None, 'gzip' o 'zstd'"
+        )
+    if compression == "zstd" and not ZSTD_AVAILABLE:
+        raise ImportError(
+            "zstandard es requerido para compresión zstd. "
+            "Instálalo con: pip install zstandard"
+        )
+
+
+class NDJSONSessionWriter:
+    """
+    Writer NDJSON thread-safe con buffer para una sesión de scraping.
+
+    Las líneas se acumulan en memoria y se vuelcan como un bloque
+    cuando superan `block_size`, al llamar a flush() o al cerrar.
+    Con compresión, cada bloque es un miembro gzip / frame zstd
+    independiente (los lectores estándar leen el archivo completo).
+    """
+
+    def __init__(self, base_path: str, compression: Optional[str] = None,
+                 block_size: int = DEFAULT_BLOCK_SIZE):
+        _check_compression(compression)
+        self.compression = compression
+        self.block_size = block_size
+        self.path = base_path + EXTENSIONS[compression]
+        self.index_path = self.path + ".idx"
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+
+        self._lock = Lock()
+        self._file = open(self.path, "ab")
+        self._index = open(self.index_path, "a", encoding="utf-8")
+        self._offset = self._file.tell()
+        self._count = self._count_index_lines()
+        # Buffer del bloque actual: bytes + (clave, pos, largo) por línea
+        self._buffer = bytearray()
+        self._pending: List[Tuple[str, int, int]] = []
+        self._compressor = (
+            zstandard.ZstdCompressor(level=3) if compression == "zstd" else None
+        )
+
+    def _count_index_lines(self) -> int:
+        """Número de registros ya escritos (al reabrir una sesión)"""
+        if not os.path.exists(self.index_path):
+            return 0
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            return sum(1 for _ in f)
+
+    def write(self, record: Dict, key: Optional[str] = None) -> None:
+        """Agrega un registro a la sesión"""
+        line = json.dumps(record, ensure_ascii=False).encode("utf-8") + b"\n"
+        with self._lock:
+            self._pending.append(
+                ((key or "").replace("\t", " ").replace("\n", " "),
+                 len(self._buffer), len(line))
+            )
+            self._buffer += line
+            if len(self._buffer) >= self.block_size:
+                self._flush_block()
+
+    def write_many(self, records: List[Dict], key_field: str = "url") -> None:
+        """Agrega varios registros usando `key_field` como clave del índice"""
+        for record in records:
+            self.write(record, key=record.get(key_field))
+
+    def _compress(self, data: bytes) -> bytes:
+        if self.compression == "gzip":
+            return gzip.compress(data, compresslevel=6)
+        if self.compression == "zstd":
+            return self._compressor.compress(data)
+        return data
+
+    def _flush_block(self) -> None:
+        """Vuelca el bloque actual (llamar con el lock tomado)"""
+        if not self._pending:
+            return
+        block = self._compress(bytes(self._buffer))
+        block_offset = self._offset
+        self._file.write(block)
+        self._file.flush()
+        self._offset += len(block)
+
+        lines = []
+        for key, pos, length in self._pending:
+            if self.compression is None:
+                # Sin compresión cada línea es directamente accesible
+                lines.append(f"{self._count}\t{block_offset + pos}\t{length}\t0\t{length}\t{key}\n")
+            else:
+                lines.append(f"{self._count}\t{block_offset}\t{len(block)}\t{pos}\t{length}\t{key}\n")
+            self._count += 1
+        # El índice se escribe después de los datos: nunca apunta a bytes inexistentes
+        self._index.writelines(lines)
+        self._index.flush()
+
+        self._buffer = bytearray()
+        self._pending = []
+
+    def flush(self) -> None:
+        """Fuerza el volcado del bloque pendiente"""
+        with self._lock:
+            self._flush_block()
+
+    def close(self) -> None:
+        """Vuelca lo pendiente y cierra los archivos"""
+        with self._lock:
+            if self._file.closed:
+                return
+            self._flush_block()
+            self._file.close()
+            self._index.close()
+
+    @property
+    def records_written(self) -> int:
+        """Registros escritos (incluye los que están en buffer)"""
+        with self._lock:
+            return self._count + len(self._pending)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
+class NDJSONSessionReader:
+    """
+    Lector de archivos NDJSON de sesión con acceso aleatorio vía índice.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.index_path = path + ".idx"
+        if path.endswith(".gz"):
+            self.compression = "gzip"
+        elif path.endswith(".zst"):
+            self.compression = "zstd"
+        else:
+            self.compression = None
+        _check_compression(self.compression)
+        self._entries: Optional[List[Tuple[int, int, int, int]]] = None
+        self._keys: Dict[str, int] = {}
+        # Último bloque descomprimido (lecturas consecutivas del mismo bloque)
+        self._block_cache: Tuple[int, bytes] = (-1, b"")
+
+    def _load_index(self) -> None:
+        if self._entries is not None:
+            return
+        self._entries = []
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                parts = line.rstrip("\n").split("\t", 5)
+                n, block_offset, block_len, pos, length = map(int, parts[:5])
+                self._entries.append((block_offset, block_len, pos, length))
+                if len(parts) > 5 and parts[5]:
+                    self._keys[parts[5]] = n
+
+    def __len__(self) -> int:
+        self._load_index()
+        return len(self._entries)
+
+    def _read_block(self, f, block_offset: int, block_len: int) -> bytes:
+        if self._block_cache[0] == block_offset:
+            return self._block_cache[1]
+        f.seek(block_offset)
+        raw = f.read(block_len)
+        if self.compression == "gzip":
+            raw = gzip.decompress(raw)
+        elif self.compression == "zstd":
+            raw = zstandard.ZstdDecompressor().decompress(raw)
+        self._block_cache = (block_offset, raw)
+        return raw
+
+    def get(self, n: int) -> Dict:
+        """Retorna el registro número `n` (0-indexado)"""
+        self._load_index()
+        block_offset, block_len, pos, length = self._entries[n]
+        with open(self.path, "rb") as f:
+            block = self._read_block(f, block_offset, block_len)
+        return json.loads(block[pos:pos + length])
+
+    def get_by_key(self, key: str) -> Optional[Dict]:
+        """Retorna el último registro escrito con esa clave"""
+        self._load_index()
+        n = self._keys.get(key)
+        return self.get(n) if n is not None else None
+
+    def __iter__(self) -> Iterator[Dict]:
+        """Recorre el archivo completo en streaming"""
+        if self.compression == "gzip":
+            f = gzip.open(self.path, "rb")
+        elif self.compression == "zstd":
+            f = zstandard.ZstdDecompressor().stream_reader(
+                open(self.path, "rb"), read_across_frames=True, closefd=True
+            )
+        else:
+            f = open(self.path, "rb")
+        with f:
+            buffered = f if self.compression != "zstd" else _iter_lines(f)
+            for line in buffered:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def _iter_lines(stream, chunk_size: int = 1 << 16) -> Iterator[bytes]:
+    """Divide un stream binario en líneas (para stream_reader de zstd)"""
+    rest = b""
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        rest += chunk
+        *lines, rest = rest.split(b"\n")
+        yield from lines
+    if rest:
+        yield rest
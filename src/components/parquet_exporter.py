@@ -0,0 +1,229 @@
+"""
+Descripción:
+    Exportación columnar (Apache Parquet) de productos y resultados de
+    tareas para análisis en pandas / Arrow sin costo de parseo.
+
+    - Los productos se escriben con columnas tipadas: precios, descuento
+    y rating numéricos, tienda, consulta, sesión y timestamps.
+    - Las filas se acumulan en memoria y se vuelcan como row groups
+    incrementales a medida que llegan los resultados, por lo que la
+    memoria no crece con el tamaño de la exportación.
+    - tienda, consulta y sesión usan dictionary encoding: se repiten en
+    millones de filas y quedan como enteros + diccionario.
+"""
+
+import os
+import time
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.components.data_handler import DataHandler
+from src.utils.helpers import detect_store, extract_search_query, parse_count, parse_number
+
+# Se importa pyarrow para exportación Parquet opcional
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Filas por row group: balancea memoria del writer y tamaño de lectura
+DEFAULT_ROW_GROUP_SIZE = 50_000
+
+def _require_pyarrow() -> None:
+    if not PYARROW_AVAILABLE:
+        raise ImportError(
+            "pyarrow es requerido para exportar a Parquet. "
+            "Instálalo con: pip install pyarrow"
+        )
+
+
+def _dict_string():
+    """Columna string con dictionary encoding (valores muy repetidos)"""
+    return pa.dictionary(pa.int32(), pa.string())
+
+
+def product_schema():
+    """Esquema Arrow de una fila de producto"""
+    _require_pyarrow()
+    ts = pa.timestamp('ms', tz='UTC')
+    return pa.schema([
+        ('tienda', _dict_string()),
+        ('consulta', _dict_string()),
+        ('sesion', _dict_string()),
+        ('categoria', _dict_string()),
+        ('url_origen', pa.string()),
+        ('url', pa.string()),
+        ('nombre', pa.string()),
+        ('imagen_url', pa.string()),
+        ('precio_original', pa.float64()),
+        ('precio', pa.float64()),
+        ('descuento_pct', pa.float32()),
+        ('rating', pa.float32()),
+        ('rating_count', pa.int32()),
+        ('scraped_at', ts),
+    ])
+
+
+def task_schema():
+    """Esquema Arrow de una fila de resultado de tarea"""
+    _require_pyarrow()
+    return pa.schema([
+        ('url', pa.string()),
+        ('tipo', _dict_string()),
+        ('subtipo', _dict_string()),
+        ('tienda', _dict_string()),
+        ('consulta', _dict_string()),
+        ('sesion', _dict_string()),
+        ('exito', pa.bool_()),
+        ('error', pa.string()),
+        ('error_type', _dict_string()),
+        ('duracion_s', pa.float64()),
+        ('intentos', pa.int16()),
+        ('productos', pa.int32()),
+        ('from_cache', pa.bool_()),
+        ('circuit_breaker', pa.bool_()),
+    ])
+
+
+class ParquetTableWriter:
+    """
+    Writer Parquet thread-safe que agrega filas y escribe row groups
+    de `row_group_size` filas. El archivo es válido tras close().
+    """
+
+    def __init__(self, path: str, schema, row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+                 compression: str = 'zstd'):
+        _require_pyarrow()
+        self.path = str(path)
+        self.schema = schema
+        self.row_group_size = row_group_size
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._columns: Dict[str, List] = {name: [] for name in schema.names}
+        self._pending = 0
+        self._rows_written = 0
+        self._row_groups = 0
+        self._lock = Lock()
+        dictionary_columns = [
+            f.name for f in schema if pa.types.is_dictionary(f.type)
+        ]
+        self._writer = pq.ParquetWriter(
+            self.path, schema,
+            compression=compression,
+            use_dictionary=dictionary_columns
+        )
+
+    def write_rows(self, rows: Iterable[Dict]) -> None:
+        """Agrega filas; vuelca un row group al alcanzar row_group_size"""
+        with self._lock:
+            for row in rows:
+                for name, column in self._columns.items():
+                    column.append(row.get(name))
+                self._pending += 1
+                if self._pending >= self.row_group_size:
+                    self._flush_row_group()
+
+    def _flush_row_group(self) -> None:
+        """Escribe las filas pendientes (llamar con el lock tomado)"""
+        if not self._pending:
+            return
+        table = pa.Table.from_pydict(self._columns, schema=self.schema)
+        self._writer.write_table(table, row_group_size=self._pending)
+        self._rows_written += self._pending
+        self._row_groups += 1
+        self._columns = {name: [] for name in self.schema.names}
+        self._pending = 0
+
+    def close(self) -> None:
+        """Vuelca lo pendiente y escribe el footer del archivo"""
+        with self._lock:
+            if self._writer is None:
+                return
+            self._flush_row_group()
+            self._writer.close()
+            self._writer = None
+
+    @property
+    def rows_written(self) -> int:
+        """Filas escritas (incluye las pendientes del row group actual)"""
+        with self._lock:
+            return self._rows_written + self._pending
+
+    @property
+    def row_groups(self) -> int:
+        return self._row_groups
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
+
+
+class ProductParquetWriter(ParquetTableWriter):
+    """
+    Exportador de productos: convierte los dicts de los extractores
+    en filas tipadas con el contexto de la tarea de origen.
+    """
+
+    def __init__(self, path: str, session_id: Optional[str] = None, **kwargs):
+        super().__init__(path, product_schema(), **kwargs)
+        self.session_id = session_id
+
+    def add_products(self, products: List[Dict], source_url: str,
+                     tienda: Optional[str] = None,
+                     scraped_at: Optional[float] = None) -> None:
+        """Agrega los productos de una tarea (scraped_at en epoch segundos)"""
+        context = {
+            'tienda': tienda or detect_store(source_url),
+            'consulta': extract_search_query(source_url) or None,
+            'sesion': self.session_id,
+            'url_origen': source_url,
+            'scraped_at': datetime.fromtimestamp(scraped_at or time.time(), tz=timezone.utc),
+        }
+        self.write_rows(
+            self.product_row(p, context) for p in products if isinstance(p, dict)
+        )
+
+    @staticmethod
+    def product_row(product: Dict, context: Dict) -> Dict:
+        rating = product.get('rating') if isinstance(product.get('rating'), dict) else {}
+        row = dict(context)
+        row.update({
+            'categoria': product.get('category'),
+            'url': product.get('url'),
+            'nombre': product.get('title'),
+            'imagen_url': product.get('image'),
+            'precio_original': DataHandler._to_float(product.get('price_original')),
+            'precio': DataHandler._to_float(product.get('price_sell')),
+            'descuento_pct': parse_number(product.get('discount')),
+            'rating': parse_number(rating.get('rating')),
+            'rating_count': parse_count(rating.get('rating_count')),
+        })
+        return row
+
+
+def task_row(result: Dict, session_id: Optional[str] = None) -> Dict:
+    """Fila tipada de un resultado de tarea del coordinador"""
+    url = result.get('url') or ''
+    data = result.get('data')
+    metrics = result.get('metrics', {})
+    return {
+        'url': url,
+        'tipo': result.get('type') or result.get('task_type'),
+        'subtipo': result.get('subtype'),
+        'tienda': detect_store(url),
+        'consulta': extract_search_query(url) or None,
+        'sesion': session_id,
+        'exito': 'data' in result,
+        'error': result.get('error'),
+        'error_type': result.get('error_type'),
+        'duracion_s': metrics.get('duration'),
+        'intentos': metrics.get('attempts'),
+        'productos': len(data) if isinstance(data, list) else (1 if data else 0),
+        'from_cache': bool(result.get('from_cache', False)),
+        'circuit_breaker': bool(result.get('circuit_breaker', False)),
+    }
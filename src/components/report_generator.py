@@ -0,0 +1,363 @@
+"""
+Descripción:
+    Generación de reportes (HTML o TXT) en streaming para sesiones
+    grandes.
+
+    - Los productos se leen por bloques desde la base (keyset por id)
+    o desde cualquier iterador; nunca se cargan todos en memoria.
+    - Los agregados se calculan en una sola pasada: distribución de
+    precios por tienda, top de descuentos (MinHeap de tamaño fijo) e
+    histograma de ratings.
+    - El HTML se arma con string.Template. El listado opcional de
+    productos se escribe a un archivo temporal durante la misma pasada
+    y se copia por bloques tras el resumen, por lo que la memoria no
+    depende del número de filas.
+"""
+
+import html
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from datetime import datetime
+from string import Template
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy import select
+
+from src.components.data_handler import DataHandler
+from src.db.models import ProductoEcommerce
+from src.utils.heap_cq import MinHeap
+from src.utils.helpers import detect_store, parse_number
+
+# Límites superiores de los rangos de precio (COP); el último es abierto
+PRICE_BUCKETS = [50_000, 100_000, 250_000, 500_000, 1_000_000,
+                 2_000_000, 5_000_000, 10_000_000]
+RATING_BUCKETS = ["0-1", "1-2", "2-3", "3-4", "4-5", "Sin rating"]
+
+DB_CHUNK_SIZE = 1000
+
+
+def _bucket_labels() -> List[str]:
+    labels, lower = [], 0
+    for upper in PRICE_BUCKETS:
+        labels.append(f"{lower:,.0f} - {upper:,.0f}".replace(",", "."))
+        lower = upper
+    labels.append(f"> {lower:,.0f}".replace(",", "."))
+    return labels
+
+
+def _price_bucket(price: float) -> int:
+    for i, upper in enumerate(PRICE_BUCKETS):
+        if price < upper:
+            return i
+    return len(PRICE_BUCKETS)
+
+
+@dataclass
+class StoreStats:
+    """Distribución de precios de una tienda"""
+    count: int = 0
+    priced: int = 0
+    total: float = 0.0
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    buckets: List[int] = field(default_factory=lambda: [0] * (len(PRICE_BUCKETS) + 1))
+
+    def add(self, price: Optional[float]) -> None:
+        self.count += 1
+        if price is None:
+            return
+        self.priced += 1
+        self.total += price
+        self.min_price = price if self.min_price is None else min(self.min_price, price)
+        self.max_price = price if self.max_price is None else max(self.max_price, price)
+        self.buckets[_price_bucket(price)] += 1
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.priced if self.priced else None
+
+
+class ReportAggregator:
+    """
+    Agregados de una pasada sobre productos normalizados
+    (ver normalize_product). Memoria O(tiendas + top_n).
+    """
+
+    def __init__(self, top_n: int = 20):
+        self.top_n = top_n
+        self.total = 0
+        self.stores: Dict[str, StoreStats] = {}
+        self.ratings = {label: 0 for label in RATING_BUCKETS}
+        # Min-heap de (descuento, secuencia, producto): la raíz es el menor
+        # descuento del top y se reemplaza cuando llega uno mayor
+        self._top = MinHeap()
+        self._seq = 0
+
+    def add(self, product: Dict) -> None:
+        self.total += 1
+        store = product["tienda"]
+        if store not in self.stores:
+            self.stores[store] = StoreStats()
+        self.stores[store].add(product["precio"])
+
+        rating = product["rating"]
+        if rating is None:
+            self.ratings["Sin rating"] += 1
+        else:
+            index = min(max(int(rating), 0), 4)
+            self.ratings[RATING_BUCKETS[index]] += 1
+
+        discount = product["descuento"]
+        if discount:
+            self._seq += 1
+            entry = (discount, self._seq, product)
+            if len(self._top) < self.top_n:
+                self._top.push(entry)
+            elif discount > self._top.peek()[0]:
+                self._top.pop()
+                self._top.push(entry)
+
+    def top_discounts(self) -> List[Dict]:
+        """Top de descuentos de mayor a menor (no consume el heap)"""
+        entries = sorted(self._top._heap, key=lambda e: (-e[0], e[1]))
+        return [product for _, _, product in entries]
+
+
+def normalize_product(item: Dict) -> Dict:
+    """Producto de un extractor (strings) -> campos numéricos del reporte"""
+    rating = item.get("rating") if isinstance(item.get("rating"), dict) else {}
+    return {
+        "nombre": item.get("title") or "",
+        "url": item.get("url") or "",
+        "tienda": detect_store(item.get("url") or ""),
+        "precio": DataHandler._to_float(item.get("price_sell")),
+        "precio_original": DataHandler._to_float(item.get("price_original")),
+        "descuento": parse_number(item.get("discount")),
+        "rating": parse_number(rating.get("rating")),
+    }
+
+
+def iter_products(items: Iterable[Dict]) -> Iterator[Dict]:
+    """Normaliza un iterador de productos scrapeados"""
+    for item in items:
+        if isinstance(item, dict):
+            yield normalize_product(item)
+
+
+def iter_products_from_db(session, session_id: Optional[int] = None,
+                          chunk_size: int = DB_CHUNK_SIZE) -> Iterator[Dict]:
+    """
+    Recorre productos e-commerce por bloques (keyset por id), leyendo
+    solo las columnas del reporte (la descripción no se descomprime).
+    """
+    last_id = 0
+    while True:
+        stmt = (
+            select(ProductoEcommerce.id, ProductoEcommerce.url, ProductoEcommerce.nombre,
+                   ProductoEcommerce.precio, ProductoEcommerce.precio_original,
+                   ProductoEcommerce.descuento, ProductoEcommerce.rating_metadata)
+            .select_from(ProductoEcommerce)
+            .where(ProductoEcommerce.id > last_id)
+            .order_by(ProductoEcommerce.id)
+            .limit(chunk_size)
+        )
+        if session_id is not None:
+            stmt = stmt.where(ProductoEcommerce.session_id == session_id)
+        rows = session.execute(stmt).all()
+        if not rows:
+            return
+        for row in rows:
+            rating = row.rating_metadata if isinstance(row.rating_metadata, dict) else {}
+            yield {
+                "nombre": row.nombre or "",
+                "url": row.url or "",
+                "tienda": detect_store(row.url or ""),
+                "precio": row.precio,
+                "precio_original": row.precio_original,
+                "descuento": parse_number(row.descuento),
+                "rating": parse_number(rating.get("rating")),
+            }
+        last_id = rows[-1].id
+
+
+def _money(value: Optional[float]) -> str:
+    return "-" if value is None else f"${value:,.0f}".replace(",", ".")
+
+
+HTML_TEMPLATE = Template("""<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<title>$title</title>
+<style>
+body { font-family: Arial, sans-serif; margin: 2em; color: #222; }
+table { border-collapse: collapse; margin-bottom: 2em; }
+th, td { border: 1px solid #ccc; padding: 4px 8px; text-align: right; }
+th:first-child, td:first-child { text-align: left; }
+.bar { background: #4a90d9; height: 12px; display: inline-block; }
+</style>
+</head>
+<body>
+<h1>$title</h1>
+<p>Generado: $generated &middot; Productos: $total</p>
+<h2>Precios por tienda</h2>
+<table>
+<tr><th>Tienda</th><th>Productos</th><th>Con precio</th><th>Mínimo</th><th>Promedio</th><th>Máximo</th></tr>
+$store_rows
+</table>
+<h2>Distribución de precios</h2>
+<table>
+<tr><th>Rango</th>$store_headers</tr>
+$bucket_rows
+</table>
+<h2>Top $top_n descuentos</h2>
+<table>
+<tr><th>Producto</th><th>Tienda</th><th>Descuento</th><th>Precio</th><th>Precio original</th></tr>
+$discount_rows
+</table>
+<h2>Ratings</h2>
+<table>
+<tr><th>Rating</th><th>Productos</th><th></th></tr>
+$rating_rows
+</table>
+""")
+HTML_TAIL = "</body>\n</html>\n"
+
+ITEM_ROW = Template(
+    '<tr><td><a href="$url">$nombre</a></td><td>$tienda</td>'
+    '<td>$precio</td><td>$descuento</td><td>$rating</td></tr>\n'
+)
+
+TXT_TEMPLATE = Template("""$title
+$rule
+Generado: $generated
+Productos: $total
+
+Precios por tienda
+$store_rows
+
+Top $top_n descuentos
+$discount_rows
+
+Ratings
+$rating_rows
+""")
+
+
+class ReportGenerator:
+    """
+    Reporte en streaming sobre cualquier iterador de productos
+    normalizados (iter_products / iter_products_from_db).
+    """
+
+    def __init__(self, products: Iterable[Dict], title: str = "Reporte de Datos Extraídos",
+                 top_n: int = 20, include_items: bool = False):
+        self.products = products
+        self.title = title
+        self.top_n = top_n
+        self.include_items = include_items
+        self.aggregator = ReportAggregator(top_n=top_n)
+
+    def _consume(self, items_file=None) -> None:
+        """Única pasada: agrega y, si corresponde, escribe el listado"""
+        for product in self.products:
+            self.aggregator.add(product)
+            if items_file is not None:
+                items_file.write(ITEM_ROW.substitute(
+                    url=html.escape(product["url"], quote=True),
+                    nombre=html.escape(product["nombre"]),
+                    tienda=html.escape(product["tienda"]),
+                    precio=_money(product["precio"]),
+                    descuento="-" if product["descuento"] is None else f"{product['descuento']:.0f}%",
+                    rating="-" if product["rating"] is None else f"{product['rating']:.1f}",
+                ))
+
+    def render_html(self, path: str) -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        items_tmp = None
+        try:
+            if self.include_items:
+                items_tmp = tempfile.TemporaryFile("w+", encoding="utf-8")
+            self._consume(items_tmp)
+
+            agg = self.aggregator
+            stores = sorted(agg.stores)
+            esc = html.escape
+            store_rows = "\n".join(
+                f"<tr><td>{esc(s)}</td><td>{agg.stores[s].count}</td><td>{agg.stores[s].priced}</td>"
+                f"<td>{_money(agg.stores[s].min_price)}</td><td>{_money(agg.stores[s].mean)}</td>"
+                f"<td>{_money(agg.stores[s].max_price)}</td></tr>"
+                for s in stores
+            )
+            bucket_rows = "\n".join(
+                f"<tr><td>{esc(label)}</td>"
+                + "".join(f"<td>{agg.stores[s].buckets[i]}</td>" for s in stores)
+                + "</tr>"
+                for i, label in enumerate(_bucket_labels())
+            )
+            discount_rows = "\n".join(
+                f"<tr><td><a href=\"{esc(p['url'], quote=True)}\">{esc(p['nombre'])}</a></td>"
+                f"<td>{esc(p['tienda'])}</td><td>{p['descuento']:.0f}%</td>"
+                f"<td>{_money(p['precio'])}</td><td>{_money(p['precio_original'])}</td></tr>"
+                for p in agg.top_discounts()
+            )
+            max_rating = max(agg.ratings.values()) or 1
+            rating_rows = "\n".join(
+                f"<tr><td>{label}</td><td>{count}</td>"
+                f"<td><span class=\"bar\" style=\"width:{200 * count // max_rating}px\"></span></td></tr>"
+                for label, count in agg.ratings.items()
+            )
+            head = HTML_TEMPLATE.substitute(
+                title=esc(self.title),
+                generated=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                total=agg.total,
+                top_n=self.top_n,
+                store_rows=store_rows,
+                store_headers="".join(f"<th>{esc(s)}</th>" for s in stores),
+                bucket_rows=bucket_rows,
+                discount_rows=discount_rows,
+                rating_rows=rating_rows,
+            )
+
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(head)
+                if items_tmp is not None:
+                    f.write("<h2>Productos</h2>\n<table>\n<tr><th>Producto</th><th>Tienda</th>"
+                            "<th>Precio</th><th>Descuento</th><th>Rating</th></tr>\n")
+                    items_tmp.seek(0)
+                    shutil.copyfileobj(items_tmp, f)
+                    f.write("</table>\n")
+                f.write(HTML_TAIL)
+        finally:
+            if items_tmp is not None:
+                items_tmp.close()
+        return path
+
+    def render_txt(self, path: str) -> str:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._consume()
+        agg = self.aggregator
+        store_rows = "\n".join(
+            f"  {s:<15} productos={st.count:<8} min={_money(st.min_price):<14} "
+            f"promedio={_money(st.mean):<14} max={_money(st.max_price)}"
+            for s, st in sorted(agg.stores.items())
+        )
+        discount_rows = "\n".join(
+            f"  {p['descuento']:>3.0f}%  {_money(p['precio']):<14} {p['nombre'][:70]}"
+            for p in agg.top_discounts()
+        )
+        rating_rows = "\n".join(f"  {label:<11} {count}" for label, count in agg.ratings.items())
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(TXT_TEMPLATE.substitute(
+                title=self.title,
+                rule="=" * 50,
+                generated=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                total=agg.total,
+                top_n=self.top_n,
+                store_rows=store_rows or "  (sin datos)",
+                discount_rows=discount_rows or "  (sin descuentos)",
+                rating_rows=rating_rows,
+            ))
+        return path
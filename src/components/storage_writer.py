@@ -0,0 +1,264 @@
+"""
+Descripción:
+    Servicio de escritura en segundo plano (write-behind) que desacopla
+    el scraping de la persistencia.
+
+    - Los extractores encolan productos en una cola acotada y siguen
+    trabajando; solo se bloquean si la cola está llena (backpressure).
+    - Un único hilo escritor es dueño de los sinks SQL y JSON, por lo
+    que los workers no compiten por el lock de escritura de SQLite.
+    - Los productos se confirman en lotes por tamaño (batch_size) o por
+    tiempo (flush_interval), lo que ocurra primero.
+    - flush() actúa como barrera: retorna cuando todo lo encolado hasta
+    ese momento quedó confirmado.
+    - Toda la ejecución se registra en una sola ScrapingSession, creada
+    en el primer commit SQL y cuyos contadores se actualizan por lote.
+    - Con background=False los lotes se confirman en el hilo que llama
+    a submit() (mismo batching, sin hilo escritor).
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Any
+
+from src.components.data_handler import DataHandler
+from src.components.ndjson_writer import NDJSONSessionWriter
+
+# Marcadores de control para el hilo escritor
+_FLUSH = object()
+_STOP = object()
+
+
+class StorageWriter:
+    """
+    Sink de almacenamiento de una ejecución (por defecto en segundo plano).
+    """
+
+    def __init__(self,
+                 storage_format: str = 'both',
+                 session_id: Optional[str] = None,
+                 json_mode: str = 'files',
+                 json_compression: Optional[str] = None,
+                 ndjson_writer: Optional[NDJSONSessionWriter] = None,
+                 batch_size: int = 500,
+                 flush_interval: float = 2.0,
+                 max_queue_size: int = 10000,
+                 background: bool = True,
+                 logger: Optional[logging.Logger] = None):
+        self.storage_format = storage_format
+        self.session_id = session_id
+        self.json_mode = json_mode
+        self.json_compression = json_compression
+        self.ndjson_writer = ndjson_writer
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.background = background
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._thread: Optional[threading.Thread] = None
+        # Modo síncrono: lote pendiente protegido por lock
+        self._sync_lock = threading.Lock()
+        self._sync_batch = []
+        self._sync_deadline: Optional[float] = None
+        # ScrapingSession única de la ejecución (se crea en el primer commit SQL)
+        self._db_session_id: Optional[int] = None
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            'enqueued': 0,
+            'items_written': 0,
+            'items_failed': 0,
+            'batches': 0,
+            'failed_batches': 0,
+            'max_queue_depth': 0,
+            'total_commit_latency': 0.0,
+            'max_commit_latency': 0.0,
+        }
+
+    @property
+    def db_session_id(self) -> Optional[int]:
+        """ID de la ScrapingSession de la ejecución (None si aún no hay SQL)"""
+        return self._db_session_id
+
+    def start(self) -> 'StorageWriter':
+        """Inicia el hilo escritor (idempotente)"""
+        if not self.background:
+            return self
+        if self._thread is None or not self._thread.is_alive():
+            self._thread = threading.Thread(
+                target=self._run, name='StorageWriter', daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def submit(self, products: List[Dict], url: str, tipo: str) -> None:
+        """
+        Encola productos para persistir. Solo bloquea si la cola está
+        llena, frenando a los productores hasta que el escritor avance.
+        """
+        if not self.background:
+            self._submit_sync(products, url, tipo)
+            return
+        if self._thread is None:
+            self.start()
+        for product in products:
+            self._queue.put((tipo, url, product))
+        with self._stats_lock:
+            self._stats['enqueued'] += len(products)
+            depth = self._queue.qsize()
+            if depth > self._stats['max_queue_depth']:
+                self._stats['max_queue_depth'] = depth
+
+    def _submit_sync(self, products: List[Dict], url: str, tipo: str) -> None:
+        """Acumula en el hilo llamador y confirma al llenar o vencer el lote"""
+        with self._sync_lock:
+            self._sync_batch.extend((tipo, url, product) for product in products)
+            with self._stats_lock:
+                self._stats['enqueued'] += len(products)
+                self._stats['max_queue_depth'] = max(
+                    self._stats['max_queue_depth'], len(self._sync_batch))
+            if self._sync_deadline is None:
+                self._sync_deadline = time.monotonic() + self.flush_interval
+            if (len(self._sync_batch) >= self.batch_size
+                    or time.monotonic() >= self._sync_deadline):
+                self._flush_sync()
+
+    def _flush_sync(self) -> None:
+        """Confirma el lote síncrono pendiente (llamar con _sync_lock)"""
+        batch, self._sync_batch, self._sync_deadline = self._sync_batch, [], None
+        self._commit(batch)
+
+    def flush(self) -> None:
+        """Barrera: espera a que todo lo encolado quede confirmado"""
+        if not self.background:
+            with self._sync_lock:
+                self._flush_sync()
+            return
+        if self._thread is None or not self._thread.is_alive():
+            return
+        self._queue.put(_FLUSH)
+        self._queue.join()
+
+    def close(self) -> None:
+        """Confirma lo pendiente y detiene el hilo escritor"""
+        if not self.background:
+            self.flush()
+        elif self._thread is None or not self._thread.is_alive():
+            return
+        else:
+            self._queue.put(_STOP)
+            self._thread.join()
+        self.logger.info(f"StorageWriter cerrado: {self.get_stats()}")
+
+    def _run(self) -> None:
+        """Bucle del hilo escritor: acumula y confirma por lotes"""
+        batch = []
+        deadline = None
+        while True:
+            timeout = self.flush_interval if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if item is _STOP or item is _FLUSH:
+                self._commit_queued(batch)
+                batch, deadline = [], None
+                self._queue.task_done()
+                if item is _STOP:
+                    return
+                continue
+
+            if item is not None:
+                batch.append(item)
+                if deadline is None:
+                    deadline = time.monotonic() + self.flush_interval
+
+            if batch and (len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._commit_queued(batch)
+                batch, deadline = [], None
+
+    def _commit_queued(self, batch: List) -> None:
+        """Confirma un lote tomado de la cola y libera sus entradas"""
+        try:
+            self._commit(batch)
+        finally:
+            for _ in batch:
+                self._queue.task_done()
+
+    def _commit(self, batch: List) -> None:
+        """Persiste un lote: JSON por URL de origen y SQL por tipo"""
+        if not batch:
+            return
+        start = time.perf_counter()
+        ok = True
+        try:
+            by_tipo = defaultdict(list)
+            by_source = defaultdict(list)
+            for tipo, url, product in batch:
+                by_tipo[tipo].append(product)
+                by_source[(tipo, url)].append(product)
+
+            if self.storage_format in ('json', 'both'):
+                for (tipo, url), products in by_source.items():
+                    ok &= self._handler(products, 'json').store_json(url, tipo)
+            if self.storage_format in ('sql', 'both'):
+                if self._db_session_id is None:
+                    self._db_session_id = DataHandler.open_scraping_session()
+                    self.logger.info(f"Sesión de scraping de la ejecución: {self._db_session_id}")
+                for tipo, products in by_tipo.items():
+                    ok &= self._handler(products, 'sql').store_sql(tipo)
+        except Exception as e:
+            ok = False
+            self.logger.error(f"Error confirmando lote de {len(batch)} productos: {e}")
+        finally:
+            latency = time.perf_counter() - start
+            with self._stats_lock:
+                self._stats['batches'] += 1
+                self._stats['total_commit_latency'] += latency
+                self._stats['max_commit_latency'] = max(self._stats['max_commit_latency'], latency)
+                if ok:
+                    self._stats['items_written'] += len(batch)
+                else:
+                    self._stats['failed_batches'] += 1
+                    self._stats['items_failed'] += len(batch)
+
+    def _handler(self, products: List[Dict], storage_format: str) -> DataHandler:
+        return DataHandler(
+            products,
+            storage_format=storage_format,
+            logger=self.logger,
+            session_id=self.session_id,
+            json_mode=self.json_mode,
+            json_compression=self.json_compression,
+            ndjson_writer=self.ndjson_writer,
+            db_session_id=self._db_session_id
+        )
+
+    def queue_depth(self) -> int:
+        """Productos en cola pendientes de confirmar"""
+        if not self.background:
+            return len(self._sync_batch)
+        return self._queue.qsize()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estadísticas del escritor (profundidad de cola y latencia de commit)"""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        batches = stats['batches']
+        total_latency = stats.pop('total_commit_latency')
+        stats['queue_depth'] = self.queue_depth()
+        stats['db_session_id'] = self._db_session_id
+        stats['avg_commit_latency_ms'] = round(total_latency / batches * 1000, 2) if batches else 0.0
+        stats['max_commit_latency_ms'] = round(stats.pop('max_commit_latency') * 1000, 2)
+        return stats
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+        return False
@@ -25,6 +25,29 @@ PAGINACION_ML = {
     "url_suffix": "_NoIndex_True",  # sufijo estándar observado
 }
 
+# Límite de requests por tienda (token bucket): tasa sostenida en 
+# requests/s y ráfaga máxima. Los dominios sin entrada usan el 
+# delay_between_requests del coordinador (rate = 1 / delay, ráfaga 1).
+RATE_LIMITS_DOMINIO = {
+    "mercadolibre": {"rate": 1.0, "burst": 3},
+    "alkosto": {"rate": 0.5, "burst": 2},
+}
+
+# Máximo de tareas simultáneas por tienda en el coordinador. Los 
+# dominios sin entrada usan default_domain_concurrency.
+CONCURRENCIA_DOMINIO = {
+    "mercadolibre": 3,
+    "alkosto": 2,
+}
+
+# Vigencia (segundos) de los resultados en caché por tienda. Los 
+# dominios sin entrada usan el cache_ttl del coordinador; una tarea 
+# puede fijar la suya con 'cache_ttl'.
+CACHE_TTL_TIENDA = {
+    "mercadolibre": 3600,
+    "alkosto": 6 * 3600,
+}
+
 SELECTORES_LISTA_DINAMICOS = {
     "mercadolibre": {
         "producto": {"tag": "li", "class": "ui-search-layout__item"},
@@ -69,6 +92,11 @@ SELECTORES_LISTA_DINAMICOS = {
         "discount": {
             "tag": "span", 
             "class": "andes-money-amount__discount"
+        },
+        # Categoría a nivel de página (título del breadcrumb del listado)
+        "category": {
+            "tag": "h1",
+            "class": "ui-search-breadcrumb__title"
         }
     },
     "alkosto": {
@@ -126,6 +154,13 @@ SELECTORES_LISTA_DINAMICOS = {
         "description": {
         "tag": "ul", 
         "class": "product__item__information__key-features--list"
+        },
+        # Categoría a nivel de página (último nivel del breadcrumb)
+        "category": {
+            "tag": "ol",
+            "class": "breadcrumb",
+            "sub_element": {"tag": "li"},
+            "last": True
         }
     }
 }
\ No newline at end of file
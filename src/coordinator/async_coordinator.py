@@ -0,0 +1,364 @@
+"""
+Descripción:
+    Motor asyncio del coordinador de scraping.
+
+    - AsyncScrapingCoordinator reutiliza validación, caché, robots.txt,
+    circuit breaker, deduplicación y el sink de almacenamiento de
+    ScrapingCoordinator; solo cambia cómo se ejecutan las tareas.
+    - Cada tarea es una corrutina: las esperas de rate limiting, backoff
+    y cupo de dominio no ocupan hilos, así que puede haber cientos de
+    tareas en vuelo con poco overhead.
+    - Concurrencia por dominio con asyncio.Semaphore (mismos topes que
+    el planificador síncrono) y un tope global `max_concurrency`.
+    - Selenium es bloqueante: las llamadas al extractor pasan por un
+    puente de hilos (ThreadPoolExecutor). _scrape_async es el punto de
+    extensión para un cliente nativo (p.ej. CDP sobre websockets).
+    - Las escrituras al sink corren fuera del event loop.
+    - run() es un envoltorio síncrono de run_async(); los resultados
+    también se pueden consumir a medida que terminan con
+    iter_results_async() (o iter_results() desde código síncrono).
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from functools import partial
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from src.coordinator.scraping_coordinator import ScrapingCoordinator, TQDM_AVAILABLE
+from src.utils.cancellation import CancelToken
+from src.utils.helpers import domain_key
+
+if TQDM_AVAILABLE:
+    from tqdm import tqdm
+
+
+class AsyncScrapingCoordinator(ScrapingCoordinator):
+    """
+    Coordinador con el mismo contrato que ScrapingCoordinator (tareas,
+    resultados, estadísticas, callbacks) ejecutado sobre asyncio.
+    """
+
+    def __init__(self,
+                 tasks: List[Dict],
+                 max_concurrency: int = 100,
+                 bridge_workers: Optional[int] = None,
+                 **kwargs):
+        """
+        Args:
+            tasks: Tareas a procesar
+            max_concurrency: Tareas en vuelo como máximo (corrutinas)
+            bridge_workers: Hilos del puente para llamadas bloqueantes de
+                Selenium (por defecto max_concurrency)
+            **kwargs: Resto de parámetros de ScrapingCoordinator 
+                (con executor='process', max_workers es el número de procesos)
+        """
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency debe ser al menos 1")
+        if kwargs.get('task_queue') is not None:
+            raise ValueError(
+                "AsyncScrapingCoordinator no soporta colas compartidas; "
+                "use ScrapingCoordinator(task_queue=...)"
+            )
+        super().__init__(tasks, **kwargs)
+        self.options.update(max_concurrency=max_concurrency, bridge_workers=bridge_workers)
+        self.max_concurrency = max_concurrency
+        self.bridge_workers = bridge_workers or max_concurrency
+        self._bridge: Optional[ThreadPoolExecutor] = None
+        self._domain_semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._domain_stats: Dict[str, Dict] = {}
+
+    def run(self) -> Dict:
+        """Envoltorio síncrono: ejecuta run_async() en un event loop propio"""
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.run_async())
+        raise RuntimeError(
+            "run() no puede llamarse desde un event loop activo; use 'await run_async()'"
+        )
+
+    async def run_async(self) -> Dict:
+        """
+        Ejecuta todas las tareas de la cola y retorna resultados y
+        estadísticas (mismo formato que ScrapingCoordinator.run).
+        """
+        async for _ in self.iter_results_async():
+            pass
+        return self._last_run
+
+    def iter_results(self) -> Iterator[Dict]:
+        """
+        Versión síncrona de iter_results_async(). El event loop solo
+        avanza mientras se pide el siguiente resultado: un consumidor
+        lento frena el lanzamiento de tareas nuevas.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError(
+                "iter_results() no puede llamarse desde un event loop activo; "
+                "use 'async for ... in iter_results_async()'"
+            )
+        loop = asyncio.new_event_loop()
+        results = self.iter_results_async()
+        try:
+            while True:
+                try:
+                    yield loop.run_until_complete(results.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            loop.run_until_complete(results.aclose())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.close()
+
+    async def iter_results_async(self) -> AsyncIterator[Dict]:
+        """
+        Entrega cada resultado a medida que termina su tarea (ver
+        ScrapingCoordinator.iter_results). Al agotarse, el retorno de
+        run_async() queda en last_run.
+        """
+        total_start_time = time.time()
+        self._last_run = None
+        self._reset_dedup()
+        tasks = self._start_checkpoint(self._drain_task_queue())
+
+        self.logger.info(
+            f"Iniciando scraping asíncrono de {len(tasks)} tareas "
+            f"(máximo {self.max_concurrency} en vuelo, "
+            f"{self.bridge_workers} hilos de puente)"
+        )
+
+        if not tasks:
+            if self._checkpoint is not None and self._checkpoint.completed:
+                self._close_checkpoint()
+                self._last_run = self._finish_run(time.time() - total_start_time)
+                return
+            self.logger.warning("No hay tareas para procesar")
+            self._last_run = self._empty_run_result()
+            return
+
+        loop = asyncio.get_running_loop()
+        self._open_run_outputs()
+        self._start_process_pool()
+        self._bridge = ThreadPoolExecutor(
+            max_workers=self.bridge_workers, thread_name_prefix='selenium-bridge'
+        )
+        results = self._iter_execute_tasks_async(tasks)
+        try:
+            async for result in results:
+                yield result
+        finally:
+            # Si el consumidor cerró antes, cancela las tareas aún en vuelo
+            await results.aclose()
+            # Sin esperar hilos abandonados por timeout (son daemon de facto)
+            self._bridge.shutdown(wait=False)
+            self._bridge = None
+            await loop.run_in_executor(None, self._stop_process_pool)
+            await loop.run_in_executor(None, self._close_run_outputs)
+            self._close_checkpoint()
+
+        self._last_run = self._finish_run(time.time() - total_start_time)
+
+    async def _iter_execute_tasks_async(self, tasks: List[Dict]) -> AsyncIterator[Dict]:
+        """
+        Lanza una corrutina por tarea (en orden de prioridad) y entrega los
+        resultados a medida que terminan. Las tareas agregadas con
+        add_task durante la ejecución también se lanzan.
+        """
+        self._domain_semaphores.clear()
+        self._domain_stats.clear()
+        global_slots = asyncio.Semaphore(self.max_concurrency)
+        total = len(tasks)
+        progress = (
+            tqdm(total=total, desc="Scraping", unit="tarea")
+            if self.show_progress else None
+        )
+
+        # Los semáforos despiertan en orden FIFO: crear las corrutinas por
+        # prioridad hace que cada dominio atienda primero las urgentes
+        pending = {
+            asyncio.ensure_future(self._run_task(task, global_slots))
+            for task in sorted(tasks, key=lambda t: t.get('priority', 0))
+        }
+        # Sin tareas terminadas, despierta igual para guardar el checkpoint
+        wait_timeout = self.checkpoint_interval if self._checkpoint is not None else None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, timeout=wait_timeout, return_when=asyncio.FIRST_COMPLETED
+                )
+                for future in done:
+                    result = future.result()
+                    if progress is not None:
+                        progress.update(1)
+                    if result is None:
+                        continue
+                    self._keep_result(result)
+                    yield result
+
+                # En el hilo del event loop: ninguna corrutina modifica el 
+                # checkpoint mientras se escribe
+                self._checkpoint_tick()
+
+                added = self._checkpoint_new_tasks(self._drain_task_queue())
+                if added:
+                    total += len(added)
+                    if progress is not None:
+                        progress.total = total
+                        progress.refresh()
+                    pending |= {
+                        asyncio.ensure_future(self._run_task(task, global_slots))
+                        for task in sorted(added, key=lambda t: t.get('priority', 0))
+                    }
+        finally:
+            for future in pending:
+                future.cancel()
+            if progress is not None:
+                progress.close()
+
+    def _domain_slot(self, domain: str) -> asyncio.Semaphore:
+        semaphore = self._domain_semaphores.get(domain)
+        if semaphore is None:
+            cap = max(1, self.domain_concurrency.get(domain, self.default_domain_concurrency))
+            semaphore = asyncio.Semaphore(cap)
+            self._domain_semaphores[domain] = semaphore
+            self._domain_stats[domain] = {
+                'max_concurrency': cap, 'dispatched': 0, 'active': 0,
+                'max_active': 0, 'total_queue_wait': 0.0
+            }
+        return semaphore
+
+    async def _run_task(self, task: Dict,
+                        global_slots: asyncio.Semaphore) -> Optional[Dict]:
+        """
+        Espera cupo en el dominio y en el tope global y procesa la tarea. 
+        Retorna None para las tareas de actualización del caché.
+        """
+        domain = domain_key(task['url'])
+        domain_slots = self._domain_slot(domain)
+        stats = self._domain_stats[domain]
+        queued_at = time.monotonic()
+        async with domain_slots, global_slots:
+            stats['dispatched'] += 1
+            stats['active'] += 1
+            stats['max_active'] = max(stats['max_active'], stats['active'])
+            stats['total_queue_wait'] += time.monotonic() - queued_at
+            if self._checkpoint is not None:
+                self._checkpoint.task_started(task)
+            try:
+                result = await self.process_task_async(task)
+            except Exception as e:
+                if not task.get('revalidate'):
+                    raise
+                result = self._failed_revalidation(task, e)
+            finally:
+                stats['active'] -= 1
+            self._checkpoint_task_finished(task, result)
+            if task.get('revalidate'):
+                # Actualización del caché: no es un resultado de la ejecución
+                self._revalidation_done(task, result)
+                return None
+            return result
+
+    async def process_task_async(self, task: Dict) -> Dict:
+        """
+        Versión asíncrona de process_task: mismos chequeos, reintentos y
+        clasificación de errores, sin bloquear el event loop.
+        """
+        loop = asyncio.get_running_loop()
+        start_time = time.time()
+        timeout = self._compute_timeout(task)
+        url = task['url']
+
+        # robots.txt puede descargar el archivo: fuera del event loop
+        early_result = await loop.run_in_executor(self._bridge, self._precheck_task, task)
+        if early_result is not None:
+            return early_result
+
+        last_exception = None
+        rate_limit_wait = 0.0
+        for attempt in range(self.max_retries):
+            rate_limit_wait += await self._rate_limiter.acquire_async(url)
+            token = CancelToken()
+            with self.lock:
+                self._active_tokens.add(token)
+            try:
+                data = await self._scrape_with_timeout(task, timeout, token)
+                # El sink puede bloquear (cola llena o modo síncrono)
+                return await loop.run_in_executor(
+                    None, self._task_succeeded, task, data, attempt, start_time, rate_limit_wait
+                )
+            except asyncio.CancelledError:
+                token.cancel("Ejecución cancelada")
+                raise
+            except Exception as e:
+                last_exception, retry_in = self._attempt_failed(e, attempt, url, timeout)
+                if retry_in is None:
+                    break
+                if retry_in:
+                    await asyncio.sleep(retry_in)
+            finally:
+                with self.lock:
+                    self._active_tokens.discard(token)
+
+        return await loop.run_in_executor(
+            None, self._task_failed, task, last_exception, start_time, rate_limit_wait
+        )
+
+    async def _scrape_with_timeout(self, task: Dict, timeout: float,
+                                   cancel_token: CancelToken) -> Any:
+        """
+        Ejecuta _scrape_async con límite de `timeout` segundos. Al vencer
+        cancela el token (cierra el navegador) y espera a la tarea como
+        máximo cancel_grace_period antes de abandonarla.
+        """
+        attempt = asyncio.ensure_future(self._scrape_async(task, cancel_token))
+        # Si la corrutina se cancela desde afuera (cierre anticipado), nadie 
+        # espera al intento: se consume su excepción para no dejarla huérfana
+        attempt.add_done_callback(lambda f: f.cancelled() or f.exception())
+        try:
+            return await asyncio.wait_for(asyncio.shield(attempt), timeout)
+        except asyncio.TimeoutError:
+            with self.lock:
+                self.metrics['timeouts'] += 1
+            cancel_token.cancel(f"Timeout de {timeout}s excedido")
+            try:
+                await asyncio.wait_for(attempt, self.cancel_grace_period)
+            except asyncio.TimeoutError:
+                with self.lock:
+                    self.metrics['abandoned_threads'] += 1
+                self.logger.warning(
+                    f"El intento no terminó {self.cancel_grace_period}s después "
+                    "de cancelarlo; se abandona"
+                )
+            except Exception:
+                pass
+            raise TimeoutError(f"Timeout de {timeout}s excedido")
+
+    async def _scrape_async(self, task: Dict, cancel_token: CancelToken) -> Any:
+        """
+        Scrapea una tarea. Por defecto ejecuta el extractor Selenium en el
+        puente de hilos; una subclase puede sobrescribirlo con un cliente
+        asíncrono nativo que consulte `cancel_token`.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._bridge, partial(self._scrape_with_extractor, task, cancel_token=cancel_token)
+        )
+
+    def _scheduler_stats(self) -> Dict:
+        return {
+            domain: {
+                'max_concurrency': s['max_concurrency'],
+                'dispatched': s['dispatched'],
+                'max_active': s['max_active'],
+                'pending': 0,
+                'avg_queue_wait': round(s['total_queue_wait'] / s['dispatched'], 3)
+                if s['dispatched'] else 0.0,
+            }
+            for domain, s in self._domain_stats.items()
+        }
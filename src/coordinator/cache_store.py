@@ -0,0 +1,331 @@
+"""
+Descripción:
+    Caché de resultados de scraping persistente en SQLite.
+
+    - Misma API que LRUCache (get / set / clear / size / get_cache_info)
+    pero cada escritura es un upsert de una sola entrada: el costo no
+    depende del tamaño del caché y no se reescribe un pickle completo.
+    - Carga perezosa: al iniciar no se lee nada; cada get consulta solo
+    su clave (índice por PRIMARY KEY).
+    - Límite en bytes serializados (`max_bytes`), no en número de
+    entradas: un listado de 500 productos pesa cientos de veces lo que
+    uno de un producto. Expulsión GreedyDual-Size ('gds', por defecto):
+    cada entrada tiene prioridad L + costo / tamaño, donde el costo es lo
+    que tomó obtenerla (segundos de scraping) y L sube a la prioridad de
+    cada entrada expulsada, de modo que las entradas grandes, baratas
+    de volver a obtener o sin uso reciente salen primero. 'lru' expulsa
+    por último acceso hasta volver a caber en el presupuesto.
+    - Modo WAL y una conexión por hilo: varios procesos (p.ej. uno por
+    scrape lanzado desde la app Java) comparten el archivo sin pisarse;
+    una caída a mitad de una escritura no corrompe las demás entradas.
+    - Vigencia por entrada (ttl): get() solo retorna entradas vigentes;
+    get_entry(max_stale=...) también las vencidas hace menos de
+    `max_stale` segundos (stale-while-revalidate en el coordinador).
+"""
+
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+EVICTION_POLICIES = ('gds', 'lru')
+DEFAULT_MAX_BYTES = 128 * 1024 * 1024
+
+
+def entry_priority(inflation: float, cost: float, size: int) -> float:
+    """Prioridad GreedyDual-Size de una entrada: L + costo / tamaño"""
+    return inflation + cost / max(size, 1)
+
+
+@dataclass
+class CacheEntry:
+    """Valor en caché con su momento de creación y de vencimiento (epoch)"""
+    value: Any
+    created_at: float
+    expires_at: Optional[float] = None
+    # Bytes serializados y costo de volver a obtenerla (segundos)
+    size: int = 0
+    cost: float = 1.0
+
+    @classmethod
+    def create(cls, value: Any, ttl: Optional[float] = None,
+               size: int = 0, cost: float = 1.0) -> 'CacheEntry':
+        now = time.time()
+        return cls(value, now, None if ttl is None else now + ttl, size, cost)
+
+    def is_fresh(self, now: Optional[float] = None) -> bool:
+        """Sin vencimiento o aún dentro de su ttl"""
+        return self.expires_at is None or (now or time.time()) < self.expires_at
+
+    def is_usable(self, max_stale: float = 0.0, now: Optional[float] = None) -> bool:
+        """Vigente o vencida hace menos de `max_stale` segundos"""
+        return self.expires_at is None or (now or time.time()) < self.expires_at + max_stale
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now or time.time()) - self.created_at
+
+
+class SQLiteCache:
+    """
+    Caché thread-safe y multiproceso sobre un archivo SQLite, acotado
+    en bytes. Los valores se serializan con pickle, igual que LRUCache.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS cache_entries (
+            key TEXT PRIMARY KEY,
+            value BLOB NOT NULL,
+            size INTEGER NOT NULL,
+            created_at REAL NOT NULL,
+            last_access REAL NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0,
+            expires_at REAL,
+            cost REAL NOT NULL DEFAULT 1.0,
+            priority REAL NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_cache_entries_access
+            ON cache_entries (last_access);
+        CREATE TABLE IF NOT EXISTS cache_meta (
+            name TEXT PRIMARY KEY,
+            value REAL NOT NULL
+        );
+        INSERT OR IGNORE INTO cache_meta (name, value) VALUES ('inflation', 0);
+    """
+
+    # Columnas agregadas después de la primera versión del esquema
+    MIGRATIONS = {
+        'expires_at': "ALTER TABLE cache_entries ADD COLUMN expires_at REAL",
+        'cost': "ALTER TABLE cache_entries ADD COLUMN cost REAL NOT NULL DEFAULT 1.0",
+        'priority': "ALTER TABLE cache_entries ADD COLUMN priority REAL NOT NULL DEFAULT 0",
+    }
+
+    def __init__(self, max_size: Optional[int] = None, cache_dir: str = 'cache',
+                 filename: str = 'scraping_cache.db', busy_timeout: float = 30.0,
+                 max_bytes: int = DEFAULT_MAX_BYTES, eviction: str = 'gds'):
+        """
+        Args:
+            max_size: Número máximo de entradas (None: solo límite en bytes)
+            cache_dir: Directorio del archivo de caché
+            filename: Nombre del archivo SQLite
+            busy_timeout: Segundos de espera si otro proceso tiene el lock
+            max_bytes: Máximo de bytes serializados entre todas las entradas
+            eviction: 'gds' (GreedyDual-Size) o 'lru'
+        """
+        if max_size is not None and max_size < 1:
+            raise ValueError("max_size debe ser al menos 1")
+        if max_bytes < 1:
+            raise ValueError("max_bytes debe ser al menos 1")
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(f"eviction no válida: {eviction}")
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.eviction = eviction
+        self.evictions = 0
+        self.busy_timeout = busy_timeout
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.cache_file = self.cache_dir / filename
+        self.logger = logging.getLogger('SQLiteCache')
+        self._local = threading.local()
+        self._conn().executescript(self.SCHEMA)
+        self._migrate()
+
+    def _migrate(self) -> None:
+        """Agrega las columnas que falten a cachés creados con esquemas anteriores"""
+        with self._transaction() as conn:
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(cache_entries)")}
+            for column, ddl in self.MIGRATIONS.items():
+                if column not in columns:
+                    conn.execute(ddl)
+            if 'priority' not in columns:
+                conn.execute("UPDATE cache_entries SET priority = cost / max(size, 1)")
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cache_entries_priority "
+                "ON cache_entries (priority)"
+            )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # isolation_level=None: cada sentencia confirma sola y las
+            # transacciones de varias sentencias se abren explícitamente
+            conn = sqlite3.connect(str(self.cache_file), timeout=self.busy_timeout,
+                                   isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Obtiene un valor vigente del caché y actualiza su último acceso"""
+        entry = self.get_entry(key)
+        return entry.value if entry is not None else None
+
+    def get_entry(self, key: str, max_stale: float = 0.0) -> Optional[CacheEntry]:
+        """
+        Obtiene la entrada de `key` si está vigente o vencida hace menos
+        de `max_stale` segundos y renueva su prioridad. Una entrada más
+        vieja cuenta como ausente (y, al no renovarse, es de las primeras
+        en expulsarse).
+        """
+        now = time.time()
+        try:
+            row = self._conn().execute(
+                "UPDATE cache_entries SET last_access = ?, hits = hits + 1, "
+                "priority = (SELECT value FROM cache_meta WHERE name = 'inflation') "
+                "+ cost / max(size, 1) "
+                "WHERE key = ? AND (expires_at IS NULL OR expires_at + ? > ?) "
+                "RETURNING value, created_at, expires_at, size, cost",
+                (now, key, max_stale, now)
+            ).fetchone()
+        except sqlite3.Error as e:
+            self.logger.warning(f"Error leyendo caché: {e}")
+            return None
+        if row is None:
+            return None
+        try:
+            return CacheEntry(pickle.loads(row[0]), *row[1:])
+        except Exception as e:
+            self.logger.warning(f"Entrada de caché ilegible ({key}): {e}")
+            return None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None,
+            cost: float = 1.0) -> None:
+        """
+        Guarda (upsert) una entrada vigente por `ttl` segundos (None: sin
+        vencimiento) cuyo costo de volver a obtenerla es `cost`, y expulsa
+        entradas hasta volver a caber en el presupuesto.
+        """
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            self.logger.error(f"Error serializando entrada de caché: {e}")
+            return
+        if len(blob) > self.max_bytes:
+            self.logger.debug(
+                f"Entrada de {len(blob)} bytes excede max_bytes, no se guarda: {key}"
+            )
+            return
+        entry = CacheEntry.create(None, ttl, len(blob), cost)
+        try:
+            with self._transaction() as conn:
+                inflation = conn.execute(
+                    "SELECT value FROM cache_meta WHERE name = 'inflation'"
+                ).fetchone()[0]
+                conn.execute(
+                    "INSERT INTO cache_entries "
+                    "(key, value, size, created_at, last_access, expires_at, cost, priority) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET value = excluded.value, "
+                    "size = excluded.size, created_at = excluded.created_at, "
+                    "last_access = excluded.last_access, expires_at = excluded.expires_at, "
+                    "cost = excluded.cost, priority = excluded.priority",
+                    (key, blob, entry.size, entry.created_at, entry.created_at,
+                     entry.expires_at, entry.cost,
+                     entry_priority(inflation, entry.cost, entry.size))
+                )
+                self._evict(conn)
+        except sqlite3.Error as e:
+            self.logger.error(f"Error guardando entrada de caché: {e}")
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """
+        Borra entradas en orden de prioridad (o de último acceso con 'lru')
+        hasta quedar dentro de max_bytes y max_size. Con 'gds' la inflación
+        L sube a la prioridad de la última entrada expulsada.
+        """
+        total_bytes, entries = conn.execute(
+            "SELECT coalesce(sum(size), 0), count(*) FROM cache_entries"
+        ).fetchone()
+        excess_bytes = total_bytes - self.max_bytes
+        excess_entries = entries - self.max_size if self.max_size else 0
+        if excess_bytes <= 0 and excess_entries <= 0:
+            return
+
+        order = 'priority' if self.eviction == 'gds' else 'last_access'
+        victims, freed, inflation = [], 0, None
+        rows = conn.execute(f"SELECT key, size, priority FROM cache_entries ORDER BY {order}")
+        for key, size, priority in rows:
+            if freed >= excess_bytes and len(victims) >= excess_entries:
+                break
+            victims.append((key,))
+            freed += size
+            inflation = priority if inflation is None else max(inflation, priority)
+        rows.close()
+
+        conn.executemany("DELETE FROM cache_entries WHERE key = ?", victims)
+        if self.eviction == 'gds':
+            conn.execute(
+                "UPDATE cache_meta SET value = max(value, ?) WHERE name = 'inflation'",
+                (inflation,)
+            )
+        self.evictions += len(victims)
+
+    def clear(self) -> None:
+        """Limpia el caché (para todos los procesos que lo comparten)"""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM cache_entries")
+            conn.execute("UPDATE cache_meta SET value = 0 WHERE name = 'inflation'")
+
+    def size(self) -> int:
+        """Retorna el tamaño actual del caché"""
+        return self._conn().execute("SELECT count(*) FROM cache_entries").fetchone()[0]
+
+    def get_cache_info(self) -> Dict[str, Any]:
+        """Retorna información detallada del caché"""
+        conn = self._conn()
+        entries, payload, expired = conn.execute(
+            "SELECT count(*), coalesce(sum(size), 0), "
+            "coalesce(sum(expires_at IS NOT NULL AND expires_at <= ?), 0) "
+            "FROM cache_entries", (time.time(),)
+        ).fetchone()
+        oldest = conn.execute(
+            "SELECT key FROM cache_entries ORDER BY last_access LIMIT 1"
+        ).fetchone()
+        newest = conn.execute(
+            "SELECT key FROM cache_entries ORDER BY last_access DESC LIMIT 1"
+        ).fetchone()
+        # El archivo principal más el WAL aún sin volcar
+        total_size = sum(
+            os.path.getsize(path)
+            for path in (str(self.cache_file), f"{self.cache_file}-wal")
+            if os.path.exists(path)
+        )
+        return {
+            'entries': entries,
+            'expired_entries': expired,
+            'max_size': self.max_size,
+            'bytes': payload,
+            'max_bytes': self.max_bytes,
+            'eviction': self.eviction,
+            'evictions': self.evictions,
+            'disk_size_mb': round(total_size / (1024 * 1024), 2),
+            'payload_size_mb': round(payload / (1024 * 1024), 2),
+            'cache_file': str(self.cache_file),
+            'oldest_entry': oldest[0] if oldest else None,
+            'newest_entry': newest[0] if newest else None,
+        }
+
+    def close(self) -> None:
+        """Cierra la conexión del hilo actual"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
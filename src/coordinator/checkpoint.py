@@ -0,0 +1,347 @@
+"""
+Descripción:
+    Checkpoints de una ejecución del coordinador para poder reanudarla.
+
+    - Cada tarea recibe un ID estable (hash de su contenido más el número
+    de ocurrencia), así que el mismo archivo de tareas produce los mismos
+    IDs en cada ejecución.
+    - state.json: tareas de la ejecución, IDs pendientes, en curso y
+    completados, y la configuración del coordinador (para reanudar con
+    las mismas opciones). Se reescribe de forma atómica (archivo
+    temporal + os.replace) como máximo cada `interval` segundos.
+    - Las opciones se guardan como JSON; los RateLimit se guardan con su
+    tipo y se reconstruyen al cargar. Cualquier otro valor que no sea
+    JSON se rechaza con ValueError en lugar de volver como texto.
+    - results.ndjson: resultados de las tareas terminadas con las claves
+    de deduplicación de sus productos; solo se agregan líneas. Se
+    escribe antes que state.json, de modo que un resultado en disco
+    siempre cuenta como completado aunque el estado no alcanzara a
+    actualizarse.
+    - Al reanudar se omiten las tareas completadas (sus resultados y
+    claves se restauran) y las que estaban en curso vuelven a
+    pendientes: el trabajo repetido queda acotado al intervalo del
+    checkpoint.
+"""
+
+import hashlib
+import json
+import os
+import time
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.coordinator.rate_limiter import RateLimit
+from src.utils.logger import get_logger
+
+DEFAULT_CHECKPOINT_DIR = os.path.join('outputs', 'checkpoints')
+
+# Tipos no JSON que pueden venir en las opciones: se guardan como 
+# {'__type__': nombre, **campos} y se reconstruyen al cargar
+OPTION_TYPES = {'RateLimit': RateLimit}
+
+
+def encode_options(options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Opciones del coordinador listas para json.dump.
+
+    Raises:
+        ValueError: Si alguna opción no es JSON ni de OPTION_TYPES
+    """
+    return {name: _encode_option(value, name) for name, value in options.items()}
+
+
+def _encode_option(value: Any, path: str) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, RateLimit):
+        return {'__type__': type(value).__name__, **asdict(value)}
+    if isinstance(value, (list, tuple)):
+        return [_encode_option(item, f"{path}[{i}]") for i, item in enumerate(value)]
+    if isinstance(value, dict) and all(isinstance(key, str) for key in value):
+        return {key: _encode_option(item, f"{path}.{key}") for key, item in value.items()}
+    raise ValueError(
+        f"La opción '{path}' ({type(value).__name__}) no se puede guardar en el "
+        "checkpoint; use valores JSON o RateLimit"
+    )
+
+
+def decode_options(options: Dict[str, Any]) -> Dict[str, Any]:
+    """Inversa de encode_options: reconstruye los tipos de OPTION_TYPES"""
+    return {name: _decode_option(value) for name, value in options.items()}
+
+
+def _decode_option(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_decode_option(item) for item in value]
+    if isinstance(value, dict):
+        fields = {key: _decode_option(item) for key, item in value.items()}
+        option_type = OPTION_TYPES.get(fields.get('__type__'))
+        if option_type is not None:
+            del fields['__type__']
+            return option_type(**fields)
+        return fields
+    return value
+
+
+def task_fingerprint(task: Dict) -> str:
+    """Hash del contenido de una tarea (independiente del orden de claves)"""
+    payload = json.dumps(task, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode('utf-8')).hexdigest()[:16]
+
+
+class RunCheckpoint:
+    """
+    Estado persistente de una ejecución. Lo actualiza solo el hilo que
+    despacha las tareas (no es thread-safe).
+    """
+
+    STATE_FILE = 'state.json'
+    RESULTS_FILE = 'results.ndjson'
+
+    def __init__(self, run_id: str, directory: str = DEFAULT_CHECKPOINT_DIR,
+                 interval: float = 30.0, options: Optional[Dict[str, Any]] = None,
+                 coordinator: Optional[str] = None):
+        """
+        Args:
+            run_id: Identificador de la ejecución (nombre del directorio)
+            directory: Directorio base de los checkpoints
+            interval: Segundos mínimos entre escrituras a disco
+            options: Opciones del coordinador (JSON o tipos de OPTION_TYPES)
+            coordinator: Nombre de la clase del coordinador
+        """
+        if interval < 0:
+            raise ValueError("interval no puede ser negativo")
+        self.run_id = run_id
+        self.path = os.path.join(directory, run_id)
+        self.interval = interval
+        self.logger = get_logger('RunCheckpoint')
+
+        # ID -> tarea, en orden de registro
+        self.tasks: Dict[str, Dict] = {}
+        # Solo IDs: los resultados se guardan en disco y no se retienen
+        self.completed: set = set()
+        self.in_flight: set = set()
+        self.status = 'running'
+        self.created_at = time.time()
+        self.options: Dict[str, Any] = options or {}
+        self.coordinator = coordinator
+        self.restored = 0
+        self.restored_results: List[Dict] = []
+        self.restored_keys: List[str] = []
+        self.flushes = 0
+
+        self._ids: Dict[int, str] = {}
+        self._occurrences: Dict[str, int] = {}
+        self._unsaved_results: Dict[str, Dict] = {}
+        self._dirty = True
+        self._last_flush = time.monotonic()
+
+    @property
+    def state_path(self) -> str:
+        return os.path.join(self.path, self.STATE_FILE)
+
+    @property
+    def results_path(self) -> str:
+        return os.path.join(self.path, self.RESULTS_FILE)
+
+    @classmethod
+    def exists(cls, run_id: str, directory: str = DEFAULT_CHECKPOINT_DIR) -> bool:
+        return os.path.exists(os.path.join(directory, run_id, cls.STATE_FILE))
+
+    @classmethod
+    def load_options(cls, run_id: str,
+                     directory: str = DEFAULT_CHECKPOINT_DIR) -> Tuple[Optional[str], Dict]:
+        """
+        (clase del coordinador, opciones) guardadas en el checkpoint, sin 
+        leer los resultados. Checkpoints anteriores: (None, {}).
+
+        Raises:
+            FileNotFoundError: Si no existe un checkpoint con ese ID
+        """
+        path = os.path.join(directory, run_id, cls.STATE_FILE)
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No existe el checkpoint '{run_id}' en {directory}")
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        return state.get('coordinator'), decode_options(state.get('options') or {})
+
+    @classmethod
+    def load(cls, run_id: str, directory: str = DEFAULT_CHECKPOINT_DIR,
+             interval: float = 30.0) -> 'RunCheckpoint':
+        """
+        Carga el checkpoint de `run_id`. Las tareas que estaban en curso
+        quedan pendientes; los resultados guardados quedan en
+        `restored_results` y sus claves de deduplicación en
+        `restored_keys`.
+
+        Raises:
+            FileNotFoundError: Si no existe un checkpoint con ese ID
+        """
+        checkpoint = cls(run_id, directory=directory, interval=interval)
+        if not os.path.exists(checkpoint.state_path):
+            raise FileNotFoundError(f"No existe el checkpoint '{run_id}' en {directory}")
+
+        with open(checkpoint.state_path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        checkpoint.created_at = state.get('created_at', checkpoint.created_at)
+        checkpoint.options = decode_options(state.get('options') or {})
+        checkpoint.coordinator = state.get('coordinator')
+        for task_id, task in state['tasks'].items():
+            checkpoint.tasks[task_id] = task
+            checkpoint._ids[id(task)] = task_id
+
+        for task_id, result, keys in checkpoint._read_results():
+            if task_id in checkpoint.tasks and task_id not in checkpoint.completed:
+                checkpoint.completed.add(task_id)
+                checkpoint.restored_results.append(result)
+                checkpoint.restored_keys.extend(keys)
+        checkpoint.restored = len(checkpoint.completed)
+        return checkpoint
+
+    def _read_results(self):
+        """
+        Lee results.ndjson. Una última línea incompleta (caída a mitad de
+        una escritura) se descarta y se trunca para poder seguir agregando.
+        """
+        if not os.path.exists(self.results_path):
+            return
+        with open(self.results_path, 'rb+') as f:
+            content = f.read()
+            end = content.rfind(b'\n') + 1
+            if end < len(content):
+                self.logger.warning(
+                    f"Checkpoint {self.run_id}: se descarta un resultado incompleto"
+                )
+                f.truncate(end)
+        for line in content[:end].splitlines():
+            if line.strip():
+                record = json.loads(line)
+                yield record['id'], record['result'], record.get('keys', [])
+
+    def register(self, tasks: List[Dict]) -> List[Dict]:
+        """
+        Asigna IDs a las tareas. Las que ya figuraban en el checkpoint
+        (p.ej. al reanudar con el mismo archivo de tareas) se ignoran.
+
+        Returns:
+            Tareas nuevas
+        """
+        new_tasks = []
+        for task in tasks:
+            fingerprint = task_fingerprint(task)
+            occurrence = self._occurrences.get(fingerprint, 0) + 1
+            self._occurrences[fingerprint] = occurrence
+            task_id = fingerprint if occurrence == 1 else f"{fingerprint}-{occurrence}"
+            if task_id in self.tasks:
+                continue
+            self.tasks[task_id] = task
+            self._ids[id(task)] = task_id
+            new_tasks.append(task)
+        if new_tasks:
+            self._dirty = True
+        return new_tasks
+
+    def unfinished_tasks(self) -> List[Dict]:
+        """Tareas registradas sin resultado, en orden de registro"""
+        return [
+            task for task_id, task in self.tasks.items()
+            if task_id not in self.completed
+        ]
+
+    def take_restored_results(self) -> List[Dict]:
+        """Entrega (una sola vez) los resultados cargados al reanudar"""
+        results, self.restored_results = self.restored_results, []
+        return results
+
+    def take_restored_keys(self) -> List[str]:
+        """Entrega (una sola vez) las claves de deduplicación cargadas al reanudar"""
+        keys, self.restored_keys = self.restored_keys, []
+        return keys
+
+    def task_started(self, task: Dict) -> None:
+        task_id = self._ids.get(id(task))
+        if task_id is not None:
+            self.in_flight.add(task_id)
+            self._dirty = True
+
+    def task_finished(self, task: Dict, result: Dict,
+                      keys: Optional[List[str]] = None) -> None:
+        """
+        Marca la tarea como completada. `keys`: claves de deduplicación 
+        de sus productos, para no volver a emitirlos al reanudar.
+        """
+        task_id = self._ids.get(id(task))
+        if task_id is None:
+            return
+        self.in_flight.discard(task_id)
+        self.completed.add(task_id)
+        self._unsaved_results[task_id] = (result, keys)
+        self._dirty = True
+
+    def due(self) -> bool:
+        """Hay cambios sin guardar y ya pasó el intervalo"""
+        return self._dirty and time.monotonic() - self._last_flush >= self.interval
+
+    def flush(self) -> None:
+        """Escribe los resultados nuevos y luego el estado (atómico)"""
+        if not self._dirty:
+            return
+        os.makedirs(self.path, exist_ok=True)
+        if self._unsaved_results:
+            with open(self.results_path, 'a', encoding='utf-8') as f:
+                for task_id, (result, keys) in self._unsaved_results.items():
+                    record = {'id': task_id, 'result': result}
+                    if keys:
+                        record['keys'] = keys
+                    f.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            self._unsaved_results.clear()
+
+        state = {
+            'run_id': self.run_id,
+            'status': self.status,
+            'coordinator': self.coordinator,
+            'options': encode_options(self.options),
+            'created_at': self.created_at,
+            'updated_at': time.time(),
+            'tasks': self.tasks,
+            'pending': [
+                task_id for task_id in self.tasks
+                if task_id not in self.completed and task_id not in self.in_flight
+            ],
+            'in_flight': sorted(self.in_flight),
+            'completed': sorted(self.completed),
+        }
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False, default=str)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.state_path)
+
+        self._dirty = False
+        self._last_flush = time.monotonic()
+        self.flushes += 1
+
+    def close(self) -> None:
+        """Guarda el estado final; 'completed' si no quedan tareas pendientes"""
+        if not self.in_flight and len(self.completed) == len(self.tasks):
+            self.status = 'completed'
+        self._dirty = True
+        self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        completed = len(self.completed)
+        in_flight = len(self.in_flight)
+        return {
+            'run_id': self.run_id,
+            'path': self.path,
+            'status': self.status,
+            'tasks': len(self.tasks),
+            'completed': completed,
+            'in_flight': in_flight,
+            'pending': len(self.tasks) - completed - in_flight,
+            'restored': self.restored,
+            'flushes': self.flushes,
+        }
@@ -0,0 +1,313 @@
+"""
+Descripción:
+    Cola de tareas durable y compartida entre coordinadores.
+
+    - TaskQueueBackend: interfaz con semántica lease/ack. Un nodo toma
+    tareas en préstamo (lease) por un tiempo de visibilidad; si no las
+    confirma (ack / fail) antes de que venza, vuelven a la cola y otro
+    nodo las procesa (entrega al-menos-una-vez).
+    - SQLiteTaskQueue: implementación sobre un archivo SQLite en modo WAL.
+    Varios procesos de la misma máquina (o nodos sobre un sistema de
+    archivos con bloqueos fiables) comparten la cola; otro backend
+    (p.ej. PostgreSQL con SKIP LOCKED) solo debe implementar la interfaz.
+    - Orden por prioridad (menor número = más prioritaria) y luego por
+    orden de llegada.
+    - Tras `max_attempts` leases vencidos la tarea pasa a 'dead' para no
+    bloquear la cola con una URL que tumba al worker.
+    - Deduplicación al encolar: cada tarea tiene una clave (URL canónica,
+    subtipo y parámetros del extractor) única entre las pendientes y en
+    préstamo, así que encolar la misma búsqueda dos veces (dos nodos que
+    siembran la cola) no duplica el trabajo. Una tarea ya terminada sí
+    puede volver a encolarse.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from src.utils.helpers import canonical_product_key
+
+STATUSES = ('pending', 'leased', 'done', 'failed', 'dead')
+
+
+@dataclass
+class Lease:
+    """Tarea prestada a un nodo hasta `expires_at` (epoch)"""
+    id: str
+    task: Dict
+    attempts: int
+    expires_at: float
+
+
+# Parámetros de la tarea que cambian su resultado (los del extractor) y 
+# su valor por defecto (el de ScrapingCoordinator._extractor_params)
+RESULT_PARAMS = {'num_productos': 1, 'max_paginas': 1, 'tienda': None}
+
+
+def task_key(task: Dict) -> str:
+    """
+    Clave de deduplicación de una tarea: URL canónica, subtipo y los 
+    parámetros que cambian el resultado. La misma búsqueda con otro 
+    num_productos o max_paginas es otra tarea y no se descarta.
+    """
+    params = '|'.join(str(task.get(name, default)) for name, default in RESULT_PARAMS.items())
+    return f"{canonical_product_key(task.get('url', ''))}|{task.get('subtype', '')}|{params}"
+
+
+class TaskQueueBackend(ABC):
+    """Interfaz de colas de tareas compartidas con lease/ack"""
+
+    @abstractmethod
+    def push_many(self, tasks: List[Dict]) -> int:
+        """Encola tareas. Retorna cuántas se encolaron (sin duplicados)"""
+
+    def push(self, task: Dict) -> bool:
+        return self.push_many([task]) == 1
+
+    @abstractmethod
+    def lease(self, owner: str, limit: int = 1,
+              visibility_timeout: Optional[float] = None) -> List[Lease]:
+        """Toma hasta `limit` tareas pendientes, por prioridad"""
+
+    @abstractmethod
+    def ack(self, lease_id: str) -> bool:
+        """Marca la tarea como terminada. False si el lease ya no es válido"""
+
+    @abstractmethod
+    def fail(self, lease_id: str, error: str) -> bool:
+        """Marca la tarea como fallida (definitivo, no se reintenta)"""
+
+    @abstractmethod
+    def release(self, lease_id: str, delay: float = 0.0) -> bool:
+        """Devuelve la tarea a la cola (p.ej. al cancelar la ejecución)"""
+
+    @abstractmethod
+    def extend(self, lease_ids: Iterable[str],
+               visibility_timeout: Optional[float] = None) -> int:
+        """Renueva leases en curso. Retorna cuántos seguían vigentes"""
+
+    @abstractmethod
+    def counts(self) -> Dict[str, int]:
+        """Número de tareas por estado"""
+
+    def outstanding(self) -> int:
+        """Tareas pendientes o en préstamo (aún pueden ejecutarse)"""
+        counts = self.counts()
+        return counts.get('pending', 0) + counts.get('leased', 0)
+
+    def size(self) -> int:
+        return self.counts().get('pending', 0)
+
+    def is_empty(self) -> bool:
+        return self.size() == 0
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Elimina todas las tareas de la cola"""
+
+
+class SQLiteTaskQueue(TaskQueueBackend):
+    """
+    Cola durable en SQLite. Una conexión por hilo; cada operación es una
+    transacción BEGIN IMMEDIATE corta, así que los nodos solo se
+    serializan durante el lease/ack, no mientras scrapean.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS task_queue (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            queue TEXT NOT NULL,
+            priority INTEGER NOT NULL DEFAULT 0,
+            payload TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'pending',
+            lease_id TEXT,
+            lease_owner TEXT,
+            lease_expires REAL,
+            available_at REAL NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            task_key TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_task_queue_status
+            ON task_queue (queue, status, priority, id);
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_task_queue_lease
+            ON task_queue (lease_id);
+    """
+
+    # Solo una copia viva (pendiente o en préstamo) de cada tarea por cola
+    TASK_KEY_INDEX = """
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_task_queue_key
+            ON task_queue (queue, task_key) WHERE status IN ('pending', 'leased')
+    """
+
+    def __init__(self, path: str, name: str = 'default',
+                 visibility_timeout: float = 300.0, max_attempts: int = 5,
+                 busy_timeout: float = 30.0):
+        if visibility_timeout <= 0:
+            raise ValueError("visibility_timeout debe ser mayor que 0")
+        if max_attempts < 1:
+            raise ValueError("max_attempts debe ser al menos 1")
+        self.path = path
+        self.name = name
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        conn = self._conn()
+        conn.executescript(self.SCHEMA)
+        # Colas creadas antes de la deduplicación al encolar
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(task_queue)")}
+        if 'task_key' not in columns:
+            conn.execute("ALTER TABLE task_queue ADD COLUMN task_key TEXT")
+        conn.execute(self.TASK_KEY_INDEX)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # isolation_level=None: las transacciones se abren explícitamente
+            conn = sqlite3.connect(self.path, timeout=self.busy_timeout,
+                                   isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def push_many(self, tasks: List[Dict]) -> int:
+        now = time.time()
+        rows = [
+            (self.name, int(task.get('priority', 0)),
+             json.dumps(task, ensure_ascii=False, default=str), task_key(task),
+             now, now, now)
+            for task in tasks
+        ]
+        with self._transaction() as conn:
+            before = conn.total_changes
+            # Las tareas que ya están pendientes o en préstamo se ignoran
+            conn.executemany(
+                "INSERT INTO task_queue (queue, priority, payload, task_key, "
+                "available_at, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT DO NOTHING", rows
+            )
+            return conn.total_changes - before
+
+    def _requeue_expired(self, conn: sqlite3.Connection, now: float) -> None:
+        """Devuelve a la cola los leases vencidos (o los marca 'dead')"""
+        conn.execute(
+            "UPDATE task_queue SET "
+            "status = CASE WHEN attempts >= ? THEN 'dead' ELSE 'pending' END, "
+            "error = CASE WHEN attempts >= ? THEN 'Lease vencido demasiadas veces' "
+            "ELSE error END, "
+            "lease_id = NULL, lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE queue = ? AND status = 'leased' AND lease_expires < ?",
+            (self.max_attempts, self.max_attempts, now, self.name, now)
+        )
+
+    def lease(self, owner: str, limit: int = 1,
+              visibility_timeout: Optional[float] = None) -> List[Lease]:
+        if limit < 1:
+            return []
+        now = time.time()
+        expires = now + (visibility_timeout or self.visibility_timeout)
+        with self._transaction() as conn:
+            self._requeue_expired(conn, now)
+            rows = conn.execute(
+                "UPDATE task_queue SET status = 'leased', "
+                "lease_id = lower(hex(randomblob(16))), lease_owner = ?, "
+                "lease_expires = ?, attempts = attempts + 1, updated_at = ? "
+                "WHERE id IN ("
+                "  SELECT id FROM task_queue "
+                "  WHERE queue = ? AND status = 'pending' AND available_at <= ? "
+                "  ORDER BY priority, id LIMIT ?"
+                ") RETURNING id, priority, lease_id, payload, attempts",
+                (owner, expires, now, self.name, now, limit)
+            ).fetchall()
+        # RETURNING no garantiza orden: se reordena por prioridad y llegada
+        rows.sort(key=lambda row: (row[1], row[0]))
+        return [
+            Lease(id=lease_id, task=json.loads(payload), attempts=attempts,
+                  expires_at=expires)
+            for _, _, lease_id, payload, attempts in rows
+        ]
+
+    def _finish(self, lease_id: str, status: str, error: Optional[str] = None,
+                delay: float = 0.0, refund_attempt: bool = False) -> bool:
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE task_queue SET status = ?, error = ?, available_at = ?, "
+                "attempts = attempts - ?, "
+                "lease_id = NULL, lease_owner = NULL, lease_expires = NULL, "
+                "updated_at = ? "
+                "WHERE lease_id = ? AND status = 'leased' AND lease_expires >= ?",
+                (status, error, now + delay, int(refund_attempt), now, lease_id, now)
+            )
+            return cursor.rowcount == 1
+
+    def ack(self, lease_id: str) -> bool:
+        return self._finish(lease_id, 'done')
+
+    def fail(self, lease_id: str, error: str) -> bool:
+        return self._finish(lease_id, 'failed', error=error)
+
+    def release(self, lease_id: str, delay: float = 0.0) -> bool:
+        # Devolverla no cuenta como intento fallido
+        return self._finish(lease_id, 'pending', delay=delay, refund_attempt=True)
+
+    def extend(self, lease_ids: Iterable[str],
+               visibility_timeout: Optional[float] = None) -> int:
+        lease_ids = list(lease_ids)
+        if not lease_ids:
+            return 0
+        now = time.time()
+        expires = now + (visibility_timeout or self.visibility_timeout)
+        with self._transaction() as conn:
+            cursor = conn.executemany(
+                "UPDATE task_queue SET lease_expires = ?, updated_at = ? "
+                "WHERE lease_id = ? AND status = 'leased' AND lease_expires >= ?",
+                [(expires, now, lease_id, now) for lease_id in lease_ids]
+            )
+            return cursor.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        conn = self._conn()
+        now = time.time()
+        counts = dict.fromkeys(STATUSES, 0)
+        for status, expired, total in conn.execute(
+            "SELECT status, status = 'leased' AND lease_expires < ?, count(*) "
+            "FROM task_queue WHERE queue = ? GROUP BY 1, 2", (now, self.name)
+        ):
+            # Un lease vencido se cuenta como pendiente (se re-encolará)
+            counts['pending' if expired else status] += total
+        return counts
+
+    def clear(self) -> None:
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM task_queue WHERE queue = ?", (self.name,))
+
+    def close(self) -> None:
+        """Cierra la conexión del hilo actual"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
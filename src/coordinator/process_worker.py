@@ -0,0 +1,106 @@
+"""
+Descripción:
+    Código que corre dentro de los procesos worker del modo
+    executor='process' de ScrapingCoordinator.
+
+    - Cada proceso descarga (con sus propios navegadores) y parsea las
+    tareas que recibe: el parseo con BeautifulSoup ya no compite por el
+    GIL del coordinador.
+    - El worker no ve la caché, el circuit breaker ni la deduplicación:
+    viven solo en el proceso padre, que es la única fuente de verdad.
+    Para la deduplicación recibe un AttemptDeduplicator con las claves ya
+    vistas de la tienda de la tarea, así descarta duplicados antes de
+    cortar en num_productos; el padre vuelve a filtrar y registra las
+    claves si la tarea termina bien.
+    - El resultado viaja al padre como un diccionario pequeño (productos
+    y métricas del proceso) por el canal del ProcessPoolExecutor.
+    - El plazo de la tarea también se aplica aquí: al vencer se cancela
+    el extractor y se cierra su Chrome dentro del mismo proceso.
+    - Si el padre cancela el intento (su plazo, cleanup) marca la bandera
+    compartida del intento (`cancel_slot`); un hilo vigía la consulta y
+    cancela el extractor sin esperar al plazo del worker.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from src.components.dynamic.ecommerce_extractor import EcommerceExtractor
+from src.utils.cancellation import CancelToken, DeadlineExceeded, run_with_deadline
+
+# Extractores por subtipo (mismo criterio que select_extractor)
+EXTRACTORS = {
+    'e-commerce': EcommerceExtractor,
+}
+
+
+# Banderas de cancelación compartidas con el padre (una por intento)
+_cancel_flags = None
+
+# Cada cuánto el vigía consulta la bandera del intento
+CANCEL_POLL_INTERVAL = 0.1
+
+
+def init_worker(log_level: str = 'WARNING', cancel_flags=None) -> None:
+    """
+    Inicializador del proceso: logging propio (los handlers no se 
+    heredan) y las banderas de cancelación del padre.
+    """
+    global _cancel_flags
+    _cancel_flags = cancel_flags
+    logging.basicConfig(
+        level=getattr(logging, log_level.upper(), logging.WARNING),
+        format=f'%(asctime)s - worker {os.getpid()} - %(levelname)s - %(message)s'
+    )
+
+
+def _watch_cancel_flag(slot: int, token: CancelToken, done: threading.Event) -> None:
+    """Cancela `token` cuando el padre marca la bandera `slot`"""
+    while not done.wait(CANCEL_POLL_INTERVAL):
+        if _cancel_flags[slot]:
+            token.cancel("Cancelada por el coordinador")
+            return
+
+
+def scrape_task(task: Dict, params: Dict[str, Any], timeout: float,
+                grace_period: float, cancel_slot: Optional[int] = None) -> Dict:
+    """
+    Ejecuta el extractor de `task` con `params` en este proceso.
+    `cancel_slot` es la bandera con la que el padre puede cancelarlo.
+
+    Returns:
+        {'data', 'timed_out', 'pid', 'cpu_time', 'duration', 'discarded'}
+    """
+    extractor_cls = EXTRACTORS.get(task.get('subtype'))
+    if extractor_cls is None:
+        raise ValueError(f"Subtipo no implementado: {task.get('subtype')}")
+
+    start = time.perf_counter()
+    cpu_start = time.process_time()
+    token = CancelToken()
+    timed_out = False
+    data = None
+    done = threading.Event()
+    if cancel_slot is not None and _cancel_flags is not None:
+        threading.Thread(target=_watch_cancel_flag, args=(cancel_slot, token, done),
+                         name='cancel-watch', daemon=True).start()
+    try:
+        data = run_with_deadline(
+            lambda: extractor_cls(task['url'], cancel_token=token, **params).scrape(),
+            timeout, cancel_token=token, grace_period=grace_period
+        )
+    except DeadlineExceeded:
+        timed_out = True
+    finally:
+        done.set()
+    return {
+        'data': data,
+        'timed_out': timed_out,
+        'pid': os.getpid(),
+        'cpu_time': time.process_time() - cpu_start,
+        'duration': time.perf_counter() - start,
+        # Duplicados que descartó el filtro del intento
+        'discarded': getattr(params.get('product_filter'), 'duplicates', 0),
+    }
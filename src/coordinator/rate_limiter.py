@@ -0,0 +1,155 @@
+"""
+Descripción:
+    Rate limiting por dominio con token buckets.
+
+    - Cada tienda (o dominio desconocido) tiene su propio bucket con
+    tasa (requests/s) y ráfaga configurables.
+    - acquire() reserva el turno bajo el lock del bucket y duerme fuera
+    de él: los workers de otros dominios no esperan y ningún lock
+    global queda tomado durante la espera.
+    - Las reservas son FIFO: el saldo de tokens puede quedar negativo y
+    cada llamada espera lo que le corresponde según su posición.
+    - Métricas por dominio: requests, espera total, media y máxima.
+    - acquire_async() usa el mismo bucket con asyncio.sleep, para el
+    coordinador asyncio.
+"""
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Union
+
+from src.utils.helpers import domain_key
+
+
+@dataclass
+class RateLimit:
+    """Tasa sostenida (requests por segundo) y ráfaga máxima"""
+    rate: float
+    burst: int = 1
+
+    def __post_init__(self):
+        if self.rate < 0:
+            raise ValueError("La tasa debe ser mayor o igual a 0")
+        if self.burst < 1:
+            raise ValueError("La ráfaga debe ser al menos 1")
+
+
+class TokenBucket:
+    """
+    Token bucket thread-safe. rate=0 desactiva el límite.
+    """
+
+    def __init__(self, limit: RateLimit, clock: Callable[[], float] = time.monotonic):
+        self.limit = limit
+        self._clock = clock
+        self._tokens = float(limit.burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """
+        Reserva un token y retorna cuántos segundos hay que esperar para
+        usarlo (0 si había tokens disponibles). No duerme.
+        """
+        if self.limit.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                float(self.limit.burst),
+                self._tokens + (now - self._updated) * self.limit.rate
+            )
+            self._updated = now
+            self._tokens -= 1.0
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.limit.rate
+
+
+@dataclass
+class DomainStats:
+    requests: int = 0
+    waited: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+
+class DomainRateLimiter:
+    """
+    Limitador por dominio. Las claves son las tiendas conocidas
+    (mercadolibre, alkosto) o el netloc para el resto.
+    """
+
+    def __init__(self, default: Union[RateLimit, Dict, None] = None,
+                 limits: Optional[Dict[str, Union[RateLimit, Dict]]] = None,
+                 sleep: Callable[[float], None] = time.sleep):
+        self.default = self._as_limit(default) if default is not None else RateLimit(rate=0)
+        self.limits = {key: self._as_limit(value) for key, value in (limits or {}).items()}
+        self._sleep = sleep
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._stats: Dict[str, DomainStats] = {}
+        # Solo protege la creación de buckets y las métricas (nunca se duerme con él)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _as_limit(value: Union[RateLimit, Dict]) -> RateLimit:
+        return value if isinstance(value, RateLimit) else RateLimit(**value)
+
+    def _bucket(self, key: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = TokenBucket(self.limits.get(key, self.default))
+                self._buckets[key] = bucket
+                self._stats[key] = DomainStats()
+            return bucket
+
+    def acquire(self, url: str) -> float:
+        """
+        Espera el turno del dominio de `url`.
+
+        Returns:
+            Segundos esperados
+        """
+        key = domain_key(url)
+        wait = self._bucket(key).reserve()
+        if wait > 0:
+            self._sleep(wait)
+        self._record(key, wait)
+        return wait
+
+    async def acquire_async(self, url: str) -> float:
+        """Como acquire() pero cede el event loop mientras espera"""
+        key = domain_key(url)
+        wait = self._bucket(key).reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        self._record(key, wait)
+        return wait
+
+    def _record(self, key: str, wait: float) -> None:
+        with self._lock:
+            stats = self._stats[key]
+            stats.requests += 1
+            if wait > 0:
+                stats.waited += 1
+                stats.total_wait += wait
+                stats.max_wait = max(stats.max_wait, wait)
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Métricas de espera por dominio"""
+        with self._lock:
+            return {
+                key: {
+                    'rate': self._buckets[key].limit.rate,
+                    'burst': self._buckets[key].limit.burst,
+                    'requests': s.requests,
+                    'waited_requests': s.waited,
+                    'total_wait': round(s.total_wait, 3),
+                    'avg_wait': round(s.total_wait / s.requests, 3) if s.requests else 0.0,
+                    'max_wait': round(s.max_wait, 3),
+                }
+                for key, s in self._stats.items()
+            }
@@ -0,0 +1,148 @@
+"""
+Descripción:
+    Planificador de tareas por dominio entre TaskPriorityQueue y los
+    workers del coordinador.
+
+    - Una subcola (MinHeap por prioridad y orden de llegada) por tienda
+    o dominio.
+    - Límite de tareas en curso por dominio: un dominio con muchas
+    tareas no acapara los workers ni satura a la tienda.
+    - Entre los dominios con cupo se respeta primero la prioridad de la
+    tarea en cabeza (menor número = más prioritaria); entre empates se
+    rota en round-robin o en round-robin ponderado (smooth weighted
+    round-robin, como nginx).
+"""
+
+import itertools
+import threading
+import time
+from typing import Dict, List, Optional
+
+from src.utils.heap_cq import MinHeap
+from src.utils.helpers import domain_key
+
+POLICIES = ('round_robin', 'weighted')
+
+
+class DomainScheduler:
+    """
+    Planificador con subcolas por dominio y concurrencia máxima por
+    dominio. Thread-safe.
+    """
+
+    def __init__(self, max_concurrency: Optional[Dict[str, int]] = None,
+                 default_concurrency: int = 2,
+                 policy: str = 'round_robin',
+                 weights: Optional[Dict[str, float]] = None):
+        if policy not in POLICIES:
+            raise ValueError(f"Política de planificación no válida: {policy}")
+        if default_concurrency < 1:
+            raise ValueError("La concurrencia por dominio debe ser al menos 1")
+        self.max_concurrency = dict(max_concurrency or {})
+        self.default_concurrency = default_concurrency
+        self.policy = policy
+        self.weights = dict(weights or {})
+
+        self._queues: Dict[str, MinHeap] = {}
+        self._active: Dict[str, int] = {}
+        # Orden de rotación (round-robin) y pesos efectivos (ponderado)
+        self._order: List[str] = []
+        self._last_index = -1
+        self._current_weight: Dict[str, float] = {}
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict] = {}
+
+    def _cap(self, domain: str) -> int:
+        return max(1, self.max_concurrency.get(domain, self.default_concurrency))
+
+    def push(self, task: Dict) -> None:
+        """Encola una tarea en la subcola de su dominio"""
+        domain = domain_key(task.get('url', ''))
+        with self._lock:
+            if domain not in self._queues:
+                self._queues[domain] = MinHeap()
+                self._active[domain] = 0
+                self._order.append(domain)
+                self._current_weight[domain] = 0.0
+                self._stats[domain] = {
+                    'dispatched': 0, 'max_active': 0, 'total_queue_wait': 0.0
+                }
+            self._queues[domain].push(
+                (task.get('priority', 0), next(self._seq), time.monotonic(), task)
+            )
+
+    def push_many(self, tasks: List[Dict]) -> None:
+        for task in tasks:
+            self.push(task)
+
+    def next_task(self) -> Optional[Dict]:
+        """
+        Retorna la siguiente tarea despachable (None si todos los
+        dominios con tareas pendientes están en su límite).
+        """
+        with self._lock:
+            eligible = [
+                d for d in self._order
+                if self._queues[d] and self._active[d] < self._cap(d)
+            ]
+            if not eligible:
+                return None
+            best = min(self._queues[d].peek()[0] for d in eligible)
+            candidates = [d for d in eligible if self._queues[d].peek()[0] == best]
+            domain = self._choose(candidates)
+
+            _, _, queued_at, task = self._queues[domain].pop()
+            self._active[domain] += 1
+            stats = self._stats[domain]
+            stats['dispatched'] += 1
+            stats['max_active'] = max(stats['max_active'], self._active[domain])
+            stats['total_queue_wait'] += time.monotonic() - queued_at
+            return task
+
+    def _choose(self, candidates: List[str]) -> str:
+        if self.policy == 'round_robin':
+            # Primer candidato después del último dominio servido
+            n = len(self._order)
+            positions = {d: self._order.index(d) for d in candidates}
+            domain = min(candidates, key=lambda d: (positions[d] - self._last_index - 1) % n)
+        else:
+            total = 0.0
+            for d in candidates:
+                weight = self.weights.get(d, 1.0)
+                self._current_weight[d] += weight
+                total += weight
+            domain = max(candidates, key=lambda d: self._current_weight[d])
+            self._current_weight[domain] -= total
+        self._last_index = self._order.index(domain)
+        return domain
+
+    def task_done(self, task: Dict) -> None:
+        """Libera el cupo del dominio de una tarea terminada"""
+        domain = domain_key(task.get('url', ''))
+        with self._lock:
+            if self._active.get(domain, 0) > 0:
+                self._active[domain] -= 1
+
+    def pending(self) -> int:
+        with self._lock:
+            return sum(len(q) for q in self._queues.values())
+
+    def active(self) -> int:
+        with self._lock:
+            return sum(self._active.values())
+
+    def get_stats(self) -> Dict[str, Dict]:
+        """Métricas por dominio: despachadas, pico de concurrencia y espera en cola"""
+        with self._lock:
+            return {
+                d: {
+                    'max_concurrency': self._cap(d),
+                    'dispatched': s['dispatched'],
+                    'max_active': s['max_active'],
+                    'pending': len(self._queues[d]),
+                    'avg_queue_wait': round(s['total_queue_wait'] / s['dispatched'], 3)
+                    if s['dispatched'] else 0.0,
+                }
+                for d, s in self._stats.items()
+            }
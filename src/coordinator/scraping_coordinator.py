@@ -8,20 +8,44 @@ Descripción:
     - Incluye reintentos automáticos, rate limiting, caché y más
 """
 
-import logging, time, json, csv, hashlib, concurrent.futures, pickle, os
+import logging, time, json, csv, hashlib, concurrent.futures, pickle, os, uuid, socket
+import multiprocessing
+import textwrap
 from pathlib import Path
 from src.utils.heap_cq import MinHeap
 from dataclasses import dataclass, field
 from io import StringIO
-from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
+from concurrent.futures import (
+    ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED, TimeoutError
+)
 from threading import Lock
-from typing import List, Dict, Optional, Callable, Any
+from typing import List, Dict, Optional, Callable, Any, Iterator
 from urllib.robotparser import RobotFileParser
 from urllib.parse import urlparse
 from collections import OrderedDict
+from functools import partial
 
 from src.utils.logger import get_logger
-from src.utils.helpers import validate_url, calculate_stats
+from src.utils.helpers import validate_url, RunStats, canonical_product_key, domain_key
+from src.utils.bloom_filter import BloomFilter
+from src.utils.cancellation import (
+    CancelToken, TaskCancelledError, DeadlineExceeded, run_with_deadline
+)
+from src.components.ndjson_writer import NDJSONSessionWriter
+from src.components.data_handler import session_output_dir
+from src.components.storage_writer import StorageWriter
+from src.components.parquet_exporter import (
+    ProductParquetWriter, ParquetTableWriter, task_schema, task_row
+)
+from src.coordinator.rate_limiter import DomainRateLimiter, RateLimit
+from src.coordinator.scheduler import DomainScheduler, POLICIES
+from src.coordinator.process_worker import scrape_task, init_worker
+from src.coordinator.durable_queue import TaskQueueBackend
+from src.coordinator.checkpoint import RunCheckpoint, DEFAULT_CHECKPOINT_DIR
+from src.coordinator.cache_store import (
+    SQLiteCache, CacheEntry, EVICTION_POLICIES, DEFAULT_MAX_BYTES, entry_priority
+)
+from src.config import RATE_LIMITS_DOMINIO, CONCURRENCIA_DOMINIO, CACHE_TTL_TIENDA
 
 # Extractores necesarios
 from src.components.dynamic.ecommerce_extractor import EcommerceExtractor
@@ -53,13 +77,28 @@ class QueueFullError(Exception):
 
 class LRUCache:
     """
-    Implementación de caché LRU (Least Recently Used) thread-safe con persistencia en disco.
-    Limita el tamaño máximo y elimina elementos menos usados.
+    Implementación de caché thread-safe con persistencia en disco.
+    Limita los bytes serializados (y opcionalmente el número de entradas) 
+    y expulsa por GreedyDual-Size o LRU, igual que SQLiteCache.
+    Backend 'pickle': reescribe el archivo completo en cada set; para 
+    escrituras por entrada y acceso multiproceso usar SQLiteCache.
     """
     
-    def __init__(self, max_size: int = 1000, cache_dir: str = 'cache'):
+    def __init__(self, max_size: Optional[int] = None, cache_dir: str = 'cache',
+                 max_bytes: int = DEFAULT_MAX_BYTES, eviction: str = 'gds'):
+        if max_bytes < 1:
+            raise ValueError("max_bytes debe ser al menos 1")
+        if eviction not in EVICTION_POLICIES:
+            raise ValueError(f"eviction no válida: {eviction}")
         self.cache = OrderedDict()
         self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.eviction = eviction
+        self.evictions = 0
+        # Prioridad GreedyDual-Size por clave, inflación L y bytes totales
+        self._priority: Dict[str, float] = {}
+        self._inflation = 0.0
+        self._bytes = 0
         self._lock = Lock()
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(parents=True, exist_ok=True)
@@ -72,6 +111,16 @@ class LRUCache:
             try:
                 with open(self.cache_file, 'rb') as f:
                     self.cache = pickle.load(f)
+                # Archivos anteriores a la vigencia por entrada: sin vencimiento. 
+                # Las prioridades no se guardan; se recalculan con L = 0
+                for key, value in self.cache.items():
+                    if not isinstance(value, CacheEntry):
+                        value = self.cache[key] = CacheEntry(value, time.time())
+                    if not value.size:
+                        value.size = len(pickle.dumps(value.value, pickle.HIGHEST_PROTOCOL))
+                    self._bytes += value.size
+                    self._priority[key] = entry_priority(0.0, value.cost, value.size)
+                self._evict()
                 logging.getLogger('LRUCache').info(
                     f"Caché cargado desde disco: {len(self.cache)} entradas"
                 )
@@ -80,6 +129,8 @@ class LRUCache:
                     f"Error cargando caché desde disco: {e}. Iniciando caché vacío."
                 )
                 self.cache = OrderedDict()
+                self._priority.clear()
+                self._bytes = 0
     
     def _save_to_disk(self) -> None:
         """Guarda el caché a disco"""
@@ -92,30 +143,69 @@ class LRUCache:
             )
     
     def get(self, key: str) -> Optional[Any]:
-        """Obtiene un valor del caché"""
+        """Obtiene un valor vigente del caché"""
+        entry = self.get_entry(key)
+        return entry.value if entry is not None else None
+    
+    def get_entry(self, key: str, max_stale: float = 0.0) -> Optional[CacheEntry]:
+        """Obtiene la entrada si está vigente o vencida hace menos de max_stale"""
         with self._lock:
-            if key in self.cache:
-                # Mover al final
+            entry = self.cache.get(key)
+            if entry is not None and entry.is_usable(max_stale):
+                # Mover al final y renovar su prioridad
                 self.cache.move_to_end(key)
-                return self.cache[key]
+                self._priority[key] = entry_priority(self._inflation, entry.cost, entry.size)
+                return entry
             return None
     
-    def set(self, key: str, value: Any) -> None:
-        """Guarda un valor en el caché (memoria y disco)"""
+    def set(self, key: str, value: Any, ttl: Optional[float] = None,
+            cost: float = 1.0) -> None:
+        """
+        Guarda un valor en el caché (memoria y disco), vigente por ttl 
+        segundos y con costo `cost` de volver a obtenerlo
+        """
+        size = len(pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+        if size > self.max_bytes:
+            logging.getLogger('LRUCache').debug(
+                f"Entrada de {size} bytes excede max_bytes, no se guarda: {key}"
+            )
+            return
         with self._lock:
-            if key in self.cache:
-                self.cache.move_to_end(key)
-            self.cache[key] = value
-            # Si excede el tamaño, eliminar el menos usado
-            if len(self.cache) > self.max_size:
-                self.cache.popitem(last=False)
+            old = self.cache.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self.cache[key] = CacheEntry.create(value, ttl, size, cost)
+            self._priority[key] = entry_priority(self._inflation, cost, size)
+            self._bytes += size
+            self._evict()
             # Guardar a disco después de cada cambio
             self._save_to_disk()
     
+    def _evict(self) -> None:
+        """
+        Expulsa entradas (menor prioridad con 'gds', la menos usada 
+        recientemente con 'lru') hasta caber en max_bytes y max_size
+        """
+        while self.cache and (
+            self._bytes > self.max_bytes
+            or (self.max_size and len(self.cache) > self.max_size)
+        ):
+            if self.eviction == 'gds':
+                key = min(self._priority, key=self._priority.get)
+                self._inflation = max(self._inflation, self._priority[key])
+            else:
+                key = next(iter(self.cache))
+            self._bytes -= self.cache.pop(key).size
+            del self._priority[key]
+            self.evictions += 1
+    
     def clear(self) -> None:
         """Limpia el caché (memoria y disco)"""
         with self._lock:
             self.cache.clear()
+            self._priority.clear()
+            self._inflation = 0.0
+            self._bytes = 0
             self._save_to_disk()
     
     def size(self) -> int:
@@ -133,12 +223,168 @@ class LRUCache:
             return {
                 'entries': len(self.cache),
                 'max_size': self.max_size,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'eviction': self.eviction,
+                'evictions': self.evictions,
                 'disk_size_mb': round(total_size / (1024 * 1024), 2),
+                'payload_size_mb': round(self._bytes / (1024 * 1024), 2),
                 'cache_file': str(self.cache_file),
                 'oldest_entry': list(self.cache.keys())[0] if self.cache else None,
                 'newest_entry': list(self.cache.keys())[-1] if self.cache else None
             }
 
+class ProductDeduplicator:
+    """
+    Deduplicador de productos a nivel de ejecución (thread-safe).
+
+    Usa como clave la URL canónica del producto (ID de publicación o 
+    URL sin parámetros de tracking). Por defecto guarda las claves en un 
+    set exacto; para ejecuciones muy grandes se puede usar un filtro de 
+    Bloom con memoria acotada a cambio de una tasa pequeña de falsos 
+    positivos (productos únicos descartados como duplicados).
+    """
+
+    def __init__(self, bloom_capacity: Optional[int] = None, error_rate: float = 0.001):
+        self._lock = Lock()
+        self._bloom = BloomFilter(bloom_capacity, error_rate) if bloom_capacity else None
+        self._seen = set()
+        self.total_seen = 0
+        self.duplicates = 0
+
+    @staticmethod
+    def product_key(product: Dict, source_url: Optional[str] = None) -> Optional[str]:
+        """
+        Clave canónica del producto. Si el extractor no encontró enlace 
+        propio (usa la URL del listado) se recurre a título + precio.
+        """
+        url = product.get('url')
+        if url and url != source_url:
+            return canonical_product_key(url)
+        title = (product.get('title') or '').strip().lower()
+        if not title:
+            return None
+        return f"title:{title}|{product.get('price_sell', '')}"
+
+    def is_new(self, product: Dict, source_url: Optional[str] = None) -> bool:
+        """Registra el producto y retorna False si ya se había visto"""
+        key = self.product_key(product, source_url)
+        with self._lock:
+            self.total_seen += 1
+            if key is None:
+                return True
+            if self._bloom is not None:
+                is_new = self._bloom.add(key)
+            else:
+                is_new = key not in self._seen
+                if is_new:
+                    self._seen.add(key)
+            if not is_new:
+                self.duplicates += 1
+            return is_new
+
+    def filter_new(self, products: List[Dict], source_url: Optional[str] = None) -> List[Dict]:
+        """Retorna solo los productos no vistos antes en la ejecución"""
+        return [p for p in products if self.is_new(p, source_url)]
+
+    def __contains__(self, key: str) -> bool:
+        """Si la clave ya se registró (sin registrarla)"""
+        with self._lock:
+            return key in self._bloom if self._bloom is not None else key in self._seen
+
+    def record_duplicates(self, count: int) -> None:
+        """Suma a las estadísticas duplicados descartados fuera de is_new"""
+        with self._lock:
+            self.total_seen += count
+            self.duplicates += count
+
+    def attempt(self, source_url: Optional[str] = None) -> 'AttemptDeduplicator':
+        """Filtro para un intento de scraping de la tarea `source_url`"""
+        return AttemptDeduplicator(self, source_url, run=self)
+
+    def restore(self, keys: List[str]) -> None:
+        """Registra claves ya emitidas (p.ej. al reanudar un checkpoint)"""
+        with self._lock:
+            for key in keys:
+                if self._bloom is not None:
+                    self._bloom.add(key)
+                else:
+                    self._seen.add(key)
+
+    def keys_for(self, url: str) -> frozenset:
+        """
+        Claves ya vistas del dominio de `url`. Es lo único que se envía a 
+        un proceso worker (el padre vuelve a filtrar al terminar la 
+        tarea); con Bloom no se pueden enumerar y retorna un conjunto vacío.
+        """
+        parsed = urlparse(url or '')
+        prefixes = (f"{domain_key(url)}:", f"{parsed.scheme}://{parsed.netloc}")
+        with self._lock:
+            if self._bloom is not None:
+                return frozenset()
+            return frozenset(k for k in self._seen if k.startswith(prefixes))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estadísticas de deduplicación"""
+        with self._lock:
+            ratio = (self.duplicates / self.total_seen * 100) if self.total_seen else 0.0
+            return {
+                'backend': 'bloom' if self._bloom is not None else 'set',
+                'seen': self.total_seen,
+                'unique': self.total_seen - self.duplicates,
+                'duplicates': self.duplicates,
+                'dedup_ratio': f"{ratio:.1f}%",
+                'memory_bytes': (self._bloom.size_bytes if self._bloom is not None
+                                 else sum(len(k) for k in self._seen))
+            }
+
+    def clear(self) -> None:
+        """Olvida todas las claves registradas"""
+        with self._lock:
+            self._seen.clear()
+            if self._bloom is not None:
+                self._bloom.clear()
+            self.total_seen = 0
+            self.duplicates = 0
+
+
+class AttemptDeduplicator:
+    """
+    Filtro de productos de un intento de scraping. Descarta los que la 
+    ejecución ya confirmó (`known`) y los repetidos dentro del intento, 
+    pero no registra nada en la ejecución: las claves se registran al 
+    terminar bien la tarea (ProductDeduplicator.filter_new en 
+    _task_succeeded). Así un intento fallido no deja sus productos 
+    marcados como vistos y el reintento los vuelve a entregar.
+
+    Los descartes se suman a las estadísticas de `run`; sin él (filtro 
+    enviado a un proceso worker) quedan en `duplicates`.
+    """
+
+    def __init__(self, known, source_url: Optional[str] = None,
+                 run: Optional[ProductDeduplicator] = None):
+        self.known = known
+        self.source_url = source_url
+        self.run = run
+        self.duplicates = 0
+        self._seen = set()
+
+    def __call__(self, products: List[Dict]) -> List[Dict]:
+        """Retorna los productos de `products` que aún no se vieron"""
+        nuevos = []
+        for product in products:
+            key = ProductDeduplicator.product_key(product, self.source_url)
+            if key is not None:
+                if key in self._seen or key in self.known:
+                    self.duplicates += 1
+                    if self.run is not None:
+                        self.run.record_duplicates(1)
+                    continue
+                self._seen.add(key)
+            nuevos.append(product)
+        return nuevos
+
+
 @dataclass(order=True)
 class PriorityTask:
     """
@@ -234,30 +480,97 @@ class NetworkError(Exception):
     """Excepción para errores de red que merecen reintento"""
     pass
 
+EXECUTORS = ('thread', 'process')
+# Parámetros del constructor que no se guardan en self.options
+NON_PORTABLE_OPTIONS = (
+    'self', 'tasks', 'task_queue', 'resume_run_id',
+    'on_success', 'on_error', 'on_complete',
+)
+
+# Qué se retiene de cada resultado en self.results
+RETENTION_POLICIES = ('full', 'summary', 'none')
+# 'sqlite': SQLiteCache (upsert por entrada, multiproceso). 'pickle': LRUCache
+CACHE_BACKENDS = ('sqlite', 'pickle')
+
+
+def summarize_result(result: Dict) -> Dict:
+    """Resultado sin los productos: data=None y su cantidad en 'items'"""
+    if 'data' not in result:
+        return result
+    data = result['data']
+    items = len(data) if isinstance(data, list) else int(bool(data))
+    return {**result, 'data': None, 'items': items}
+
+
 class ScrapingCoordinator:
     """
     Clase para la gestión de subtipos y validación de tareas.
     
     Características mejoradas:
     - Cola de prioridad con límite de tamaño
-    - Caché LRU para prevenir fugas de memoria
+    - Caché LRU persistente (SQLite, escritura por entrada y multiproceso)
+    con vigencia por tienda/tarea y stale-while-revalidate
     - Manejo de excepciones específico
     - Validación exhaustiva de URLs y parámetros
     - Métricas de memoria
     - Circuit breaker para URLs problemáticas
+    - Deduplicación de productos por URL canónica
+    - Sink de almacenamiento único por ejecución (una ScrapingSession)
+    - Rate limiting por dominio (token bucket) sin lock global
+    - Planificador por dominio con concurrencia máxima por tienda
+    - Timeout real por intento: cancelación cooperativa y cierre forzado 
+    del navegador al vencer el plazo
+    - Modo multiproceso (executor='process'): descarga y parseo en 
+    procesos worker; caché, circuit breaker y deduplicación en el padre
+    - Cola compartida opcional (TaskQueueBackend, p.ej. SQLiteTaskQueue) 
+    con lease/ack para que varios coordinadores cooperen
+    - Checkpoints periódicos de la ejecución y reanudación (resume_run_id)
+    - Resultados en streaming (iter_results) con retención configurable y 
+    estadísticas incrementales
     - Liberación apropiada de recursos
     """
     
+    # Función ejecutada en los procesos worker (debe ser importable)
+    process_target = staticmethod(scrape_task)
+
     def __init__(self, 
                 tasks: List[Dict], 
                 max_workers: int = 5,
+                executor: str = 'thread',
                 delay_between_requests: float = 1.0,
+                rate_limits: Optional[Dict[str, Dict]] = None,
+                domain_concurrency: Optional[Dict[str, int]] = None,
+                default_domain_concurrency: int = 2,
+                scheduling_policy: str = 'round_robin',
+                domain_weights: Optional[Dict[str, float]] = None,
                 max_retries: int = 3,
                 default_timeout: int = 30,
+                cancel_grace_period: float = 5.0,
                 respect_robots_txt: bool = True,
                 enable_cache: bool = True,
-                cache_size: int = 1000,
+                cache_size: Optional[int] = None,
+                cache_max_bytes: int = DEFAULT_MAX_BYTES,
+                cache_eviction: str = 'gds',
+                cache_backend: str = 'sqlite',
+                cache_ttl: Optional[float] = None,
+                cache_ttls: Optional[Dict[str, float]] = None,
+                stale_while_revalidate: float = 0.0,
                 max_queue_size: int = 10000,
+                task_queue: Optional[TaskQueueBackend] = None,
+                lease_timeout: Optional[float] = None,
+                queue_poll_interval: float = 1.0,
+                checkpoint_interval: Optional[float] = None,
+                checkpoint_dir: str = DEFAULT_CHECKPOINT_DIR,
+                resume_run_id: Optional[str] = None,
+                deduplicate: bool = True,
+                dedup_bloom_capacity: Optional[int] = None,
+                json_output: str = 'files',
+                json_compression: Optional[str] = None,
+                write_behind: bool = True,
+                storage_batch_size: int = 500,
+                storage_flush_interval: float = 2.0,
+                parquet_output: bool = False,
+                result_retention: str = 'full',
                 show_progress: bool = True,
                 log_level: str = 'INFO',
                 on_success: Optional[Callable[[Dict], None]] = None,
@@ -266,24 +579,133 @@ class ScrapingCoordinator:
         """
         Inicializa el coordinador de scraping.
         """
+        # Configuración portable (sin tareas, cola ni callbacks): se guarda 
+        # en el checkpoint para reanudar con las mismas opciones y la 
+        # heredan los coordinadores de reintento
+        options = dict(locals())
+        self.options = {
+            name: value for name, value in options.items()
+            if name not in NON_PORTABLE_OPTIONS
+        }
 
         self.DYNAMIC_SUBTYPES = ['e-commerce', 'real_state']
         
         self.validate_tasks(tasks)
         
-        self.task_queue = TaskPriorityQueue(max_size=max_queue_size)
-        self.task_queue.push_many(tasks)
+        # Cola compartida: las tareas se toman en préstamo (lease) a medida 
+        # que hay cupo y se confirman al terminar; si el nodo muere, sus 
+        # leases vencen y otro coordinador las procesa. Un nodo de cola 
+        # compartida no siembra tareas: si cada nodo encolara las suyas, 
+        # todos repetirían el mismo trabajo
+        self.shared_queue = task_queue is not None
+        if self.shared_queue and tasks:
+            raise ValueError(
+                "Con cola compartida las tareas se encolan una sola vez con "
+                "task_queue.push_many(); los nodos se crean con tasks=[]"
+            )
+        self.task_queue = (
+            task_queue if self.shared_queue else TaskPriorityQueue(max_size=max_queue_size)
+        )
+        if tasks:
+            self.task_queue.push_many(tasks)
+        self.node_id = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:6]}"
+        self.lease_timeout = lease_timeout or getattr(task_queue, 'visibility_timeout', 300.0)
+        self.queue_poll_interval = queue_poll_interval
+        # id(tarea) -> lease de la cola compartida
+        self._leases: Dict[int, str] = {}
+        
+        # Checkpoints: tareas pendientes, en curso y completadas (con sus 
+        # resultados) se guardan cada `checkpoint_interval` segundos en 
+        # checkpoint_dir/<run_id>. Con resume_run_id se retoma esa ejecución
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoint_dir = checkpoint_dir
+        self.resume_run_id = resume_run_id
+        self.checkpointing = checkpoint_interval is not None or resume_run_id is not None
+        if self.checkpointing and self.shared_queue:
+            raise ValueError(
+                "Los checkpoints no aplican con cola compartida "
+                "(la cola ya es durable)"
+            )
+        if resume_run_id is not None and not RunCheckpoint.exists(resume_run_id, checkpoint_dir):
+            raise ValueError(f"No existe el checkpoint '{resume_run_id}' en {checkpoint_dir}")
+        # ID estable de la ejecución (se conserva al reanudar)
+        self.run_id: Optional[str] = resume_run_id
+        self._checkpoint: Optional[RunCheckpoint] = None
         
         self._total_tasks = len(tasks)
         
         self.max_workers = max_workers
+        # 'thread': extractores en hilos del proceso actual. 'process': 
+        # cada intento corre en uno de `max_workers` procesos worker (con 
+        # sus propios navegadores) y solo los productos vuelven al padre
+        if executor not in EXECUTORS:
+            raise ValueError(f"executor no válido: {executor}")
+        self.executor = executor
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        self._worker_stats: Dict[int, Dict[str, float]] = {}
+        # Banderas compartidas con los workers para cancelar sus intentos
+        self._cancel_flags = None
+        self._free_cancel_slots: List[int] = []
+        self._cancel_slot_owner: Dict[int, concurrent.futures.Future] = {}
         self.delay = delay_between_requests
+        
+        # Token bucket por tienda/dominio: la espera de un dominio no 
+        # bloquea a los demás ni al lock del coordinador. Los dominios 
+        # sin límite propio usan 1 request cada `delay` segundos.
+        self.rate_limits = RATE_LIMITS_DOMINIO if rate_limits is None else rate_limits
+        self._rate_limiter = DomainRateLimiter(
+            default=RateLimit(rate=1.0 / self.delay if self.delay > 0 else 0),
+            limits=self.rate_limits,
+        )
+        
+        # Planificador entre la cola de prioridad y los workers: subcolas 
+        # por dominio, tope de tareas simultáneas por tienda y rotación 
+        # round-robin (o ponderada) entre dominios de igual prioridad
+        self.domain_concurrency = (
+            CONCURRENCIA_DOMINIO if domain_concurrency is None else domain_concurrency
+        )
+        self.default_domain_concurrency = default_domain_concurrency
+        if scheduling_policy not in POLICIES:
+            raise ValueError(f"scheduling_policy no válida: {scheduling_policy}")
+        self.scheduling_policy = scheduling_policy
+        self.domain_weights = domain_weights
+        self._scheduler: Optional[DomainScheduler] = None
         self.max_retries = max_retries
         self.default_timeout = default_timeout
+        # Segundos que se espera al hilo del extractor tras cancelarlo; 
+        # timeout + cancel_grace_period acota el tiempo real de un intento
+        self.cancel_grace_period = cancel_grace_period
+        # Tokens de los intentos en curso (cleanup() los cancela)
+        self._active_tokens: set = set()
         self.respect_robots_txt = respect_robots_txt
         self.enable_cache = enable_cache
         self.show_progress = show_progress and TQDM_AVAILABLE
         
+        # Salida JSON: un archivo por producto ('files') o un NDJSON por 
+        # ejecución ('ndjson') compartido por todas las tareas
+        if json_output not in ('files', 'ndjson'):
+            raise ValueError(f"json_output no válido: {json_output}")
+        self.json_output = json_output
+        self.json_compression = json_compression
+        self._ndjson_writer: Optional[NDJSONSessionWriter] = None
+        self.ndjson_path: Optional[str] = None
+        self.run_session_id: Optional[str] = None
+        
+        # Sink único de la ejecución: los extractores solo retornan productos 
+        # y el coordinador los entrega al sink, que confirma por lotes (por 
+        # tamaño o por tiempo) en una sola ScrapingSession. Con write_behind 
+        # los lotes se confirman en un hilo escritor en segundo plano.
+        self.write_behind = write_behind
+        self.storage_batch_size = storage_batch_size
+        self.storage_flush_interval = storage_flush_interval
+        self._storage_writer: Optional[StorageWriter] = None
+        
+        # Exportación Parquet de productos en streaming (row groups 
+        # incrementales a medida que terminan las tareas)
+        self.parquet_output = parquet_output
+        self._parquet_writer: Optional[ProductParquetWriter] = None
+        self.parquet_path: Optional[str] = None
+        
         # Callbacks
         self.on_success = on_success
         self.on_error = on_error
@@ -295,10 +717,46 @@ class ScrapingCoordinator:
         self.logger = get_logger('ScrapingCoordinator')
         self.logger.setLevel(getattr(logging, log_level.upper(), logging.INFO))
         
+        # Retención de resultados: 'full' guarda cada resultado completo, 
+        # 'summary' lo guarda sin los productos (data=None, items=n) y 
+        # 'none' no guarda nada. Las estadísticas no dependen de self.results
+        if result_retention not in RETENTION_POLICIES:
+            raise ValueError(f"result_retention no válida: {result_retention}")
+        self.result_retention = result_retention
         self.results = []
-        self._cache = LRUCache(max_size=cache_size)
+        self._run_stats = RunStats()
+        self._measured_tasks = 0
+        self._last_run: Optional[Dict] = None
+        if cache_backend not in CACHE_BACKENDS:
+            raise ValueError(f"cache_backend no válido: {cache_backend}")
+        self.cache_backend = cache_backend
+        # Acotado en bytes serializados (cache_max_bytes); cache_size es un 
+        # tope opcional de entradas. cache_eviction: 'gds' (GreedyDual-Size, 
+        # costo = segundos que tomó el scraping) o 'lru'
+        cache_class = SQLiteCache if cache_backend == 'sqlite' else LRUCache
+        self._cache = cache_class(
+            max_size=cache_size, max_bytes=cache_max_bytes, eviction=cache_eviction
+        )
+        # Vigencia de los resultados en caché: 'cache_ttl' de la tarea, o 
+        # el de su tienda, o cache_ttl (None: no vencen). Dentro de los 
+        # `stale_while_revalidate` segundos posteriores al vencimiento un 
+        # resultado vencido se entrega de inmediato (marcado 'stale') y se 
+        # encola una tarea que lo actualiza en segundo plano
+        self.cache_ttl = cache_ttl
+        self.cache_ttls = CACHE_TTL_TIENDA if cache_ttls is None else cache_ttls
+        if stale_while_revalidate < 0:
+            raise ValueError("stale_while_revalidate no puede ser negativo")
+        self.stale_while_revalidate = stale_while_revalidate
+        # Claves de caché con una actualización encolada o en curso
+        self._revalidating: set = set()
         self._robots_cache: Dict[str, RobotFileParser] = {}
         
+        # Deduplicación de productos entre páginas y tareas de la ejecución
+        self._dedup = (
+            ProductDeduplicator(bloom_capacity=dedup_bloom_capacity)
+            if deduplicate else None
+        )
+        
         self._worker_pool: Optional[ThreadPoolExecutor] = None
         
         # Se hace circuit breaker para URLs problemáticas
@@ -313,39 +771,65 @@ class ScrapingCoordinator:
             'fastest_task': None,
             'slowest_task': None,
             'cache_hits': 0,
+            'cache_stale_hits': 0,
             'cache_misses': 0,
-            'memory_usage': 0.0
+            'cache_revalidations': 0,
+            'cache_revalidation_errors': 0,
+            'memory_usage': 0.0,
+            'timeouts': 0,
+            'abandoned_threads': 0
         }
 
-    def _run_with_timeout(self, func: Callable, timeout: float, *args, **kwargs):
+    def _run_with_timeout(self, func: Callable, timeout: float, *args,
+                          cancel_token: Optional[CancelToken] = None, **kwargs):
         """
-        Ejecuta func(*args, **kwargs) en un hilo separado y fuerza un Timeout
-        si excede `timeout` segundos. Lanza TimeoutError (concurrent.futures)
+        Ejecuta func(*args, **kwargs) en un hilo daemon y espera como 
+        máximo `timeout` segundos. Lanza TimeoutError (concurrent.futures) 
         si se excede el tiempo.
+
+        Con `cancel_token` el token se pasa a func y se cancela al vencer 
+        el plazo: el extractor se detiene en el siguiente punto de control 
+        y sus callbacks cierran el navegador. Se espera al hilo hasta 
+        `cancel_grace_period` segundos; si sigue vivo se abandona (daemon) 
+        en lugar de bloquear al worker.
         """
-        with ThreadPoolExecutor(max_workers=1) as exec_local:
-            future = exec_local.submit(func, *args, **kwargs)
-            try:
-                return future.result(timeout=timeout)
-            except concurrent.futures.TimeoutError:
-                # Intentar cancelar (no mata el hilo si está en C bloqueante)
-                try:
-                    future.cancel()
-                except Exception:
-                    pass
-                # Volver a lanzar el mismo tipo que capturas en process_task
-                raise TimeoutError(f"Timeout de {timeout}s excedido")
-
-    def add_task(self, task: Dict) -> None:
+        if cancel_token is not None:
+            kwargs['cancel_token'] = cancel_token
+        try:
+            return run_with_deadline(
+                partial(func, *args, **kwargs), timeout,
+                cancel_token=cancel_token, grace_period=self.cancel_grace_period
+            )
+        except DeadlineExceeded as e:
+            with self.lock:
+                self.metrics['timeouts'] += 1
+                if e.abandoned:
+                    self.metrics['abandoned_threads'] += 1
+            if e.abandoned:
+                self.logger.warning(
+                    f"El intento no terminó {self.cancel_grace_period}s después "
+                    "de cancelarlo; se abandona el hilo"
+                )
+            # Volver a lanzar el mismo tipo que capturas en process_task
+            raise TimeoutError(f"Timeout de {timeout}s excedido")
+
+    def add_task(self, task: Dict) -> bool:
         """
         Agrega una nueva tarea a la cola (thread-safe).
+
+        Returns:
+            False si la cola compartida ya tenía la tarea pendiente o en 
+            curso (no se agregó nada)
         """
         self.validate_tasks([task])
         with self.lock:
             try:
-                self.task_queue.push(task)
+                if self.task_queue.push(task) is False:
+                    self.logger.info(f"Tarea ya encolada: {task['url']}")
+                    return False
                 self._total_tasks += 1
                 self.logger.info(f"Tarea agregada: {task['url']}")
+                return True
             except QueueFullError as e:
                 self.logger.error(f"Error al agregar tarea: {e}")
                 raise
@@ -437,6 +921,15 @@ class ScrapingCoordinator:
                         f"Debe ser un número > 0"
                     )
             
+            # Validar vigencia en caché
+            cache_ttl = task.get('cache_ttl')
+            if cache_ttl is not None:
+                if not isinstance(cache_ttl, (int, float)) or cache_ttl < 0:
+                    raise ValidationError(
+                        f"Tarea {idx}: cache_ttl inválido '{cache_ttl}'. "
+                        f"Debe ser un número >= 0"
+                    )
+            
             # Validar subtipo dinámico
             if task_type == 'dynamic':
                 subtype = task.get('subtype')
@@ -461,25 +954,89 @@ class ScrapingCoordinator:
         return hashlib.md5(task_str.encode()).hexdigest()
 
     def _get_from_cache(self, task: Dict) -> Optional[Dict]:
-        """Obtiene resultado de caché si existe"""
-        if not self.enable_cache:
+        """
+        Obtiene resultado de caché si existe y sigue vigente. Un resultado 
+        vencido dentro de la ventana stale_while_revalidate se retorna 
+        marcado 'stale' y se encola su actualización.
+        """
+        # Las tareas de actualización siempre scrapean
+        if not self.enable_cache or task.get('revalidate'):
             return None
         cache_key = self._get_cache_key(task)
-        result = self._cache.get(cache_key)
+        entry = self._cache.get_entry(cache_key, max_stale=self.stale_while_revalidate)
         
         # Actualizar métricas
-        if result:
-            self.metrics['cache_hits'] += 1
-        else:
-            self.metrics['cache_misses'] += 1
+        if entry is None:
+            with self.lock:
+                self.metrics['cache_misses'] += 1
+            return None
+        if entry.is_fresh():
+            with self.lock:
+                self.metrics['cache_hits'] += 1
+            return entry.value
         
-        return result
+        with self.lock:
+            self.metrics['cache_stale_hits'] += 1
+        self._schedule_revalidation(task, cache_key)
+        return {**entry.value, 'stale': True, 'cache_age': round(entry.age(), 1)}
+
+    def _cache_ttl_for(self, task: Dict) -> Optional[float]:
+        """Vigencia en caché del resultado de la tarea (None: no vence)"""
+        if task.get('cache_ttl') is not None:
+            return task['cache_ttl']
+        return self.cache_ttls.get(domain_key(task['url']), self.cache_ttl)
 
     def _save_to_cache(self, task: Dict, result: Dict) -> None:
         """Guarda resultado en caché"""
         if self.enable_cache:
             cache_key = self._get_cache_key(task)
-            self._cache.set(cache_key, result)
+            # Costo GreedyDual-Size: lo que tomaría volver a obtenerlo
+            cost = result.get('metrics', {}).get('duration') or 1.0
+            self._cache.set(cache_key, result, ttl=self._cache_ttl_for(task), cost=cost)
+
+    def _schedule_revalidation(self, task: Dict, cache_key: str) -> None:
+        """
+        Encola una copia de la tarea que ignora el caché y lo actualiza. 
+        Pasa por el planificador y el rate limiting como cualquier tarea, 
+        con menor prioridad; su resultado no se suma a self.results.
+        """
+        with self.lock:
+            if cache_key in self._revalidating:
+                return
+            self._revalidating.add(cache_key)
+        refresh = {**task, 'revalidate': True, 'priority': task.get('priority', 0) + 1}
+        try:
+            queued = self.add_task(refresh)
+        except QueueFullError:
+            queued = False
+            self.logger.warning(f"Cola llena: no se actualiza el caché de {task['url']}")
+        # Si no se encoló (o la cola compartida puede entregarla a otro 
+        # nodo) este nodo no verá su fin: la cola evita los duplicados
+        if not queued or self.shared_queue:
+            with self.lock:
+                self._revalidating.discard(cache_key)
+
+    def _failed_revalidation(self, task: Dict, error: Exception) -> Dict:
+        """
+        Resultado de una actualización del caché que lanzó una excepción: 
+        se registra como error sin interrumpir la ejecución.
+        """
+        self.logger.warning(f"Falló la actualización del caché de {task['url']}: {error}")
+        return {
+            'url': task['url'],
+            'error': str(error),
+            'task_type': task['type'],
+            'subtype': task.get('subtype'),
+        }
+
+    def _revalidation_done(self, task: Dict, result: Dict) -> None:
+        """Registra el fin de una tarea de actualización del caché"""
+        with self.lock:
+            self._revalidating.discard(self._get_cache_key(task))
+            if 'error' in result:
+                self.metrics['cache_revalidation_errors'] += 1
+            else:
+                self.metrics['cache_revalidations'] += 1
 
     def is_allowed_by_robots(self, url: str) -> bool:
         """Verifica si el scraping está permitido por robots.txt.
@@ -537,22 +1094,36 @@ class ScrapingCoordinator:
         if url in self._failed_urls:
             del self._failed_urls[url]
 
-    def select_extractor(self, task: Dict):
+    def select_extractor(self, task: Dict, cancel_token: Optional[CancelToken] = None):
         """Selección de extractores con subtipos"""
         url = task['url']
                     
         subtype = task['subtype']
-        params = {
-            'num_productos': task.get('num_productos', 1),
-            'max_paginas': task.get('max_paginas', 1),
-            'tienda': task.get('tienda')
-        }
+        params = self._extractor_params(task)
+        if self._dedup is not None:
+            # Los duplicados se descartan antes del tope de productos; las 
+            # claves se registran en la ejecución solo si la tarea termina bien
+            params['product_filter'] = self._dedup.attempt(source_url=url)
+        if cancel_token is not None:
+            params['cancel_token'] = cancel_token
         
         if subtype == 'e-commerce':
             return EcommerceExtractor(url, **params)
             
         raise ValueError(f"Subtipo no implementado: {subtype}")
 
+    def _extractor_params(self, task: Dict) -> Dict:
+        """Parámetros del extractor que se pueden enviar a otro proceso"""
+        params = {
+            'num_productos': task.get('num_productos', 1),
+            'max_paginas': task.get('max_paginas', 1),
+            'tienda': task.get('tienda')
+        }
+        if self._storage_writer is not None:
+            # El almacenamiento lo hace el sink de la ejecución
+            params['autostore'] = False
+        return params
+
     def _compute_timeout(self, task: Dict) -> int:
         """Calcula timeout efectivo escalado por paginacion y tienda."""
         timeout = task.get('timeout', self.default_timeout)
@@ -570,25 +1141,151 @@ class ScrapingCoordinator:
 
         return timeout
 
-    def _scrape_with_extractor(self, task: Dict) -> Any:
+    def _scrape_with_extractor(self, task: Dict,
+                               cancel_token: Optional[CancelToken] = None) -> Any:
         """Ejecuta el scraping con el extractor apropiado"""
-        extractor = self.select_extractor(task)
+        if self._process_pool is not None:
+            return self._scrape_in_process(task, cancel_token)
+        extractor = self.select_extractor(task, cancel_token)
         return extractor.scrape()
 
-    def _apply_rate_limiting(self) -> None:
-        """Aplica rate limiting entre requests"""
+    def _scrape_in_process(self, task: Dict,
+                           cancel_token: Optional[CancelToken] = None) -> Any:
+        """
+        Ejecuta el intento en un proceso worker. El worker aplica su propio 
+        plazo; aquí solo se espera el resultado consultando el token. Si el 
+        token se cancela (plazo del padre, cleanup) se marca la bandera 
+        compartida del intento y el worker cancela su extractor. La 
+        deduplicación definitiva se aplica en el padre.
+        """
+        params = self._extractor_params(task)
+        if self._dedup is not None:
+            # El worker descarta los ya vistos de la tienda antes de cortar 
+            # en num_productos (solo viajan las claves de ese dominio)
+            params['product_filter'] = AttemptDeduplicator(
+                self._dedup.keys_for(task['url']), source_url=task['url']
+            )
+        slot = self._acquire_cancel_slot()
+        future = self._process_pool.submit(
+            self.process_target, task, params,
+            self._compute_timeout(task), self.cancel_grace_period, slot
+        )
+        if slot is not None:
+            with self.lock:
+                self._cancel_slot_owner[slot] = future
+            future.add_done_callback(partial(self._release_cancel_slot, slot))
+        if cancel_token is not None:
+            # Si aún no empezó, se descarta sin ocupar un worker
+            cancel_token.register(future.cancel)
+            if slot is not None:
+                cancel_token.register(partial(self._signal_worker_cancel, slot, future))
+        while True:
+            try:
+                outcome = future.result(timeout=0.25)
+                break
+            except TimeoutError:
+                if cancel_token is not None:
+                    cancel_token.check()
+            except concurrent.futures.CancelledError:
+                if cancel_token is not None:
+                    cancel_token.check()
+                raise
+
+        with self.lock:
+            worker = self._worker_stats.setdefault(
+                outcome['pid'], {'tasks': 0, 'cpu_time': 0.0, 'busy_time': 0.0}
+            )
+            worker['tasks'] += 1
+            worker['cpu_time'] += outcome['cpu_time']
+            worker['busy_time'] += outcome['duration']
+        if outcome['timed_out']:
+            raise TimeoutError(f"Timeout en el proceso worker {outcome['pid']}")
+
+        if self._dedup is not None:
+            self._dedup.record_duplicates(outcome.get('discarded', 0))
+        return outcome['data']
+
+    def _start_process_pool(self) -> None:
+        """Crea los procesos worker del modo executor='process'"""
+        if self.executor != 'process':
+            return
+        # spawn: los workers no heredan hilos ni locks del padre (sink, 
+        # rate limiter) a medio usar
+        context = multiprocessing.get_context('spawn')
+        # Una bandera de cancelación por intento en curso; si se agotan, el 
+        # intento solo se detiene con el plazo propio del worker
+        slots = max(1, self.max_workers) * 4
+        self._cancel_flags = context.RawArray('b', slots)
+        self._free_cancel_slots = list(range(slots))
+        self._cancel_slot_owner.clear()
+        self._process_pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=context,
+            initializer=init_worker,
+            initargs=(logging.getLevelName(self.logger.getEffectiveLevel()),
+                      self._cancel_flags)
+        )
+        self._worker_stats.clear()
+
+    def _stop_process_pool(self) -> None:
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=True, cancel_futures=True)
+            self._process_pool = None
+
+    def _acquire_cancel_slot(self) -> Optional[int]:
+        with self.lock:
+            return self._free_cancel_slots.pop() if self._free_cancel_slots else None
+
+    def _signal_worker_cancel(self, slot: int, future: concurrent.futures.Future) -> None:
+        """Pide al worker que cancele el intento (si la bandera sigue siendo suya)"""
         with self.lock:
-            time.sleep(self.delay)
+            if self._cancel_slot_owner.get(slot) is future:
+                self._cancel_flags[slot] = 1
+
+    def _release_cancel_slot(self, slot: int, future: concurrent.futures.Future) -> None:
+        """El intento terminó en el worker: la bandera queda libre"""
+        with self.lock:
+            self._cancel_slot_owner.pop(slot, None)
+            self._cancel_flags[slot] = 0
+            self._free_cancel_slots.append(slot)
+
+    def _process_pool_stats(self) -> Dict:
+        """Métricas de los procesos worker (tareas, CPU y tiempo ocupado)"""
+        with self.lock:
+            workers = {pid: dict(s) for pid, s in self._worker_stats.items()}
+        return {
+            'workers': len(workers),
+            'tasks': sum(s['tasks'] for s in workers.values()),
+            'cpu_time': round(sum(s['cpu_time'] for s in workers.values()), 3),
+            'per_worker': {
+                pid: {
+                    'tasks': s['tasks'],
+                    'cpu_time': round(s['cpu_time'], 3),
+                    'busy_time': round(s['busy_time'], 3),
+                }
+                for pid, s in workers.items()
+            },
+        }
+
+    def _apply_rate_limiting(self, url: str) -> float:
+        """
+        Espera el turno del dominio de `url` (token bucket por dominio).
+
+        Returns:
+            Segundos esperados
+        """
+        return self._rate_limiter.acquire(url)
 
     def _update_metrics(self, result: Dict) -> None:
         """Actualiza métricas agregadas tras cada tarea (éxito o fallo)."""
         duration = result.get('metrics', {}).get('duration')
         if duration is not None:
-            self.metrics['total_duration'] += duration
-            total_processed = len(self.results) + 1  # incluir actual
-            self.metrics['avg_task_duration'] = round(
-                self.metrics['total_duration'] / total_processed, 4
-            )
+            with self.lock:
+                self._measured_tasks += 1
+                self.metrics['total_duration'] += duration
+                self.metrics['avg_task_duration'] = round(
+                    self.metrics['total_duration'] / self._measured_tasks, 4
+                )
             # Fastest
             if (self.metrics['fastest_task'] is None or
                 duration < self.metrics['fastest_task']['duration']):
@@ -617,6 +1314,46 @@ class ScrapingCoordinator:
         timeout = self._compute_timeout(task)
         url = task['url']
         
+        early_result = self._precheck_task(task)
+        if early_result is not None:
+            return early_result
+        
+        last_exception = None
+        rate_limit_wait = 0.0
+        for attempt in range(self.max_retries):
+            # Cada intento es un request al dominio: respeta su límite
+            rate_limit_wait += self._apply_rate_limiting(url)
+            # Token propio por intento: cancelar uno no afecta al reintento
+            token = CancelToken()
+            with self.lock:
+                self._active_tokens.add(token)
+            try:
+                # Ejecutar el extractor con timeout cross-platform
+                data = self._run_with_timeout(
+                    self._scrape_with_extractor, timeout, task, cancel_token=token
+                )
+                return self._task_succeeded(task, data, attempt, start_time, rate_limit_wait)
+            except Exception as e:
+                last_exception, retry_in = self._attempt_failed(e, attempt, url, timeout)
+                if retry_in is None:
+                    break
+                if retry_in:
+                    time.sleep(retry_in)
+            finally:
+                with self.lock:
+                    self._active_tokens.discard(token)
+        
+        return self._task_failed(task, last_exception, start_time, rate_limit_wait)
+
+    def _precheck_task(self, task: Dict) -> Optional[Dict]:
+        """
+        Circuit breaker, caché y robots.txt antes de scrapear.
+
+        Returns:
+            El resultado final de la tarea si no hay que scrapear, o None
+        """
+        url = task['url']
+        
         # Verificar circuit breaker
         if self._is_circuit_open(url):
             error_info = {
@@ -650,91 +1387,111 @@ class ScrapingCoordinator:
             if self.on_error:
                 self.on_error(task, Exception('Bloqueado por robots.txt'))
             return error_info
+        return None
+
+    def _task_succeeded(self, task: Dict, data: Any, attempt: int,
+                        start_time: float, rate_limit_wait: float) -> Dict:
+        """Almacena la salida de un intento exitoso y arma su resultado"""
+        url = task['url']
+        if self._dedup is not None and data:
+            # Recién ahora se registran sus productos en la ejecución. Se 
+            # descartan los que otra tarea concurrente registró entretanto
+            products = data if isinstance(data, list) else [data]
+            data = self._dedup.filter_new(products, source_url=url)
+        self._store_task_output(task, data)
         
-        # Aplicar rate limiting
-        self._apply_rate_limiting()
+        duration = time.time() - start_time
         
-        last_exception = None
-        for attempt in range(self.max_retries):
-            try:
-                # Ejecutar el extractor con timeout cross-platform
-                data = self._run_with_timeout(self._scrape_with_extractor, timeout, task)
+        # Resetear circuit breaker en éxito
+        self._record_success(url)
+        
+        result = {
+            'url': url,
+            'type': task['type'],
+            'subtype': task.get('subtype'),
+            'priority': task.get('priority', 0),
+            'data': data,
+            'from_cache': False,
+            'metrics': {
+                'duration': round(duration, 3),
+                'attempts': attempt + 1,
+                'rate_limit_wait': round(rate_limit_wait, 3),
+                'url_length': len(url)
+            }
+        }
+        
+        log_data = {
+            'url': url,
+            'type': task['type'],
+            'subtype': task.get('subtype'),
+            'priority': task.get('priority', 0),
+            'results': len(data) if isinstance(data, list) else 1,
+            'duration': f"{duration:.2f}s"
+        }
+        self.logger.info(f"Tarea completada: {log_data}")
+        
+        self._save_to_cache(task, result)
+        self._update_metrics(result)
+        
+        if self.on_success:
+            self.on_success(result)
+        
+        return result
 
-                
-                duration = time.time() - start_time
-                
-                # Resetear circuit breaker en éxito
-                self._record_success(url)
-                
-                result = {
-                    'url': url,
-                    'type': task['type'],
-                    'subtype': task.get('subtype'),
-                    'priority': task.get('priority', 0),
-                    'data': data,
-                    'from_cache': False,
-                    'metrics': {
-                        'duration': round(duration, 3),
-                        'attempts': attempt + 1,
-                        'url_length': len(url)
-                    }
-                }
-                
-                log_data = {
-                    'url': url,
-                    'type': task['type'],
-                    'subtype': task.get('subtype'),
-                    'priority': task.get('priority', 0),
-                    'results': len(data) if isinstance(data, list) else 1,
-                    'duration': f"{duration:.2f}s"
-                }
-                self.logger.info(f"Tarea completada: {log_data}")
-                
-                self._save_to_cache(task, result)
-                self._update_metrics(result)
-                
-                if self.on_success:
-                    self.on_success(result)
-                
-                return result
-            
-            except TimeoutError as e:
-                last_exception = TimeoutError(f"Timeout de {timeout}s excedido")
+    def _attempt_failed(self, error: Exception, attempt: int, url: str,
+                        timeout: float):
+        """
+        Clasifica el error de un intento.
+
+        Returns:
+            (excepción a reportar, segundos de espera antes del siguiente 
+            intento o None si no se debe reintentar)
+        """
+        if isinstance(error, TimeoutError):
+            # Timeout es recuperable - reintentar
+            self.logger.warning(
+                f"Timeout en intento {attempt + 1} para {url}"
+            )
+            return TimeoutError(f"Timeout de {timeout}s excedido"), 0
+        
+        if isinstance(error, TaskCancelledError):
+            # Cancelación externa (cleanup) - no reintentar
+            self.logger.warning(f"Tarea cancelada para {url}: {error}")
+            return error, None
+        
+        if isinstance(error, (ConnectionError, OSError)):
+            # Errores de red - reintentar
+            last_exception = NetworkError(f"Error de red: {str(error)}")
+            if attempt < self.max_retries - 1:
+                wait_time = 2 ** attempt
                 self.logger.warning(
-                    f"Timeout en intento {attempt + 1} para {url}"
+                    f"Error de red en intento {attempt + 1} para {url}, "
+                    f"reintentando en {wait_time}s... Error: {str(error)}"
                 )
-                # Timeout es recuperable - reintentar
-                
-            except (ConnectionError, OSError) as e:
-                # Errores de red - reintentar
-                last_exception = NetworkError(f"Error de red: {str(e)}")
-                if attempt < self.max_retries - 1:
-                    wait_time = 2 ** attempt
-                    self.logger.warning(
-                        f"Error de red en intento {attempt + 1} para {url}, "
-                        f"reintentando en {wait_time}s... Error: {str(e)}"
-                    )
-                    time.sleep(wait_time)
-            
-            except (ValueError, KeyError, AttributeError) as e:
-                # Errores de validación/parseo - no reintentar
-                last_exception = e
-                self.logger.error(
-                    f"Error de validación para {url}: {str(e)}. No se reintentará."
-                )
-                break  # Salir del loop de reintentos
-            
-            except Exception as e:
-                # Otros errores - reintentar con precaución
-                last_exception = e
-                if attempt < self.max_retries - 1:
-                    wait_time = 2 ** attempt
-                    self.logger.warning(
-                        f"Error inesperado en intento {attempt + 1} para {url}, "
-                        f"reintentando en {wait_time}s... Error: {str(e)}"
-                    )
-                    time.sleep(wait_time)
+                return last_exception, wait_time
+            return last_exception, 0
         
+        if isinstance(error, (ValueError, KeyError, AttributeError)):
+            # Errores de validación/parseo - no reintentar
+            self.logger.error(
+                f"Error de validación para {url}: {str(error)}. No se reintentará."
+            )
+            return error, None
+        
+        # Otros errores - reintentar con precaución
+        if attempt < self.max_retries - 1:
+            wait_time = 2 ** attempt
+            self.logger.warning(
+                f"Error inesperado en intento {attempt + 1} para {url}, "
+                f"reintentando en {wait_time}s... Error: {str(error)}"
+            )
+            return error, wait_time
+        return error, 0
+
+    def _task_failed(self, task: Dict, last_exception: Optional[Exception],
+                     start_time: float, rate_limit_wait: float) -> Dict:
+        """Registra el fallo definitivo de una tarea y arma su resultado"""
+        url = task['url']
         # Registrar fallo en circuit breaker
         self._record_failure(url)
         
@@ -749,7 +1506,8 @@ class ScrapingCoordinator:
             'priority': task.get('priority', 0),
             'metrics': {
                 'duration': round(duration, 3),
-                'attempts': self.max_retries
+                'attempts': self.max_retries,
+                'rate_limit_wait': round(rate_limit_wait, 3)
             }
         }
         
@@ -763,81 +1521,470 @@ class ScrapingCoordinator:
         self._update_metrics(error_info)
         return error_info
 
-    def run(self) -> Dict:
+    def _open_run_outputs(self) -> None:
+        """Abre las salidas compartidas por todas las tareas de la ejecución"""
+        self.run_session_id = str(uuid.uuid4())[:8]
+        if self.json_output == 'ndjson':
+            base_path = os.path.join(
+                session_output_dir('e-commerce'), f"session_{self.run_session_id}"
+            )
+            self._ndjson_writer = NDJSONSessionWriter(
+                base_path, compression=self.json_compression
+            )
+            self.ndjson_path = self._ndjson_writer.path
+            self.logger.info(f"Salida NDJSON de la ejecución: {self.ndjson_path}")
+        self._storage_writer = StorageWriter(
+            session_id=self.run_session_id,
+            json_mode=self.json_output,
+            json_compression=self.json_compression,
+            ndjson_writer=self._ndjson_writer,
+            batch_size=self.storage_batch_size,
+            flush_interval=self.storage_flush_interval,
+            background=self.write_behind,
+            logger=get_logger('StorageWriter')
+        ).start()
+        if self.parquet_output:
+            self.parquet_path = os.path.join(
+                session_output_dir('e-commerce'), f"session_{self.run_session_id}.parquet"
+            )
+            self._parquet_writer = ProductParquetWriter(
+                self.parquet_path, session_id=self.run_session_id
+            )
+            self.logger.info(f"Salida Parquet de la ejecución: {self.parquet_path}")
+
+    def _store_task_output(self, task: Dict, data: Any) -> None:
+        """Entrega los productos de una tarea al sink de la ejecución"""
+        if self._storage_writer is None or not data:
+            return
+        products = data if isinstance(data, list) else [data]
+        self._storage_writer.submit(products, url=task['url'], tipo=task.get('subtype'))
+        if self._parquet_writer is not None:
+            self._parquet_writer.add_products(
+                products, source_url=task['url'], tienda=task.get('tienda')
+            )
+
+    def _close_run_outputs(self) -> None:
+        """Vuelca y cierra las salidas compartidas de la ejecución"""
+        if self._storage_writer is not None:
+            # Barrera: todo lo encolado por los workers queda confirmado
+            self._storage_writer.close()
+            storage_stats = self._storage_writer.get_stats()
+            self.metrics['storage_queue_max_depth'] = storage_stats['max_queue_depth']
+            self.metrics['storage_commit_latency_ms'] = storage_stats['avg_commit_latency_ms']
+            self.metrics['storage'] = storage_stats
+            self._storage_writer = None
+        if self._ndjson_writer is not None:
+            self._ndjson_writer.close()
+            self.logger.info(
+                f"NDJSON cerrado: {self._ndjson_writer.records_written} registros "
+                f"en {self._ndjson_writer.path}"
+            )
+            self._ndjson_writer = None
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+            self.logger.info(
+                f"Parquet cerrado: {self._parquet_writer.rows_written} productos "
+                f"en {self._parquet_writer.row_groups} row groups"
+            )
+            self._parquet_writer = None
+
+    def _iter_execute_tasks(self, tasks: List[Dict]) -> Iterator[Dict]:
         """
-        Ejecución con estadísticas finales y barra de progreso.
-        Consume la cola para evitar reprocesar las mismas tareas en ejecuciones subsecuentes.
+        Ejecuta las tareas a través del planificador por dominio: solo se 
+        envían al pool las que tienen cupo en su dominio, y cada tarea 
+        terminada libera un cupo. Las tareas agregadas con add_task 
+        durante la ejecución también se planifican. Entrega cada 
+        resultado apenas termina su tarea.
         """
-        total_start_time = time.time()
+        self._scheduler = DomainScheduler(
+            max_concurrency=self.domain_concurrency,
+            default_concurrency=self.default_domain_concurrency,
+            policy=self.scheduling_policy,
+            weights=self.domain_weights,
+        )
+        self._scheduler.push_many(tasks)
+        total = len(tasks)
+        progress = (
+            tqdm(total=total, desc="Scraping", unit="tarea")
+            if self.show_progress else None
+        )
+
+        running: Dict[concurrent.futures.Future, Dict] = {}
+        # Con cola compartida los leases se renuevan a un tercio de su plazo
+        heartbeat = self.lease_timeout / 3 if self.shared_queue else None
+        last_heartbeat = time.monotonic()
+        # El bucle despierta al menos cada intervalo para guardar el checkpoint
+        wait_timeout = heartbeat or (self.checkpoint_interval if self.checkpointing else None)
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                while True:
+                    pulled = self._pull_tasks(len(running))
+                    if pulled:
+                        total += pulled
+                        if progress is not None:
+                            progress.total = total
+                            progress.refresh()
+
+                    while len(running) < self.max_workers:
+                        task = self._scheduler.next_task()
+                        if task is None:
+                            break
+                        running[executor.submit(self.process_task, task)] = task
+                        if self._checkpoint is not None:
+                            self._checkpoint.task_started(task)
+
+                    if not running:
+                        if self.shared_queue and self.task_queue.outstanding() > 0:
+                            # Otros nodos tienen leases en curso: si vencen 
+                            # vuelven a la cola y este nodo puede tomarlos
+                            time.sleep(self.queue_poll_interval)
+                            continue
+                        break
+
+                    done, _ = wait(running, timeout=wait_timeout, return_when=FIRST_COMPLETED)
+                    if heartbeat and time.monotonic() - last_heartbeat >= heartbeat:
+                        self.task_queue.extend(self._leases.values(), self.lease_timeout)
+                        last_heartbeat = time.monotonic()
+                    for future in done:
+                        task = running.pop(future)
+                        self._scheduler.task_done(task)
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            if not task.get('revalidate'):
+                                raise
+                            result = self._failed_revalidation(task, e)
+                        self._settle_lease(task, result)
+                        self._checkpoint_task_finished(task, result)
+                        if progress is not None:
+                            progress.update(1)
+                        if task.get('revalidate'):
+                            self._revalidation_done(task, result)
+                            continue
+                        self._keep_result(result)
+                        yield result
+                    self._checkpoint_tick()
+        except GeneratorExit:
+            # El consumidor dejó de iterar: no esperar a los intentos en curso
+            self.cancel_running_tasks("Iteración de resultados cerrada")
+            raise
+        finally:
+            # Lo no terminado vuelve a la cola compartida para otros nodos
+            for lease_id in self._leases.values():
+                self.task_queue.release(lease_id)
+            self._leases.clear()
+            if progress is not None:
+                progress.close()
+
+    def _pull_tasks(self, running: int) -> int:
+        """
+        Pasa tareas nuevas al planificador: las agregadas con add_task 
+        (cola local) o, con cola compartida, tantos leases como cupo libre.
 
-        # Consumir la cola (pop) en lugar de copiar su contenido
+        Returns:
+            Número de tareas incorporadas
+        """
+        if not self.shared_queue:
+            tasks = self._checkpoint_new_tasks(self._drain_task_queue())
+            self._scheduler.push_many(tasks)
+            return len(tasks)
+
+        # Sin acaparar: solo lo que este nodo puede empezar pronto
+        capacity = self.max_workers - running - self._scheduler.pending()
+        if capacity <= 0:
+            return 0
+        pulled = 0
+        for lease in self.task_queue.lease(self.node_id, limit=capacity,
+                                           visibility_timeout=self.lease_timeout):
+            try:
+                self.validate_tasks([lease.task])
+            except ValidationError as e:
+                self.logger.error(f"Tarea inválida en la cola compartida: {e}")
+                self.task_queue.fail(lease.id, str(e))
+                continue
+            self._leases[id(lease.task)] = lease.id
+            self._scheduler.push(lease.task)
+            pulled += 1
+        return pulled
+
+    def _settle_lease(self, task: Dict, result: Dict) -> None:
+        """Confirma en la cola compartida el resultado de una tarea"""
+        lease_id = self._leases.pop(id(task), None)
+        if lease_id is None:
+            return
+        if 'error' in result:
+            settled = self.task_queue.fail(lease_id, result['error'])
+        else:
+            settled = self.task_queue.ack(lease_id)
+        if not settled:
+            self.logger.warning(
+                f"El lease de {task['url']} había vencido; la tarea pudo "
+                "procesarse también en otro nodo"
+            )
+
+    def _drain_task_queue(self) -> List[Dict]:
+        """Consume la cola (pop) en lugar de copiar su contenido"""
         tasks = []
         while not self.task_queue.is_empty():
             task = self.task_queue.pop()
             if task:
                 tasks.append(task)
+        return tasks
+
+    @staticmethod
+    def _empty_run_result() -> Dict:
+        return {
+            'results': [],
+            'statistics': {
+                'total_tasks': 0,
+                'total_duration': '0s',
+                'avg_task_duration': '0s',
+                'min_task_duration': '0s',
+                'max_task_duration': '0s',
+                'cache_hit_rate': '0%',
+                'cache_size': 0,
+                'failed_urls_tracked': 0
+            }
+        }
 
-        self.logger.info(
-            f"Iniciando scraping de {len(tasks)} tareas "
-            f"con {self.max_workers} workers"
-        )
+    def run(self) -> Dict:
+        """
+        Ejecución con estadísticas finales y barra de progreso.
+        Consume la cola para evitar reprocesar las mismas tareas en ejecuciones subsecuentes.
+        """
+        for _ in self.iter_results():
+            pass
+        return self._last_run
+
+    def iter_results(self) -> Iterator[Dict]:
+        """
+        Ejecuta las tareas y entrega cada resultado a medida que termina, 
+        sin esperar al final de la ejecución. Con result_retention 
+        'summary' o 'none' la memoria no crece con los productos.
+
+        Al agotarse el generador, el retorno de run() (resultados 
+        retenidos y estadísticas) queda en last_run. Si se cierra antes, 
+        los intentos en curso se cancelan. Al reanudar un checkpoint no 
+        se entregan los resultados restaurados (sí cuentan en las 
+        estadísticas).
+        """
+        total_start_time = time.time()
+        self._last_run = None
+        self._reset_dedup()
+
+        if self.shared_queue:
+            # Las tareas se toman en préstamo durante la ejecución
+            tasks = []
+            self.logger.info(
+                f"Nodo {self.node_id}: consumiendo la cola compartida "
+                f"({self.task_queue.size()} pendientes) con {self.max_workers} workers"
+            )
+        else:
+            tasks = self._start_checkpoint(self._drain_task_queue())
+            self.logger.info(
+                f"Iniciando scraping de {len(tasks)} tareas "
+                f"con {self.max_workers} workers"
+            )
 
-        if not tasks:
+        if not tasks and not (self.shared_queue and self.task_queue.outstanding()):
+            if self._checkpoint is not None and self._checkpoint.completed:
+                # Reanudación de una ejecución que ya había terminado
+                self._close_checkpoint()
+                self._last_run = self._finish_run(time.time() - total_start_time)
+                return
             self.logger.warning("No hay tareas para procesar")
-            return {
-                'results': [],
-                'statistics': {
-                    'total_tasks': 0,
-                    'total_duration': '0s',
-                    'avg_task_duration': '0s',
-                    'min_task_duration': '0s',
-                    'max_task_duration': '0s',
-                    'cache_hit_rate': '0%',
-                    'cache_size': 0,
-                    'failed_urls_tracked': 0
-                }
-            }
+            self._last_run = self._empty_run_result()
+            return
 
-        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
-            futures = {
-                executor.submit(self.process_task, task): task
-                for task in tasks
-            }
+        self._open_run_outputs()
+        self._start_process_pool()
 
-            if self.show_progress:
-                future_iter = tqdm(
-                    as_completed(futures),
-                    total=len(futures),
-                    desc="Scraping",
-                    unit="tarea"
-                )
-            else:
-                future_iter = as_completed(futures)
+        try:
+            yield from self._iter_execute_tasks(tasks)
+        finally:
+            self._stop_process_pool()
+            self._close_run_outputs()
+            self._close_checkpoint()
+
+        self._last_run = self._finish_run(time.time() - total_start_time)
 
-            for future in future_iter:
-                result = future.result()
-                self.results.append(result)
+    @classmethod
+    def from_checkpoint(cls, run_id: str, checkpoint_dir: str = DEFAULT_CHECKPOINT_DIR,
+                        **overrides) -> 'ScrapingCoordinator':
+        """
+        Coordinador que reanuda `run_id` con la configuración guardada en 
+        su checkpoint (misma clase y opciones). `overrides` reemplaza 
+        opciones puntuales, p.ej. los callbacks, que no se guardan.
+        """
+        try:
+            coordinator, options = RunCheckpoint.load_options(run_id, checkpoint_dir)
+        except FileNotFoundError as e:
+            raise ValueError(str(e)) from e
+        if coordinator == 'AsyncScrapingCoordinator' and cls is ScrapingCoordinator:
+            # Import diferido: async_coordinator importa este módulo
+            from src.coordinator.async_coordinator import AsyncScrapingCoordinator
+            cls = AsyncScrapingCoordinator
+        options.update(overrides)
+        options['checkpoint_dir'] = checkpoint_dir
+        return cls([], resume_run_id=run_id, **options)
+
+    def _reset_dedup(self) -> None:
+        """Cada ejecución deduplica solo contra sus propios productos"""
+        if self._dedup is not None:
+            self._dedup.clear()
+
+    @property
+    def last_run(self) -> Optional[Dict]:
+        """Resultados y estadísticas de la última ejecución completa"""
+        return self._last_run
+
+    def _keep_result(self, result: Dict) -> None:
+        """Suma el resultado a las estadísticas y lo retiene según la política"""
+        self._run_stats.add(result)
+        if self.result_retention == 'full':
+            self.results.append(result)
+        elif self.result_retention == 'summary':
+            self.results.append(summarize_result(result))
+
+    def _start_checkpoint(self, tasks: List[Dict]) -> List[Dict]:
+        """
+        Abre el checkpoint de la ejecución (o retoma resume_run_id) y 
+        retorna las tareas por ejecutar. Al reanudar, los resultados ya 
+        guardados se restauran en self.results y sus tareas se omiten; 
+        sus productos ya quedaron almacenados en la sesión anterior.
+        """
+        if not self.checkpointing:
+            return tasks
+
+        interval = self.checkpoint_interval if self.checkpoint_interval is not None else 30.0
+        if self.resume_run_id is not None:
+            self._checkpoint = RunCheckpoint.load(
+                self.resume_run_id, directory=self.checkpoint_dir, interval=interval
+            )
+            # Una siguiente llamada a run() empieza un checkpoint nuevo
+            self.resume_run_id = None
+            restored = self._checkpoint.take_restored_results()
+            for result in restored:
+                self._keep_result(result)
+            # Los productos emitidos antes de la interrupción siguen vistos
+            keys = self._checkpoint.take_restored_keys()
+            if self._dedup is not None:
+                self._dedup.restore(keys)
+            self.logger.info(
+                f"Reanudando la ejecución {self._checkpoint.run_id}: "
+                f"{len(restored)} tareas completadas se omiten"
+            )
+        else:
+            self._checkpoint = RunCheckpoint(
+                uuid.uuid4().hex[:8], directory=self.checkpoint_dir, interval=interval
+            )
+        self._checkpoint.options = self.options
+        self._checkpoint.coordinator = type(self).__name__
 
-        total_duration = time.time() - total_start_time
+        self._checkpoint.register(tasks)
+        self._checkpoint.flush()
+        self.run_id = self._checkpoint.run_id
+        self.logger.info(
+            f"Checkpoint de la ejecución en {self._checkpoint.path} "
+            f"(reanudar con --resume {self.run_id})"
+        )
+        return self._checkpoint.unfinished_tasks()
+
+    def _checkpoint_task_finished(self, task: Dict, result: Dict) -> None:
+        """Registra el resultado en el checkpoint con las claves de sus productos"""
+        if self._checkpoint is None:
+            return
+        keys = None
+        if self._dedup is not None and result.get('data'):
+            data = result['data'] if isinstance(result['data'], list) else [result['data']]
+            keys = [
+                key for key in (
+                    ProductDeduplicator.product_key(p, source_url=task['url'])
+                    for p in data if isinstance(p, dict)
+                ) if key
+            ]
+        self._checkpoint.task_finished(task, result, keys)
+
+    def _checkpoint_new_tasks(self, tasks: List[Dict]) -> List[Dict]:
+        """Registra en el checkpoint las tareas agregadas durante la ejecución"""
+        if self._checkpoint is None:
+            return tasks
+        # Las actualizaciones del caché no forman parte de la ejecución
+        refresh = [task for task in tasks if task.get('revalidate')]
+        return self._checkpoint.register(
+            [task for task in tasks if not task.get('revalidate')]
+        ) + refresh
+
+    def _checkpoint_tick(self) -> None:
+        """Guarda el checkpoint si ya pasó su intervalo"""
+        if self._checkpoint is not None and self._checkpoint.due():
+            self._flush_checkpoint()
+
+    def _flush_checkpoint(self) -> None:
+        # Primero se confirman los productos en el sink: una tarea marcada 
+        # como completada no puede perder su salida si el proceso muere
+        if self._storage_writer is not None:
+            self._storage_writer.flush()
+        if self._ndjson_writer is not None:
+            self._ndjson_writer.flush()
+        self._checkpoint.flush()
+
+    def _close_checkpoint(self) -> None:
+        """Guarda el estado final del checkpoint (tras cerrar las salidas)"""
+        if self._checkpoint is None:
+            return
+        try:
+            self._checkpoint.close()
+        except OSError as e:
+            self.logger.error(f"No se pudo guardar el checkpoint {self.run_id}: {e}")
 
-        stats = calculate_stats(self.results)
+    def _finish_run(self, total_duration: float) -> Dict:
+        """Calcula las estadísticas finales e invoca on_complete"""
+        stats = self._run_stats.summary()
 
         # Inyectar métricas agregadas calculadas
         stats['aggregated_metrics'] = {
             'avg_task_duration_runtime': self.metrics['avg_task_duration'],
             'fastest_task': self.metrics['fastest_task'],
             'slowest_task': self.metrics['slowest_task'],
-            'memory_usage_mb': self.metrics['memory_usage']
+            'memory_usage_mb': self.metrics['memory_usage'],
+            'timeouts': self.metrics['timeouts'],
+            'abandoned_threads': self.metrics['abandoned_threads']
         }
 
         stats['total_duration'] = f"{total_duration:.2f}s"
+        cache_lookups = (
+            self.metrics['cache_hits'] + self.metrics['cache_stale_hits']
+            + self.metrics['cache_misses']
+        )
         stats['cache_hit_rate'] = (
-            f"{(self.metrics['cache_hits']/(self.metrics['cache_hits']+self.metrics['cache_misses'])*100):.1f}%"
-            if (self.metrics['cache_hits'] + self.metrics['cache_misses']) > 0 else "0%"
+            f"{(self.metrics['cache_hits']/cache_lookups*100):.1f}%"
+            if cache_lookups > 0 else "0%"
         )
         stats['cache_size'] = self._cache.size()
+        stats['cache_metrics'] = {
+            'hits': self.metrics['cache_hits'],
+            'stale_hits': self.metrics['cache_stale_hits'],
+            'misses': self.metrics['cache_misses'],
+            'revalidations': self.metrics['cache_revalidations'],
+            'revalidation_errors': self.metrics['cache_revalidation_errors'],
+        }
         stats['cache_info'] = self._cache.get_cache_info()
         stats['failed_urls_tracked'] = len(self._failed_urls)
+        if self._dedup is not None:
+            stats['deduplication'] = self._dedup.get_stats()
+        if self.ndjson_path:
+            stats['ndjson_file'] = self.ndjson_path
+        if 'storage' in self.metrics:
+            stats['storage'] = self.metrics['storage']
+        stats['rate_limiting'] = self._rate_limiter.get_stats()
+        stats['scheduler'] = self._scheduler_stats()
+        if self.executor == 'process':
+            stats['process_pool'] = self._process_pool_stats()
+        if self.shared_queue:
+            stats['task_queue'] = {'node_id': self.node_id, **self.task_queue.counts()}
+        if self._checkpoint is not None:
+            stats['checkpoint'] = self._checkpoint.get_stats()
 
         stats['total_tasks'] = stats.pop('total')
         stats['avg_task_duration'] = stats.pop('avg_time')
@@ -856,10 +2003,16 @@ class ScrapingCoordinator:
 
         return result_data
 
+    def _scheduler_stats(self) -> Dict:
+        """Métricas del planificador por dominio de la última ejecución"""
+        return self._scheduler.get_stats() if self._scheduler is not None else {}
+
     def export_results(self, format: str = 'json', filepath: Optional[str] = None) -> str:
         """
         Exporta resultados en múltiples formatos.
         Siempre guarda en un archivo en outputs/exports/ si no se especifica filepath.
+        Exporta lo retenido en self.results (con result_retention 'summary' 
+        los resultados no incluyen productos; estos quedan en el sink).
         """
         # Crear carpeta de exportación si no existe
         export_dir = Path('outputs/exports')
@@ -874,13 +2027,24 @@ class ScrapingCoordinator:
                 filepath = export_dir / f'scraping_results_{timestamp}.csv'
             elif format == 'excel':
                 filepath = export_dir / f'scraping_results_{timestamp}.xlsx'
+            elif format == 'parquet':
+                filepath = export_dir / f'scraping_results_{timestamp}.parquet'
         else:
             filepath = Path(filepath)
         
         if format == 'json':
-            output = json.dumps(self.results, indent=2, ensure_ascii=False)
+            # Un resultado a la vez (mismo formato que json.dumps(..., indent=2))
+            # para no armar en memoria el texto de toda la ejecución
             with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(output)
+                if not self.results:
+                    f.write('[]')
+                    return str(filepath)
+                f.write('[\n')
+                for i, r in enumerate(self.results):
+                    if i:
+                        f.write(',\n')
+                    f.write(textwrap.indent(json.dumps(r, indent=2, ensure_ascii=False), '  '))
+                f.write('\n]')
             return str(filepath)
             
         elif format == 'csv':
@@ -939,11 +2103,37 @@ class ScrapingCoordinator:
             df.to_excel(filepath, index=False, engine='openpyxl')
             return str(filepath)
         
+        elif format == 'parquet':
+            return self._export_parquet(Path(filepath))
+        
         else:
             raise ValueError(
-                f"Formato no soportado: {format}. Use 'json', 'csv' o 'excel'"
+                f"Formato no soportado: {format}. Use 'json', 'csv', 'excel' o 'parquet'"
             )
 
+    def _export_parquet(self, filepath: Path) -> str:
+        """
+        Exporta las tareas a `filepath` y sus productos a 
+        `<nombre>_productos.parquet`, escribiendo row groups a medida que 
+        se recorren los resultados.
+        """
+        products_path = filepath.with_name(f"{filepath.stem}_productos.parquet")
+        with ParquetTableWriter(filepath, task_schema()) as tasks_writer, \
+                ProductParquetWriter(products_path, session_id=self.run_session_id) as products_writer:
+            for r in self.results:
+                tasks_writer.write_rows([task_row(r, self.run_session_id)])
+                data = r.get('data')
+                if data:
+                    products_writer.add_products(
+                        data if isinstance(data, list) else [data],
+                        source_url=r.get('url', '')
+                    )
+        self.logger.info(
+            f"Parquet exportado: {tasks_writer.rows_written} tareas en {filepath}, "
+            f"{products_writer.rows_written} productos en {products_path}"
+        )
+        return str(filepath)
+
     def get_failed_tasks(self) -> List[Dict]:
         """Retorna lista de tareas que fallaron"""
         return [r for r in self.results if 'error' in r]
@@ -973,7 +2163,8 @@ class ScrapingCoordinator:
 
     def retry_failed_tasks(self) -> Dict:
         """
-        Reintenta las tareas que fallaron.
+        Reintenta las tareas que fallaron con un coordinador de la misma 
+        clase y las mismas opciones que este.
         """
         failed = self.get_failed_tasks()
         if not failed:
@@ -1004,15 +2195,13 @@ class ScrapingCoordinator:
 
         self.logger.info(f"Reintentando {len(retry_tasks)} tareas fallidas")
 
-        retry_coordinator = ScrapingCoordinator(
-            tasks=retry_tasks,
-            max_workers=self.max_workers,
-            delay_between_requests=self.delay,
-            max_retries=self.max_retries,
-            default_timeout=self.default_timeout,
-            respect_robots_txt=self.respect_robots_txt,
-            enable_cache=False,
-            show_progress=self.show_progress
+        # Misma configuración que esta ejecución (executor, límites por 
+        # dominio, caché, salidas, retención...). Los fallos no se guardan 
+        # en caché, así que los reintentos vuelven a scrapear
+        retry_coordinator = type(self)(
+            retry_tasks, **self.options,
+            on_success=self.on_success, on_error=self.on_error,
+            on_complete=self.on_complete,
         )
 
         return retry_coordinator.run()
@@ -1023,6 +2212,20 @@ class ScrapingCoordinator:
         self._robots_cache.clear()
         self.logger.info("Caché limpiado")
 
+    def cancel_running_tasks(self, reason: str = "cancelada") -> int:
+        """
+        Cancela los intentos en curso. Los extractores se detienen en su 
+        siguiente punto de control y sus navegadores se cierran.
+
+        Returns:
+            Número de intentos cancelados
+        """
+        with self.lock:
+            tokens = list(self._active_tokens)
+        for token in tokens:
+            token.cancel(reason)
+        return len(tokens)
+
     def cleanup(self) -> None:
         """
         Libera todos los recursos utilizados.
@@ -1030,18 +2233,31 @@ class ScrapingCoordinator:
         """
         self.logger.info("Iniciando limpieza de recursos...")
         
-        # Limpiar caché
-        self.clear_cache()
+        # Detener los intentos en curso (cierra sus navegadores)
+        self.cancel_running_tasks("Coordinador cerrado")
+        
+        # Limpiar caché (la de SQLite es persistente y compartida entre 
+        # procesos: solo se vacía con clear_cache explícito)
+        if self.cache_backend == 'sqlite':
+            self._robots_cache.clear()
+        else:
+            self.clear_cache()
         
-        # Limpiar cola
-        self.task_queue.clear()
+        # Limpiar cola (la compartida pertenece a todos los nodos)
+        if not self.shared_queue:
+            self.task_queue.clear()
         
         # Limpiar resultados
         self.results.clear()
+        self._run_stats = RunStats()
         
         # Limpiar circuit breaker
         self._failed_urls.clear()
         
+        # Limpiar claves de deduplicación
+        if self._dedup is not None:
+            self._dedup.clear()
+        
         self.logger.info("Recursos liberados correctamente")
 
     def __del__(self):
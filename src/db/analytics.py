@@ -0,0 +1,513 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Módulo: analytics.py
+Descripción:
+    Réplica analítica opcional en DuckDB (archivo columnar embebido)
+    para consultas agregadas pesadas sobre todo el histórico.
+
+    - AnalyticsMirror.sync: exportación incremental desde SQLite por
+    bloques cortos (cada bloque es una lectura breve, así los escaneos
+    largos no compiten con los escritores del scraper):
+        * productos: filas nuevas (id > marca) y actualizadas
+        (fecha_actualizacion >= marca), con INSERT OR REPLACE.
+        * precios: puntos nuevos de precios_historicos, ya decodificados
+        a valores absolutos (los deltas se resuelven con el último
+        punto replicado de cada producto).
+    - run_report: ejecuta uno de los reportes predefinidos de REPORTS
+    (percentiles de precio por tienda y semana, resumen por categoría,
+    descuentos por tienda) contra la réplica.
+    - start_periodic_sync: hilo que sincroniza cada N segundos.
+
+    DuckDB permite un solo proceso con el archivo abierto en escritura:
+    la sincronización periódica corre dentro de la aplicación web
+    (ANALYTICS_SYNC_INTERVAL) o por CLI, no ambas a la vez.
+
+    Variables de entorno:
+    - ANALYTICS_DB_PATH        (outputs/analytics.duckdb)
+    - ANALYTICS_SYNC_INTERVAL  (0)  segundos entre sincronizaciones en
+                                    la app web; 0 desactiva el hilo
+
+    Uso:
+        python -m src.db.analytics sync
+        python -m src.db.analytics report percentiles_tienda_semana --desde 2024-01-01
+"""
+
+import argparse
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select
+
+from src.db.database import engine
+from src.db.models import PrecioHistorico, ProductoEcommerce, ScrapedData
+from src.utils.helpers import detect_store, parse_number
+
+# Se importan duckdb y pandas para la réplica analítica opcional
+try:
+    import duckdb
+    import pandas as pd
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    DUCKDB_AVAILABLE = False
+
+logger = logging.getLogger("Analytics")
+
+ANALYTICS_DB_PATH = os.getenv(
+    "ANALYTICS_DB_PATH", os.path.join("outputs", "analytics.duckdb")
+)
+ANALYTICS_SYNC_INTERVAL = int(os.getenv("ANALYTICS_SYNC_INTERVAL", "0"))
+
+# Filas leídas de SQLite por bloque
+SYNC_BATCH_SIZE = 20_000
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS productos (
+        id BIGINT PRIMARY KEY,
+        url VARCHAR,
+        tienda VARCHAR,
+        categoria VARCHAR,
+        nombre VARCHAR,
+        precio DOUBLE,
+        precio_original DOUBLE,
+        descuento_pct DOUBLE,
+        session_id BIGINT,
+        fecha_extraccion TIMESTAMP,
+        fecha_actualizacion TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS precios (
+        id BIGINT PRIMARY KEY,
+        producto_id BIGINT,
+        secuencia INTEGER,
+        fecha TIMESTAMP,
+        precio DOUBLE,
+        precio_original DOUBLE,
+        descuento_pct DOUBLE,
+        session_id BIGINT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS sync_state (
+        tabla VARCHAR PRIMARY KEY,
+        ultimo_id BIGINT,
+        ultima_actualizacion TIMESTAMP,
+        fecha_sync TIMESTAMP
+    )
+    """,
+]
+
+# Reportes predefinidos: parámetros opcionales $desde, $hasta y $tienda
+_FILTROS = """
+    ($desde IS NULL OR {fecha} >= CAST($desde AS TIMESTAMP))
+    AND ($hasta IS NULL OR {fecha} < CAST($hasta AS TIMESTAMP))
+    AND ($tienda IS NULL OR p.tienda = $tienda)
+"""
+
+REPORTS: Dict[str, Dict[str, str]] = {
+    "percentiles_tienda_semana": {
+        "descripcion": "Percentiles de precio observado por tienda y semana",
+        "sql": f"""
+            SELECT p.tienda,
+                   date_trunc('week', h.fecha) AS semana,
+                   count(*) AS observaciones,
+                   count(DISTINCT h.producto_id) AS productos,
+                   quantile_cont(h.precio, 0.25) AS p25,
+                   quantile_cont(h.precio, 0.5) AS p50,
+                   quantile_cont(h.precio, 0.75) AS p75,
+                   quantile_cont(h.precio, 0.9) AS p90,
+                   avg(h.precio) AS promedio
+            FROM precios h
+            JOIN productos p ON p.id = h.producto_id
+            WHERE h.precio IS NOT NULL AND {_FILTROS.format(fecha="h.fecha")}
+            GROUP BY ALL
+            ORDER BY semana, p.tienda
+        """,
+    },
+    "resumen_categorias": {
+        "descripcion": "Productos y precios actuales por tienda y categoría",
+        "sql": f"""
+            SELECT p.tienda,
+                   coalesce(p.categoria, 'Sin Categoría') AS categoria,
+                   count(*) AS productos,
+                   min(p.precio) AS precio_min,
+                   median(p.precio) AS precio_mediana,
+                   max(p.precio) AS precio_max,
+                   avg(p.descuento_pct) AS descuento_promedio
+            FROM productos p
+            WHERE {_FILTROS.format(fecha="p.fecha_extraccion")}
+            GROUP BY ALL
+            ORDER BY productos DESC
+        """,
+    },
+    "descuentos_tienda_semana": {
+        "descripcion": "Descuento promedio y productos con descuento por tienda y semana",
+        "sql": f"""
+            SELECT p.tienda,
+                   date_trunc('week', h.fecha) AS semana,
+                   avg(h.descuento_pct) AS descuento_promedio,
+                   quantile_cont(h.descuento_pct, 0.9) AS descuento_p90,
+                   count(*) FILTER (WHERE h.descuento_pct > 0) AS con_descuento,
+                   count(*) AS observaciones
+            FROM precios h
+            JOIN productos p ON p.id = h.producto_id
+            WHERE {_FILTROS.format(fecha="h.fecha")}
+            GROUP BY ALL
+            ORDER BY semana, p.tienda
+        """,
+    },
+}
+
+
+class AnalyticsUnavailableError(Exception):
+    """Excepción lanzada cuando DuckDB no está instalado"""
+    pass
+
+
+class UnknownReportError(Exception):
+    """Excepción lanzada cuando se pide un reporte no definido"""
+    pass
+
+
+def _to_datetime(value) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+class AnalyticsMirror:
+    """
+    Réplica DuckDB de productos_ecommerce / scraped_data y del historial
+    de precios. Thread-safe: la sincronización se serializa con un lock
+    y cada consulta usa su propio cursor.
+    """
+
+    def __init__(self, path: Optional[str] = None, source_engine=None,
+                 read_only: bool = False):
+        if not DUCKDB_AVAILABLE:
+            raise AnalyticsUnavailableError(
+                "duckdb y pandas son requeridos para la réplica analítica. "
+                "Instálalos con: pip install duckdb pandas"
+            )
+        self.path = path or ANALYTICS_DB_PATH
+        self.source_engine = source_engine or engine
+        self.read_only = read_only
+        self._sync_lock = threading.Lock()
+        if not read_only:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        self._conn = duckdb.connect(self.path, read_only=read_only)
+        if not read_only:
+            for ddl in _SCHEMA:
+                self._conn.execute(ddl)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # ---------------------- sincronización ----------------------
+
+    def _get_state(self, cursor, tabla: str):
+        row = cursor.execute(
+            "SELECT ultimo_id, ultima_actualizacion FROM sync_state WHERE tabla = ?",
+            [tabla],
+        ).fetchone()
+        return (row[0], row[1]) if row else (0, None)
+
+    def _set_state(self, cursor, tabla: str, ultimo_id: int,
+                   ultima_actualizacion: Optional[datetime]) -> None:
+        cursor.execute(
+            "INSERT OR REPLACE INTO sync_state VALUES (?, ?, ?, ?)",
+            [tabla, ultimo_id, ultima_actualizacion, datetime.now()],
+        )
+
+    def sync(self, batch_size: int = SYNC_BATCH_SIZE) -> Dict[str, int]:
+        """
+        Exporta a la réplica las filas nuevas o modificadas desde la
+        última sincronización.
+
+        Returns:
+            {"productos": filas replicadas, "precios": puntos replicados}
+        """
+        with self._sync_lock:
+            cursor = self._conn.cursor()
+            try:
+                productos = self._sync_products(cursor, batch_size)
+                precios = self._sync_prices(cursor, batch_size)
+            finally:
+                cursor.close()
+        if productos or precios:
+            logger.info(f"Réplica analítica: {productos} productos, {precios} precios")
+        return {"productos": productos, "precios": precios}
+
+    def _product_query(self):
+        return (
+            select(
+                ProductoEcommerce.id, ScrapedData.url, ProductoEcommerce.categoria,
+                ProductoEcommerce.nombre, ProductoEcommerce.precio,
+                ProductoEcommerce.precio_original, ProductoEcommerce.descuento,
+                ScrapedData.session_id, ScrapedData.fecha_extraccion,
+                ScrapedData.fecha_actualizacion,
+            )
+            .select_from(ProductoEcommerce)
+        )
+
+    @staticmethod
+    def _product_frame(rows) -> "pd.DataFrame":
+        return pd.DataFrame({
+            "id": [r.id for r in rows],
+            "url": [r.url for r in rows],
+            "tienda": [detect_store(r.url) for r in rows],
+            "categoria": [r.categoria for r in rows],
+            "nombre": [r.nombre for r in rows],
+            "precio": pd.array([r.precio for r in rows], dtype="Float64"),
+            "precio_original": pd.array([r.precio_original for r in rows], dtype="Float64"),
+            "descuento_pct": pd.array([parse_number(r.descuento) for r in rows], dtype="Float64"),
+            "session_id": pd.array([r.session_id for r in rows], dtype="Int64"),
+            "fecha_extraccion": pd.to_datetime([r.fecha_extraccion for r in rows]),
+            "fecha_actualizacion": pd.to_datetime([r.fecha_actualizacion for r in rows]),
+        })
+
+    def _upsert_products(self, cursor, rows) -> None:
+        frame = self._product_frame(rows)
+        cursor.register("lote_productos", frame)
+        try:
+            cursor.execute("INSERT OR REPLACE INTO productos SELECT * FROM lote_productos")
+        finally:
+            cursor.unregister("lote_productos")
+
+    def _sync_products(self, cursor, batch_size: int) -> int:
+        ultimo_id, ultima_actualizacion = self._get_state(cursor, "productos")
+        replicated_id = ultimo_id
+        copied = 0
+        # El máximo de fecha_actualizacion se toma antes de copiar: lo que se
+        # actualice durante la sincronización entra en la siguiente
+        with self.source_engine.connect() as conn:
+            max_update = conn.execute(
+                select(func.max(ScrapedData.fecha_actualizacion))
+                .where(ScrapedData.tipo == "e-commerce")
+            ).scalar()
+
+        # 1. Filas nuevas por id (keyset)
+        while True:
+            with self.source_engine.connect() as conn:
+                rows = conn.execute(
+                    self._product_query()
+                    .where(ProductoEcommerce.id > ultimo_id)
+                    .order_by(ProductoEcommerce.id)
+                    .limit(batch_size)
+                ).all()
+            if not rows:
+                break
+            self._upsert_products(cursor, rows)
+            ultimo_id = rows[-1].id
+            copied += len(rows)
+            self._set_state(cursor, "productos", ultimo_id, ultima_actualizacion)
+
+        # 2. Filas replicadas antes de esta sincronización que cambiaron
+        # desde la última marca (>=: las del mismo instante se recopian)
+        if replicated_id and max_update is not None:
+            since = ultima_actualizacion or datetime.min
+            after_id = 0
+            while True:
+                with self.source_engine.connect() as conn:
+                    rows = conn.execute(
+                        self._product_query()
+                        .where(ScrapedData.fecha_actualizacion >= since,
+                               ProductoEcommerce.id > after_id,
+                               ProductoEcommerce.id <= replicated_id)
+                        .order_by(ProductoEcommerce.id)
+                        .limit(batch_size)
+                    ).all()
+                if not rows:
+                    break
+                self._upsert_products(cursor, rows)
+                after_id = rows[-1].id
+                copied += len(rows)
+
+        # Las filas nuevas ya traían su fecha_actualizacion: la marca avanza
+        if max_update is not None:
+            ultima_actualizacion = max(filter(None, (ultima_actualizacion, _to_datetime(max_update))))
+        self._set_state(cursor, "productos", ultimo_id, ultima_actualizacion)
+        return copied
+
+    def _previous_prices(self, cursor, producto_ids: List[int]) -> Dict[int, tuple]:
+        """Último (precio, precio_original) absoluto replicado por producto"""
+        if not producto_ids:
+            return {}
+        cursor.register("ids_previos", pd.DataFrame({"producto_id": producto_ids}))
+        try:
+            rows = cursor.execute("""
+                SELECT h.producto_id, arg_max(h.precio, h.secuencia),
+                       arg_max(h.precio_original, h.secuencia)
+                FROM precios h JOIN ids_previos USING (producto_id)
+                GROUP BY h.producto_id
+            """).fetchall()
+        finally:
+            cursor.unregister("ids_previos")
+        return {row[0]: (row[1], row[2]) for row in rows}
+
+    def _sync_prices(self, cursor, batch_size: int) -> int:
+        ultimo_id, _ = self._get_state(cursor, "precios")
+        copied = 0
+        while True:
+            with self.source_engine.connect() as conn:
+                rows = conn.execute(
+                    select(PrecioHistorico.__table__)
+                    .where(PrecioHistorico.id > ultimo_id)
+                    .order_by(PrecioHistorico.id)
+                    .limit(batch_size)
+                ).all()
+            if not rows:
+                break
+
+            # Los ids crecen con la secuencia de cada producto: los puntos
+            # anteriores a este bloque ya están en la réplica
+            delta_ids = sorted({r.producto_id for r in rows if r.es_delta})
+            state = self._previous_prices(cursor, delta_ids)
+            records = []
+            for r in sorted(rows, key=lambda r: (r.producto_id, r.secuencia)):
+                precio, precio_original = r.precio, r.precio_original
+                if r.es_delta:
+                    previo = state.get(r.producto_id)
+                    if previo is None or None in previo:
+                        logger.warning(
+                            f"Delta sin punto previo (producto {r.producto_id}); se omite"
+                        )
+                        continue
+                    precio = previo[0] + precio
+                    precio_original = previo[1] + precio_original
+                state[r.producto_id] = (precio, precio_original)
+                records.append((r.id, r.producto_id, r.secuencia, r.fecha, precio,
+                                precio_original, parse_number(r.descuento), r.session_id))
+
+            frame = pd.DataFrame.from_records(records, columns=[
+                "id", "producto_id", "secuencia", "fecha", "precio",
+                "precio_original", "descuento_pct", "session_id",
+            ])
+            frame["session_id"] = frame["session_id"].astype("Int64")
+            cursor.register("lote_precios", frame)
+            try:
+                cursor.execute("INSERT OR REPLACE INTO precios SELECT * FROM lote_precios")
+            finally:
+                cursor.unregister("lote_precios")
+            ultimo_id = rows[-1].id
+            copied += len(records)
+            self._set_state(cursor, "precios", ultimo_id, None)
+        return copied
+
+    # ------------------------- consultas -------------------------
+
+    def status(self) -> Dict:
+        """Marcas de sincronización y filas replicadas"""
+        cursor = self._conn.cursor()
+        try:
+            state = {
+                row[0]: {
+                    "ultimo_id": row[1],
+                    "ultima_actualizacion": row[2].isoformat() if row[2] else None,
+                    "fecha_sync": row[3].isoformat() if row[3] else None,
+                }
+                for row in cursor.execute("SELECT * FROM sync_state").fetchall()
+            }
+            for tabla in ("productos", "precios"):
+                state.setdefault(tabla, {})["filas"] = cursor.execute(
+                    f"SELECT count(*) FROM {tabla}"
+                ).fetchone()[0]
+            return state
+        finally:
+            cursor.close()
+
+    def run_report(self, name: str, desde: Optional[str] = None,
+                   hasta: Optional[str] = None, tienda: Optional[str] = None) -> List[Dict]:
+        """Ejecuta un reporte predefinido de REPORTS"""
+        if name not in REPORTS:
+            raise UnknownReportError(f"Reporte no definido: {name}")
+        cursor = self._conn.cursor()
+        try:
+            result = cursor.execute(
+                REPORTS[name]["sql"],
+                {"desde": desde, "hasta": hasta, "tienda": tienda},
+            )
+            columns = [c[0] for c in result.description]
+            return [
+                {col: (val.isoformat() if isinstance(val, datetime) else val)
+                 for col, val in zip(columns, row)}
+                for row in result.fetchall()
+            ]
+        finally:
+            cursor.close()
+
+
+_mirror: Optional[AnalyticsMirror] = None
+_mirror_lock = threading.Lock()
+_sync_thread: Optional[threading.Thread] = None
+
+
+def get_mirror() -> AnalyticsMirror:
+    """Réplica compartida del proceso (se abre en la primera llamada)"""
+    global _mirror
+    with _mirror_lock:
+        if _mirror is None:
+            _mirror = AnalyticsMirror()
+        return _mirror
+
+
+def start_periodic_sync(interval: int = ANALYTICS_SYNC_INTERVAL) -> Optional[threading.Thread]:
+    """Hilo daemon que sincroniza la réplica compartida cada `interval` s"""
+    global _sync_thread
+    if interval <= 0 or not DUCKDB_AVAILABLE:
+        return None
+    if _sync_thread is not None and _sync_thread.is_alive():
+        return _sync_thread
+
+    def _loop():
+        stop = threading.Event()
+        while not stop.wait(interval):
+            try:
+                get_mirror().sync()
+            except Exception as e:
+                logger.error(f"Error sincronizando la réplica analítica: {e}")
+
+    _sync_thread = threading.Thread(target=_loop, name="analytics-sync", daemon=True)
+    _sync_thread.start()
+    logger.info(f"Sincronización analítica cada {interval}s")
+    return _sync_thread
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Réplica analítica DuckDB")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sync_parser = sub.add_parser("sync", help="Sincronización incremental")
+    sync_parser.add_argument("--path", default=None)
+    report_parser = sub.add_parser("report", help="Ejecuta un reporte predefinido")
+    report_parser.add_argument("name", choices=sorted(REPORTS))
+    report_parser.add_argument("--path", default=None)
+    report_parser.add_argument("--desde", default=None)
+    report_parser.add_argument("--hasta", default=None)
+    report_parser.add_argument("--tienda", default=None)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "sync":
+        with AnalyticsMirror(args.path) as mirror:
+            print(json.dumps(mirror.sync()))
+            print(json.dumps(mirror.status(), indent=2))
+    else:
+        with AnalyticsMirror(args.path, read_only=True) as mirror:
+            rows = mirror.run_report(args.name, args.desde, args.hasta, args.tienda)
+            print(json.dumps(rows, indent=2, ensure_ascii=False, default=str))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Módulo: categories.py
+Descripción:
+    Resúmenes por categoría de productos e-commerce calculados en la
+    base de datos (GROUP BY), sin cargar productos en Python.
+
+    - category_summary: conteo y precio mínimo / promedio / máximo por
+    categoría sobre todo el histórico o filtrado por sesión / fecha.
+    - Sin filtros la consulta solo toca productos_ecommerce y se
+    resuelve con el índice (categoria, precio).
+    - Los productos sin categoría se agrupan como UNCATEGORIZED.
+"""
+
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import func, select
+
+from src.db.models import ProductoEcommerce, ScrapedData
+from src.utils.helpers import normalize_category
+
+UNCATEGORIZED = "Sin Categoría"
+
+
+def category_summary(session,
+                     session_id: Optional[int] = None,
+                     since: Optional[datetime] = None,
+                     min_productos: int = 1,
+                     limit: Optional[int] = None) -> List[Dict]:
+    """
+    Agrupa productos por categoría.
+
+    Returns:
+        [{"categoria", "total", "con_precio", "precio_min",
+          "precio_promedio", "precio_max"}...] ordenado por total
+    """
+    productos = ProductoEcommerce.__table__
+    total = func.count().label("total")
+    stmt = (
+        select(
+            productos.c.categoria,
+            total,
+            func.count(productos.c.precio).label("con_precio"),
+            func.min(productos.c.precio).label("precio_min"),
+            func.avg(productos.c.precio).label("precio_promedio"),
+            func.max(productos.c.precio).label("precio_max"),
+        )
+        .group_by(productos.c.categoria)
+        .order_by(total.desc(), productos.c.categoria)
+    )
+    # Los filtros por sesión y fecha viven en scraped_data
+    if session_id is not None or since is not None:
+        datos = ScrapedData.__table__
+        stmt = stmt.join_from(productos, datos, productos.c.id == datos.c.id)
+        if session_id is not None:
+            stmt = stmt.where(datos.c.session_id == session_id)
+        if since is not None:
+            stmt = stmt.where(datos.c.fecha_extraccion >= since)
+    if min_productos > 1:
+        stmt = stmt.having(total >= min_productos)
+    if limit:
+        stmt = stmt.limit(limit)
+
+    return [
+        {
+            "categoria": row.categoria or UNCATEGORIZED,
+            "total": row.total,
+            "con_precio": row.con_precio,
+            "precio_min": row.precio_min,
+            "precio_promedio": round(row.precio_promedio, 2) if row.precio_promedio is not None else None,
+            "precio_max": row.precio_max,
+        }
+        for row in session.execute(stmt)
+    ]
+
+
+def category_filter(categoria: str):
+    """Condición SQL para filtrar productos de una categoría (normalizada)"""
+    normalized = normalize_category(categoria)
+    if normalized is None or normalized == normalize_category(UNCATEGORIZED):
+        return ProductoEcommerce.categoria.is_(None)
+    return ProductoEcommerce.categoria == normalized
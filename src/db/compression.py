@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Módulo: compression.py
+Descripción:
+    Almacenamiento comprimido de columnas JSON (descripcion,
+    rating_metadata, contenido).
+
+    - CompressedJSON: TypeDecorator que serializa a JSON y guarda un
+    BLOB comprimido con zstd o zlib usando un diccionario entrenado con
+    los propios datos (las listas de características de Alkosto repiten
+    las mismas claves en miles de productos).
+    - Cada valor lleva una cabecera de 3 bytes: códec + ID del
+    diccionario, por lo que conviven valores escritos con diccionarios
+    distintos y los JSON en texto plano de bases anteriores se siguen
+    leyendo sin migrar.
+    - Los diccionarios se guardan en la tabla diccionarios_compresion y
+    se cargan en init_db. Un diccionario entrenado después por otro
+    proceso (la migración, otro scraper) se carga por su ID la primera
+    vez que aparece un valor escrito con él.
+    - migrate_json_columns: entrena un diccionario y reescribe las filas
+    existentes (opcionalmente con VACUUM para recuperar espacio).
+
+    Variables de entorno:
+    - JSON_COMPRESSION   (zstd si está instalado, si no zlib)  zstd | zlib | none
+
+    Uso de la migración:
+        python -m src.db.compression [--no-train] [--vacuum]
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import struct
+import threading
+import zlib
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from sqlalchemy import LargeBinary, insert, text
+from sqlalchemy.types import TypeDecorator
+
+# Se importa zstandard para compresión zstd opcional
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger("Compression")
+
+# Códecs (primer byte de la cabecera)
+CODEC_NONE = 0
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+CODECS = {"none": CODEC_NONE, "zlib": CODEC_ZLIB, "zstd": CODEC_ZSTD}
+
+_HEADER = struct.Struct(">BH")  # códec, ID de diccionario (0 = sin diccionario)
+
+# Tamaño del diccionario entrenado y muestras usadas para entrenarlo
+DICT_SIZE = 16 * 1024
+DICT_SAMPLES = 5000
+
+# Columnas comprimidas: (tabla, columna)
+COMPRESSED_COLUMNS = [
+    ("scraped_data", "contenido"),
+    ("productos_ecommerce", "rating_metadata"),
+    ("productos_ecommerce", "descripcion"),
+]
+
+_lock = threading.Lock()
+_local = threading.local()
+# ID -> (códec, bytes del diccionario)
+_dictionaries: Dict[int, Tuple[int, bytes]] = {}
+_active_codec = CODECS.get(
+    os.getenv("JSON_COMPRESSION", "zstd" if ZSTD_AVAILABLE else "zlib"), CODEC_ZLIB
+)
+if _active_codec == CODEC_ZSTD and not ZSTD_AVAILABLE:
+    _active_codec = CODEC_ZLIB
+_active_dict_id = 0
+
+
+def set_json_codec(codec: str) -> None:
+    """Cambia el códec de escritura ('zstd', 'zlib' o 'none')"""
+    global _active_codec, _active_dict_id
+    if codec not in CODECS:
+        raise ValueError(f"Códec no soportado: {codec}. Use 'zstd', 'zlib' o 'none'")
+    if codec == "zstd" and not ZSTD_AVAILABLE:
+        raise ImportError(
+            "zstandard es requerido para compresión zstd. "
+            "Instálalo con: pip install zstandard"
+        )
+    with _lock:
+        _active_codec = CODECS[codec]
+        # El diccionario activo solo sirve si es del mismo códec
+        if _dictionaries.get(_active_dict_id, (None,))[0] != _active_codec:
+            _active_dict_id = 0
+
+
+def register_dictionary(dict_id: int, codec: int, data: bytes, activate: bool = True) -> None:
+    """Registra un diccionario; si es del códec activo puede quedar en uso"""
+    global _active_dict_id
+    with _lock:
+        _dictionaries[dict_id] = (codec, data)
+        if activate and codec == _active_codec:
+            _active_dict_id = dict_id
+
+
+def active_dictionary() -> Tuple[int, int]:
+    """(códec, ID de diccionario) con los que se escribe"""
+    return _active_codec, _active_dict_id
+
+
+def _zstd_dict(dict_id: int):
+    codec, data = _dictionaries[dict_id]
+    dict_type = (
+        zstandard.DICT_TYPE_FULLDICT if data[:4] == b"\x37\xa4\x30\xec"
+        else zstandard.DICT_TYPE_RAWCONTENT
+    )
+    return zstandard.ZstdCompressionDict(data, dict_type=dict_type)
+
+
+def _zstd(dict_id: int, compress: bool):
+    """Compresor/descompresor zstd por hilo (no son thread-safe)"""
+    cache = getattr(_local, "zstd", None)
+    if cache is None:
+        cache = _local.zstd = {}
+    key = (dict_id, compress)
+    if key not in cache:
+        dict_data = _zstd_dict(dict_id) if dict_id else None
+        if compress:
+            cache[key] = zstandard.ZstdCompressor(
+                level=3, dict_data=dict_data,
+                write_checksum=False, write_dict_id=False
+            )
+        else:
+            cache[key] = zstandard.ZstdDecompressor(dict_data=dict_data)
+    return cache[key]
+
+
+def _check_dictionary(dict_id: int) -> None:
+    """Registra el diccionario `dict_id` si aún no está cargado en este proceso"""
+    if not dict_id or dict_id in _dictionaries:
+        return
+    # Import diferido: src.db.database importa este módulo
+    from src.db.database import engine
+    with engine.connect() as conn:
+        row = conn.execute(text(
+            "SELECT codec, datos FROM diccionarios_compresion WHERE id = :id"
+        ), {"id": dict_id}).first()
+    if row is None:
+        raise ValueError(f"Diccionario de compresión {dict_id} no existe en la base")
+    # Uno más nuevo que el activo pasa a usarse también para escribir
+    register_dictionary(dict_id, row[0], bytes(row[1]), activate=dict_id > _active_dict_id)
+    logger.info(f"Diccionario de compresión {dict_id} cargado bajo demanda")
+
+
+def compress_json(value: Any, codec: Optional[int] = None,
+                  dict_id: Optional[int] = None) -> bytes:
+    """Serializa y comprime un valor JSON con cabecera"""
+    if codec is None:
+        codec, dict_id = active_dictionary()
+    dict_id = dict_id or 0
+    raw = json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    if codec == CODEC_ZSTD:
+        _check_dictionary(dict_id)
+        payload = _zstd(dict_id, compress=True).compress(raw)
+    elif codec == CODEC_ZLIB:
+        _check_dictionary(dict_id)
+        zdict = _dictionaries[dict_id][1] if dict_id else None
+        compressor = (
+            zlib.compressobj(6, zlib.DEFLATED, -15, zdict=zdict) if zdict
+            else zlib.compressobj(6, zlib.DEFLATED, -15)
+        )
+        payload = compressor.compress(raw) + compressor.flush()
+    else:
+        payload = raw
+
+    # Valores pequeños que no se benefician se guardan sin comprimir
+    if codec != CODEC_NONE and len(payload) >= len(raw):
+        codec, dict_id, payload = CODEC_NONE, 0, raw
+    return _HEADER.pack(codec, dict_id) + payload
+
+
+def decompress_json(value: Any) -> Any:
+    """Inverso de compress_json; acepta también JSON en texto plano (legado)"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        return json.loads(value)
+    value = bytes(value)
+    if not value:
+        return None
+    if value[:1] in (b"{", b"[", b'"'):
+        # BLOB con JSON plano (escrito por el tipo JSON anterior)
+        return json.loads(value)
+    codec, dict_id = _HEADER.unpack_from(value)
+    payload = value[_HEADER.size:]
+    if codec == CODEC_ZSTD:
+        _check_dictionary(dict_id)
+        raw = _zstd(dict_id, compress=False).decompress(payload)
+    elif codec == CODEC_ZLIB:
+        _check_dictionary(dict_id)
+        zdict = _dictionaries[dict_id][1] if dict_id else None
+        decompressor = (
+            zlib.decompressobj(-15, zdict=zdict) if zdict else zlib.decompressobj(-15)
+        )
+        raw = decompressor.decompress(payload) + decompressor.flush()
+    else:
+        raw = payload
+    return json.loads(raw)
+
+
+def value_dictionary(value: Any) -> Optional[Tuple[int, int]]:
+    """(códec, diccionario) de un valor almacenado; None si es JSON plano"""
+    if value is None or isinstance(value, str):
+        return None
+    value = bytes(value)
+    if not value or value[:1] in (b"{", b"[", b'"'):
+        return None
+    return _HEADER.unpack_from(value)
+
+
+class CompressedJSON(TypeDecorator):
+    """
+    Columna JSON almacenada como BLOB comprimido.
+
+    Con deferred() en el modelo el BLOB no se lee ni se descomprime
+    hasta que se accede al atributo.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return compress_json(value)
+
+    def process_result_value(self, value, dialect):
+        return decompress_json(value)
+
+
+# ---------------------------------------------------------------------------
+# Entrenamiento de diccionarios
+# ---------------------------------------------------------------------------
+
+def _fragments(value: Any) -> Iterator[str]:
+    """Fragmentos JSON repetibles: elementos de listas y pares clave/valor"""
+    if isinstance(value, list):
+        for item in value:
+            yield json.dumps(item, ensure_ascii=False, separators=(",", ":"))
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            yield json.dumps({key: item}, ensure_ascii=False, separators=(",", ":"))[1:-1]
+
+
+def _content_dictionary(samples: List[Any], size: int) -> bytes:
+    """
+    Diccionario de contenido: los fragmentos que más bytes ahorrarían
+    (frecuencia x largo), con los más valiosos al final, que es donde
+    deflate/zstd los alcanzan con distancias más cortas.
+    """
+    counts = Counter()
+    for sample in samples:
+        for fragment in _fragments(sample):
+            counts[fragment] += 1
+        # Las claves sueltas también se repiten entre valores distintos
+        for key in re.findall(r'"[^"\\]{1,40}":', json.dumps(sample, ensure_ascii=False)):
+            counts[key] += 1
+    ranked = sorted(
+        (f for f, c in counts.items() if c > 1),
+        key=lambda f: counts[f] * len(f.encode("utf-8"))
+    )
+    chunks, total = [], 0
+    for fragment in reversed(ranked):
+        encoded = fragment.encode("utf-8")
+        if total + len(encoded) > size:
+            continue
+        chunks.append(encoded)
+        total += len(encoded)
+    return b"".join(reversed(chunks))
+
+
+def train_dictionary(samples: List[Any], codec: int, size: int = DICT_SIZE) -> bytes:
+    """Entrena un diccionario para el códec a partir de valores JSON"""
+    if codec == CODEC_ZSTD:
+        encoded = [
+            json.dumps(s, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            for s in samples
+        ]
+        try:
+            return zstandard.train_dictionary(size, encoded).as_bytes()
+        except zstandard.ZstdError as e:
+            # Pocas muestras: se usa un diccionario de contenido
+            logger.info(f"Entrenamiento zstd no disponible ({e}); diccionario de contenido")
+    return _content_dictionary(samples, size)
+
+
+def load_dictionaries(connection) -> int:
+    """Carga los diccionarios guardados y activa el último del códec activo"""
+    rows = connection.execute(text(
+        "SELECT id, codec, datos FROM diccionarios_compresion ORDER BY id"
+    )).all()
+    for dict_id, codec, data in rows:
+        register_dictionary(dict_id, codec, bytes(data))
+    return len(rows)
+
+
+def _iter_raw_values(connection, table: str, column: str,
+                     chunk_size: int = 500) -> Iterator[List[Tuple[int, Any]]]:
+    """Recorre (id, valor crudo) de una columna en bloques por keyset"""
+    last_id = 0
+    while True:
+        rows = connection.execute(text(
+            f"SELECT id, {column} FROM {table} "
+            f"WHERE id > :last AND {column} IS NOT NULL ORDER BY id LIMIT :n"
+        ), {"last": last_id, "n": chunk_size}).all()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+
+def migrate_json_columns(engine, train: bool = True, vacuum: bool = False,
+                         samples: int = DICT_SAMPLES) -> Dict[str, int]:
+    """
+    Reescribe las columnas JSON existentes con el códec activo:
+    1. (train) Entrena un diccionario con una muestra de las filas y lo
+    guarda en diccionarios_compresion.
+    2. Recomprime toda fila escrita en texto plano o con otro
+    códec/diccionario.
+    3. (vacuum) Compacta el archivo SQLite para liberar el espacio.
+    """
+    stats = {"filas_reescritas": 0, "bytes_antes": 0, "bytes_despues": 0}
+
+    if train and _active_codec != CODEC_NONE:
+        sample_values = []
+        with engine.connect() as conn:
+            for table, column in COMPRESSED_COLUMNS:
+                per_column = samples // len(COMPRESSED_COLUMNS)
+                rows = conn.execute(text(
+                    f"SELECT {column} FROM {table} WHERE {column} IS NOT NULL "
+                    f"ORDER BY RANDOM() LIMIT :n"
+                ), {"n": per_column}).all()
+                sample_values.extend(decompress_json(r[0]) for r in rows)
+        if sample_values:
+            data = train_dictionary(sample_values, _active_codec)
+            from src.db.models import DiccionarioCompresion
+            with engine.begin() as conn:
+                result = conn.execute(
+                    insert(DiccionarioCompresion.__table__).values(codec=_active_codec, datos=data)
+                )
+                dict_id = result.inserted_primary_key[0]
+            register_dictionary(dict_id, _active_codec, data)
+            stats["diccionario_id"] = dict_id
+            stats["diccionario_bytes"] = len(data)
+            logger.info(f"Diccionario {dict_id} entrenado con {len(sample_values)} muestras")
+
+    target = active_dictionary()
+    with engine.connect() as read_conn:
+        for table, column in COMPRESSED_COLUMNS:
+            for rows in _iter_raw_values(read_conn, table, column):
+                updates = []
+                for row_id, raw in rows:
+                    if value_dictionary(raw) == target:
+                        continue
+                    new_value = compress_json(decompress_json(raw))
+                    if new_value == raw:
+                        continue
+                    stats["bytes_antes"] += len(raw.encode("utf-8") if isinstance(raw, str) else raw)
+                    stats["bytes_despues"] += len(new_value)
+                    updates.append({"id": row_id, "v": new_value})
+                if updates:
+                    with engine.begin() as write_conn:
+                        write_conn.execute(
+                            text(f"UPDATE {table} SET {column} = :v WHERE id = :id"), updates
+                        )
+                    stats["filas_reescritas"] += len(updates)
+
+    if vacuum and engine.dialect.name == "sqlite":
+        with engine.connect() as conn:
+            conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+            conn.exec_driver_sql("VACUUM")
+    logger.info(f"Migración de columnas JSON: {stats}")
+    return stats
+
+
+if __name__ == "__main__":
+    from src.db.database import engine, init_db
+
+    parser = argparse.ArgumentParser(
+        description="Comprime las columnas JSON existentes con un diccionario entrenado"
+    )
+    parser.add_argument("--no-train", action="store_true",
+                        help="No entrenar diccionario nuevo (usa el activo)")
+    parser.add_argument("--vacuum", action="store_true",
+                        help="Ejecutar VACUUM al terminar (SQLite)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    init_db()
+    print(migrate_json_columns(engine, train=not args.no_train, vacuum=args.vacuum))
@@ -7,13 +7,28 @@ Descripción:
     Define el engine, el sessionmaker y funciones para inicializar 
     la base de datos, creando las tablas definidas en los modelos 
     (por ejemplo, ScrapedData).
+
+    Variables de entorno (junto a DATABASE_URL):
+    - SQLITE_JOURNAL_MODE   (WAL)       modo de journal
+    - SQLITE_SYNCHRONOUS    (NORMAL)    nivel de sincronización a disco
+    - SQLITE_MMAP_SIZE      (268435456) bytes mapeados en memoria
+    - SQLITE_CACHE_SIZE     (-65536)    páginas, o KiB si es negativo
+    - SQLITE_TEMP_STORE     (MEMORY)    tablas temporales en memoria
+    - SQLITE_BUSY_TIMEOUT   (30000)     ms de espera por el lock de escritura
+    - DB_POOL_SIZE          (10)        conexiones persistentes del pool
+    - DB_MAX_OVERFLOW       (20)        conexiones extra bajo demanda
+    - DB_POOL_TIMEOUT       (30)        s de espera por una conexión libre
 """
 
 import os
 import logging
-from sqlalchemy import create_engine
+from threading import Lock
+from sqlalchemy import create_engine, event, inspect, text
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool, StaticPool
 from src.db.models import Base, ScrapedData
+from src.db.compression import load_dictionaries
+from src.db.search import ensure_fts
 
 # Configuración del logger para el módulo de base de datos
 logger = logging.getLogger("Database")
@@ -28,28 +43,119 @@ DATABASE_URL = os.getenv(
     "DATABASE_URL", f"sqlite:///{DEFAULT_SQLITE_PATH}"
     )
 
+# PRAGMAs aplicados a cada conexión SQLite nueva
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT", "30000")),
+    "foreign_keys": "ON",
+}
+
+# Pool compartido por los hilos escritores del scraper y los lectores de Flask
+POOL_SETTINGS = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+    "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+}
+
+def _build_engine(url: str):
+    """Crea el engine con el pool y los argumentos adecuados al motor."""
+    if not url.startswith("sqlite"):
+        return create_engine(url, echo=False, pool_pre_ping=True, **POOL_SETTINGS)
+
+    connect_args = {
+        # Las conexiones del pool pasan entre hilos (workers, Flask)
+        "check_same_thread": False,
+        "timeout": SQLITE_PRAGMAS["busy_timeout"] / 1000,
+    }
+    if url in ("sqlite://", "sqlite:///:memory:"):
+        # En memoria: una sola conexión o cada una vería otra base
+        return create_engine(url, echo=False, connect_args=connect_args,
+                             poolclass=StaticPool)
+    return create_engine(url, echo=False, connect_args=connect_args,
+                         poolclass=QueuePool, **POOL_SETTINGS)
+
 # Creación del engine de SQLAlchemy
-engine = create_engine(DATABASE_URL, echo=False)
+engine = _build_engine(DATABASE_URL)
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine, "connect")
+    def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+        """Aplica los PRAGMAs configurados a cada conexión nueva."""
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma, value in SQLITE_PRAGMAS.items():
+                cursor.execute(f"PRAGMA {pragma}={value}")
+        finally:
+            cursor.close()
 
 # Configuración del sessionmaker para gestionar sesiones de la base de datos
 SessionLocal = sessionmaker(
     autocommit=False, autoflush=False, bind=engine
     )
 
-def init_db():
+# El esquema se crea una sola vez por proceso
+_schema_lock = Lock()
+_schema_ready = False
+
+def init_db(force: bool = False):
     """
     Inicializa la base de datos creando todas las tablas definidas en 
     los modelos.
     
     Esta función utiliza la metadata de SQLAlchemy para crear las tablas 
-    en la base de datos.
+    en la base de datos. Tras la primera llamada exitosa del proceso 
+    las siguientes no hacen nada (salvo force=True), por lo que se puede 
+    invocar antes de cada escritura sin costo.
     """
-    try:
-        Base.metadata.create_all(bind=engine)
-        logger.info("Base de datos inicializada exitosamente.")
-    except Exception as e:
-        logger.error("Error al inicializar la base de datos: %s", str(e))
-        raise
+    global _schema_ready
+    if _schema_ready and not force:
+        return
+    with _schema_lock:
+        if _schema_ready and not force:
+            return
+        try:
+            Base.metadata.create_all(bind=engine)
+            _add_missing_columns()
+            # Diccionarios de las columnas JSON comprimidas
+            with engine.connect() as conn:
+                load_dictionaries(conn)
+            # Índice FTS5 de nombres de producto (solo SQLite)
+            with engine.begin() as conn:
+                ensure_fts(conn)
+            _schema_ready = True
+            logger.info("Base de datos inicializada exitosamente.")
+        except Exception as e:
+            logger.error("Error al inicializar la base de datos: %s", str(e))
+            raise
+
+def _add_missing_columns():
+    """
+    Migración mínima: create_all no altera tablas existentes, así que 
+    las columnas nuevas de los modelos se agregan con ALTER TABLE 
+    ADD COLUMN (nullable, sin restricciones) y luego se crean los 
+    índices declarados que falten.
+    """
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {c["name"] for c in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                conn.execute(text(
+                    f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'
+                ))
+                logger.info("Columna agregada: %s.%s", table.name, column.name)
+            existing_indexes = {i["name"] for i in inspector.get_indexes(table.name)}
+            for index in table.indexes:
+                if index.name not in existing_indexes:
+                    index.create(conn, checkfirst=True)
+                    logger.info("Índice creado: %s", index.name)
 
 def get_db():
     """
@@ -1,8 +1,10 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Text, ForeignKey, Index, JSON
+from sqlalchemy import Column, Integer, String, DateTime, Float, Text, ForeignKey, Index, JSON, Boolean, LargeBinary
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
 
+from src.db.compression import CompressedJSON
+
 Base = declarative_base()
 
 class ScrapingSession(Base):
@@ -15,6 +17,8 @@ class ScrapingSession(Base):
     total_items = Column(Integer, default=0)
     successful_items = Column(Integer, default=0)
     failed_items = Column(Integer, default=0)
+    # Registros sin cambios (mismo payload_hash) que no se reescribieron
+    skipped_items = Column(Integer, default=0)
     
     scraped_items = relationship(
         "ScrapedData", 
@@ -31,8 +35,12 @@ class ScrapedData(Base):
     url = Column(String(500), nullable=False, index=True)
     tipo = Column(String(50), nullable=False, index=True)
     
-    # Campo para almacenar datos genéricos en JSON
-    contenido = Column(JSON)
+    # Campo para almacenar datos genéricos en JSON (comprimido y diferido: 
+    # solo se lee y descomprime al acceder al atributo)
+    contenido = deferred(Column(CompressedJSON), group='json')
+    
+    # Hash compacto del payload: si no cambia, el upsert no reescribe la fila
+    payload_hash = Column(String(16))
     
     # Auditoría
     fecha_extraccion = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
@@ -74,10 +82,13 @@ class ProductoEcommerce(ScrapedData):
     descuento = Column(String(20))
     
     # ✅ De "rating" Dict → guardar completo en JSON
-    rating_metadata = Column(JSON)  # {"rating": "N/A", "rating_count": "Sin calificaciones"}
+    rating_metadata = deferred(Column(CompressedJSON), group='json')  # {"rating": "N/A", "rating_count": "Sin calificaciones"}
     
     # ✅ De "description" → "descripcion" (JSON para mantener estructura de listas)
-    descripcion = Column(JSON)
+    descripcion = deferred(Column(CompressedJSON), group='json')
+    
+    # ✅ De "category" → "categoria" (breadcrumb o término de búsqueda)
+    categoria = Column(String(100))
     
     __mapper_args__ = {
         'polymorphic_identity': 'e-commerce'
@@ -86,5 +97,52 @@ class ProductoEcommerce(ScrapedData):
     __table_args__ = (
         Index('idx_nombre', 'nombre'),
         Index('idx_precio', 'precio'),
+        # Cubre GROUP BY categoria con MIN/AVG/MAX(precio) sin leer la tabla
+        Index('idx_categoria_precio', 'categoria', 'precio'),
+    )
+
+
+class PrecioHistorico(Base):
+    """
+    Historial append-only de precios de productos e-commerce.
+
+    Solo se agrega un punto cuando cambia el precio, el precio original 
+    o el descuento. Con codificación delta los precios de un punto son 
+    la diferencia con el punto anterior, salvo en los keyframes 
+    (es_delta=False) que guardan valores absolutos.
+    """
+    __tablename__ = "precios_historicos"
+    
+    id = Column(Integer, primary_key=True)
+    producto_id = Column(
+        Integer, 
+        ForeignKey('productos_ecommerce.id', ondelete='CASCADE'), 
+        nullable=False
+    )
+    fecha = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Número de punto dentro del historial del producto (0, 1, 2, ...)
+    secuencia = Column(Integer, nullable=False, default=0)
+    
+    precio = Column(Float)
+    precio_original = Column(Float)
+    descuento = Column(String(20))
+    es_delta = Column(Boolean, nullable=False, default=False)
+    
+    session_id = Column(Integer, ForeignKey('scraping_sessions.id', ondelete='SET NULL'))
+    
+    __table_args__ = (
+        # "Historial del producto X" (ordenado por fecha)
+        Index('idx_precio_hist_producto_fecha', 'producto_id', 'fecha'),
+        # "Todos los cambios desde T"
+        Index('idx_precio_hist_fecha', 'fecha'),
     )
 
+
+class DiccionarioCompresion(Base):
+    """Diccionarios entrenados para las columnas CompressedJSON"""
+    __tablename__ = "diccionarios_compresion"
+    
+    id = Column(Integer, primary_key=True)
+    codec = Column(Integer, nullable=False)
+    datos = Column(LargeBinary, nullable=False)
+    fecha = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Módulo: price_history.py
+Descripción:
+    Historial append-only de precios (tabla precios_historicos).
+
+    - record_price_observations: recibe el estado actual de varios
+    productos y solo agrega un punto a los que cambiaron de precio,
+    precio original o descuento respecto a su último punto.
+    - Codificación delta opcional: cada punto guarda la diferencia con
+    el anterior y cada KEYFRAME_INTERVAL puntos se guarda un keyframe
+    con valores absolutos. Los precios enteros pequeños ocupan menos
+    en SQLite (se guardan como enteros de longitud variable). Las
+    diferencias se redondean a centavos al codificar y al decodificar,
+    así el historial no acumula error de punto flotante; un precio con
+    más decimales se guarda como keyframe.
+    - get_price_history / get_price_changes_since: lecturas ya
+    decodificadas (valores absolutos).
+    - backfill_price_history: reconstruye el historial a partir de las
+    filas actuales de productos_ecommerce y de los JSON / NDJSON
+    archivados en outputs/.
+
+    Variables de entorno:
+    - PRICE_HISTORY_DELTA      (0)   1 para activar la codificación delta
+    - PRICE_HISTORY_KEYFRAME   (16)  puntos entre keyframes
+
+    Uso del backfill:
+        python -m src.db.price_history [--json-dir DIR ...] [--delta]
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from sqlalchemy import and_, case, func, select
+
+from src.db.models import PrecioHistorico, ProductoEcommerce, ScrapedData
+
+logger = logging.getLogger("PriceHistory")
+
+PRICE_HISTORY_DELTA = os.getenv("PRICE_HISTORY_DELTA", "0") == "1"
+KEYFRAME_INTERVAL = max(1, int(os.getenv("PRICE_HISTORY_KEYFRAME", "16")))
+
+# Tamaño de bloque para consultas IN (mismo límite que DataHandler)
+CHUNK_SIZE = 500
+
+# Decimales de los precios (centavos) en las diferencias de la codificación delta
+PRICE_DECIMALS = 2
+
+# (precio, precio_original, descuento) en valores absolutos
+PriceState = Tuple[Optional[float], Optional[float], Optional[str]]
+
+
+def _chunks(items: List, size: int = CHUNK_SIZE) -> Iterator[List]:
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _in_cents(value: Optional[float]) -> bool:
+    """Si el precio no tiene más decimales que PRICE_DECIMALS"""
+    return value is not None and round(value, PRICE_DECIMALS) == value
+
+
+def _decode(rows: Iterable[PrecioHistorico]) -> List[Dict]:
+    """
+    Decodifica puntos de un mismo producto ordenados por secuencia.
+    El primero debe ser un keyframe.
+    """
+    decoded = []
+    precio = precio_original = None
+    for row in rows:
+        if row.es_delta:
+            precio = round(precio + row.precio, PRICE_DECIMALS)
+            precio_original = round(precio_original + row.precio_original, PRICE_DECIMALS)
+        else:
+            precio, precio_original = row.precio, row.precio_original
+        decoded.append({
+            "producto_id": row.producto_id,
+            "fecha": row.fecha,
+            "secuencia": row.secuencia,
+            "precio": precio,
+            "precio_original": precio_original,
+            "descuento": row.descuento,
+            "session_id": row.session_id,
+        })
+    return decoded
+
+
+def _encode(producto_id: int, secuencia: int, state: PriceState,
+            previous: Optional[PriceState], fecha: datetime,
+            session_id: Optional[int], delta: bool) -> PrecioHistorico:
+    """Crea el punto `secuencia` de un producto (delta o keyframe)"""
+    precio, precio_original, descuento = state
+    use_delta = (
+        delta
+        and previous is not None
+        and secuencia % KEYFRAME_INTERVAL != 0
+        # Los nulos no admiten diferencia y un precio con más decimales 
+        # que centavos no se reconstruiría exacto: se fuerza un keyframe
+        and all(map(_in_cents, (precio, precio_original, previous[0], previous[1])))
+    )
+    if use_delta:
+        precio = round(precio - previous[0], PRICE_DECIMALS)
+        precio_original = round(precio_original - previous[1], PRICE_DECIMALS)
+    return PrecioHistorico(
+        producto_id=producto_id,
+        fecha=fecha,
+        secuencia=secuencia,
+        precio=precio,
+        precio_original=precio_original,
+        descuento=descuento,
+        es_delta=use_delta,
+        session_id=session_id,
+    )
+
+
+def _rows_from_last_keyframe(session, producto_ids: List[int],
+                             before: Optional[datetime] = None) -> Dict[int, List[PrecioHistorico]]:
+    """
+    Puntos desde el último keyframe de cada producto (anterior a
+    `before` si se indica), agrupados por producto y ordenados.
+    """
+    rows_by_product: Dict[int, List[PrecioHistorico]] = defaultdict(list)
+    for chunk in _chunks(producto_ids):
+        conditions = [PrecioHistorico.producto_id.in_(chunk)]
+        if before is not None:
+            conditions.append(PrecioHistorico.fecha < before)
+        keyframes = (
+            select(
+                PrecioHistorico.producto_id.label("producto_id"),
+                func.max(case(
+                    (PrecioHistorico.es_delta.is_(False), PrecioHistorico.secuencia)
+                )).label("keyframe"),
+            )
+            .where(*conditions)
+            .group_by(PrecioHistorico.producto_id)
+            .subquery()
+        )
+        stmt = (
+            select(PrecioHistorico)
+            .join(keyframes, and_(
+                PrecioHistorico.producto_id == keyframes.c.producto_id,
+                PrecioHistorico.secuencia >= keyframes.c.keyframe,
+            ))
+            .where(*conditions)
+            .order_by(PrecioHistorico.producto_id, PrecioHistorico.secuencia)
+        )
+        for row in session.scalars(stmt):
+            rows_by_product[row.producto_id].append(row)
+    return rows_by_product
+
+
+def last_states(session, producto_ids: List[int]) -> Dict[int, Tuple[int, PriceState]]:
+    """{producto_id: (última secuencia, último estado absoluto)}"""
+    states = {}
+    for producto_id, rows in _rows_from_last_keyframe(session, producto_ids).items():
+        last = _decode(rows)[-1]
+        states[producto_id] = (
+            last["secuencia"],
+            (last["precio"], last["precio_original"], last["descuento"]),
+        )
+    return states
+
+
+def record_price_observations(session, observations: Dict[int, PriceState],
+                              fecha: Optional[datetime] = None,
+                              session_id: Optional[int] = None,
+                              delta: Optional[bool] = None) -> int:
+    """
+    Agrega un punto por cada producto cuyo estado cambió respecto a su
+    último punto (o que aún no tiene historial). No hace commit.
+
+    Returns:
+        Número de puntos agregados
+    """
+    if not observations:
+        return 0
+    delta = PRICE_HISTORY_DELTA if delta is None else delta
+    fecha = fecha or datetime.now()
+    previous = last_states(session, list(observations))
+
+    points = []
+    for producto_id, state in observations.items():
+        last_seq, last_state = previous.get(producto_id, (-1, None))
+        if last_state == state:
+            continue
+        points.append(_encode(producto_id, last_seq + 1, state, last_state,
+                              fecha, session_id, delta))
+    session.add_all(points)
+    return len(points)
+
+
+def get_price_history(session, producto_id: int) -> List[Dict]:
+    """Historial completo de un producto, ordenado por fecha"""
+    rows = session.scalars(
+        select(PrecioHistorico)
+        .where(PrecioHistorico.producto_id == producto_id)
+        .order_by(PrecioHistorico.fecha, PrecioHistorico.secuencia)
+    )
+    return _decode(rows)
+
+
+def get_price_changes_since(session, since: datetime) -> List[Dict]:
+    """Todos los puntos con fecha >= since, decodificados y ordenados por fecha"""
+    window: Dict[int, List[PrecioHistorico]] = defaultdict(list)
+    rows = session.scalars(
+        select(PrecioHistorico)
+        .where(PrecioHistorico.fecha >= since)
+        .order_by(PrecioHistorico.producto_id, PrecioHistorico.secuencia)
+    )
+    for row in rows:
+        window[row.producto_id].append(row)
+
+    # Si el primer punto de la ventana es delta, su keyframe es anterior a `since`
+    needs_base = [pid for pid, rows in window.items() if rows[0].es_delta]
+    base = _rows_from_last_keyframe(session, needs_base, before=since) if needs_base else {}
+
+    changes = []
+    for producto_id, rows in window.items():
+        prefix = base.get(producto_id, [])
+        changes.extend(_decode(prefix + rows)[len(prefix):])
+    changes.sort(key=lambda point: point["fecha"])
+    return changes
+
+
+# ---------------------------------------------------------------------------
+# Backfill
+# ---------------------------------------------------------------------------
+
+def _parse_fecha(value, fallback: datetime) -> datetime:
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value)
+        except ValueError:
+            pass
+    return fallback
+
+
+def _iter_archived_records(json_dirs: List[str]) -> Iterator[Tuple[Dict, datetime]]:
+    """Productos archivados en JSON (uno por archivo) y NDJSON de sesión"""
+    from src.components.ndjson_writer import NDJSONSessionReader
+
+    for json_dir in json_dirs:
+        for path in sorted(glob.glob(os.path.join(json_dir, "**", "*"), recursive=True)):
+            if not os.path.isfile(path):
+                continue
+            mtime = datetime.fromtimestamp(os.path.getmtime(path))
+            try:
+                if path.endswith((".ndjson", ".ndjson.gz", ".ndjson.zst")):
+                    records = iter(NDJSONSessionReader(path))
+                elif path.endswith(".json"):
+                    with open(path, "r", encoding="utf-8") as f:
+                        content = json.load(f)
+                    records = content if isinstance(content, list) else [content]
+                else:
+                    continue
+                for record in records:
+                    if isinstance(record, dict) and record.get("url"):
+                        yield record, _parse_fecha(record.get("scraped_at"), mtime)
+            except (OSError, ValueError, ImportError) as e:
+                logger.warning(f"No se pudo leer {path}: {e}")
+
+
+def backfill_price_history(session, json_dirs: Optional[List[str]] = None,
+                           delta: Optional[bool] = None) -> Dict[str, int]:
+    """
+    Reconstruye el historial de precios combinando:
+    1. Los puntos ya existentes en precios_historicos.
+    2. El estado actual de cada fila de productos_ecommerce.
+    3. Los productos archivados en JSON / NDJSON (`json_dirs`).
+
+    Las observaciones se ordenan por fecha, se descartan las que no
+    cambian respecto a la anterior y el historial de cada producto se
+    reescribe completo, por lo que es idempotente. Hace commit.
+    """
+    from src.components.data_handler import DataHandler
+
+    delta = PRICE_HISTORY_DELTA if delta is None else delta
+    observations: Dict[str, List[Tuple[datetime, PriceState, Optional[int]]]] = defaultdict(list)
+
+    # Historial existente (se conserva al reescribir)
+    existing: Dict[int, List[PrecioHistorico]] = defaultdict(list)
+    for point in session.scalars(select(PrecioHistorico).order_by(
+            PrecioHistorico.producto_id, PrecioHistorico.secuencia)):
+        existing[point.producto_id].append(point)
+    decoded_by_id = {pid: _decode(points) for pid, points in existing.items()}
+
+    # Estado actual de los productos en la base
+    ids_by_url: Dict[str, int] = {}
+    rows = session.execute(select(
+        ProductoEcommerce.id, ScrapedData.url, ScrapedData.fecha_extraccion,
+        ScrapedData.fecha_actualizacion, ScrapedData.session_id,
+        ProductoEcommerce.precio, ProductoEcommerce.precio_original,
+        ProductoEcommerce.descuento,
+    ))
+    for pid, url, extraido, actualizado, session_id, precio, original, descuento in rows:
+        ids_by_url[url] = pid
+        state = (precio, original, descuento)
+        fecha = actualizado or extraido
+        history = decoded_by_id.get(pid, [])
+        for point in history:
+            observations[url].append((
+                point["fecha"],
+                (point["precio"], point["precio_original"], point["descuento"]),
+                point["session_id"],
+            ))
+        if history:
+            last = history[-1]
+            if (last["precio"], last["precio_original"], last["descuento"]) == state:
+                continue
+            # La fila actual es posterior a todo su historial
+            fecha = max(fecha, last["fecha"])
+        observations[url].append((fecha, state, session_id))
+
+    # JSON / NDJSON archivados
+    archived = unknown = 0
+    for record, fecha in _iter_archived_records(json_dirs or []):
+        if record["url"] not in ids_by_url:
+            unknown += 1
+            continue
+        state = (
+            DataHandler._to_float(record.get("price_sell")),
+            DataHandler._to_float(record.get("price_original")),
+            record.get("discount"),
+        )
+        observations[record["url"]].append((fecha, state, None))
+        archived += 1
+
+    written = 0
+    for url, items in observations.items():
+        pid = ids_by_url[url]
+        items.sort(key=lambda item: item[0])
+        for point in existing.get(pid, []):
+            session.delete(point)
+
+        secuencia = 0
+        previous: Optional[PriceState] = None
+        for fecha, state, session_id in items:
+            if state == previous:
+                continue
+            session.add(_encode(pid, secuencia, state, previous, fecha, session_id, delta))
+            previous = state
+            secuencia += 1
+        written += secuencia
+
+    session.commit()
+    stats = {
+        "productos": len(observations),
+        "observaciones_archivadas": archived,
+        "observaciones_sin_producto": unknown,
+        "puntos_escritos": written,
+    }
+    logger.info(f"Backfill de historial de precios: {stats}")
+    return stats
+
+
+if __name__ == "__main__":
+    from src.components.data_handler import session_output_dir
+    from src.db.database import SessionLocal, init_db
+
+    parser = argparse.ArgumentParser(
+        description="Reconstruye precios_historicos desde la base y los JSON archivados"
+    )
+    parser.add_argument("--json-dir", action="append", dest="json_dirs",
+                        help="Carpeta con JSON / NDJSON archivados (repetible)")
+    parser.add_argument("--delta", action="store_true",
+                        help="Escribir con codificación delta")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    init_db()
+    db = SessionLocal()
+    try:
+        print(backfill_price_history(
+            db,
+            json_dirs=args.json_dirs or [session_output_dir("e-commerce")],
+            delta=args.delta or None,
+        ))
+    finally:
+        db.close()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Módulo: search.py
+Descripción:
+    Búsqueda de texto completo de productos con SQLite FTS5.
+
+    - productos_fts: tabla virtual FTS5 de contenido externo sobre
+    productos_ecommerce.nombre (sin duplicar el texto).
+    - Triggers AFTER INSERT / UPDATE / DELETE la mantienen sincronizada
+    con cualquier escritura (ORM, bulk_insert_mappings o SQL directo).
+    - search_products: resultados ordenados por relevancia (bm25) con
+    filtros de precio y paginación por keyset (score, id), sin OFFSET.
+
+    El tokenizador unicode61 con remove_diacritics permite buscar
+    "cafetera electrica" y encontrar "Cafetera Eléctrica".
+"""
+
+import base64
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+logger = logging.getLogger("Search")
+
+FTS_TABLE = "productos_fts"
+
+_FTS_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        nombre,
+        content='productos_ecommerce',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS productos_fts_ai AFTER INSERT ON productos_ecommerce BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, nombre) VALUES (new.id, new.nombre);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS productos_fts_ad AFTER DELETE ON productos_ecommerce BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, nombre) VALUES ('delete', old.id, old.nombre);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS productos_fts_au AFTER UPDATE OF nombre ON productos_ecommerce BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, nombre) VALUES ('delete', old.id, old.nombre);
+        INSERT INTO {FTS_TABLE}(rowid, nombre) VALUES (new.id, new.nombre);
+    END
+    """,
+]
+
+# Palabras de la consulta (letras, dígitos y signos internos como 4k, 5.1, wi-fi)
+_TOKEN = re.compile(r"\w[\w.\-]*", re.UNICODE)
+
+
+class SearchUnavailableError(Exception):
+    """Excepción lanzada cuando el motor no soporta FTS5"""
+    pass
+
+
+def ensure_fts(connection) -> bool:
+    """
+    Crea la tabla FTS5 y sus triggers si no existen. Si la tabla es
+    nueva se indexan los productos ya existentes (rebuild).
+
+    Returns:
+        True si la búsqueda de texto completo está disponible
+    """
+    if connection.dialect.name != "sqlite":
+        return False
+    existed = connection.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=:name"
+    ), {"name": FTS_TABLE}).first() is not None
+    try:
+        for ddl in _FTS_DDL:
+            connection.execute(text(ddl))
+    except Exception as e:
+        logger.warning(f"FTS5 no disponible: {e}")
+        return False
+    if not existed:
+        connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        logger.info("Índice de búsqueda de productos creado")
+    return True
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    Convierte texto libre en una consulta FTS5 segura: cada palabra
+    entre comillas (sin operadores del usuario) y la última como prefijo
+    para búsquedas mientras se escribe ("samsung gal" -> galaxy).
+    """
+    tokens = _TOKEN.findall(query or "")
+    if not tokens:
+        return None
+    quoted = ['"' + token.replace('"', '""') + '"' for token in tokens]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def encode_cursor(score: float, product_id: int) -> str:
+    """Cursor opaco de keyset (score, id)"""
+    raw = f"{score!r}:{product_id}".encode("ascii")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[float, int]:
+    padded = cursor + "=" * (-len(cursor) % 4)
+    score, product_id = base64.urlsafe_b64decode(padded).decode("ascii").split(":")
+    return float(score), int(product_id)
+
+
+def search_products(session, query: str,
+                    min_precio: Optional[float] = None,
+                    max_precio: Optional[float] = None,
+                    limit: int = 20,
+                    cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+    """
+    Busca productos por nombre ordenados por relevancia.
+
+    Returns:
+        ([{"id", "score"}...], cursor de la página siguiente o None)
+    """
+    if session.get_bind().dialect.name != "sqlite":
+        raise SearchUnavailableError("La búsqueda de texto requiere SQLite con FTS5")
+    match = build_match_query(query)
+    if match is None:
+        return [], None
+
+    conditions = [f"{FTS_TABLE} MATCH :match"]
+    params = {"match": match, "limit": limit + 1}
+    if min_precio is not None:
+        conditions.append("p.precio >= :min_precio")
+        params["min_precio"] = min_precio
+    if max_precio is not None:
+        conditions.append("p.precio <= :max_precio")
+        params["max_precio"] = max_precio
+    if cursor:
+        params["after_score"], params["after_id"] = decode_cursor(cursor)
+        conditions.append(
+            "(f.rank > :after_score OR (f.rank = :after_score AND p.id > :after_id))"
+        )
+
+    # rank de FTS5 es bm25(): menor = más relevante
+    sql = text(f"""
+        SELECT p.id, f.rank AS score
+        FROM {FTS_TABLE} AS f
+        JOIN productos_ecommerce AS p ON p.id = f.rowid
+        WHERE {" AND ".join(conditions)}
+        ORDER BY f.rank, p.id
+        LIMIT :limit
+    """)
+    try:
+        rows = session.execute(sql, params).all()
+    except Exception as e:
+        if "no such table" in str(e):
+            raise SearchUnavailableError("Índice de búsqueda no inicializado") from e
+        raise
+
+    results = [{"id": row.id, "score": row.score} for row in rows[:limit]]
+    next_cursor = None
+    if len(rows) > limit:
+        last = results[-1]
+        next_cursor = encode_cursor(last["score"], last["id"])
+    return results, next_cursor
@@ -0,0 +1,74 @@
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    Implementación propia de filtro de Bloom.
+
+    Estructura probabilística para pertenencia a conjuntos: nunca da
+    falsos negativos y la tasa de falsos positivos se acota con
+    `error_rate` mientras no se superen `capacity` elementos.
+
+    Complejidades:
+    - add: O(k)
+    - contains: O(k)
+    - memoria: ~ -n·ln(p) / ln(2)² bits (≈1.2 MB para 1M claves con p=0.1%)
+    """
+
+    def __init__(self, capacity: int = 1_000_000, error_rate: float = 0.001):
+        if capacity < 1:
+            raise ValueError("La capacidad debe ser mayor que 0")
+        if not 0 < error_rate < 1:
+            raise ValueError("error_rate debe estar entre 0 y 1")
+
+        self.capacity = capacity
+        self.error_rate = error_rate
+        # Tamaño óptimo del arreglo de bits y número de funciones hash
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self._count = 0
+
+    def _positions(self, item: str):
+        """Genera las k posiciones con doble hashing (Kirsch-Mitzenmacher)"""
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str) -> bool:
+        """
+        Inserta un elemento. Retorna True si el elemento era nuevo
+        (algún bit estaba en 0).
+        """
+        is_new = False
+        for pos in self._positions(item):
+            byte, mask = pos >> 3, 1 << (pos & 7)
+            if not self._bits[byte] & mask:
+                self._bits[byte] |= mask
+                is_new = True
+        if is_new:
+            self._count += 1
+        return is_new
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[pos >> 3] & (1 << (pos & 7))
+            for pos in self._positions(item)
+        )
+
+    def __len__(self):
+        """Número aproximado de elementos insertados"""
+        return self._count
+
+    @property
+    def size_bytes(self) -> int:
+        """Memoria ocupada por el arreglo de bits"""
+        return len(self._bits)
+
+    def clear(self):
+        """Limpia el filtro"""
+        self._bits = bytearray(len(self._bits))
+        self._count = 0
@@ -0,0 +1,172 @@
+"""
+Descripción:
+    Cancelación cooperativa de tareas de scraping.
+
+    - CancelToken: bandera thread-safe que el extractor consulta entre
+    páginas y scrolls (check() / wait()).
+    - Callbacks de cancelación: los recursos externos (WebDriver,
+    proceso de Chrome) se registran en el token y se liberan a la
+    fuerza en cuanto se cancela, aunque el hilo siga bloqueado en una
+    llamada de Selenium.
+    - run_with_deadline: ejecuta una función en un hilo daemon con plazo
+    máximo; al vencer cancela el token y espera un margen de gracia.
+    - kill_process_tree: termina un proceso y todos sus hijos (psutil si
+    está disponible; si no, solo el proceso raíz).
+"""
+
+import logging
+import os
+import signal
+import threading
+from typing import Any, Callable, Dict, List, Optional
+
+# Se importa psutil para terminar el árbol de procesos completo
+try:
+    import psutil
+    PSUTIL_AVAILABLE = True
+except ImportError:
+    PSUTIL_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class TaskCancelledError(Exception):
+    """La tarea fue cancelada (timeout o cierre del coordinador)"""
+    pass
+
+
+class CancelToken:
+    """
+    Token de cancelación compartido entre el coordinador y el extractor.
+    """
+
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+        self.reason: Optional[str] = None
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "cancelada") -> None:
+        """
+        Marca el token como cancelado y ejecuta los callbacks
+        registrados (una sola vez).
+        """
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in reversed(callbacks):
+            try:
+                callback()
+            except Exception as e:
+                logger.debug(f"Error en callback de cancelación: {e}")
+
+    def register(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Registra un callback de liberación. Si el token ya está
+        cancelado se ejecuta de inmediato.
+
+        Returns:
+            Función para retirar el callback (p.ej. tras cerrar el
+            recurso normalmente)
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._unregister(callback)
+        callback()
+        return lambda: None
+
+    def _unregister(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def check(self) -> None:
+        """Lanza TaskCancelledError si el token fue cancelado"""
+        if self._event.is_set():
+            raise TaskCancelledError(self.reason or "cancelada")
+
+    def wait(self, seconds: float) -> None:
+        """time.sleep interrumpible: lanza TaskCancelledError al cancelar"""
+        if self._event.wait(max(0.0, seconds)):
+            raise TaskCancelledError(self.reason or "cancelada")
+
+
+class DeadlineExceeded(Exception):
+    """
+    La función no terminó en el plazo. `abandoned` indica que tampoco
+    terminó durante el margen de gracia tras cancelarla.
+    """
+
+    def __init__(self, timeout: float, abandoned: bool = False):
+        super().__init__(f"Timeout de {timeout}s excedido")
+        self.timeout = timeout
+        self.abandoned = abandoned
+
+
+def run_with_deadline(func: Callable[[], Any], timeout: float,
+                      cancel_token: Optional[CancelToken] = None,
+                      grace_period: float = 5.0) -> Any:
+    """
+    Ejecuta func() en un hilo daemon y espera como máximo `timeout`
+    segundos. Al vencer cancela `cancel_token` y espera al hilo hasta
+    `grace_period` segundos; si sigue vivo se abandona.
+
+    Raises:
+        DeadlineExceeded: si no terminó a tiempo
+    """
+    outcome: Dict[str, Any] = {}
+
+    def target():
+        try:
+            outcome['value'] = func()
+        except BaseException as e:
+            outcome['error'] = e
+
+    worker = threading.Thread(target=target, name='scrape-attempt', daemon=True)
+    worker.start()
+    worker.join(timeout)
+    if worker.is_alive():
+        if cancel_token is not None:
+            cancel_token.cancel(f"Timeout de {timeout}s excedido")
+            worker.join(grace_period)
+        raise DeadlineExceeded(timeout, abandoned=worker.is_alive())
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['value']
+
+
+def kill_process_tree(pid: Optional[int]) -> int:
+    """
+    Termina (SIGKILL) el proceso `pid` y sus descendientes.
+
+    Returns:
+        Número de procesos terminados
+    """
+    if not pid:
+        return 0
+    if PSUTIL_AVAILABLE:
+        try:
+            root = psutil.Process(pid)
+            procs = root.children(recursive=True) + [root]
+        except psutil.NoSuchProcess:
+            return 0
+        for proc in procs:
+            try:
+                proc.kill()
+            except psutil.NoSuchProcess:
+                pass
+        psutil.wait_procs(procs, timeout=3)
+        return len(procs)
+    try:
+        os.kill(pid, getattr(signal, 'SIGKILL', signal.SIGTERM))
+        return 1
+    except OSError:
+        return 0
@@ -2,8 +2,8 @@ import hashlib
 import os
 import re
 
-from typing import List, Dict, Union
-from urllib.parse import urlparse
+from typing import Any, List, Dict, Optional, Union
+from urllib.parse import urlparse, parse_qsl, urlencode, unquote
 
 def validate_url(url: str) -> bool:
     """Valida que una URL tenga formato correcto"""
@@ -61,75 +61,220 @@ def clean_filename(filename: str, max_length: int = 100) -> str:
     # Limitar longitud y eliminar espacios
     return cleaned[:max_length].strip('_')
 
-def calculate_stats(results: List[Dict]) -> Dict[str, Union[int, float, str]]:
+class RunStats:
     """
-    Calcula estadísticas completas de los resultados del scraping.
+    Estadísticas de resultados calculadas de forma incremental: cada 
+    resultado se agrega con add() y no necesita quedar en memoria.
     """
-    stats = {
-        'total': len(results),
-        'success': 0,
-        'errors': 0,
-        'cached': 0,
-        'circuit_breaker_blocks': 0,
-        'error_types': {},
-        'total_time': 0.0,
-        'avg_time': 0.0,
-        'min_time': float('inf'),
-        'max_time': 0.0
-    }
-    
-    if len(results) == 0:
-        stats['min_time'] = 0.0
-        return stats
-    
-    for result in results:
+
+    def __init__(self):
+        self.total = 0
+        self.success = 0
+        self.errors = 0
+        self.cached = 0
+        self.circuit_breaker_blocks = 0
+        self.error_types: Dict[str, int] = {}
+        self.total_time = 0.0
+        self.min_time = float('inf')
+        self.max_time = 0.0
+
+    def add(self, result: Dict) -> None:
+        """Incorpora un resultado de tarea"""
+        self.total += 1
         # Contar éxitos y errores
         if 'error' in result:
-            stats['errors'] += 1
+            self.errors += 1
             # Registrar tipos de error
             error_type = result.get('error_type', 'Unknown')
-            stats['error_types'][error_type] = stats['error_types'].get(error_type, 0) + 1
+            self.error_types[error_type] = self.error_types.get(error_type, 0) + 1
         else:
-            stats['success'] += 1
+            self.success += 1
         
         # Contar resultados desde caché
         if result.get('from_cache', False):
-            stats['cached'] += 1
+            self.cached += 1
         
         # Contar bloqueos por circuit breaker
         if result.get('circuit_breaker', False):
-            stats['circuit_breaker_blocks'] += 1
+            self.circuit_breaker_blocks += 1
         
         # Calcular estadísticas de tiempo
         duration = result.get('metrics', {}).get('duration', 0)
         if duration > 0:
-            stats['total_time'] += duration
-            stats['min_time'] = min(stats['min_time'], duration)
-            stats['max_time'] = max(stats['max_time'], duration)
-    
-    # Calcular tasas porcentuales
-    if stats['total'] > 0:
-        stats['success_rate'] = f"{(stats['success'] / stats['total']) * 100:.1f}%"
-        stats['error_rate'] = f"{(stats['errors'] / stats['total']) * 100:.1f}%"
-        stats['cache_rate'] = f"{(stats['cached'] / stats['total']) * 100:.1f}%"
-    
-    # Calcular tiempo promedio
-    if stats['success'] > 0:
-        stats['avg_time'] = f"{stats['total_time'] / stats['success']:.2f}s"
-    else:
-        stats['avg_time'] = "0.00s"
-    
-    # Formatear tiempos min/max
-    if stats['min_time'] == float('inf'):
-        stats['min_time'] = "0.00s"
-    else:
-        stats['min_time'] = f"{stats['min_time']:.2f}s"
-    
-    stats['max_time'] = f"{stats['max_time']:.2f}s"
-    stats['total_time'] = f"{stats['total_time']:.2f}s"
-    
-    return stats
+            self.total_time += duration
+            self.min_time = min(self.min_time, duration)
+            self.max_time = max(self.max_time, duration)
+
+    def summary(self) -> Dict[str, Union[int, float, str]]:
+        """Estadísticas con el formato de calculate_stats"""
+        stats = {
+            'total': self.total,
+            'success': self.success,
+            'errors': self.errors,
+            'cached': self.cached,
+            'circuit_breaker_blocks': self.circuit_breaker_blocks,
+            'error_types': dict(self.error_types),
+            'total_time': 0.0,
+            'avg_time': 0.0,
+            'min_time': 0.0,
+            'max_time': 0.0
+        }
+        
+        if self.total == 0:
+            return stats
+        
+        # Calcular tasas porcentuales
+        stats['success_rate'] = f"{(self.success / self.total) * 100:.1f}%"
+        stats['error_rate'] = f"{(self.errors / self.total) * 100:.1f}%"
+        stats['cache_rate'] = f"{(self.cached / self.total) * 100:.1f}%"
+        
+        # Calcular tiempo promedio
+        if self.success > 0:
+            stats['avg_time'] = f"{self.total_time / self.success:.2f}s"
+        else:
+            stats['avg_time'] = "0.00s"
+        
+        # Formatear tiempos min/max
+        if self.min_time == float('inf'):
+            stats['min_time'] = "0.00s"
+        else:
+            stats['min_time'] = f"{self.min_time:.2f}s"
+        
+        stats['max_time'] = f"{self.max_time:.2f}s"
+        stats['total_time'] = f"{self.total_time:.2f}s"
+        
+        return stats
+
+def calculate_stats(results: List[Dict]) -> Dict[str, Union[int, float, str]]:
+    """
+    Calcula estadísticas completas de los resultados del scraping.
+    """
+    stats = RunStats()
+    for result in results:
+        stats.add(result)
+    return stats.summary()
 
 def generate_hash(content: str, length: int = 8) -> str:
     """Genera un hash único para contenido"""
-    return hashlib.md5(content.encode()).hexdigest()[:length]
\ No newline at end of file
+    return hashlib.md5(content.encode()).hexdigest()[:length]
+
+_NUMBER = re.compile(r'\d+(?:[.,]\d+)?')
+
+def parse_number(value: Any) -> Optional[float]:
+    """Primer número de textos como "4.5 de 5" o "35% OFF"; None si no hay"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    match = _NUMBER.search(value)
+    return float(match.group().replace(',', '.')) if match else None
+
+def parse_count(value: Any) -> Optional[int]:
+    """Conteos con separador de miles ("1.234 reseñas" -> 1234)"""
+    if isinstance(value, int):
+        return value
+    if not isinstance(value, str):
+        return None
+    digits = re.sub(r'\D', '', value)
+    return int(digits) if digits else None
+
+CATEGORY_MAX_LENGTH = 100
+
+def normalize_category(value: Any) -> Optional[str]:
+    """
+    Normaliza una categoría para agrupar de forma consistente
+    ("  CELULARES   samsung " -> "Celulares samsung"); None si está vacía.
+    """
+    if not isinstance(value, str):
+        return None
+    text = ' '.join(value.split()).strip(' >/|')
+    if not text:
+        return None
+    text = text.lower()
+    return (text[0].upper() + text[1:])[:CATEGORY_MAX_LENGTH]
+
+# Identificadores de publicación de MercadoLibre (MCO-123456, MLA123456, ...)
+_ML_ITEM_ID = re.compile(r'\b(M[A-Z]{2})-?(\d{6,})\b')
+# Parámetros de query que solo llevan tracking y no identifican el producto
+_TRACKING_PARAMS = {
+    'tracking_id', 'searchvariation', 'position', 'search_layout', 'type',
+    'sid', 'wid', 'polycard_client', 'gclid', 'fbclid', 'ref', 'source'
+}
+# Producto de catálogo de MercadoLibre (/p/MCO123456)
+_ML_CATALOG_ID = re.compile(r'/p/(M[A-Z]{2}\d+)')
+# Código de producto de Alkosto al final de la ruta (/p/7705946478601)
+_ALKOSTO_PRODUCT_ID = re.compile(r'/p/([A-Za-z0-9-]+)/?$')
+
+def detect_store(url: str) -> str:
+    """Retorna la tienda asociada a una URL o 'desconocida'"""
+    netloc = urlparse(url or '').netloc.lower()
+    if 'mercadolibre' in netloc:
+        return 'mercadolibre'
+    if 'alkosto' in netloc:
+        return 'alkosto'
+    return 'desconocida'
+
+def domain_key(url: str) -> str:
+    """
+    Clave de dominio para límites por host: la tienda si se reconoce
+    (agrupa listado.mercadolibre y articulo.mercadolibre) o el netloc.
+    """
+    store = detect_store(url)
+    if store != 'desconocida':
+        return store
+    return urlparse(url or '').netloc.lower() or 'desconocido'
+
+def extract_search_query(url: str) -> str:
+    """
+    Retorna el término de búsqueda de una URL de listado o '' si no aplica.
+
+    - MercadoLibre: primer segmento de la ruta (/celulares-samsung).
+    - Alkosto: parámetro text de /search?text=...
+    """
+    parsed = urlparse(url or '')
+    store = detect_store(url)
+    if store == 'mercadolibre' and parsed.netloc.lower().startswith('listado.'):
+        segment = parsed.path.strip('/').split('/')[0]
+        return unquote(segment).split('_')[0].replace('-', ' ').strip()
+    if store == 'alkosto':
+        for key, value in parse_qsl(parsed.query):
+            if key == 'text':
+                return value.strip()
+    return ''
+
+def canonical_product_key(url: str) -> str:
+    """
+    Genera una clave canónica para un producto a partir de su URL.
+
+    - MercadoLibre: usa el ID de la publicación (MCO-123 y MCO123 son 
+    el mismo producto) aunque cambien el slug, la query o el fragmento 
+    de tracking.
+    - Alkosto: usa el código de producto de la ruta /p/<codigo>.
+    - Otros: esquema + dominio + ruta y los parámetros de query que no 
+    son de tracking (ordenados), sin fragmento.
+    """
+    if not url:
+        return ''
+    parsed = urlparse(url.strip())
+    store = detect_store(url)
+
+    if store == 'mercadolibre':
+        catalog = _ML_CATALOG_ID.search(parsed.path)
+        if catalog:
+            return f"mercadolibre:p:{catalog.group(1)}"
+        # El ID puede venir en la ruta o en el tracking (wid=MCO123)
+        match = _ML_ITEM_ID.search(parsed.path) or _ML_ITEM_ID.search(url)
+        if match:
+            return f"mercadolibre:{match.group(1)}{match.group(2)}"
+    elif store == 'alkosto':
+        match = _ALKOSTO_PRODUCT_ID.search(parsed.path)
+        if match:
+            return f"alkosto:{match.group(1).lower()}"
+
+    path = parsed.path.rstrip('/') or '/'
+    params = sorted(
+        (k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+        if k.lower() not in _TRACKING_PARAMS and not k.lower().startswith('utm_')
+    )
+    query = f"?{urlencode(params)}" if params else ''
+    return f"{parsed.scheme.lower()}://{parsed.netloc.lower()}{path}{query}"
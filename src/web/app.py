@@ -20,6 +20,7 @@ from flask import Flask, jsonify
 from flask_cors import CORS
 from src.web.routes import web_bp
 from src.db.database import init_db
+from src.db.analytics import start_periodic_sync
 
 # Configuración de logging
 logging.basicConfig(
@@ -54,6 +55,9 @@ def create_app(config=None):
     except Exception as e:
         logger.error(f"Error al inicializar la base de datos: {str(e)}")
     
+    # Réplica analítica DuckDB (opcional, ANALYTICS_SYNC_INTERVAL > 0)
+    start_periodic_sync()
+    
     # Habilitar CORS
     CORS(app, resources={
         r"/api/*": {
@@ -78,7 +82,11 @@ def create_app(config=None):
                     "GET /api/data/<id>": "Obtiene un dato específico"
                 },
                 "ecommerce": {
-                    "GET /api/ecommerce": "Lista productos (con filtros de precio)"
+                    "GET /api/ecommerce": "Lista productos (con filtros de precio y categoría)",
+                    "GET /api/categories": "Resumen por categoría (conteo y precios)",
+                    "GET /api/ecommerce/<id>/price-history": "Historial de precios de un producto",
+                    "GET /api/ecommerce/price-changes?since=<fecha>": "Cambios de precio desde una fecha",
+                    "GET /api/search?q=<texto>": "Búsqueda por nombre (relevancia, paginada con cursor)"
                 },
                 "sesiones": {
                     "GET /api/sessions": "Lista todas las sesiones de scraping",
@@ -86,6 +94,10 @@ def create_app(config=None):
                 },
                 "estadisticas": {
                     "GET /api/stats": "Estadísticas generales del sistema"
+                },
+                "analitica": {
+                    "GET /api/analytics": "Reportes disponibles y estado de la réplica DuckDB",
+                    "GET /api/analytics/<reporte>": "Ejecuta un reporte agregado (?desde=&hasta=&tienda=)"
                 }
             },
             "parametros_comunes": {
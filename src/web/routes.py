@@ -12,16 +12,33 @@ Descripción:
     - Rutas para gestionar sesiones de scraping
     - Paginación y filtrado de resultados
     - Estadísticas de sesiones
+    - Historial de precios de productos
+    - Búsqueda de texto completo (FTS5) con paginación por keyset
+    - Resumen por categoría calculado en la base de datos (GROUP BY)
+    - Reportes agregados sobre la réplica analítica (DuckDB, opcional)
 """
 
+from datetime import datetime
 from flask import Blueprint, jsonify, request
 from sqlalchemy import desc
+from sqlalchemy.orm import undefer_group, with_polymorphic
 from src.db.database import SessionLocal
 from src.db.models import ScrapedData, ProductoEcommerce, ScrapingSession
+from src.db.price_history import get_price_history, get_price_changes_since
+from src.db.search import search_products, SearchUnavailableError
+from src.db.categories import category_summary, category_filter
+from src.db.analytics import (
+    REPORTS, AnalyticsUnavailableError, UnknownReportError, get_mirror
+)
 
 # Creación del blueprint para las rutas de la API
 web_bp = Blueprint('web', __name__, url_prefix='/api')
 
+# Registros de cualquier tipo con las columnas de las subclases en la 
+# misma consulta (JOIN); junto con undefer_group('json') evita una 
+# consulta extra por fila al serializar
+ScrapedDataPolimorfico = with_polymorphic(ScrapedData, [ProductoEcommerce])
+
 
 def serialize_scraped_data(record):
     """Serializa un registro según su tipo polimórfico."""
@@ -42,7 +59,8 @@ def serialize_scraped_data(record):
             "precio": record.precio,
             "descuento": record.descuento,
             "rating": record.rating_metadata,
-            "descripcion": record.descripcion
+            "descripcion": record.descripcion,
+            "categoria": record.categoria
         })
     elif hasattr(record, 'contenido'):
         # Para tipos genéricos con contenido JSON
@@ -65,7 +83,7 @@ def get_all_data():
         per_page = request.args.get('per_page', 20, type=int)
         tipo = request.args.get('tipo', None)
         
-        query = session.query(ScrapedData)
+        query = session.query(ScrapedDataPolimorfico).options(undefer_group('json'))
         
         if tipo:
             query = query.filter(ScrapedData.tipo == tipo)
@@ -100,8 +118,9 @@ def get_data_by_id(data_id):
     """
     session = SessionLocal()
     try:
-        record = session.query(ScrapedData).filter(
-            ScrapedData.id == data_id).first()
+        record = session.query(ScrapedDataPolimorfico)\
+                        .options(undefer_group('json'))\
+                        .filter(ScrapedData.id == data_id).first()
         
         if not record:
             return jsonify({"error": "Registro no encontrado"}), 404
@@ -119,7 +138,7 @@ def get_data_by_id(data_id):
 def get_ecommerce_products():
     """
     Obtiene productos de e-commerce con filtros.
-    Query params: ?page=1&per_page=20&min_precio=1000&max_precio=5000
+    Query params: ?page=1&per_page=20&min_precio=1000&max_precio=5000&categoria=Celulares
     """
     session = SessionLocal()
     try:
@@ -127,13 +146,18 @@ def get_ecommerce_products():
         per_page = request.args.get('per_page', 20, type=int)
         min_precio = request.args.get('min_precio', type=float)
         max_precio = request.args.get('max_precio', type=float)
+        categoria = request.args.get('categoria')
         
-        query = session.query(ProductoEcommerce)
+        # Las columnas JSON comprimidas son diferidas: se cargan en la 
+        # misma consulta porque el listado las serializa
+        query = session.query(ProductoEcommerce).options(undefer_group('json'))
         
         if min_precio:
             query = query.filter(ProductoEcommerce.precio >= min_precio)
         if max_precio:
             query = query.filter(ProductoEcommerce.precio <= max_precio)
+        if categoria is not None:
+            query = query.filter(category_filter(categoria))
         
         total = query.count()
         products = query.order_by(desc(ProductoEcommerce.fecha_extraccion))\
@@ -158,6 +182,198 @@ def get_ecommerce_products():
         session.close()
 
 
+@web_bp.route('/search', methods=['GET'])
+def search_ecommerce_products():
+    """
+    Búsqueda de productos por nombre ordenada por relevancia.
+    Query params: ?q=televisor 55&min_precio=1000&max_precio=5000&limit=20&cursor=<next_cursor>
+    """
+    session = SessionLocal()
+    try:
+        q = request.args.get('q', '').strip()
+        if not q:
+            return jsonify({"error": "Parámetro 'q' requerido"}), 400
+        limit = min(max(request.args.get('limit', 20, type=int), 1), 100)
+        try:
+            hits, next_cursor = search_products(
+                session, q,
+                min_precio=request.args.get('min_precio', type=float),
+                max_precio=request.args.get('max_precio', type=float),
+                limit=limit,
+                cursor=request.args.get('cursor')
+            )
+        except ValueError:
+            return jsonify({"error": "Cursor no válido"}), 400
+
+        # Cargar los productos de la página en una consulta y conservar el orden
+        ids = [hit["id"] for hit in hits]
+        products = {
+            p.id: p for p in session.query(ProductoEcommerce)
+                                    .options(undefer_group('json'))
+                                    .filter(ProductoEcommerce.id.in_(ids))
+        } if ids else {}
+        results = []
+        for hit in hits:
+            product = products.get(hit["id"])
+            if product is not None:
+                item = serialize_scraped_data(product)
+                item["score"] = round(hit["score"], 4)
+                results.append(item)
+
+        return jsonify({
+            "query": q,
+            "results": results,
+            "next_cursor": next_cursor
+        })
+    except SearchUnavailableError as e:
+        return jsonify({"error": str(e)}), 503
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    finally:
+        session.close()
+
+
+def serialize_price_point(point):
+    """Serializa un punto (decodificado) del historial de precios."""
+    return {
+        "producto_id": point["producto_id"],
+        "fecha": point["fecha"].isoformat() if point["fecha"] else None,
+        "precio": point["precio"],
+        "precio_original": point["precio_original"],
+        "descuento": point["descuento"],
+        "session_id": point["session_id"],
+    }
+
+
+@web_bp.route('/ecommerce/<int:product_id>/price-history', methods=['GET'])
+def get_product_price_history(product_id):
+    """
+    Historial de precios de un producto (solo los cambios).
+    """
+    session = SessionLocal()
+    try:
+        if session.get(ProductoEcommerce, product_id) is None:
+            return jsonify({"error": "Producto no encontrado"}), 404
+        history = get_price_history(session, product_id)
+        return jsonify({
+            "producto_id": product_id,
+            "history": [serialize_price_point(p) for p in history]
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    finally:
+        session.close()
+
+
+@web_bp.route('/ecommerce/price-changes', methods=['GET'])
+def get_price_changes():
+    """
+    Cambios de precio de todos los productos desde una fecha.
+    Query params: ?since=2024-01-31T00:00:00
+    """
+    session = SessionLocal()
+    try:
+        since_arg = request.args.get('since')
+        if not since_arg:
+            return jsonify({"error": "Parámetro 'since' requerido (ISO 8601)"}), 400
+        try:
+            since = datetime.fromisoformat(since_arg)
+        except ValueError:
+            return jsonify({"error": f"Fecha no válida: {since_arg}"}), 400
+        changes = get_price_changes_since(session, since)
+        return jsonify({
+            "since": since.isoformat(),
+            "total": len(changes),
+            "changes": [serialize_price_point(p) for p in changes]
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    finally:
+        session.close()
+
+
+@web_bp.route('/categories', methods=['GET'])
+def get_categories():
+    """
+    Resumen por categoría (conteo y precio mínimo / promedio / máximo).
+    Query params: ?session_id=3&since=2024-01-31T00:00:00&min_productos=5&limit=50
+    """
+    session = SessionLocal()
+    try:
+        session_id = request.args.get('session_id', type=int)
+        min_productos = request.args.get('min_productos', 1, type=int)
+        limit = request.args.get('limit', type=int)
+        since_arg = request.args.get('since')
+        since = None
+        if since_arg:
+            try:
+                since = datetime.fromisoformat(since_arg)
+            except ValueError:
+                return jsonify({"error": f"Fecha no válida: {since_arg}"}), 400
+        categories = category_summary(
+            session, session_id=session_id, since=since,
+            min_productos=min_productos, limit=limit
+        )
+        return jsonify({
+            "total": len(categories),
+            "categories": categories
+        })
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+    finally:
+        session.close()
+
+
+# ==================== ANALÍTICA (DuckDB) ====================
+
+@web_bp.route('/analytics', methods=['GET'])
+def get_analytics_reports():
+    """
+    Reportes predefinidos disponibles y estado de la réplica analítica.
+    """
+    try:
+        return jsonify({
+            "reports": {name: r["descripcion"] for name, r in REPORTS.items()},
+            "mirror": get_mirror().status()
+        })
+    except AnalyticsUnavailableError as e:
+        return jsonify({"error": str(e)}), 503
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@web_bp.route('/analytics/<report_name>', methods=['GET'])
+def run_analytics_report(report_name):
+    """
+    Ejecuta un reporte agregado contra la réplica DuckDB (no toca SQLite).
+    Query params: ?desde=2024-01-01&hasta=2024-03-01&tienda=alkosto
+    """
+    desde = request.args.get('desde')
+    hasta = request.args.get('hasta')
+    for value in (desde, hasta):
+        if value:
+            try:
+                datetime.fromisoformat(value)
+            except ValueError:
+                return jsonify({"error": f"Fecha no válida: {value}"}), 400
+    try:
+        rows = get_mirror().run_report(
+            report_name, desde=desde, hasta=hasta,
+            tienda=request.args.get('tienda')
+        )
+        return jsonify({
+            "report": report_name,
+            "total": len(rows),
+            "rows": rows
+        })
+    except UnknownReportError as e:
+        return jsonify({"error": str(e)}), 404
+    except AnalyticsUnavailableError as e:
+        return jsonify({"error": str(e)}), 503
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
 # ==================== RUTAS DE SESIONES ====================
 
 @web_bp.route('/sessions', methods=['GET'])
@@ -180,6 +396,7 @@ def get_all_sessions():
                 "total_items": s.total_items,
                 "successful_items": s.successful_items,
                 "failed_items": s.failed_items,
+                "skipped_items": s.skipped_items or 0,
                 "success_rate": round((s.successful_items / s.total_items * 100) if s.total_items > 0 else 0, 2)
             })
         
@@ -205,7 +422,8 @@ def get_session_details(session_id):
             return jsonify({"error": "Sesión no encontrada"}), 404
         
         # Obtener productos de esta sesión
-        products = db_session.query(ScrapedData)\
+        products = db_session.query(ScrapedDataPolimorfico)\
+                            .options(undefer_group('json'))\
                             .filter(ScrapedData.session_id == session_id)\
                             .all()
         
@@ -216,7 +434,8 @@ def get_session_details(session_id):
                 "end_time": scraping_session.end_time.isoformat() if scraping_session.end_time else None,
                 "total_items": scraping_session.total_items,
                 "successful_items": scraping_session.successful_items,
-                "failed_items": scraping_session.failed_items
+                "failed_items": scraping_session.failed_items,
+                "skipped_items": scraping_session.skipped_items or 0
             },
             "products": [serialize_scraped_data(p) for p in products]
         })
@@ -0,0 +1,93 @@
+"""
+Configuración común de las pruebas.
+
+La base de datos temporal debe configurarse antes de importar src.db
+(igual que en benchmarks/). Cada prueba corre en su propio directorio
+de trabajo, así outputs/, cache/ y logs/ no ensucian el repositorio.
+"""
+
+import logging
+import os
+import sys
+import tempfile
+
+import pytest
+
+_TMP_DIR = tempfile.mkdtemp(prefix="tests_scraper_")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_TMP_DIR, 'tests.db')}"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.components.dynamic.ecommerce_extractor import EcommerceExtractor  # noqa: E402
+from src.coordinator.scraping_coordinator import ScrapingCoordinator  # noqa: E402
+from src.db.database import init_db  # noqa: E402
+
+logging.disable(logging.WARNING)
+init_db()
+
+
+@pytest.fixture(autouse=True)
+def directorio_trabajo(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def producto(clave: str) -> dict:
+    return {
+        "title": f"Producto {clave}",
+        "price_sell": 100_000,
+        "url": f"https://www.alkosto.com/producto-{clave}/p/{clave}",
+    }
+
+
+@pytest.fixture
+def tienda_simulada(monkeypatch):
+    """
+    Reemplaza la descarga y el parseo de EcommerceExtractor (sin Chrome).
+    `paginas` asocia (búsqueda, número de página) a una lista de claves
+    de producto; se mantiene el resto de la lógica del extractor.
+    """
+    paginas = {}
+
+    def download(self, override_url=None):
+        return override_url or self.url
+
+    def parse(self, html_content=None):
+        from urllib.parse import parse_qs, urlparse
+        qs = parse_qs(urlparse(html_content).query)
+        clave = (qs["text"][0], int(qs.get("page", ["1"])[0]))
+        productos = [producto(c) for c in paginas.get(clave, [])]
+        if not self.product_filter:
+            productos = productos[: self.num_productos]
+        return productos
+
+    monkeypatch.setattr(EcommerceExtractor, "download", download)
+    monkeypatch.setattr(EcommerceExtractor, "parse", parse)
+    return paginas
+
+
+def tarea(busqueda: str, **extra) -> dict:
+    return {
+        "url": f"https://www.alkosto.com/search?text={busqueda}",
+        "type": "dynamic", "subtype": "e-commerce", "tienda": "alkosto", **extra,
+    }
+
+
+@pytest.fixture
+def crear_coordinador():
+    """Fábrica de coordinadores sin esperas, robots.txt ni barra de progreso"""
+    creados = []
+
+    def crear(tareas, cls=ScrapingCoordinator, **opciones):
+        config = dict(
+            max_workers=1, delay_between_requests=0, rate_limits={},
+            respect_robots_txt=False, enable_cache=False, show_progress=False,
+            json_output="ndjson", log_level="ERROR",
+        )
+        config.update(opciones)
+        coordinator = cls(tareas, **config)
+        creados.append(coordinator)
+        return coordinator
+
+    yield crear
+    for coordinator in creados:
+        coordinator.cleanup()
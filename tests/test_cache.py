@@ -0,0 +1,170 @@
+import time
+
+import pytest
+
+from src.config import CACHE_TTL_TIENDA
+from src.coordinator.async_coordinator import AsyncScrapingCoordinator
+from src.coordinator.cache_store import SQLiteCache
+from src.coordinator.durable_queue import SQLiteTaskQueue
+from src.coordinator.scraping_coordinator import LRUCache, ScrapingCoordinator
+
+from conftest import tarea
+
+
+@pytest.fixture(params=["sqlite", "pickle"])
+def crear_cache(request, tmp_path):
+    """Fábrica de cachés de ambos backends en un directorio temporal"""
+    def crear(**opciones):
+        if request.param == "sqlite":
+            return SQLiteCache(cache_dir=str(tmp_path / "cache"), **opciones)
+        return LRUCache(cache_dir=str(tmp_path / "cache"), **opciones)
+    return crear
+
+
+def test_vencimiento_y_ventana_stale(crear_cache):
+    cache = crear_cache()
+    cache.set("vence", {"v": 1}, ttl=0.05)
+    cache.set("no-vence", {"v": 2})
+    time.sleep(0.1)
+
+    assert cache.get("vence") is None
+    entrada = cache.get_entry("vence", max_stale=60)
+    assert entrada.value == {"v": 1}
+    assert not entrada.is_fresh()
+    assert cache.get_entry("vence", max_stale=0.01) is None
+    assert cache.get_entry("no-vence").is_fresh()
+
+
+def test_ttl_por_defecto(crear_coordinador):
+    coordinator = crear_coordinador([])
+    # Sin cache_ttl explícito solo vencen las tiendas de CACHE_TTL_TIENDA
+    assert coordinator.cache_ttl is None
+    assert coordinator._cache_ttl_for(tarea("tv")) == CACHE_TTL_TIENDA["alkosto"]
+    assert coordinator._cache_ttl_for({"url": "https://example.com/a"}) is None
+    assert coordinator._cache_ttl_for(tarea("tv", cache_ttl=5)) == 5
+
+    coordinator = crear_coordinador([], cache_ttl=60, cache_ttls={})
+    assert coordinator._cache_ttl_for(tarea("tv")) == 60
+
+
+@pytest.mark.parametrize("cache_backend", ["sqlite", "pickle"])
+def test_stale_while_revalidate(crear_coordinador, tienda_simulada, cache_backend):
+    tienda_simulada[("tv", 1)] = ["viejo"]
+    coordinator = crear_coordinador(
+        [tarea("tv", cache_ttl=0.05)], enable_cache=True, cache_backend=cache_backend,
+        stale_while_revalidate=60, deduplicate=False,
+    )
+    coordinator.clear_cache()
+    primera = coordinator.run()["results"]
+    assert primera[0]["data"][0]["url"].endswith("/p/viejo")
+    assert "stale" not in primera[0]
+
+    time.sleep(0.1)
+    tienda_simulada[("tv", 1)] = ["nuevo"]
+    coordinator.add_task(tarea("tv", cache_ttl=60))
+    segunda = coordinator.run()
+    # El resultado vencido se entrega de inmediato y se actualiza aparte 
+    # (self.results acumula las ejecuciones; la actualización no se suma)
+    assert len(segunda["results"]) == 2
+    resultado = segunda["results"][-1]
+    assert resultado["stale"]
+    assert resultado["data"][0]["url"].endswith("/p/viejo")
+    assert segunda["statistics"]["cache_metrics"]["revalidations"] == 1
+
+    coordinator.add_task(tarea("tv"))
+    tercera = coordinator.run()["results"][-1]
+    assert "stale" not in tercera
+    assert tercera["data"][0]["url"].endswith("/p/nuevo")
+
+
+@pytest.mark.parametrize("cls", [ScrapingCoordinator, AsyncScrapingCoordinator])
+def test_revalidacion_que_falla_se_puede_repetir(crear_coordinador, tienda_simulada,
+                                                 monkeypatch, cls):
+    tienda_simulada[("tv", 1)] = ["viejo"]
+    coordinator = crear_coordinador(
+        [tarea("tv", cache_ttl=0.05)], cls=cls, enable_cache=True,
+        stale_while_revalidate=60, deduplicate=False,
+    )
+    coordinator.clear_cache()
+    coordinator.run()
+    time.sleep(0.1)
+
+    def falla(task):
+        raise RuntimeError("Extractor roto")
+
+    # La tarea de actualización lanza en vez de retornar un error
+    metodo = "process_task_async" if cls is AsyncScrapingCoordinator else "process_task"
+    original = getattr(coordinator, metodo)
+    monkeypatch.setattr(coordinator, metodo,
+                        lambda task: falla(task) if task.get("revalidate") else original(task))
+    coordinator.add_task(tarea("tv"))
+    estadisticas = coordinator.run()["statistics"]
+
+    assert estadisticas["cache_metrics"]["revalidation_errors"] == 1
+    # La clave se libera: el siguiente acceso vencido vuelve a programarla
+    assert coordinator._revalidating == set()
+
+
+def test_revalidacion_en_cola_compartida_no_queda_pendiente(crear_coordinador, tmp_path):
+    cola = SQLiteTaskQueue(str(tmp_path / "tareas.db"))
+    # La tarea está en curso en la cola: encolar su actualización no agrega nada
+    cola.push(tarea("tv"))
+    cola.lease("nodo")
+    coordinator = crear_coordinador([], task_queue=cola, enable_cache=True,
+                                    stale_while_revalidate=60)
+
+    coordinator._schedule_revalidation(tarea("tv"), coordinator._get_cache_key(tarea("tv")))
+
+    assert coordinator._revalidating == set()
+    assert cola.counts()["leased"] == 1
+    cola.close()
+
+
+def valor(kb: int) -> str:
+    return "x" * (kb * 1024)
+
+
+def test_limite_en_bytes(crear_cache):
+    cache = crear_cache(max_bytes=20 * 1024)
+    for i in range(10):
+        cache.set(f"k{i}", valor(4))
+
+    info = cache.get_cache_info()
+    assert info["bytes"] <= 20 * 1024
+    assert info["entries"] == 4
+    assert info["evictions"] == 6
+    # Una entrada mayor que todo el presupuesto no se guarda ni expulsa nada
+    cache.set("enorme", valor(30))
+    assert cache.get("enorme") is None
+    assert cache.size() == 4
+
+
+def test_gds_conserva_las_pequenas_y_costosas(crear_cache):
+    cache = crear_cache(max_bytes=20 * 1024, eviction="gds")
+    for i in range(4):
+        cache.set(f"chica{i}", valor(1), cost=5)
+    cache.set("grande", valor(12), cost=5)
+    # No cabe: sale la de menor costo por byte (la grande), aunque sea reciente
+    cache.set("otra", valor(6), cost=5)
+
+    assert cache.get("grande") is None
+    assert all(cache.get(f"chica{i}") is not None for i in range(4))
+    assert cache.get("otra") is not None
+
+
+def test_lru_expulsa_la_menos_usada(crear_cache):
+    cache = crear_cache(max_bytes=12 * 1024, eviction="lru")
+    for clave in ("a", "b", "c"):
+        cache.set(clave, valor(3))
+    cache.get("a")
+    cache.set("d", valor(3))
+
+    assert cache.get("b") is None
+    assert all(cache.get(clave) is not None for clave in ("a", "c", "d"))
+
+
+def test_limite_en_entradas(crear_cache):
+    cache = crear_cache(max_size=2)
+    for clave in ("a", "b", "c"):
+        cache.set(clave, valor(1))
+    assert cache.size() == 2
@@ -0,0 +1,102 @@
+import pytest
+
+from src.coordinator.async_coordinator import AsyncScrapingCoordinator
+from src.coordinator.checkpoint import RunCheckpoint, encode_options
+from src.coordinator.rate_limiter import RateLimit
+from src.coordinator.scraping_coordinator import ScrapingCoordinator
+
+from conftest import tarea
+
+
+def test_ida_y_vuelta(tmp_path):
+    tareas = [tarea("a"), tarea("b"), tarea("c")]
+    checkpoint = RunCheckpoint("run1", directory=str(tmp_path), interval=0,
+                               options={"max_workers": 7}, coordinator="ScrapingCoordinator")
+    checkpoint.register(tareas)
+    checkpoint.task_started(tareas[0])
+    checkpoint.task_finished(tareas[0], {"url": tareas[0]["url"], "data": []}, keys=["k1"])
+    checkpoint.task_started(tareas[1])
+    checkpoint.flush()
+
+    cargado = RunCheckpoint.load("run1", directory=str(tmp_path))
+
+    assert cargado.unfinished_tasks() == tareas[1:]
+    assert cargado.take_restored_results() == [{"url": tareas[0]["url"], "data": []}]
+    assert cargado.take_restored_keys() == ["k1"]
+    assert RunCheckpoint.load_options("run1", directory=str(tmp_path)) == (
+        "ScrapingCoordinator", {"max_workers": 7}
+    )
+    # Al volver a registrar el mismo archivo de tareas no se duplican
+    assert cargado.register([tarea("a"), tarea("b"), tarea("c")]) == []
+
+
+def test_resultado_incompleto_se_descarta(tmp_path):
+    tareas = [tarea("a"), tarea("b")]
+    checkpoint = RunCheckpoint("run2", directory=str(tmp_path), interval=0)
+    checkpoint.register(tareas)
+    checkpoint.task_finished(tareas[0], {"data": []})
+    checkpoint.flush()
+    with open(checkpoint.results_path, "a", encoding="utf-8") as f:
+        f.write('{"id": "corte a mitad')
+
+    cargado = RunCheckpoint.load("run2", directory=str(tmp_path))
+
+    assert len(cargado.take_restored_results()) == 1
+    assert len(cargado.unfinished_tasks()) == 1
+
+
+@pytest.mark.parametrize("cls", [ScrapingCoordinator, AsyncScrapingCoordinator])
+def test_reanudar_con_la_misma_configuracion(cls, tienda_simulada, crear_coordinador):
+    tienda_simulada[("a", 1)] = ["1", "2", "3"]
+    tienda_simulada[("b", 1)] = ["2", "3", "4", "5"]
+    coordinator = crear_coordinador(
+        [tarea("a", num_productos=3, priority=0), tarea("b", num_productos=2, priority=1)],
+        cls=cls, checkpoint_interval=0, max_retries=1, respect_robots_txt=False,
+        domain_concurrency={"alkosto": 1},
+        **({"max_concurrency": 1} if cls is AsyncScrapingCoordinator else {}),
+    )
+    resultados = coordinator.iter_results()
+    primero = next(resultados)
+    # Interrupción tras la primera tarea
+    resultados.close()
+    assert primero["url"] == tarea("a")["url"]
+
+    reanudado = ScrapingCoordinator.from_checkpoint(coordinator.run_id, show_progress=False)
+    final = reanudado.run()
+
+    assert type(reanudado) is cls
+    assert reanudado.options == {**coordinator.options}
+    assert reanudado.respect_robots_txt is False and reanudado.max_retries == 1
+    # Los productos de la tarea completada antes de interrumpir siguen vistos
+    por_url = {r["url"]: r for r in final["results"]}
+    assert [p["url"][-1] for p in por_url[tarea("b")["url"]]["data"]] == ["4", "5"]
+    assert final["statistics"]["checkpoint"]["status"] == "completed"
+
+
+def test_reanudar_con_limites_por_dominio(tienda_simulada, crear_coordinador):
+    tienda_simulada[("a", 1)] = ["1"]
+    tienda_simulada[("b", 1)] = ["2"]
+    limites = {"alkosto": RateLimit(rate=100, burst=5), "example.com": {"rate": 2.0}}
+    coordinator = crear_coordinador([tarea("a", priority=0), tarea("b", priority=1)],
+                                    checkpoint_interval=0, rate_limits=limites)
+    resultados = coordinator.iter_results()
+    next(resultados)
+    resultados.close()
+
+    reanudado = ScrapingCoordinator.from_checkpoint(coordinator.run_id, show_progress=False)
+
+    # Los RateLimit vuelven como RateLimit, no como su texto
+    assert reanudado.options["rate_limits"] == limites
+    assert reanudado._rate_limiter.limits["alkosto"] == RateLimit(rate=100, burst=5)
+    final = reanudado.run()
+    assert [r["url"] for r in final["results"]][-1] == tarea("b")["url"]
+
+
+def test_opcion_no_serializable_se_rechaza():
+    with pytest.raises(ValueError, match="domain_weights.alkosto"):
+        encode_options({"domain_weights": {"alkosto": object()}})
+
+
+def test_checkpoint_inexistente():
+    with pytest.raises(ValueError, match="No existe"):
+        ScrapingCoordinator.from_checkpoint("no-existe")
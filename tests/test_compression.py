@@ -0,0 +1,46 @@
+import pytest
+from sqlalchemy import insert
+
+from src.db import compression
+from src.db.database import engine
+from src.db.models import DiccionarioCompresion
+
+zstandard = pytest.importorskip("zstandard")
+
+
+@pytest.fixture
+def registro_aislado(monkeypatch):
+    """Registro de diccionarios propio de la prueba (como un proceso nuevo)"""
+    monkeypatch.setattr(compression, "_dictionaries", {})
+    monkeypatch.setattr(compression, "_active_codec", compression.CODEC_ZSTD)
+    monkeypatch.setattr(compression, "_active_dict_id", 0)
+    monkeypatch.setattr(compression._local, "zstd", {}, raising=False)
+
+
+def test_diccionario_de_otro_proceso_se_carga_por_id(registro_aislado):
+    valor = {"caracteristicas": ["Resolución 4K", "HDR", "Wi-Fi"], "modelo": "TV-55"}
+    muestras = [{**valor, "modelo": f"TV-{i}"} for i in range(200)]
+    datos = compression.train_dictionary(muestras, compression.CODEC_ZSTD, size=2048)
+    # Otro proceso entrena y guarda el diccionario y escribe con él
+    with engine.begin() as conn:
+        dict_id = conn.execute(insert(DiccionarioCompresion.__table__).values(
+            codec=compression.CODEC_ZSTD, datos=datos
+        )).inserted_primary_key[0]
+    compression.register_dictionary(dict_id, compression.CODEC_ZSTD, datos)
+    blob = compression.compress_json(valor)
+    assert compression.value_dictionary(blob) == (compression.CODEC_ZSTD, dict_id)
+
+    # Este proceso no lo conocía: se carga de la base al leer
+    compression._dictionaries.clear()
+    compression._local.zstd.clear()
+    compression._active_dict_id = 0
+
+    assert compression.decompress_json(blob) == valor
+    assert dict_id in compression._dictionaries
+    assert compression.active_dictionary() == (compression.CODEC_ZSTD, dict_id)
+
+
+def test_diccionario_inexistente(registro_aislado):
+    blob = compression._HEADER.pack(compression.CODEC_ZSTD, 65000) + b"\x00"
+    with pytest.raises(ValueError, match="no existe"):
+        compression.decompress_json(blob)
@@ -0,0 +1,97 @@
+import pytest
+
+from src.components.data_handler import DataHandler
+from src.db.database import SessionLocal
+from src.db.models import PrecioHistorico, ProductoEcommerce, ScrapedData, ScrapingSession
+
+from conftest import producto
+
+
+@pytest.fixture
+def abrir_sesion():
+    """Fábrica de ScrapingSession; al terminar borra sus registros"""
+    abiertas = []
+
+    def abrir():
+        abiertas.append(DataHandler.open_scraping_session())
+        return abiertas[-1]
+
+    yield abrir
+    db = SessionLocal()
+    for db_session_id in abiertas:
+        for modelo in (PrecioHistorico, ScrapedData):
+            for registro in db.query(modelo).filter(modelo.session_id == db_session_id):
+                db.delete(registro)
+        db.delete(db.get(ScrapingSession, db_session_id))
+    db.commit()
+    db.close()
+
+
+@pytest.fixture
+def sesion_sql(abrir_sesion):
+    return abrir_sesion()
+
+
+def guardar(productos, db_session_id, bulk_sql=True):
+    handler = DataHandler(productos, storage_format="sql", bulk_sql=bulk_sql,
+                          db_session_id=db_session_id)
+    assert handler.store_sql("e-commerce")
+    db = SessionLocal()
+    try:
+        sesion = db.get(ScrapingSession, db_session_id)
+        urls = {
+            url for url, in db.query(ProductoEcommerce.url)
+            .filter(ProductoEcommerce.session_id == db_session_id)
+        }
+        precios = db.query(PrecioHistorico).filter(
+            PrecioHistorico.session_id == db_session_id).count()
+        return sesion, urls, precios
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize("bulk_sql", [True, False])
+def test_un_registro_invalido_no_tumba_el_lote(sesion_sql, bulk_sql):
+    validos = [producto(f"dh{bulk_sql:d}{i}") for i in range(3)]
+    # nombre es NOT NULL: la base rechaza este registro
+    invalido = {**producto(f"dh{bulk_sql:d}x"), "title": None}
+
+    sesion, urls, precios = guardar([validos[0], invalido, *validos[1:]],
+                                    sesion_sql, bulk_sql=bulk_sql)
+
+    assert urls == {p["url"] for p in validos}
+    assert (sesion.total_items, sesion.successful_items, sesion.failed_items) == (4, 3, 1)
+    # El historial de precios solo registra lo que se escribió
+    assert precios == 3
+
+
+def test_lote_valido_actualiza_solo_lo_que_cambio(sesion_sql):
+    productos = [producto(f"dhu{i}") for i in range(3)]
+    guardar(productos, sesion_sql)
+    productos[0] = {**productos[0], "price_sell": 90_000}
+
+    sesion, urls, _ = guardar(productos, sesion_sql)
+
+    assert urls == {p["url"] for p in productos}
+    assert (sesion.successful_items, sesion.failed_items, sesion.skipped_items) == (6, 0, 2)
+
+
+@pytest.mark.parametrize("bulk_sql", [True, False])
+def test_sesion_siguiente_incluye_los_productos_sin_cambios(abrir_sesion, bulk_sql):
+    productos = [producto(f"dhs{bulk_sql:d}{i}") for i in range(3)]
+    guardar(productos, abrir_sesion(), bulk_sql=bulk_sql)
+    productos[0] = {**productos[0], "price_sell": 90_000}
+
+    segunda = abrir_sesion()
+    sesion, urls, _ = guardar(productos, segunda, bulk_sql=bulk_sql)
+
+    # Los omitidos por no tener cambios también pertenecen a la segunda sesión
+    assert urls == {p["url"] for p in productos}
+    assert sesion.skipped_items == 2
+    db = SessionLocal()
+    try:
+        sin_cambios = db.query(ScrapedData.fecha_actualizacion).filter(
+            ScrapedData.url.in_([p["url"] for p in productos[1:]])).all()
+        assert sin_cambios == [(None,), (None,)]
+    finally:
+        db.close()
@@ -0,0 +1,67 @@
+import pickle
+
+import pytest
+
+from src.coordinator.async_coordinator import AsyncScrapingCoordinator
+from src.coordinator.scraping_coordinator import (
+    AttemptDeduplicator, ProductDeduplicator, ScrapingCoordinator,
+)
+
+from conftest import producto, tarea
+
+
+def claves(resultado):
+    return [p["url"].rsplit("/", 1)[-1] for p in resultado["data"]]
+
+
+def test_filtro_antes_del_tope(tienda_simulada, crear_coordinador):
+    tienda_simulada[("a", 1)] = ["1", "2", "3", "4", "5"]
+    tienda_simulada[("b", 1)] = ["3", "4", "5", "6", "7"]
+    tienda_simulada[("b", 2)] = ["8", "9"]
+    coordinator = crear_coordinador([
+        tarea("a", num_productos=4, priority=0),
+        tarea("b", num_productos=4, max_paginas=2, priority=1),
+    ])
+
+    resultados = {r["url"]: r for r in coordinator.run()["results"]}
+
+    assert claves(resultados[tarea("a")["url"]]) == ["1", "2", "3", "4"]
+    # Los duplicados (3, 4) se reemplazan con los siguientes de la página
+    # y de la página 2: la tarea recibe los 4 productos pedidos
+    assert claves(resultados[tarea("b")["url"]]) == ["5", "6", "7", "8"]
+
+
+@pytest.mark.parametrize("cls", [ScrapingCoordinator, AsyncScrapingCoordinator])
+def test_segunda_ejecucion_no_hereda_claves(cls, tienda_simulada, crear_coordinador):
+    tienda_simulada[("a", 1)] = ["1", "2", "3"]
+    coordinator = crear_coordinador([tarea("a", num_productos=3)], cls=cls)
+
+    primera = coordinator.run()
+    coordinator.add_task(tarea("a", num_productos=3))
+    segunda = coordinator.run()
+
+    assert claves(primera["results"][0]) == ["1", "2", "3"]
+    assert claves(segunda["results"][0]) == ["1", "2", "3"]
+    dedup = segunda["statistics"]["deduplication"]
+    assert (dedup["seen"], dedup["duplicates"]) == (3, 0)
+
+
+def test_clear_reinicia_estadisticas():
+    dedup = ProductDeduplicator()
+    dedup.filter_new([producto("1"), producto("1")])
+    dedup.clear()
+
+    assert dedup.get_stats()["duplicates"] == 0
+    assert dedup.is_new(producto("1"))
+
+
+def test_filtro_del_intento_viaja_a_otro_proceso():
+    dedup = ProductDeduplicator()
+    dedup.is_new(producto("1"))
+    filtro = pickle.loads(pickle.dumps(AttemptDeduplicator(
+        dedup.keys_for(producto("1")["url"]))))
+
+    assert filtro([producto("1"), producto("2"), producto("2")]) == [producto("2")]
+    assert filtro.duplicates == 2
+    # El filtro no registra nada en la ejecución
+    assert dedup.is_new(producto("2"))
@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from src.db import price_history
+from src.db.database import SessionLocal
+from src.db.models import PrecioHistorico, ProductoEcommerce
+from src.db.price_history import (
+    backfill_price_history, get_price_changes_since, get_price_history,
+    record_price_observations,
+)
+
+INICIO = datetime(2026, 1, 1)
+
+
+@pytest.fixture
+def db():
+    db = SessionLocal()
+    yield db
+    db.rollback()
+    for registro in db.scalars(select(ProductoEcommerce).where(
+            ProductoEcommerce.url.like("https://www.alkosto.com/historial/%"))):
+        db.delete(registro)
+    db.commit()
+    db.close()
+
+
+@pytest.fixture
+def crear_producto(db):
+    def crear(clave: str, precio: float = 100.0, precio_original: float = 120.0):
+        registro = ProductoEcommerce(
+            url=f"https://www.alkosto.com/historial/p/{clave}", nombre=f"Producto {clave}",
+            precio=precio, precio_original=precio_original,
+        )
+        db.add(registro)
+        db.flush()
+        return registro.id
+    return crear
+
+
+def registrar(db, producto_id, precios, delta=True):
+    """Registra un estado por día; retorna cuántos puntos se agregaron"""
+    puntos = 0
+    for dia, (precio, original) in enumerate(precios):
+        puntos += record_price_observations(
+            db, {producto_id: (precio, original, None)},
+            fecha=INICIO + timedelta(days=dia), delta=delta,
+        )
+        db.flush()
+    return puntos
+
+
+def precios(historial):
+    return [(p["precio"], p["precio_original"]) for p in historial]
+
+
+def test_delta_y_keyframes_ida_y_vuelta(db, crear_producto, monkeypatch):
+    monkeypatch.setattr(price_history, "KEYFRAME_INTERVAL", 3)
+    producto_id = crear_producto("rt")
+    serie = [(10.1, 12.0), (19.99, 25.5), (7.3, 9.99), (1999900.0, 2499900.0),
+             (0.1, 0.2), (0.3, 0.7)]
+
+    assert registrar(db, producto_id, serie) == len(serie)
+
+    puntos = db.scalars(select(PrecioHistorico.es_delta)
+                        .where(PrecioHistorico.producto_id == producto_id)
+                        .order_by(PrecioHistorico.secuencia)).all()
+    assert puntos == [False, True, True, False, True, True]
+    assert precios(get_price_history(db, producto_id)) == serie
+
+
+def test_precio_sin_cambios_no_agrega_punto(db, crear_producto):
+    producto_id = crear_producto("igual")
+    serie = [(10.1, 12.0), (19.99, 25.0), (7.3, 9.0), (7.3, 9.0)]
+
+    assert registrar(db, producto_id, serie) == 3
+    assert precios(get_price_history(db, producto_id))[-1] == (7.3, 9.0)
+
+
+def test_mas_decimales_que_centavos_se_guarda_como_keyframe(db, crear_producto):
+    producto_id = crear_producto("decimales")
+    serie = [(10.0, 12.0), (10.125, 12.0), (11.0, 12.0)]
+
+    registrar(db, producto_id, serie)
+
+    puntos = db.scalars(select(PrecioHistorico.es_delta)
+                        .where(PrecioHistorico.producto_id == producto_id)
+                        .order_by(PrecioHistorico.secuencia)).all()
+    assert puntos == [False, False, False]
+    assert precios(get_price_history(db, producto_id)) == serie
+
+
+def test_cambios_desde_una_fecha_con_keyframe_anterior(db, crear_producto, monkeypatch):
+    monkeypatch.setattr(price_history, "KEYFRAME_INTERVAL", 4)
+    producto_id = crear_producto("ventana")
+    serie = [(100.0, 120.0), (90.5, 120.0), (80.25, 110.0), (70.1, 100.0),
+             (60.0, 90.0), (50.99, 80.0)]
+    registrar(db, producto_id, serie)
+
+    # La ventana empieza en un delta (día 2) y cruza el keyframe del día 4
+    cambios = [c for c in get_price_changes_since(db, INICIO + timedelta(days=2))
+               if c["producto_id"] == producto_id]
+
+    assert precios(cambios) == serie[2:]
+
+
+def test_backfill_es_idempotente(db, crear_producto):
+    producto_id = crear_producto("backfill", precio=7.3, precio_original=9.99)
+    registrar(db, producto_id, [(10.1, 12.0), (19.99, 25.5)])
+    db.commit()
+
+    backfill_price_history(db, json_dirs=[], delta=True)
+    primera = precios(get_price_history(db, producto_id))
+    backfill_price_history(db, json_dirs=[], delta=True)
+    segunda = precios(get_price_history(db, producto_id))
+
+    # El estado actual de la fila se agrega una sola vez al final
+    assert primera == segunda == [(10.1, 12.0), (19.99, 25.5), (7.3, 9.99)]
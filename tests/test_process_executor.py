@@ -0,0 +1,81 @@
+import threading
+import time
+from pathlib import Path
+
+from src.coordinator import process_worker
+from src.coordinator.scraping_coordinator import ProductDeduplicator
+from src.utils.cancellation import TaskCancelledError
+
+# Este módulo se importa también en los procesos worker (spawn): no
+# importa conftest para no crear otra base de datos temporal en cada uno
+
+
+class ExtractorLento:
+    """Extractor que espera hasta que lo cancelen y lo deja anotado"""
+
+    def __init__(self, url, cancel_token=None, **params):
+        self.url = url
+        self.cancel_token = cancel_token
+
+    def scrape(self):
+        marcas = Path(self.url.rsplit("marcas=", 1)[-1])
+        (marcas / "empezo").touch()
+        try:
+            self.cancel_token.wait(60)
+        except TaskCancelledError:
+            (marcas / "cancelado").touch()
+            raise
+
+
+def scrape_lento(task, params, timeout, grace_period, cancel_slot=None):
+    """process_target de prueba: scrape_task con ExtractorLento"""
+    process_worker.EXTRACTORS["e-commerce"] = ExtractorLento
+    return process_worker.scrape_task(task, params, timeout, grace_period, cancel_slot)
+
+
+def esperar(condicion, segundos=30.0):
+    limite = time.monotonic() + segundos
+    while not condicion():
+        assert time.monotonic() < limite, "Tiempo de espera agotado"
+        time.sleep(0.05)
+
+
+def test_cancelar_en_el_padre_detiene_el_worker(crear_coordinador, tmp_path):
+    tarea = {
+        "url": f"https://www.alkosto.com/search?text=lento&marcas={tmp_path}",
+        "type": "dynamic", "subtype": "e-commerce", "tienda": "alkosto",
+    }
+    coordinator = crear_coordinador([tarea], executor="process", default_timeout=120,
+                                    max_retries=1)
+    coordinator.process_target = scrape_lento
+    ejecucion = threading.Thread(target=coordinator.run)
+    ejecucion.start()
+
+    esperar((tmp_path / "empezo").exists)
+    inicio = time.monotonic()
+    assert coordinator.cancel_running_tasks("prueba") == 1
+    ejecucion.join(30)
+
+    # El worker se detiene sin esperar a su propio plazo (120 s) y la
+    # ejecución termina: el pool no queda esperando al intento
+    assert not ejecucion.is_alive()
+    assert (tmp_path / "cancelado").exists()
+    assert time.monotonic() - inicio < 10
+    assert sorted(coordinator._free_cancel_slots) == list(range(len(coordinator._cancel_flags)))
+
+
+def test_al_worker_solo_viajan_las_claves_de_la_tienda():
+    dedup = ProductDeduplicator()
+    dedup.filter_new([
+        {"url": "https://www.alkosto.com/producto/p/1"},
+        {"url": "https://articulo.mercadolibre.com.co/MCO-123456789-celular"},
+        {"url": "https://example.com/item?id=7"},
+        {"url": "https://otra.com/item?id=7"},
+    ])
+
+    assert dedup.keys_for("https://www.alkosto.com/search?text=tv") == {"alkosto:1"}
+    assert dedup.keys_for("https://listado.mercadolibre.com.co/celular") == {
+        "mercadolibre:MCO123456789"}
+    assert dedup.keys_for("https://example.com/buscar") == {"https://example.com/item?id=7"}
+    assert ProductDeduplicator(bloom_capacity=100).keys_for(
+        "https://www.alkosto.com/search?text=tv") == frozenset()
@@ -0,0 +1,77 @@
+from src.components.dynamic.ecommerce_extractor import EcommerceExtractor
+from src.coordinator.scraping_coordinator import ScrapingCoordinator
+
+from conftest import tarea
+
+
+class CoordinadorRegistrado(ScrapingCoordinator):
+    """Registra las instancias creadas (incluida la de reintento)"""
+    creados = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.creados.append(self)
+
+
+def test_reintento_hereda_la_configuracion(crear_coordinador, tienda_simulada, monkeypatch):
+    tienda_simulada[("ok", 1)] = ["a"]
+    tienda_simulada[("roto", 1)] = ["b"]
+    download = EcommerceExtractor.download
+    caida = {"activa": True}
+
+    def download_con_caida(self, override_url=None):
+        if caida["activa"] and "roto" in (override_url or self.url):
+            raise ValueError("Página bloqueada")
+        return download(self, override_url)
+
+    monkeypatch.setattr(EcommerceExtractor, "download", download_con_caida)
+    exitos = []
+    coordinator = crear_coordinador(
+        [tarea("ok"), tarea("roto")], cls=CoordinadorRegistrado,
+        domain_concurrency={"alkosto": 3}, result_retention="summary",
+        write_behind=False, on_success=exitos.append,
+    )
+    coordinator.run()
+    assert [r["url"] for r in coordinator.get_failed_tasks()] == [tarea("roto")["url"]]
+
+    caida["activa"] = False
+    resultado = coordinator.retry_failed_tasks()
+
+    reintento = CoordinadorRegistrado.creados[-1]
+    assert reintento is not coordinator
+    assert reintento.options == coordinator.options
+    assert reintento.domain_concurrency == coordinator.domain_concurrency
+    assert reintento.on_success is coordinator.on_success
+    assert [r["url"] for r in resultado["results"]] == [tarea("roto")["url"]]
+    # result_retention 'summary' también en el reintento
+    assert resultado["results"][0]["data"] is None
+    assert resultado["results"][0]["items"] == 1
+    assert len(exitos) == 2
+    reintento.cleanup()
+
+
+def test_intento_fallido_no_deja_productos_como_vistos(crear_coordinador, tienda_simulada,
+                                                       monkeypatch):
+    tienda_simulada[("tv", 1)] = ["P1", "P2", "P3"]
+    tienda_simulada[("tv", 2)] = ["P20", "P21", "P22"]
+    download = EcommerceExtractor.download
+    fallos = []
+
+    def download_con_corte(self, override_url=None):
+        # El primer intento se cae al pedir la página 2
+        if "page=2" in (override_url or "") and not fallos:
+            fallos.append(override_url)
+            raise ConnectionError("Conexión reiniciada")
+        return download(self, override_url)
+
+    monkeypatch.setattr(EcommerceExtractor, "download", download_con_corte)
+    coordinator = crear_coordinador([tarea("tv", num_productos=6, max_paginas=2)])
+
+    resultado = coordinator.run()
+
+    tarea_tv, = resultado["results"]
+    assert tarea_tv["metrics"]["attempts"] == 2
+    assert [p["url"].rsplit("/", 1)[-1] for p in tarea_tv["data"]] == [
+        "P1", "P2", "P3", "P20", "P21", "P22"]
+    dedup = resultado["statistics"]["deduplication"]
+    assert (dedup["seen"], dedup["duplicates"]) == (6, 0)
@@ -0,0 +1,123 @@
+import sqlite3
+import time
+
+import pytest
+
+from src.coordinator.durable_queue import SQLiteTaskQueue
+
+from conftest import tarea
+
+
+@pytest.fixture
+def cola(tmp_path):
+    cola = SQLiteTaskQueue(str(tmp_path / "tareas.db"), visibility_timeout=30)
+    yield cola
+    cola.close()
+
+
+def test_lease_vencido_se_vuelve_a_entregar(cola):
+    cola.push(tarea("tv"))
+    primero, = cola.lease("nodo-1", visibility_timeout=0.05)
+    assert primero.attempts == 1
+    assert cola.lease("nodo-2") == []
+
+    time.sleep(0.1)
+    segundo, = cola.lease("nodo-2")
+
+    assert segundo.task == primero.task
+    assert segundo.attempts == 2
+    # El nodo caído ya no puede confirmar una tarea que tiene otro
+    assert not cola.ack(primero.id)
+    assert cola.ack(segundo.id)
+    assert cola.counts()["done"] == 1
+
+
+def test_lease_vigente_se_renueva(cola):
+    cola.push(tarea("tv"))
+    lease, = cola.lease("nodo-1", visibility_timeout=0.05)
+    assert cola.extend([lease.id], visibility_timeout=30) == 1
+    time.sleep(0.1)
+    assert cola.lease("nodo-2") == []
+    assert cola.ack(lease.id)
+
+
+def test_release_no_cuenta_como_intento(cola):
+    cola.push(tarea("tv"))
+    lease, = cola.lease("nodo-1")
+    assert cola.release(lease.id)
+    assert cola.lease("nodo-1")[0].attempts == 1
+
+
+def test_demasiados_vencimientos_pasan_a_dead(tmp_path):
+    cola = SQLiteTaskQueue(str(tmp_path / "tareas.db"), max_attempts=2)
+    cola.push(tarea("tumba-al-worker"))
+    for _ in range(2):
+        assert cola.lease("nodo", visibility_timeout=0.01)
+        time.sleep(0.05)
+
+    assert cola.lease("nodo") == []
+    assert cola.counts()["dead"] == 1
+    assert cola.outstanding() == 0
+
+
+def test_prioridad_y_orden_de_llegada(cola):
+    cola.push_many([tarea("c", priority=1), tarea("a", priority=0), tarea("b", priority=0)])
+    leases = cola.lease("nodo", limit=3)
+    assert [lease.task["url"][-1] for lease in leases] == ["a", "b", "c"]
+
+
+def test_encolar_dos_veces_no_duplica(cola):
+    assert cola.push_many([tarea("tv"), tarea("celular")]) == 2
+    # Otro nodo siembra la misma búsqueda (con parámetros de tracking)
+    duplicada = tarea("tv")
+    duplicada["url"] += "&utm_source=correo"
+    assert cola.push_many([duplicada, tarea("tv", subtype="real_state")]) == 1
+
+    lease, = cola.lease("nodo", limit=1)
+    assert not cola.push(lease.task)
+    assert cola.ack(lease.id)
+    # Una tarea ya terminada sí puede volver a encolarse
+    assert cola.push(lease.task)
+    assert cola.counts()["pending"] == 3
+
+
+def test_misma_busqueda_con_otros_parametros_no_se_descarta(cola):
+    assert cola.push(tarea("tv"))
+    assert not cola.push(tarea("tv", num_productos=1, max_paginas=1))
+    # Pedir más productos o más páginas cambia el resultado: es otra tarea
+    assert cola.push(tarea("tv", num_productos=50))
+    assert cola.push(tarea("tv", max_paginas=3))
+
+    assert sorted((t.task.get("num_productos", 1), t.task.get("max_paginas", 1))
+                  for t in cola.lease("nodo", limit=3)) == [(1, 1), (1, 3), (50, 1)]
+
+
+def test_migra_colas_sin_clave(tmp_path):
+    ruta = str(tmp_path / "antigua.db")
+    with sqlite3.connect(ruta) as conn:
+        conn.executescript(SQLiteTaskQueue.SCHEMA.replace("task_key TEXT,", ""))
+
+    cola = SQLiteTaskQueue(ruta)
+    assert cola.push_many([tarea("tv"), tarea("tv")]) == 1
+
+
+def test_nodo_de_cola_compartida_no_siembra_tareas(cola, crear_coordinador):
+    with pytest.raises(ValueError, match="una sola vez"):
+        crear_coordinador([tarea("tv")], task_queue=cola)
+
+
+def test_cada_tarea_se_procesa_una_vez(cola, crear_coordinador, tienda_simulada):
+    busquedas = [f"q{i}" for i in range(6)]
+    for busqueda in busquedas:
+        tienda_simulada[(busqueda, 1)] = [busqueda]
+    cola.push_many([tarea(b) for b in busquedas])
+
+    resultados = []
+    for _ in range(2):
+        nodo = crear_coordinador([], task_queue=cola, queue_poll_interval=0.01,
+                                 deduplicate=False)
+        resultados += nodo.run()["results"]
+
+    # El segundo nodo encuentra la cola vacía y no repite nada
+    assert sorted(r["url"][-2:] for r in resultados) == busquedas
+    assert cola.counts()["done"] == len(busquedas)
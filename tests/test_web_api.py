@@ -0,0 +1,77 @@
+from contextlib import contextmanager
+
+import pytest
+from flask import Flask
+from sqlalchemy import event
+
+from src.db.database import SessionLocal, engine
+from src.db.models import ProductoEcommerce, ScrapedData, ScrapingSession
+from src.web.routes import web_bp
+
+
+@pytest.fixture
+def cliente():
+    app = Flask(__name__)
+    app.register_blueprint(web_bp)
+    return app.test_client()
+
+
+@pytest.fixture
+def sesion_con_productos():
+    db = SessionLocal()
+    sesion = ScrapingSession()
+    db.add(sesion)
+    db.flush()
+    for i in range(5):
+        db.add(ProductoEcommerce(
+            url=f"https://www.alkosto.com/api-test/p/{i}", nombre=f"Producto {i}",
+            precio=1000.0 + i, descripcion=["Wi-Fi", f"Modelo {i}"],
+            rating_metadata={"rating": "4.5"}, session_id=sesion.id,
+        ))
+    db.commit()
+    yield sesion.id
+    for registro in db.query(ScrapedData).filter(ScrapedData.session_id == sesion.id):
+        db.delete(registro)
+    db.delete(sesion)
+    db.commit()
+    db.close()
+
+
+@contextmanager
+def contar_selects():
+    consultas = []
+
+    def registrar(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            consultas.append(statement)
+
+    event.listen(engine, "before_cursor_execute", registrar)
+    try:
+        yield consultas
+    finally:
+        event.remove(engine, "before_cursor_execute", registrar)
+
+
+@pytest.mark.parametrize("ruta", ["/api/data?per_page=50", "/api/sessions/{sesion}"])
+def test_listados_sin_consultas_por_fila(ruta, cliente, sesion_con_productos):
+    with contar_selects() as consultas:
+        respuesta = cliente.get(ruta.format(sesion=sesion_con_productos))
+
+    assert respuesta.status_code == 200
+    productos = respuesta.get_json().get("data") or respuesta.get_json()["products"]
+    assert any(p.get("descripcion") == ["Wi-Fi", "Modelo 0"] for p in productos)
+    # Conteo + listado (y la sesión): nunca una consulta por fila
+    assert len(consultas) <= 3, consultas
+
+
+def test_detalle_en_una_consulta(cliente, sesion_con_productos):
+    db = SessionLocal()
+    data_id = db.query(ScrapedData.id).filter(
+        ScrapedData.session_id == sesion_con_productos).first()[0]
+    db.close()
+
+    with contar_selects() as consultas:
+        respuesta = cliente.get(f"/api/data/{data_id}")
+
+    assert respuesta.get_json()["descripcion"] == ["Wi-Fi", "Modelo 0"]
+    assert len(consultas) == 1, consultas